@@ -1,6 +1,6 @@
 import json
 import random
-from locust import HttpUser, task, between
+from locust import HttpUser, task, between, constant
 
 
 BASE_URL = "http://127.0.0.1:8001"
@@ -67,3 +67,39 @@ class CookieConsentCollectionUser(HttpUser):
                 response.failure(f"Status check failed: {response.status_code}")
             else:
                 response.success()
+
+
+class ConsentIngestionThroughputUser(HttpUser):
+    """
+    Closed-loop banner clicks with no think time, used to compare ingestion modes.
+
+    Run once per mode against the same database and compare requests/s and p95:
+        RATE_LIMIT_ENABLED=false CONSENT_INGESTION_MODE=sync      -> start the service
+        RATE_LIMIT_ENABLED=false CONSENT_INGESTION_MODE=buffered  -> start the service
+        locust -f locustfile.py ConsentIngestionThroughputUser --headless -u 200 -r 50 -t 2m
+    """
+
+    host = BASE_URL
+    wait_time = constant(0)
+
+    DUMMY_WEBSITE_IDS = [f"website_{i}" for i in range(1, 51)]
+
+    @task
+    def submit_consent(self):
+        payload = {
+            "category_choices": {
+                "necessary": True,
+                "analytics": random.choice([True, False]),
+                "marketing": random.choice([True, False]),
+                "preferences": random.choice([True, False]),
+            },
+            "website_id": random.choice(self.DUMMY_WEBSITE_IDS),
+            "user_id": f"user_{random.randint(1, 100000)}",
+            "language": "eng",
+        }
+
+        with self.client.post("/v1/consent", json=payload, name="/v1/consent [throughput]", catch_response=True) as response:
+            if response.status_code not in (200, 201, 202):
+                response.failure(f"Consent failed: {response.status_code} - {response.text}")
+            else:
+                response.success()
@@ -10,6 +10,7 @@ from app.core.config import settings
 from app.db.session import get_s3_client
 from app.crud.consent_artifact_crud import ConsentArtifactCRUD
 from app.crud.consent_audit_crud import ConsentAuditCRUD
+from app.crud.dashboard_snapshot_crud import DashboardSnapshotCRUD
 from app.crud.consent_validation_crud import ConsentValidationCRUD
 from app.crud.data_principal_crud import DataPrincipalCRUD
 from app.crud.department_crud import DepartmentCRUD
@@ -29,6 +30,7 @@ from app.db.dependencies import (
     get_consent_validation_files_collection,
     get_cp_master_collection,
     get_customer_notifications_collection,
+    get_dashboard_snapshot_collection,
     get_de_master_collection,
     get_de_master_translated_collection,
     get_de_template_collection,
@@ -38,6 +40,7 @@ from app.db.dependencies import (
     get_notifications_collection,
     get_purpose_master_translated_collection,
     get_purpose_template_collection,
+    get_template_mirror_state_collection,
     get_cookie_master,
     get_roles_collection,
     get_user_collection,
@@ -61,6 +64,7 @@ from app.schemas.auth_schema import UserInDB
 from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorCollection
 from app.crud.data_element_crud import DataElementCRUD
 from app.crud.purpose_crud import PurposeCRUD
+from app.crud.template_mirror_crud import de_template_mirror, purpose_template_mirror
 from app.crud.collection_point_crud import CollectionPointCrud
 from app.crud.assets_crud import AssetCrud
 from app.crud.cookie_crud import CookieCrud
@@ -69,6 +73,7 @@ from app.services.consent_artifact_service import ConsentArtifactService
 from app.services.consent_audit_service import ConsentAuditService
 from app.services.consent_validation_service import ConsentValidationService
 from app.services.dashboard_service import DashboardService
+from app.services.dashboard_snapshot_service import DashboardSnapshotService
 from app.services.data_element_service import DataElementService
 from app.services.data_principal_service import DataPrincipalService
 from app.services.department_service import DepartmentService
@@ -111,8 +116,14 @@ async def get_data_element_crud(
     de_template_collection: AsyncIOMotorCollection = Depends(get_de_template_collection),
     de_master_collection: AsyncIOMotorCollection = Depends(get_de_master_collection),
     de_master_translated_collection: AsyncIOMotorCollection = Depends(get_de_master_translated_collection),
+    template_mirror_state_collection: AsyncIOMotorCollection = Depends(get_template_mirror_state_collection),
 ) -> DataElementCRUD:
-    return DataElementCRUD(de_template_collection, de_master_collection, de_master_translated_collection)
+    return DataElementCRUD(
+        de_template_collection,
+        de_master_collection,
+        de_master_translated_collection,
+        de_template_mirror(de_template_collection, template_mirror_state_collection),
+    )
 
 
 async def get_data_element_service(
@@ -126,11 +137,13 @@ async def get_purpose_crud(
     purpose_template_collection: AsyncIOMotorCollection = Depends(get_purpose_template_collection),
     purpose_master_collection: AsyncIOMotorCollection = Depends(get_consent_purpose_collection),
     purpose_master_translated_collection: AsyncIOMotorCollection = Depends(get_purpose_master_translated_collection),
+    template_mirror_state_collection: AsyncIOMotorCollection = Depends(get_template_mirror_state_collection),
 ) -> PurposeCRUD:
     return PurposeCRUD(
         purpose_template_collection,
         purpose_master_collection,
         purpose_master_translated_collection,
+        purpose_template_mirror(purpose_template_collection, template_mirror_state_collection),
     )
 
 
@@ -555,6 +568,20 @@ async def get_incident_service(
     )
 
 
+async def get_dashboard_snapshot_crud(
+    dashboard_snapshot_collection: AsyncIOMotorCollection = Depends(get_dashboard_snapshot_collection),
+) -> DashboardSnapshotCRUD:
+    return DashboardSnapshotCRUD(dashboard_snapshot_collection)
+
+
+async def get_dashboard_snapshot_service(
+    consent_artifact_crud: ConsentArtifactCRUD = Depends(get_consent_artifact_crud),
+    consent_artifact_service: ConsentArtifactService = Depends(get_consent_artifact_service),
+    dashboard_snapshot_crud: DashboardSnapshotCRUD = Depends(get_dashboard_snapshot_crud),
+) -> DashboardSnapshotService:
+    return DashboardSnapshotService(consent_artifact_crud, consent_artifact_service, dashboard_snapshot_crud)
+
+
 async def get_dashboard_service(
     departments_crud: DepartmentCRUD = Depends(get_department_crud),
     roles_crud: RoleCRUD = Depends(get_role_crud),
@@ -567,8 +594,7 @@ async def get_dashboard_service(
     grievance_crud: GrievanceCRUD = Depends(get_grievance_crud),
     dpar_crud: DparCRUD = Depends(get_dpar_crud),
     vendor_crud: VendorCRUD = Depends(get_vendor_crud),
-    consent_artifact_crud: ConsentArtifactCRUD = Depends(get_consent_artifact_crud),
-    consent_artifact_service: ConsentArtifactService = Depends(get_consent_artifact_service),
+    dashboard_snapshot_service: DashboardSnapshotService = Depends(get_dashboard_snapshot_service),
 ) -> DashboardService:
     return DashboardService(
         departments_crud,
@@ -582,6 +608,5 @@ async def get_dashboard_service(
         grievance_crud,
         dpar_crud,
         vendor_crud,
-        consent_artifact_crud,
-        consent_artifact_service,
+        dashboard_snapshot_service,
     )
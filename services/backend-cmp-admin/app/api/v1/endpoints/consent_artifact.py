@@ -86,6 +86,8 @@ async def get_consent_artifact_by_id(
 async def get_expiring_consents(
     dp_id: Optional[str] = Query(None),
     days_to_expire: Optional[Literal["7", "15", "30"]] = Query(None, description="Filter by days until expiry (7, 15, or 30)"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(500, ge=1, le=1000),
     current_user: dict = Depends(get_current_user),
     service: ConsentArtifactService = Depends(get_consent_artifact_service),
 ):
@@ -94,7 +96,20 @@ async def get_expiring_consents(
         logger.warning(f"User {current_user.get('email')} attempted to get expiring consents without df_id.")
         raise HTTPException(status_code=404, detail="User Not Found")
     logger.info(f"User {current_user.get('email')} is getting expiring consents for DF {df_id}.")
-    return await service.get_expiring_consents(df_id, dp_id, days_to_expire)
+    return await service.get_expiring_consents(df_id, dp_id, days_to_expire, page=page, limit=limit)
+
+
+@router.get("/get-expiring-consent-counts")
+async def get_expiring_consent_counts(
+    dp_id: Optional[str] = Query(None),
+    current_user: dict = Depends(get_current_user),
+    service: ConsentArtifactService = Depends(get_consent_artifact_service),
+):
+    df_id = current_user.get("df_id")
+    if not df_id:
+        logger.warning(f"User {current_user.get('email')} attempted to get expiring consent counts without df_id.")
+        raise HTTPException(status_code=404, detail="User Not Found")
+    return await service.get_expiring_consent_counts(df_id, dp_id)
 
 
 def verify_signature(payload: dict, signature: str, CMP_WEBHOOK_SECRET: str) -> bool:
@@ -45,6 +45,25 @@ async def build_cookie_widget(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.post("/rebuild-widgets", summary="Republish cookie widget config bundles for many assets")
+async def rebuild_cookie_widgets(
+    asset_ids: List[str] = Query(..., description="Asset IDs whose widgets should be republished"),
+    current_user: dict = Depends(get_current_user),
+    widget_service: WidgetService = Depends(get_widget_service),
+    s3_service=Depends(get_s3_client),
+):
+    """
+    Regenerates the config bundles of the given assets against the shared prebuilt runtime.
+    """
+    try:
+        results = await widget_service.rebuild_widget_bundles(user=current_user, asset_ids=asset_ids, s3_service=s3_service)
+        return {"message": "Widget rebuild completed.", "results": results}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
 @router.post("/scan-website-cookies", summary="Request a cookie scan for a given asset")
 async def scan_cookies_by_asset(
     asset_id: str = Query(..., description="Selected Asset ID"),
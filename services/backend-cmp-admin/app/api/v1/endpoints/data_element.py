@@ -25,6 +25,7 @@ async def list_data_element_templates_endpoint(
     domain: Optional[str] = None,
     title: Optional[str] = None,
     id: Optional[str] = None,
+    after: Optional[str] = Query(None, description="Keyset cursor: `next_cursor` from the previous page"),
     current_user: dict = Depends(get_current_user),
     service: DataElementService = Depends(get_data_element_service),
 ):
@@ -39,6 +40,7 @@ async def list_data_element_templates_endpoint(
             domain=domain,
             title=title,
             id=id,
+            after=after,
         )
     except HTTPException:
         raise
@@ -1,15 +1,18 @@
 import csv
+import hashlib
 import io
 import json
+import uuid
 import asyncpg
 from fastapi import APIRouter, Body, Depends, HTTPException, Header, Query, Request
 from datetime import datetime, timedelta, UTC
 from typing import Any, Dict, List, Optional
 from fastapi.responses import StreamingResponse
 from jose import jwt
+from pymongo import ReturnDocument
 from pydantic import BaseModel, ValidationError, field_validator, model_validator
 
-from app.db.dependencies import get_batch_collection, get_df_keys_collection
+from app.db.dependencies import get_batch_collection, get_df_keys_collection, get_failed_records_jobs_collection
 from app.db.rabbitmq import publish_message
 from app.db.session import get_postgres_pool
 
@@ -58,13 +61,18 @@ async def generate_jwt_token(df_id: str, batch_collection) -> str:
 
     await batch_collection.update_one(
         {"df_id": df_id},
-        {"$set": {"token": token, "status": "start", "expiry": expiration}},
+        {"$set": {"token": token, "status": "start", "expiry": expiration, "job_id": uuid.uuid4().hex}},
         upsert=True,
     )
 
     return token
 
 
+def get_job_id(batch_data: dict, token: str) -> str:
+    """Upload job of the current token; sessions opened before job ids existed fall back to a token hash."""
+    return batch_data.get("job_id") or hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
 class UpdateBulkDPModel(BaseModel):
 
     dp_id: Optional[str] = None
@@ -184,6 +192,7 @@ async def add_dp_bulk_api_external(
     batch_tag: Optional[str] = Query(None),
     validated_token: dict = Depends(validate_jwt_token),
     batch_collection=Depends(get_batch_collection),
+    failed_records_jobs_collection=Depends(get_failed_records_jobs_collection),
 ):
     """Process bulk DP data with JWT validation and queueing to RabbitMQ."""
     df_id = validated_token["df_id"]
@@ -196,8 +205,10 @@ async def add_dp_bulk_api_external(
             "token": None,
         }
 
+    job_id = get_job_id(batch_data, token)
     message_data = {
         "df_id": df_id,
+        "job_id": job_id,
         "batch_tag": batch_tag,
         "batch_id": str(batch_data["_id"]),
         "expiry": (batch_data.get("expiry").isoformat() if batch_data.get("expiry") else None),
@@ -212,6 +223,17 @@ async def add_dp_bulk_api_external(
             {"$set": {"status": "end", "token": None, "end_time": end_time}},
         )
         message_data["end_time"] = end_time.isoformat()
+        job = await failed_records_jobs_collection.find_one_and_update(
+            {"_id": job_id},
+            {
+                "$set": {"end_requested_at": end_time},
+                "$setOnInsert": {"df_id": df_id, "status": "open", "batches_published": 0, "created_at": end_time},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        expected_batches = job["batches_published"] - len(job.get("unpublished_batches", []))
+        await failed_records_jobs_collection.update_one({"_id": job_id}, {"$set": {"expected_batches": expected_batches}})
         await publish_message("dp_external", json.dumps(message_data))
         return {"message": "Batch processing ended. Token expired.", "token": None}
 
@@ -237,9 +259,21 @@ async def add_dp_bulk_api_external(
         {"$set": update_fields},
     )
 
+    job = await failed_records_jobs_collection.find_one_and_update(
+        {"_id": job_id},
+        {"$inc": {"batches_published": 1}, "$setOnInsert": {"df_id": df_id, "status": "open", "created_at": datetime.now(UTC)}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    message_data["batch_seq"] = job["batches_published"]
     message_data["valid_data"] = processed_data
 
-    await publish_message("dp_external", json.dumps(message_data))
+    try:
+        await publish_message("dp_external", json.dumps(message_data))
+    except Exception:
+        # batch_seq is never handed out twice; the lost sequence number is excluded from the expected count instead.
+        await failed_records_jobs_collection.update_one({"_id": job_id}, {"$addToSet": {"unpublished_batches": message_data["batch_seq"]}})
+        raise
 
     return {"message": "Bulk import queued for processing", "token": token}
 
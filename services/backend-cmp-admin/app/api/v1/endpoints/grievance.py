@@ -1,3 +1,4 @@
+from datetime import datetime
 from bson import ObjectId
 from fastapi import FastAPI, APIRouter, Depends, HTTPException, Path, Query, status
 from typing import List, Optional
@@ -12,10 +13,42 @@ router = APIRouter()
 async def get_all_grievances(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, le=100),
+    request_status: Optional[List[str]] = Query(None, description="Filter by one or more statuses"),
+    category: Optional[str] = Query(None),
+    sub_category: Optional[str] = Query(None),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    after: Optional[str] = Query(None, description="Cursor from pagination.next_cursor"),
     current_user: dict = Depends(get_current_user),
     grievance_service: GrievanceService = Depends(get_grievance_service),
 ):
-    return await grievance_service.get_all_grievances(page=page, page_size=page_size, current_user=current_user)
+    return await grievance_service.get_all_grievances(
+        page=page,
+        page_size=page_size,
+        current_user=current_user,
+        status=request_status,
+        category=category,
+        sub_category=sub_category,
+        created_from=created_from,
+        created_to=created_to,
+        sort_order=sort_order,
+        after=after,
+    )
+
+
+@router.get("/overdue-grievances")
+async def get_overdue_grievances(
+    older_than_days: Optional[int] = Query(None, ge=1, description="Defaults to GRIEVANCE_SLA_DAYS"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, le=100),
+    after: Optional[str] = Query(None, description="Cursor from pagination.next_cursor"),
+    current_user: dict = Depends(get_current_user),
+    grievance_service: GrievanceService = Depends(get_grievance_service),
+):
+    return await grievance_service.get_overdue_grievances(
+        current_user, older_than_days=older_than_days, page=page, page_size=page_size, after=after
+    )
 
 
 @router.get("/view-grievance/{grievance_id}")
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, Query, Request, HTTPException
 
 from app.api.v1.deps import get_current_user, get_invites_service
@@ -50,10 +52,13 @@ async def get_all_invites(
         ge=1,
         le=100,
     ),
+    pending_after: Optional[str] = Query(None, description="Cursor from next_cursors.pending"),
+    accepted_after: Optional[str] = Query(None, description="Cursor from next_cursors.accepted"),
+    expired_after: Optional[str] = Query(None, description="Cursor from next_cursors.expired"),
     service: InviteService = Depends(get_invites_service),
 ):
     try:
-        return await service.get_all_invites(current_user, page, page_size)
+        return await service.get_all_invites(current_user, page, page_size, pending_after, accepted_after, expired_after)
     except HTTPException:
         raise
     except Exception as e:
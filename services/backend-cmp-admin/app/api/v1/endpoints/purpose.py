@@ -29,6 +29,7 @@ async def list_purpose_templates_endpoint(
     title: Optional[str] = Query(None),
     current_page: int = Query(1, ge=1),
     data_per_page: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Keyset cursor: `next_cursor` from the previous page"),
     current_user: dict = Depends(get_current_user),
     service: PurposeService = Depends(get_purpose_service),
 ):
@@ -41,6 +42,7 @@ async def list_purpose_templates_endpoint(
             industry=industry,
             sub_category=sub_category,
             title=title,
+            after=after,
         )
     except HTTPException:
         raise
@@ -6,6 +6,7 @@ from app.schemas.role_schema import (
     UpdateRolePermissions,
     UpdateRole,
     AssignRolesToUser,
+    BulkRoleMembershipUpdate,
 )
 from app.api.v1.deps import get_current_user, get_role_service
 
@@ -155,6 +156,16 @@ async def assign_multiple_roles_to_user(
     return await service.assign_roles_to_user(user_id, data.roles_list, current_user, system_admin_role_id)
 
 
+@router.patch("/bulk-update-role-memberships", summary="Add/remove users and reset routes for many roles at once")
+async def bulk_update_role_memberships_endpoint(
+    update_data: BulkRoleMembershipUpdate,
+    current_user: dict = Depends(get_current_user),
+    service: RoleService = Depends(get_role_service),
+    system_admin_role_id: str = Depends(get_system_admin_role_id),
+):
+    return await service.bulk_update_role_memberships(update_data, current_user, system_admin_role_id)
+
+
 @router.get("/get-all-frontend-routes")
 async def get_all_frontend_routes(
     current_user: dict = Depends(get_current_user),
@@ -1,4 +1,5 @@
 import json
+import hashlib
 from enum import Enum
 from pathlib import Path
 from typing import Dict, Any, List
@@ -137,6 +138,63 @@ class CookieBanner:
         return {lang: self.build_banner(lang, df_name, privacy_url, cookie_url, cookies_data) for lang in languages}
 
 
+class WidgetConfigBundle:
+    """
+    Builds the per-asset configuration consumed by the prebuilt widget runtime
+    (src/runtime.js). Everything that WidgetBuilder bakes into a dedicated Vite
+    build is emitted here as data, so publishing a banner needs no npm step.
+    """
+
+    def __init__(self, config: Dict[str, Any], banner_builder: CookieBanner = None):
+        self.widget_name = config["WIDGET_NAME"]
+        self.df_name = config["DF_NAME"]
+        self.privacy_url = config["PRIVACY_URL"]
+        self.cookie_url = config["COOKIE_URL"]
+        self.logo_url = config["LOGO_URL"]
+        self.consent_api_base_url = config["COOKIE_CONSENT_URL"]
+        self.cookies_data = config["COOKIES_DATA"]
+        self.banner_builder = banner_builder or CookieBanner(file_path=config["INPUT_JSON_FILE"])
+        self._content = None
+
+    def build_payload(self) -> Dict[str, Any]:
+        return {
+            "websiteId": self.widget_name,
+            "consentApiBaseUrl": self.consent_api_base_url,
+            "logoUrl": self.logo_url or "",
+            "categories": list(self.cookies_data.keys()),
+            "translations": self.banner_builder.build_all_languages(
+                df_name=self.df_name,
+                privacy_url=self.privacy_url,
+                cookie_url=self.cookie_url,
+                cookies_data=self.cookies_data,
+            ),
+        }
+
+    def render(self) -> bytes:
+        if self._content is None:
+            payload = json.dumps(self.build_payload(), ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+            self._content = f"window.CMPWidgetConfig={payload};\n".encode("utf-8")
+        return self._content
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.render()).hexdigest()[:16]
+
+    @property
+    def object_name(self) -> str:
+        return f"widget-configs/{self.widget_name}.{self.content_hash}.js"
+
+
+def render_widget_loader(config_url: str, runtime_url: str) -> bytes:
+    """Small per-asset entry script that loads the hashed config bundle, then the shared runtime."""
+    js_content = (
+        "(function(){var d=document,h=d.head||d.documentElement;"
+        "function a(s){var e=d.createElement('script');e.src=s;e.async=false;h.appendChild(e);}"
+        f"a({json.dumps(config_url)});a({json.dumps(runtime_url)});}})();\n"
+    )
+    return js_content.encode("utf-8")
+
+
 class WidgetBuilder:
     """
     Handles all steps of the widget build process: path management,
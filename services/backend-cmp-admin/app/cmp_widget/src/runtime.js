@@ -0,0 +1,40 @@
+// Generic widget runtime: built once per release and shared by every asset.
+// The per-asset config bundle sets window.CMPWidgetConfig before this script runs.
+import template from "./template.html?raw";
+import styles from "./styles.css?raw";
+import { initWidget } from "./cmp.js";
+
+const categoryListPattern = /<div class="category-list">[\s\S]*?<\/div>/;
+
+function renderTemplate(config) {
+  const categoryItems = config.categories
+    .map((category, index) => `<div class="category-item${index === 0 ? " active" : ""}" data-category="${category}"></div>`)
+    .join("\n");
+
+  return template
+    .split("{{LOGO_URL}}")
+    .join(config.logoUrl || "")
+    .replace(categoryListPattern, `<div class="category-list">\n${categoryItems}\n</div>`);
+}
+
+function start() {
+  const config = window.CMPWidgetConfig;
+  if (!config) {
+    console.error("CMP widget config bundle was not loaded.");
+    return;
+  }
+
+  initWidget({
+    translations: config.translations,
+    template: renderTemplate(config),
+    styles,
+    websiteId: config.websiteId,
+    consentApiBaseUrl: config.consentApiBaseUrl,
+  });
+}
+
+if (document.body) {
+  start();
+} else {
+  document.addEventListener("DOMContentLoaded", start);
+}
@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -17,6 +19,10 @@ class Settings(BaseSettings):
     DB_NAME_CONCUR_LOGS: str = "concur_logs_test"
 
     DATA_VEDA_URL: str = "http://data-veda:8080"
+    TEMPLATE_MIRROR_SYNC_INTERVAL_SECONDS: int = 900
+    TEMPLATE_MIRROR_FULL_SYNC_INTERVAL_SECONDS: int = 86400
+    TEMPLATE_MIRROR_PAGE_SIZE: int = 200
+    TEMPLATE_MIRROR_SNAPSHOT_PATH: str = ""
 
     SUPERADMIN_EMAIL: str
     TEMPORARY_PASSWORD: str
@@ -46,6 +52,8 @@ class Settings(BaseSettings):
     KYC_DOCUMENTS_BUCKET: str = "kyc-documents-dev"
     DPAR_BULK_UPLOAD_BUCKET: str = "dpar-bulk-upload-dev"
     COOKIE_CONSENT_BUCKET: str = "cookie-consent-scripts"
+    COOKIE_WIDGET_RUNTIME_VERSION: str = "1.0.0"
+    WIDGET_BUNDLE_CONCURRENCY: int = 16
 
     RABBITMQ_HOST: str
     RABBITMQ_PORT: int = 5672
@@ -54,9 +62,31 @@ class Settings(BaseSettings):
     RABBITMQ_PASSWORD: str
     RABBITMQ_VHOST_NAME: str
     RABBITMQ_POOL_SIZE: int = 5
+    RABBITMQ_CONNECTION_COUNT: int = 2
+    RABBITMQ_PUBLISHER_CHANNELS: int = 4
+    RABBITMQ_PUBLISH_BATCH_SIZE: int = 200
+    CONSENT_PROCESSING_SHARDS: int = 8
+
+    WORKER_DEFAULT_CONCURRENCY: int = 4
+    WORKER_CONCURRENCY: Dict[str, int] = {}
+    WORKER_PROCESS_POOL_SIZE: int = 2
+    WORKER_METRICS_INTERVAL_SECONDS: int = 60
+    WORKER_DRAIN_TIMEOUT_SECONDS: int = 30
 
     WEBHOOK_MAX_RETRIES: int = 3
     WEBHOOK_RETRY_TTL_MS: int = 10000
+    CONSENT_EVENT_CLAIM_LEASE_SECONDS: int = 300
+    CONSENT_EVENT_RECEIPT_RETENTION_DAYS: int = 7
+    FAILED_RECORDS_SWEEP_INTERVAL_SECONDS: int = 300
+    FAILED_RECORDS_END_GRACE_SECONDS: int = 1800
+    FAILED_RECORDS_JOB_DEADLINE_SECONDS: int = 86400
+
+    DASHBOARD_CACHE_TTL_SECONDS: int = 30
+    VENDOR_FACET_CACHE_TTL_SECONDS: int = 300
+    GRIEVANCE_COUNT_CACHE_TTL_SECONDS: int = 60
+    GRIEVANCE_SLA_DAYS: int = 30
+    DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS: int = 300
+    DASHBOARD_SNAPSHOT_INTERVAL_SECONDS: int = 120
 
     OPENSEARCH_HOST: str
     OPENSEARCH_PORT: int = 9200
@@ -1,18 +1,28 @@
-from app.core.security import rbac_enforcer
+import asyncio
+import json
+import uuid
+from typing import Dict, Set, Tuple
 
+import aio_pika
+from pymongo import DeleteMany, InsertOne
 
-def reset_role_policies(role_id: str, routes: list):
+from app.core.logger import app_logger
+from app.core.security import rbac_enforcer, rbac_mongo_adapter
+from app.db.rabbitmq import publish_message, rabbitmq_pool
+
+RBAC_POLICY_EVENTS_EXCHANGE = "rbac_policy_events_exchange"
+
+# Lets a process skip the reload broadcast it published itself; its enforcer already holds the change.
+RBAC_INSTANCE_ID = uuid.uuid4().hex
+
+PolicyRule = Tuple[str, str, str]
+
+
+def desired_role_policies(role_id: str, routes: list) -> Set[PolicyRule]:
     """
-    Reset the policies for a given role_id to exactly the given `routes` list.
+    Policies a role should hold for the given `routes` list.
     routes: list of dicts like {"path": "/api/x", "actions": ["read","write"]}
-    This function:
-     - deduplicates requested rules
-     - computes diff with current policies
-     - removes only policies that should be removed
-     - adds only policies that should be added
-     - saves policy once at end (since auto_save is disabled)
     """
-
     desired = set()
     for route in routes or []:
         path = route.get("path")
@@ -22,25 +32,108 @@ def reset_role_policies(role_id: str, routes: list):
 
         for act in set(actions):
             desired.add((str(role_id), str(path), str(act)))
+    return desired
+
+
+def compute_policy_diff(desired_by_role: Dict[str, Set[PolicyRule]]) -> Tuple[Set[PolicyRule], Set[PolicyRule]]:
+    """Diffs the desired policies of each role against the rules the enforcer currently holds."""
+    to_add, to_remove = set(), set()
+    for role_id, desired in desired_by_role.items():
+        current = set()
+        for p in rbac_enforcer.get_filtered_policy(0, str(role_id)):
+            if len(p) >= 3:
+                current.add((str(p[0]), str(p[1]), str(p[2])))
+        to_add |= desired - current
+        to_remove |= current - desired
+    return to_add, to_remove
+
+
+def _policy_line(rule: PolicyRule) -> dict:
+    sub, obj, act = rule
+    return {"ptype": "p", "v0": sub, "v1": obj, "v2": act}
 
-    current = set()
 
-    cur_policies = rbac_enforcer.get_filtered_policy(0, role_id)
-    for p in cur_policies:
+def _write_policy_diff(to_add: Set[PolicyRule], to_remove: Set[PolicyRule]):
+    """
+    Persists the diff as one ordered bulk_write on the adapter's collection. `save_policy` is not used:
+    the pymongo adapter re-inserts every rule on each save, duplicating the whole policy set.
+    """
+    operations = [DeleteMany(_policy_line(rule)) for rule in to_remove]
+    operations.extend(InsertOne(_policy_line(rule)) for rule in to_add)
+    if operations:
+        rbac_mongo_adapter._collection.bulk_write(operations, ordered=True)
+
+    # The in-memory model is only touched once the batch is stored (auto_save is disabled).
+    if to_remove:
+        rbac_enforcer.remove_policies(sorted(list(rule) for rule in to_remove))
+    if to_add:
+        rbac_enforcer.add_policies(sorted(list(rule) for rule in to_add))
+
+
+async def apply_policy_diff(to_add: Set[PolicyRule], to_remove: Set[PolicyRule]) -> bool:
+    """Stores a policy diff in one adapter batch and tells every other instance to reload. Returns False when empty."""
+    if not to_add and not to_remove:
+        return False
+    await asyncio.to_thread(_write_policy_diff, to_add, to_remove)
+    await broadcast_policy_reload(added=len(to_add), removed=len(to_remove))
+    return True
 
-        if len(p) >= 3:
-            current.add((str(p[0]), str(p[1]), str(p[2])))
 
-    to_add = desired - current
-    to_remove = current - desired
+async def reset_role_policies(role_id: str, routes: list) -> bool:
+    """Reset the policies for a given role_id to exactly the given `routes` list."""
+    to_add, to_remove = compute_policy_diff({str(role_id): desired_role_policies(role_id, routes)})
+    return await apply_policy_diff(to_add, to_remove)
 
-    for sub, obj, act in to_remove:
 
-        rbac_enforcer.remove_policy(sub, obj, act)
+async def reset_roles_policies(routes_by_role: Dict[str, list]) -> Tuple[int, int]:
+    """Like `reset_role_policies` for many roles at once: one diff, one batch, one reload broadcast."""
+    desired_by_role = {str(role_id): desired_role_policies(role_id, routes) for role_id, routes in routes_by_role.items()}
+    to_add, to_remove = compute_policy_diff(desired_by_role)
+    await apply_policy_diff(to_add, to_remove)
+    return len(to_add), len(to_remove)
+
+
+async def broadcast_policy_reload(**details):
+    """
+    Publishes a reload request on the RBAC fanout exchange. Failures are logged and swallowed:
+    the policy is already stored and other instances pick it up on their next reload.
+    """
+    message = {"origin": RBAC_INSTANCE_ID, **details}
+    try:
+        await publish_message(RBAC_POLICY_EVENTS_EXCHANGE, json.dumps(message))
+    except Exception as e:
+        app_logger.warning(f"Failed to broadcast RBAC policy reload: {e}")
+
 
-    for sub, obj, act in to_add:
+async def run_policy_reload_listener():
+    """Reloads the enforcer from MongoDB whenever another instance broadcasts a policy change."""
+    while True:
+        connection, channel = None, None
+        try:
+            connection, channel = await rabbitmq_pool.get_connection()
+            exchange = await channel.declare_exchange(RBAC_POLICY_EVENTS_EXCHANGE, aio_pika.ExchangeType.FANOUT, durable=True)
+            queue = await channel.declare_queue("", exclusive=True, auto_delete=True)
+            await queue.bind(exchange)
+            app_logger.info("Listening for RBAC policy reload events...")
 
-        if not rbac_enforcer.has_policy(sub, obj, act):
-            rbac_enforcer.add_policy(sub, obj, act)
+            async with queue.iterator() as queue_iter:
+                async for message in queue_iter:
+                    async with message.process():
+                        try:
+                            event = json.loads(message.body.decode())
+                            if event.get("origin") == RBAC_INSTANCE_ID:
+                                continue
+                            await asyncio.to_thread(rbac_enforcer.load_policy)
+                            app_logger.info(f"Reloaded RBAC policies after change from {event.get('origin')}")
+                        except Exception as e:
+                            app_logger.error(f"Failed to reload RBAC policies: {e}", exc_info=True)
 
-    rbac_enforcer.save_policy()
+        except asyncio.CancelledError:
+            app_logger.info("RBAC policy reload listener cancelled.")
+            raise
+        except Exception as e:
+            app_logger.error(f"RBAC policy reload listener failed (restarting): {e}", exc_info=True)
+            await asyncio.sleep(5)
+        finally:
+            if connection and channel:
+                await rabbitmq_pool.release_connection(connection, channel)
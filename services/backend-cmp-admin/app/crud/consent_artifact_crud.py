@@ -1,4 +1,9 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, UpdateOne
 
 
 class ConsentArtifactCRUD:
@@ -23,30 +28,33 @@ class ConsentArtifactCRUD:
     async def count_collected_data_elements(self, query):
         """
         Count unique data elements that have been collected across all consent artifacts.
-        Extracts unique de_id values from artifact.consent_scope.data_elements.
+        Groups unique de_id values from artifact.consent_scope.data_elements on the server.
         """
-        unique_de_ids = set()
-        async for doc in self.consent_artifact_collection.find(query):
-            if "artifact" in doc and "consent_scope" in doc["artifact"] and "data_elements" in doc["artifact"]["consent_scope"]:
-                for de in doc["artifact"]["consent_scope"]["data_elements"]:
-                    if "de_id" in de:
-                        unique_de_ids.add(de["de_id"])
-        return len(unique_de_ids)
+        pipeline = [
+            {"$match": query},
+            {"$unwind": "$artifact.consent_scope.data_elements"},
+            {"$match": {"artifact.consent_scope.data_elements.de_id": {"$exists": True}}},
+            {"$group": {"_id": "$artifact.consent_scope.data_elements.de_id"}},
+            {"$count": "total"},
+        ]
+        result = await self.consent_artifact_collection.aggregate(pipeline).to_list(length=1)
+        return result[0]["total"] if result else 0
 
     async def count_collected_purposes(self, query):
         """
         Count unique purposes that have been collected across all consent artifacts.
-        Extracts unique purpose_id values from artifact.consent_scope.data_elements.consents.
-        """
-        unique_purpose_ids = set()
-        async for doc in self.consent_artifact_collection.find(query):
-            if "artifact" in doc and "consent_scope" in doc["artifact"] and "data_elements" in doc["artifact"]["consent_scope"]:
-                for de in doc["artifact"]["consent_scope"]["data_elements"]:
-                    if "consents" in de:
-                        for consent in de["consents"]:
-                            if "purpose_id" in consent:
-                                unique_purpose_ids.add(consent["purpose_id"])
-        return len(unique_purpose_ids)
+        Groups unique purpose_id values from artifact.consent_scope.data_elements.consents on the server.
+        """
+        pipeline = [
+            {"$match": query},
+            {"$unwind": "$artifact.consent_scope.data_elements"},
+            {"$unwind": "$artifact.consent_scope.data_elements.consents"},
+            {"$match": {"artifact.consent_scope.data_elements.consents.purpose_id": {"$exists": True}}},
+            {"$group": {"_id": "$artifact.consent_scope.data_elements.consents.purpose_id"}},
+            {"$count": "total"},
+        ]
+        result = await self.consent_artifact_collection.aggregate(pipeline).to_list(length=1)
+        return result[0]["total"] if result else 0
 
     async def count_collected_collection_points(self, query):
         """
@@ -55,3 +63,109 @@ class ConsentArtifactCRUD:
         """
         unique_cp_ids = await self.consent_artifact_collection.distinct("cp_id", query)
         return len(unique_cp_ids)
+
+    async def ensure_expiry_indexes(self):
+        await self.consent_artifact_collection.create_index(
+            [("df_id", ASCENDING), ("consent_grants.expires_at", ASCENDING)],
+            name="idx_df_grant_expiry",
+        )
+        await self.consent_artifact_collection.create_index(
+            [("df_id", ASCENDING), ("dp_id", ASCENDING), ("consent_grants.expires_at", ASCENDING)],
+            name="idx_df_dp_grant_expiry",
+        )
+
+    def _expiring_grants_match(self, df_id: str, start: datetime, end: datetime, dp_id: Optional[str] = None) -> Dict[str, Any]:
+        query = {
+            "df_id": df_id,
+            "consent_grants": {"$elemMatch": {"consent_status": "approved", "expires_at": {"$gt": start, "$lte": end}}},
+        }
+        if dp_id:
+            query["dp_id"] = dp_id
+        return query
+
+    def _unwind_expiring_grants(self, df_id: str, start: datetime, end: datetime, dp_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [
+            {"$match": self._expiring_grants_match(df_id, start, end, dp_id)},
+            {"$unwind": "$consent_grants"},
+            {
+                "$match": {
+                    "consent_grants.consent_status": "approved",
+                    "consent_grants.expires_at": {"$gt": start, "$lte": end},
+                }
+            },
+        ]
+
+    async def count_expiring_consents_by_window(
+        self, df_id: str, now: datetime, boundaries: List[datetime], dp_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Count DPs and purposes with an approved grant expiring in each window (now, boundary], in boundary order.
+        Every grant is matched on its own expiry, so a window only counts the purposes that expire inside it.
+        """
+        facets = {
+            str(i): [
+                {"$match": {"consent_grants.expires_at": {"$lte": boundary}}},
+                {"$group": {"_id": "$dp_id", "purpose_count": {"$sum": 1}}},
+                {"$group": {"_id": None, "dp_count": {"$sum": 1}, "purpose_count": {"$sum": "$purpose_count"}}},
+            ]
+            for i, boundary in enumerate(boundaries)
+        }
+        pipeline = [*self._unwind_expiring_grants(df_id, now, boundaries[-1], dp_id), {"$facet": facets}]
+        rows = await self.consent_artifact_collection.aggregate(pipeline).to_list(length=1)
+        facet = rows[0] if rows else {}
+
+        counts = []
+        for i in range(len(boundaries)):
+            window = (facet.get(str(i)) or [{}])[0]
+            counts.append({"dp_count": window.get("dp_count", 0), "purpose_count": window.get("purpose_count", 0)})
+        return counts
+
+    async def get_expiring_consents_by_dp(
+        self, df_id: str, start: datetime, end: datetime, skip: int, limit: int, dp_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Page through DPs with approved grants expiring in (start, end], ordered by their earliest expiry.
+        Each DP carries all of its expiring grants, so a DP's purposes never split across pages.
+        """
+        pipeline = [
+            *self._unwind_expiring_grants(df_id, start, end, dp_id),
+            {"$sort": {"consent_grants.expires_at": ASCENDING}},
+            {
+                "$group": {
+                    "_id": "$dp_id",
+                    "df_id": {"$first": "$df_id"},
+                    "next_expiry": {"$min": "$consent_grants.expires_at"},
+                    "grants": {
+                        "$push": {
+                            "de_id": "$consent_grants.de_id",
+                            "purpose_id": "$consent_grants.purpose_id",
+                            "purpose_title": "$consent_grants.purpose_title",
+                            "expires_at": "$consent_grants.expires_at",
+                        }
+                    },
+                }
+            },
+            {"$sort": {"next_expiry": ASCENDING, "_id": ASCENDING}},
+            {"$skip": skip},
+            {"$limit": limit},
+            {"$project": {"_id": 0, "dp_id": "$_id", "df_id": 1, "next_expiry": 1, "grants": 1}},
+        ]
+        return await self.consent_artifact_collection.aggregate(pipeline).to_list(length=limit)
+
+    def get_artifacts_missing_consent_grants(self, batch_size: int):
+        return self.consent_artifact_collection.find(
+            {"consent_grants": {"$exists": False}},
+            {"artifact.consent_scope.data_elements": 1},
+        ).limit(batch_size)
+
+    async def set_consent_grants(self, grants_by_id: Dict[Any, List[Dict[str, Any]]]):
+        if not grants_by_id:
+            return None
+        operations = [UpdateOne({"_id": _id}, {"$set": {"consent_grants": grants}}) for _id, grants in grants_by_id.items()]
+        return await self.consent_artifact_collection.bulk_write(operations, ordered=False)
+
+    async def get_agreement_id(self, artifact_id: str) -> Optional[str]:
+        if not ObjectId.is_valid(artifact_id):
+            return None
+        doc = await self.consent_artifact_collection.find_one({"_id": ObjectId(artifact_id)}, {"artifact.agreement_id": 1})
+        return ((doc or {}).get("artifact") or {}).get("agreement_id")
@@ -0,0 +1,37 @@
+from datetime import UTC, datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import DuplicateKeyError
+
+
+class ConsentEventReceiptCRUD:
+    """One receipt per consent event_id, so a re-published event is classified and sent to webhooks once."""
+
+    def __init__(self, collection: AsyncIOMotorCollection):
+        self.collection = collection
+
+    async def ensure_indexes(self, retention_days: int):
+        await self.collection.create_index("completed_at", expireAfterSeconds=retention_days * 86400, name="ttl_completed_at")
+
+    async def claim(self, event_id: str, lease_seconds: int) -> bool:
+        """
+        Claims the event for processing. False when it was already completed or another attempt holds a live claim;
+        a claim older than the lease (its worker died mid-event) is taken over.
+        """
+        now = datetime.now(UTC)
+        try:
+            await self.collection.insert_one({"_id": event_id, "status": "processing", "claimed_at": now})
+            return True
+        except DuplicateKeyError:
+            taken_over = await self.collection.find_one_and_update(
+                {"_id": event_id, "status": "processing", "claimed_at": {"$lt": now - timedelta(seconds=lease_seconds)}},
+                {"$set": {"claimed_at": now}},
+            )
+            return taken_over is not None
+
+    async def complete(self, event_id: str):
+        await self.collection.update_one({"_id": event_id}, {"$set": {"status": "completed", "completed_at": datetime.now(UTC)}})
+
+    async def release(self, event_id: str):
+        """Drops an unfinished claim so the retried delivery can process the event."""
+        await self.collection.delete_one({"_id": event_id, "status": "processing"})
@@ -0,0 +1,25 @@
+from datetime import datetime, UTC
+from motor.motor_asyncio import AsyncIOMotorCollection
+from typing import Any, Dict, Optional
+
+
+class DashboardSnapshotCRUD:
+    def __init__(
+        self,
+        dashboard_snapshot_collection: AsyncIOMotorCollection,
+    ):
+        self.dashboard_snapshot_collection = dashboard_snapshot_collection
+
+    async def get_snapshot(self, df_id: str) -> Optional[Dict[str, Any]]:
+        return await self.dashboard_snapshot_collection.find_one({"df_id": df_id})
+
+    async def save_snapshot(self, df_id: str, counters: Dict[str, Any]):
+        """Replace the stored counters for a DF and stamp the computation time."""
+        return await self.dashboard_snapshot_collection.update_one(
+            {"df_id": df_id},
+            {"$set": {"counters": counters, "computed_at": datetime.now(UTC)}},
+            upsert=True,
+        )
+
+    async def get_snapshot_df_ids(self):
+        return await self.dashboard_snapshot_collection.distinct("df_id")
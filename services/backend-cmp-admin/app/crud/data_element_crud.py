@@ -5,6 +5,7 @@ from bson import ObjectId
 
 from app.utils.common import validate_object_id, convert_objectid_to_str
 from app.core.config import settings
+from app.crud.template_mirror_crud import TemplateMirrorCRUD
 
 
 class DataElementCRUD:
@@ -13,10 +14,12 @@ class DataElementCRUD:
         de_template_collection: AsyncIOMotorCollection,
         de_master_collection: AsyncIOMotorCollection,
         de_master_translated_collection: AsyncIOMotorCollection,
+        template_mirror: Optional[TemplateMirrorCRUD] = None,
     ):
         self.de_template_collection = de_template_collection
         self.de_master_collection = de_master_collection
         self.de_master_translated_collection = de_master_translated_collection
+        self.template_mirror = template_mirror
         self.external_base_url = settings.DATA_VEDA_URL
 
     async def get_all_de_templates(
@@ -26,10 +29,15 @@ class DataElementCRUD:
         id: Optional[str] = None,
         offset: int = 0,
         limit: int = 20,
+        after: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
-        Fetch data elements from external service.
+        Fetch data element templates from the local mirror once it has completed a full sync,
+        otherwise from the external service.
         """
+        if self.template_mirror and await self.template_mirror.is_ready():
+            return await self.template_mirror.list_templates(offset=offset, limit=limit, after=after, id=id, domain=domain, title=title)
+
         params = {
             "offset": offset,
             "limit": limit,
@@ -1,6 +1,40 @@
+from datetime import datetime, timedelta, UTC
 from motor.motor_asyncio import AsyncIOMotorCollection
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+OPEN_GRIEVANCE_STATUSES = ["open"]
+
+GRIEVANCE_LIST_PROJECTION = {
+    "_id": 1,
+    "subject": 1,
+    "request_status": 1,
+    "category": 1,
+    "sub_category": 1,
+    "created_at": 1,
+    "last_updated_at": 1,
+    "is_verified": 1,
+    "is_registered_user": 1,
+    "email": 1,
+    "mobile_number": 1,
+    "dp_type": 1,
+    "business_entity": 1,
+    "data_processor": 1,
+    "ticket_allocated": 1,
+}
+
+
+def encode_grievance_cursor(grievance: Dict[str, Any]) -> str:
+    return f"{grievance['created_at'].isoformat()}|{grievance['_id']}"
+
+
+def decode_grievance_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Raises ValueError for a cursor that was not produced by encode_grievance_cursor."""
+    created_at, _, grievance_id = cursor.rpartition("|")
+    if not ObjectId.is_valid(grievance_id):
+        raise ValueError(f"Invalid grievance cursor: {cursor}")
+    return datetime.fromisoformat(created_at), ObjectId(grievance_id)
 
 
 class GrievanceCRUD:
@@ -10,35 +44,89 @@ class GrievanceCRUD:
     ):
         self.grievance_collection = grievance_collection
 
-    async def count_grievances(self) -> int:
-        return await self.grievance_collection.count_documents({})
+    async def ensure_indexes(self):
+        """Every listing is df-scoped and ordered by (created_at, _id), so each filter gets that suffix."""
+        await self.grievance_collection.create_index(
+            [("df_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="idx_df_created"
+        )
+        await self.grievance_collection.create_index(
+            [("df_id", ASCENDING), ("request_status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="idx_df_status_created",
+        )
+        await self.grievance_collection.create_index(
+            [("df_id", ASCENDING), ("category", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="idx_df_category_created",
+        )
+
+    @staticmethod
+    def build_query(
+        df_id: str,
+        status: Optional[List[str]] = None,
+        category: Optional[str] = None,
+        sub_category: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        query: Dict[str, Any] = {"df_id": df_id}
+        if status:
+            query["request_status"] = status[0] if len(status) == 1 else {"$in": status}
+        if category:
+            query["category"] = category
+        if sub_category:
+            query["sub_category"] = sub_category
+        if created_from or created_to:
+            query["created_at"] = {}
+            if created_from:
+                query["created_at"]["$gte"] = created_from
+            if created_to:
+                query["created_at"]["$lt"] = created_to
+        return query
+
+    @staticmethod
+    def overdue_query(df_id: str, older_than_days: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Grievances still open after `older_than_days`; served by idx_df_status_created."""
+        now = now or datetime.now(UTC)
+        return {
+            "df_id": df_id,
+            "request_status": {"$in": OPEN_GRIEVANCE_STATUSES},
+            "created_at": {"$lt": now - timedelta(days=older_than_days)},
+        }
+
+    async def count_grievances(self, df_id: Optional[str] = None, query: Optional[Dict[str, Any]] = None) -> int:
+        if query is None:
+            query = {"df_id": df_id} if df_id else {}
+        return await self.grievance_collection.count_documents(query)
 
     async def get_grievances(
         self,
-        skip: int,
+        query: Dict[str, Any],
         limit: int,
-    ) -> List[Dict[str, Any]]:
-        projection = {
-            "_id": 1,
-            "subject": 1,
-            "request_status": 1,
-            "created_at": 1,
-            "last_updated_at": 1,
-            "is_verified": 1,
-            "is_registered_user": 1,
-            "email": 1,
-            "mobile_number": 1,
-            "dp_type": 1,
-            "business_entity": 1,
-            "data_processor": 1,
-            "ticket_allocated": 1,
-        }
-        cursor = self.grievance_collection.find({}, projection).skip(skip).limit(limit)
-        grievances = await cursor.to_list(length=limit)
+        sort_order: str = "desc",
+        after: Optional[str] = None,
+        skip: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of grievances ordered by (created_at, _id). With `after` the page starts right after
+        that cursor instead of skipping `skip` rows. Returns the page and the cursor for the next one.
+        """
+        sort_dir = ASCENDING if sort_order == "asc" else DESCENDING
+        if after:
+            created_at, grievance_id = decode_grievance_cursor(after)
+            op = "$gt" if sort_dir == ASCENDING else "$lt"
+            keyset = {"$or": [{"created_at": {op: created_at}}, {"created_at": created_at, "_id": {op: grievance_id}}]}
+            query = {"$and": [query, keyset]}
+
+        cursor = self.grievance_collection.find(query, GRIEVANCE_LIST_PROJECTION).sort([("created_at", sort_dir), ("_id", sort_dir)])
+        if skip and not after:
+            cursor = cursor.skip(skip)
+        # One extra row tells us whether there is a next page.
+        grievances = await cursor.limit(limit + 1).to_list(length=limit + 1)
 
+        next_cursor = encode_grievance_cursor(grievances[limit - 1]) if len(grievances) > limit else None
+        grievances = grievances[:limit]
         for g in grievances:
             g["_id"] = str(g["_id"])
-        return grievances
+        return grievances, next_cursor
 
     async def get_by_id(self, grievance_id: str) -> Optional[Dict[str, Any]]:
         if not ObjectId.is_valid(grievance_id):
@@ -1,4 +1,10 @@
+from datetime import datetime, UTC
+from typing import Any, Dict, Optional
+
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+INVITE_BUCKETS = ("pending", "accepted", "expired")
 
 
 class InviteCRUD:
@@ -29,9 +35,78 @@ class InviteCRUD:
             {"$set": update_data},
         )
 
-    async def get_invites(self, df_id: str, page: int = 1, page_size: int = 10):
-        cursor = self.collection.find({"invited_df": df_id, "is_deleted": False})
-        return await cursor.skip((page - 1) * page_size).limit(page_size).to_list(length=None)
+    async def ensure_indexes(self):
+        await self.collection.create_index(
+            [("invited_df", ASCENDING), ("invite_status", ASCENDING), ("expiry_at", ASCENDING)],
+            name="idx_invited_df_status_expiry",
+        )
+
+    @staticmethod
+    def bucket_filters(now: datetime) -> Dict[str, dict]:
+        """Expired is not a stored status: it is a pending invite whose expiry_at has passed."""
+        return {
+            "pending": {"invite_status": "pending", "expiry_at": {"$gt": now}},
+            "accepted": {"invite_status": "accepted"},
+            "expired": {"invite_status": "pending", "expiry_at": {"$lte": now}},
+        }
+
+    async def get_invites_by_status(
+        self,
+        df_id: str,
+        page: int = 1,
+        page_size: int = 10,
+        cursors: Optional[Dict[str, Optional[str]]] = None,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        One `$facet` aggregation returning a page of each status bucket plus the per-status counts.
+        Each bucket pages independently: by its own `_id` cursor when one is given, otherwise by `page`.
+        """
+        now = now or datetime.now(UTC)
+        cursors = cursors or {}
+        filters = self.bucket_filters(now)
+
+        facets = {}
+        for bucket in INVITE_BUCKETS:
+            stages = [{"$match": filters[bucket]}]
+            if cursors.get(bucket):
+                stages.append({"$match": {"_id": {"$lt": ObjectId(cursors[bucket])}}})
+                stages.append({"$sort": {"_id": DESCENDING}})
+            else:
+                stages.extend([{"$sort": {"_id": DESCENDING}}, {"$skip": (page - 1) * page_size}])
+            # One extra row tells us whether the bucket has another page.
+            stages.append({"$limit": page_size + 1})
+            facets[bucket] = stages
+        status = {
+            "$switch": {
+                "branches": [
+                    {"case": {"$eq": ["$invite_status", "accepted"]}, "then": "accepted"},
+                    {"case": {"$gt": ["$expiry_at", now]}, "then": "pending"},
+                ],
+                "default": "expired",
+            }
+        }
+        facets["counts"] = [{"$group": {"_id": status, "count": {"$sum": 1}}}]
+
+        pipeline = [
+            {"$match": {"invited_df": df_id, "invite_status": {"$in": ["pending", "accepted"]}, "is_deleted": False}},
+            {"$facet": facets},
+        ]
+        result = await self.collection.aggregate(pipeline).to_list(length=1)
+        facet = result[0] if result else {}
+
+        response: Dict[str, Any] = {"counts": {bucket: 0 for bucket in INVITE_BUCKETS}, "next_cursors": {}}
+        for row in facet.get("counts", []):
+            response["counts"][row["_id"]] = row["count"]
+        for bucket in INVITE_BUCKETS:
+            invites = facet.get(bucket, [])
+            has_more = len(invites) > page_size
+            invites = invites[:page_size]
+            for invite in invites:
+                invite["_id"] = str(invite["_id"])
+            response[bucket] = invites
+            response["next_cursors"][bucket] = invites[-1]["_id"] if has_more else None
+        return response
 
     async def soft_delete_invite(self, invite_id: str):
         return await self.collection.update_one(
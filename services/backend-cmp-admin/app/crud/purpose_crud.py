@@ -4,6 +4,7 @@ from typing import Dict, Any, Optional
 from bson import ObjectId
 from app.utils.common import validate_object_id, convert_objectid_to_str
 from app.core.config import settings
+from app.crud.template_mirror_crud import TemplateMirrorCRUD
 
 
 class PurposeCRUD:
@@ -12,10 +13,12 @@ class PurposeCRUD:
         purpose_template_collection: AsyncIOMotorCollection,
         purpose_master_collection: AsyncIOMotorCollection,
         purpose_master_translated_collection: AsyncIOMotorCollection,
+        template_mirror: Optional[TemplateMirrorCRUD] = None,
     ):
         self.purpose_template_collection = purpose_template_collection
         self.purpose_master_collection = purpose_master_collection
         self.purpose_master_translated_collection = purpose_master_translated_collection
+        self.template_mirror = template_mirror
         self.external_base_url = settings.DATA_VEDA_URL
 
     async def get_all_purpose_templates(
@@ -26,7 +29,19 @@ class PurposeCRUD:
         industry: Optional[str] = None,
         sub_category: Optional[str] = None,
         title: Optional[str] = None,
+        after: Optional[str] = None,
     ) -> Dict[str, Any]:
+        if self.template_mirror and await self.template_mirror.is_ready():
+            return await self.template_mirror.list_templates(
+                offset=offset,
+                limit=limit,
+                after=after,
+                id=id,
+                industry=industry,
+                sub_category=sub_category,
+                title=title,
+            )
+
         params = {
             "offset": offset,
             "limit": limit,
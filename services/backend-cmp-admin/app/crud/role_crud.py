@@ -1,6 +1,7 @@
 from motor.motor_asyncio import AsyncIOMotorCollection
 from typing import List, Dict, Any, Optional
 from bson import ObjectId
+from pymongo import UpdateOne
 
 
 class RoleCRUD:
@@ -32,6 +33,18 @@ class RoleCRUD:
             return None
         return await self.collection.find_one({"_id": ObjectId(role_id), "is_deleted": False})
 
+    async def find_by_ids(self, role_ids: List[str]) -> List[Dict[str, Any]]:
+        object_ids = [ObjectId(role_id) for role_id in role_ids if ObjectId.is_valid(role_id)]
+        cursor = self.collection.find({"_id": {"$in": object_ids}, "is_deleted": False})
+        return await cursor.to_list(length=len(object_ids))
+
+    async def bulk_update_roles(self, updates: Dict[str, dict]):
+        """Applies a `$set` per role in one bulk_write; `updates` maps role_id to the fields to set."""
+        operations = [UpdateOne({"_id": ObjectId(role_id)}, {"$set": fields}) for role_id, fields in updates.items() if fields]
+        if not operations:
+            return None
+        return await self.collection.bulk_write(operations, ordered=False)
+
     async def update_role(self, role_id: str, update_fields: dict):
         return await self.collection.update_one(
             {"_id": ObjectId(role_id)},
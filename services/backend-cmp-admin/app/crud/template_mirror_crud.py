@@ -0,0 +1,131 @@
+import re
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, UpdateOne
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MIRROR_FIELDS = ("_id", "title_lc", "synced_at")
+
+
+class TemplateMirrorCRUD:
+    """Local copy of one upstream template catalogue (purposes or data elements).
+
+    Documents are keyed by the upstream template id so repeated syncs are plain
+    upserts, and listing uses `_id` as the keyset cursor.
+    """
+
+    def __init__(
+        self,
+        template_collection: AsyncIOMotorCollection,
+        state_collection: AsyncIOMotorCollection,
+        kind: str,
+        id_field: str,
+        filter_fields: Tuple[str, ...],
+    ):
+        self.template_collection = template_collection
+        self.state_collection = state_collection
+        self.kind = kind
+        self.id_field = id_field
+        self.filter_fields = filter_fields
+
+    async def ensure_indexes(self):
+        await self.template_collection.create_index(
+            [*((field, ASCENDING) for field in self.filter_fields), ("title_lc", ASCENDING), ("_id", ASCENDING)],
+            name="idx_filters_title_id",
+        )
+        await self.template_collection.create_index([("title_lc", ASCENDING), ("_id", ASCENDING)], name="idx_title_id")
+        await self.template_collection.create_index([("synced_at", ASCENDING)], name="idx_synced_at")
+
+    async def get_state(self) -> Dict[str, Any]:
+        return await self.state_collection.find_one({"_id": self.kind}) or {}
+
+    async def save_state(self, **fields):
+        return await self.state_collection.update_one({"_id": self.kind}, {"$set": fields}, upsert=True)
+
+    async def is_ready(self) -> bool:
+        """The mirror only serves reads once a full sync or snapshot import has completed."""
+        state = await self.get_state()
+        return bool(state.get("full_sync_completed_at"))
+
+    def _template_title(self, template: Dict[str, Any]) -> str:
+        title = template.get("title")
+        if not title:
+            translations = template.get("translations") or {}
+            title = translations.get("eng") or next(iter(translations.values()), "")
+        return title or ""
+
+    def to_mirror_doc(self, template: Dict[str, Any], synced_at: datetime) -> Dict[str, Any]:
+        doc = {key: value for key, value in template.items() if key not in MIRROR_FIELDS}
+        doc["title_lc"] = self._template_title(template).strip().lower()
+        doc["synced_at"] = synced_at
+        return doc
+
+    async def upsert_templates(self, templates: Iterable[Dict[str, Any]], synced_at: datetime) -> int:
+        operations = []
+        for template in templates:
+            template_id = template.get(self.id_field) or template.get("_id")
+            if not template_id:
+                continue
+            operations.append(UpdateOne({"_id": str(template_id)}, {"$set": self.to_mirror_doc(template, synced_at)}, upsert=True))
+        if not operations:
+            return 0
+        await self.template_collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    async def remove_stale(self, synced_before: datetime) -> int:
+        """Drop templates that a completed full sync no longer returned."""
+        result = await self.template_collection.delete_many({"synced_at": {"$lt": synced_before}})
+        return result.deleted_count
+
+    def build_query(self, id: Optional[str] = None, title: Optional[str] = None, **filters) -> Dict[str, Any]:
+        query: Dict[str, Any] = {}
+        if id:
+            query["_id"] = id
+        for field in self.filter_fields:
+            if filters.get(field):
+                query[field] = filters[field]
+        if title:
+            query["title_lc"] = {"$regex": f"^{re.escape(title.strip().lower())}"}
+        return query
+
+    def _from_mirror_doc(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        template = {key: value for key, value in doc.items() if key not in MIRROR_FIELDS}
+        template[self.id_field] = doc["_id"]
+        return template
+
+    async def list_templates(
+        self,
+        offset: int = 0,
+        limit: int = 20,
+        after: Optional[str] = None,
+        **filters,
+    ) -> Dict[str, Any]:
+        """Return `{total, data, next_cursor}` in the same shape as the upstream listing.
+
+        When `after` is given the page starts after that template id and `offset` is ignored.
+        """
+        query = self.build_query(**filters)
+        total = await self.template_collection.count_documents(query)
+
+        page_query = query
+        if after:
+            page_query = {"$and": [query, {"_id": {"$gt": after}}]} if query else {"_id": {"$gt": after}}
+        cursor = self.template_collection.find(page_query).sort("_id", ASCENDING)
+        if not after and offset:
+            cursor = cursor.skip(offset)
+        cursor = cursor.limit(limit)
+
+        docs: List[Dict[str, Any]] = [doc async for doc in cursor]
+        next_cursor = docs[-1]["_id"] if len(docs) == limit else None
+        return {"total": total, "data": [self._from_mirror_doc(doc) for doc in docs], "next_cursor": next_cursor}
+
+    async def export_templates(self) -> List[Dict[str, Any]]:
+        return [self._from_mirror_doc(doc) async for doc in self.template_collection.find({}).sort("_id", ASCENDING)]
+
+
+def purpose_template_mirror(template_collection: AsyncIOMotorCollection, state_collection: AsyncIOMotorCollection) -> TemplateMirrorCRUD:
+    return TemplateMirrorCRUD(template_collection, state_collection, "purposes", "purpose_id", ("industry", "sub_category"))
+
+
+def de_template_mirror(template_collection: AsyncIOMotorCollection, state_collection: AsyncIOMotorCollection) -> TemplateMirrorCRUD:
+    return TemplateMirrorCRUD(template_collection, state_collection, "data_elements", "id", ("domain",))
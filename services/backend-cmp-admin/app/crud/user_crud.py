@@ -1,6 +1,7 @@
 from motor.motor_asyncio import AsyncIOMotorCollection
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional
 from bson import ObjectId
+from pymongo import UpdateOne
 from app.schemas.auth_schema import UserInDB
 from app.utils.common import validate_object_id, convert_objectid_to_str
 
@@ -23,9 +24,10 @@ class UserCRUD:
             return UserInDB(**user_doc)
         return None
 
-    async def find_by_ids(self, user_ids: list) -> list:
+    async def find_by_ids(self, user_ids: list, projection: Optional[dict] = None) -> list:
         object_ids = [ObjectId(uid) for uid in user_ids if validate_object_id(uid)]
-        cursor = self.users_collection.find({"_id": {"$in": object_ids}})
+        query = {"_id": {"$in": object_ids}}
+        cursor = self.users_collection.find(query, projection) if projection else self.users_collection.find(query)
         users = await cursor.to_list(length=len(object_ids))
         return [convert_objectid_to_str(user) for user in users]
 
@@ -45,5 +47,26 @@ class UserCRUD:
             {"$addToSet": {"user_departments": department_id}},
         )
 
+    async def bulk_update_memberships(
+        self,
+        field: str,
+        additions: Dict[str, Iterable[str]],
+        removals: Optional[Dict[str, Iterable[str]]] = None,
+    ):
+        """
+        Adds and removes ids in a membership array (`user_roles` / `user_departments`) for many users in one
+        bulk_write. A user with both additions and removals gets two operations, since one update cannot
+        `$addToSet` and `$pull` the same field.
+        """
+        operations = [
+            UpdateOne({"_id": ObjectId(user_id)}, {"$addToSet": {field: {"$each": list(ids)}}}) for user_id, ids in additions.items() if ids
+        ]
+        operations.extend(
+            UpdateOne({"_id": ObjectId(user_id)}, {"$pull": {field: {"$in": list(ids)}}}) for user_id, ids in (removals or {}).items() if ids
+        )
+        if not operations:
+            return None
+        return await self.users_collection.bulk_write(operations, ordered=False)
+
     async def count_users(self, df_id: str) -> int:
         return await self.users_collection.count_documents({"df_id": df_id})
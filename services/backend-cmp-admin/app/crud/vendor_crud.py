@@ -1,7 +1,42 @@
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorCollection
 from pymongo import ASCENDING, DESCENDING
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+
+VENDOR_FILTER_KEYS = ("dpr_country", "dpr_country_risk", "industry", "processing_category", "audit_result")
+
+# Lowercased copies of the filterable fields, recomputed on every write so filters are exact index matches.
+SEARCH_KEYS_STAGE = {
+    "$set": {
+        "search_keys": {
+            "dpr_name": {"$toLower": "$dpr_name"},
+            "dpr_country": {"$toLower": "$dpr_country"},
+            "dpr_country_risk": {"$toLower": "$dpr_country_risk"},
+            "industry": {"$toLower": "$industry"},
+            "audit_result": {"$toLower": "$audit_status.audit_result"},
+            "processing_category": {
+                "$map": {
+                    "input": {"$cond": [{"$isArray": "$processing_category"}, "$processing_category", []]},
+                    "as": "category",
+                    "in": {"$toLower": "$$category"},
+                }
+            },
+        }
+    }
+}
+
+
+def build_search_keys(vendor: Dict[str, Any]) -> Dict[str, Any]:
+    """Python twin of `SEARCH_KEYS_STAGE` for documents built before insert."""
+    processing_category = vendor.get("processing_category")
+    return {
+        "dpr_name": (vendor.get("dpr_name") or "").lower(),
+        "dpr_country": (vendor.get("dpr_country") or "").lower(),
+        "dpr_country_risk": (vendor.get("dpr_country_risk") or "").lower(),
+        "industry": (vendor.get("industry") or "").lower(),
+        "audit_result": ((vendor.get("audit_status") or {}).get("audit_result") or "").lower(),
+        "processing_category": [(category or "").lower() for category in processing_category] if isinstance(processing_category, list) else [],
+    }
 
 
 class VendorCRUD:
@@ -17,61 +52,107 @@ class VendorCRUD:
         vendor = await self.vendor_collection.find_one({"_id": ObjectId(vendor_id), "status": {"$ne": "archived"}})
         return vendor
 
+    async def ensure_search_indexes(self):
+        await self.vendor_collection.create_index([("df_id", ASCENDING), ("created_at", DESCENDING)], name="idx_df_created")
+        for key in VENDOR_FILTER_KEYS:
+            await self.vendor_collection.create_index(
+                [("df_id", ASCENDING), (f"search_keys.{key}", ASCENDING), ("created_at", DESCENDING)],
+                name=f"idx_df_{key}_created",
+            )
+        await self.vendor_collection.create_index(
+            [("df_id", ASCENDING), ("dpr_name", "text"), ("dpr_country", "text"), ("industry", "text")],
+            name="idx_df_vendor_text",
+        )
+
+    async def backfill_search_keys(self) -> int:
+        """Populate `search_keys` on vendors written before the search fields existed."""
+        result = await self.vendor_collection.update_many({"search_keys": {"$exists": False}}, [SEARCH_KEYS_STAGE])
+        return result.modified_count
+
     async def create_vendor(self, vendor_data: dict):
+        vendor_data["search_keys"] = build_search_keys(vendor_data)
         result = await self.vendor_collection.insert_one(vendor_data)
         return result
 
     async def update_vendor(self, vendor_id: str, update_data: dict):
-        result = await self.vendor_collection.update_one({"_id": ObjectId(vendor_id)}, {"$set": update_data})
+        result = await self.vendor_collection.update_one(
+            {"_id": ObjectId(vendor_id)},
+            [{"$set": {field: {"$literal": value} for field, value in update_data.items()}}, SEARCH_KEYS_STAGE],
+        )
         return result
 
     async def count_vendors(self, query: dict) -> int:
         """Count vendors matching query."""
         return await self.vendor_collection.count_documents(query)
 
-    async def get_vendors(
+    async def search_vendors(
         self,
         query: dict,
         sort_order: str,
         page: int,
         page_size: int,
-    ) -> List[dict]:
-        """Get paginated vendor list with sorting."""
+    ) -> Tuple[List[dict], int]:
+        """Return one page of vendors and the total match count from a single aggregation."""
         sort_dir = ASCENDING if sort_order == "asc" else DESCENDING
         skip = (page - 1) * page_size
 
-        cursor = self.vendor_collection.find(query).sort("created_at", sort_dir).skip(skip).limit(page_size)
+        pipeline = [
+            {"$match": query},
+            {
+                "$facet": {
+                    "vendors": [
+                        {"$sort": {"created_at": sort_dir, "_id": sort_dir}},
+                        {"$skip": skip},
+                        {"$limit": page_size},
+                        {"$project": {"search_keys": 0}},
+                    ],
+                    "total": [{"$count": "count"}],
+                }
+            },
+        ]
+        result = await self.vendor_collection.aggregate(pipeline).to_list(length=1)
+        facet = result[0] if result else {}
+
         vendors = []
-        async for v in cursor:
+        for v in facet.get("vendors", []):
             v["_id"] = str(v["_id"])
             vendors.append(v)
-        return vendors
+        total = facet["total"][0]["count"] if facet.get("total") else 0
+        return vendors, total
 
     async def get_filter_fields(self, df_id: str) -> Dict[str, Any]:
-        """Get distinct filter values without aggregation."""
+        """Get distinct filter values with one `$facet` aggregation."""
         query = {"df_id": df_id, "status": {"$ne": "archived"}}
+        pipeline = [
+            {"$match": query},
+            {
+                "$facet": {
+                    "dpr_country": [{"$group": {"_id": "$dpr_country"}}],
+                    "dpr_country_risk": [{"$group": {"_id": "$dpr_country_risk"}}],
+                    "industry": [{"$group": {"_id": "$industry"}}],
+                    "processing_category": [
+                        {"$match": {"processing_category.0": {"$exists": True}}},
+                        {"$unwind": "$processing_category"},
+                        {"$group": {"_id": "$processing_category"}},
+                    ],
+                    "audit_result": [{"$group": {"_id": "$audit_status.audit_result"}}],
+                }
+            },
+        ]
+        result = await self.vendor_collection.aggregate(pipeline).to_list(length=1)
+        facet = result[0] if result else {}
 
-        dpr_country = await self.vendor_collection.distinct("dpr_country", query)
-        dpr_country_risk = await self.vendor_collection.distinct("dpr_country_risk", query)
-        industry = await self.vendor_collection.distinct("industry", query)
-        
-        # For processing_category, we need to iterate if it's an array of strings
-        processing_category_list = []
-        async for doc in self.vendor_collection.find(query, {"processing_category": 1}):
-            if "processing_category" in doc and isinstance(doc["processing_category"], list):
-                processing_category_list.extend(doc["processing_category"])
-        processing_category = list(set(processing_category_list)) # Get unique values
-
-        audit_result = await self.vendor_collection.distinct("audit_status.audit_result", query)
+        def values(name):
+            return sorted(bucket["_id"] for bucket in facet.get(name, []) if bucket["_id"])
 
         return {
-            "dpr_country": sorted([x for x in dpr_country if x]),
-            "dpr_country_risk": sorted([x for x in dpr_country_risk if x]),
-            "industry": sorted([x for x in industry if x]),
-            "processing_category": sorted([x for x in processing_category if x]),
+            "dpr_country": values("dpr_country"),
+            "dpr_country_risk": values("dpr_country_risk"),
+            "industry": values("industry"),
+            "processing_category": values("processing_category"),
             "cross_border": [True, False],
             "sub_processor": [True, False],
-            "audit_result": sorted([x for x in audit_result if x]),
+            "audit_result": values("audit_result"),
         }
 
     def archive_vendor(self, vendor_id: str):
@@ -59,6 +59,12 @@ async def get_purpose_template_collection(
     return db["purpose_templates"]
 
 
+async def get_template_mirror_state_collection(
+    db: AsyncIOMotorDatabase = Depends(get_concur_master_db),
+) -> AsyncIOMotorCollection:
+    return db["template_mirror_state"]
+
+
 async def get_de_master_translated_collection(
     db: AsyncIOMotorDatabase = Depends(get_concur_master_db),
 ) -> AsyncIOMotorCollection:
@@ -150,6 +156,12 @@ async def get_batch_collection(
     return db["batch_process"]
 
 
+async def get_failed_records_jobs_collection(
+    db: AsyncIOMotorDatabase = Depends(get_concur_master_db),
+) -> AsyncIOMotorCollection:
+    return db["failed_records_jobs"]
+
+
 async def get_notifications_collection(
     db: AsyncIOMotorDatabase = Depends(get_concur_master_db),
 ) -> AsyncIOMotorCollection:
@@ -192,6 +204,12 @@ async def get_consent_artifact_collection(
     return db["consent_latest_artifacts"]
 
 
+async def get_dashboard_snapshot_collection(
+    db: AsyncIOMotorDatabase = Depends(get_concur_master_db),
+) -> AsyncIOMotorCollection:
+    return db["dashboard_snapshots"]
+
+
 async def get_consent_audit_collection(
     db: AsyncIOMotorDatabase = Depends(get_concur_master_db),
 ) -> AsyncIOMotorCollection:
@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -11,8 +13,13 @@ from app.db.session import close_postgres_pool, connect_to_mongo, close_mongo_co
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.logger import setup_logging, app_logger
 from app.core.init_admin import create_initial_admin
+from app.core.rbac import run_policy_reload_listener
+from app.crud.grievance_crud import GrievanceCRUD
+from app.crud.invite_crud import InviteCRUD
+from app.crud.vendor_crud import VendorCRUD
 from app.db.rabbitmq import create_vhost, set_user_permissions, declare_queues, rabbitmq_pool
 from app.middleware.request_context import RequestContextMiddleware
+from app.services.vendor_service import run_vendor_facet_invalidation_listener
 from fastapi.responses import PlainTextResponse
 
 limiter = Limiter(key_func=get_ipaddr, default_limits=["100/minute"])
@@ -38,13 +45,27 @@ async def lifespan(app: FastAPI):
     app.state.motor_client = client
 
     await create_initial_admin(client)
+
+    concur_master_db = client[settings.DB_NAME_CONCUR_MASTER]
+    vendor_crud = VendorCRUD(concur_master_db["vendor_master"], concur_master_db["purpose_master"])
+    await vendor_crud.ensure_search_indexes()
+    backfilled_vendors = await vendor_crud.backfill_search_keys()
+    if backfilled_vendors:
+        app_logger.info(f"Backfilled search keys on {backfilled_vendors} vendors.")
+    await InviteCRUD(concur_master_db["user_invites"]).ensure_indexes()
+    await GrievanceCRUD(concur_master_db["grievances"]).ensure_indexes()
+
     await create_vhost()
     await rabbitmq_pool.init_pool()
     await set_user_permissions()
     await declare_queues()
+    policy_listener = asyncio.create_task(run_policy_reload_listener())
+    vendor_facet_listener = asyncio.create_task(run_vendor_facet_invalidation_listener())
     app_logger.info("Application startup complete.")
     yield
     app_logger.info("Application shutdown initiated.")
+    policy_listener.cancel()
+    vendor_facet_listener.cancel()
     close_mongo_connection(app)
     await rabbitmq_pool.close_pool()
     await close_postgres_pool()
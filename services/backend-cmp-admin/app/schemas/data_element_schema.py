@@ -49,6 +49,7 @@ class DETemplateOut(BaseModel):
 
 
 class DETemplatePaginatedResponse(Pagination):
+    next_cursor: Optional[str] = None
     data_elements: List[DETemplateOut] = Field(..., validation_alias="data", serialization_alias="data_elements")
 
     model_config = ConfigDict(validate_by_alias=True)
@@ -84,5 +84,6 @@ class PurposeTemplate(BaseModel):
 
 
 class PurposeTemplatePaginatedResponse(Pagination):
+    next_cursor: Optional[str] = None
     purposes: List[PurposeTemplate] = Field(..., validation_alias="data", serialization_alias="purposes")
     model_config = ConfigDict(validate_by_alias=True)
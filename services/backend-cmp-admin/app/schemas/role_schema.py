@@ -24,6 +24,18 @@ class UpdateRolePermissions(BaseModel):
     routes_accessible: List[RoutePermission] = []
 
 
+class RoleMembershipChange(BaseModel):
+    role_id: str
+    add_users: List[str] = []
+    remove_users: List[str] = []
+    # When given, the role's routes are reset to exactly this list.
+    routes_accessible: Optional[List[RoutePermission]] = None
+
+
+class BulkRoleMembershipUpdate(BaseModel):
+    roles: List[RoleMembershipChange]
+
+
 class UpdateRole(BaseModel):
     role_name: Optional[str] = None
     role_description: Optional[str] = None
@@ -6,6 +6,7 @@ from motor.motor_asyncio import AsyncIOMotorCollection
 from app.crud.collection_point_crud import CollectionPointCrud
 from app.services.data_fiduciary_service import DataFiduciaryService
 from app.utils.business_logger import log_business_event
+from app.utils.config_events import publish_config_change
 from app.schemas.collection_point_schema import CollectionPointDB
 from app.services.data_element_service import DataElementService
 from app.services.purpose_service import PurposeService
@@ -287,6 +288,8 @@ class CollectionPointService:
             business_logs_collection=self.business_logs_collection,
         )
 
+        await publish_config_change("cp", user["df_id"], cp_id)
+
         return updated_cp
 
     async def update_collection_point(self, cp_id: str, update_data: Dict[str, Any], user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -377,6 +380,9 @@ class CollectionPointService:
             business_logs_collection=self.business_logs_collection,
         )
 
+        if existing_cp.get("cp_status") == "published" or update_data.get("cp_status") == "published":
+            await publish_config_change("cp", user["df_id"], cp_id)
+
         return updated_cp
 
     async def get_all_collection_points(
@@ -1,5 +1,5 @@
 from io import StringIO
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, UTC
 
 from bson import ObjectId
 from fastapi.responses import StreamingResponse
@@ -9,10 +9,14 @@ from fastapi import HTTPException
 from app.utils.common import hash_shake256
 from pymongo import ASCENDING, DESCENDING
 from app.schemas.consent_artifact_schema import PurposeConsentExpiry, ExpiringConsentsByDpIdResponse
-from typing import Optional
+from typing import Dict, Optional
 from app.utils.business_logger import log_business_event
 
 
+EXPIRY_WINDOWS_DAYS = (7, 15, 30)
+EXPIRY_WINDOWS_DAYS_STR = tuple(str(days) for days in EXPIRY_WINDOWS_DAYS)
+
+
 class ConsentArtifactService:
     def __init__(
         self,
@@ -284,82 +288,38 @@ class ConsentArtifactService:
         )
         return consent_artifact
 
-    async def get_expiring_consents(self, df_id: str, dp_id: Optional[str] = None, days_to_expire: Optional[str] = None):
-        current_time = datetime.now()
-        seven_days_from_now = current_time + timedelta(days=7)
-        fifteen_days_from_now = current_time + timedelta(days=15)
-        thirty_days_from_now = current_time + timedelta(days=30)
+    async def get_expiring_consents(
+        self,
+        df_id: str,
+        dp_id: Optional[str] = None,
+        days_to_expire: Optional[str] = None,
+        page: int = 1,
+        limit: int = 500,
+    ):
+        current_time = datetime.now(UTC)
+        window_days = int(days_to_expire) if days_to_expire in EXPIRY_WINDOWS_DAYS_STR else 30
+        window_end = current_time + timedelta(days=window_days)
 
-        query = {
-            "df_id": df_id,
-            "artifact.consent_scope.data_elements.consents.consent_expiry_period": {
-                "$gt": current_time.isoformat(),
-            },
-        }
-        if dp_id:
-            query["dp_id"] = dp_id
-
-        if days_to_expire == "7":
-            query["artifact.consent_scope.data_elements.consents.consent_expiry_period"]["$lte"] = seven_days_from_now.isoformat()
-        elif days_to_expire == "15":
-            query["artifact.consent_scope.data_elements.consents.consent_expiry_period"]["$lte"] = fifteen_days_from_now.isoformat()
-        else:
-            query["artifact.consent_scope.data_elements.consents.consent_expiry_period"]["$lte"] = thirty_days_from_now.isoformat()
-
-        expiring_consents_cursor = self.crud.get_expiring_consent_artifacts(query)
-        expiring_consents_list = await expiring_consents_cursor.to_list(length=None)
-
-        seven_days_expiring = {}
-        fifteen_days_expiring = {}
-        thirty_days_expiring = {}
-
-        for artifact_doc in expiring_consents_list:
-            dp_id_from_doc = artifact_doc.get("dp_id")
-            df_id_from_doc = artifact_doc.get("df_id")
-
-            if not dp_id_from_doc:
-                continue
-
-            for data_element in artifact_doc.get("artifact", {}).get("consent_scope", {}).get("data_elements", []):
-                for consent in data_element.get("consents", []):
-                    consent_expiry_str = consent.get("consent_expiry_period")
-                    if not consent_expiry_str:
-                        continue
-
-                    try:
-                        consent_expiry_dt = datetime.fromisoformat(consent_expiry_str.replace("Z", "+00:00"))
-                    except ValueError:
-                        continue
-
-                    purpose_consent_expiry = PurposeConsentExpiry(
-                        purpose_id=consent.get("purpose_id"),
-                        purpose_title=consent.get("purpose_title"),
-                        consent_expiry_period=consent_expiry_dt,
-                        dp_id=dp_id_from_doc,
-                        df_id=df_id_from_doc,
+        skip = (page - 1) * limit
+        expiring_dps = await self.crud.get_expiring_consents_by_dp(df_id, current_time, window_end, skip, limit, dp_id=dp_id)
+
+        result = [
+            ExpiringConsentsByDpIdResponse(
+                dp_id=entry["dp_id"],
+                expiring_purposes=[
+                    PurposeConsentExpiry(
+                        purpose_id=grant.get("purpose_id"),
+                        purpose_title=grant.get("purpose_title"),
+                        consent_expiry_period=grant.get("expires_at"),
+                        dp_id=entry["dp_id"],
+                        df_id=entry.get("df_id"),
                     )
-
-                    if current_time < consent_expiry_dt <= seven_days_from_now:
-                        seven_days_expiring.setdefault(
-                            dp_id_from_doc, ExpiringConsentsByDpIdResponse(dp_id=dp_id_from_doc, expiring_purposes=[])
-                        ).expiring_purposes.append(purpose_consent_expiry)
-
-                    if current_time < consent_expiry_dt <= fifteen_days_from_now:
-                        fifteen_days_expiring.setdefault(
-                            dp_id_from_doc, ExpiringConsentsByDpIdResponse(dp_id=dp_id_from_doc, expiring_purposes=[])
-                        ).expiring_purposes.append(purpose_consent_expiry)
-
-                    if current_time < consent_expiry_dt <= thirty_days_from_now:
-                        thirty_days_expiring.setdefault(
-                            dp_id_from_doc, ExpiringConsentsByDpIdResponse(dp_id=dp_id_from_doc, expiring_purposes=[])
-                        ).expiring_purposes.append(purpose_consent_expiry)
-
-        if days_to_expire == "7":
-            result = list(seven_days_expiring.values())
-        elif days_to_expire == "15":
-            result = list(fifteen_days_expiring.values())
-        else:
-            result = list(thirty_days_expiring.values())
+                    for grant in entry.get("grants", [])
+                ],
+            )
+            for entry in expiring_dps
+            if entry.get("dp_id")
+        ]
 
         await log_business_event(
             event_type="LIST_EXPIRING_CONSENTS",
@@ -368,10 +328,26 @@ class ConsentArtifactService:
                 "df_id": df_id,
                 "dp_id": dp_id,
                 "days_to_expire": days_to_expire,
-                "num_expiring_consents": len(expiring_consents_list),
+                "page": page,
+                "limit": limit,
+                "num_expiring_consents": sum(len(entry.expiring_purposes) for entry in result),
             },
             message=f"User queried expiring consents for Data Fiduciary '{df_id}'. Days to expire: {days_to_expire or '30'}.",
             business_logs_collection=self.business_logs_collection,
         )
 
         return result
+
+    async def get_expiring_consent_counts(self, df_id: str, dp_id: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Count DPs and purposes with approved consents expiring within each window.
+        Windows are cumulative, so the 15-day counts include the 7-day ones.
+        """
+        current_time = datetime.now(UTC)
+        boundaries = [current_time + timedelta(days=days) for days in EXPIRY_WINDOWS_DAYS]
+        buckets = await self.crud.count_expiring_consents_by_window(df_id, current_time, boundaries, dp_id=dp_id)
+
+        return {
+            str(days): {"dp_count": bucket.get("dp_count", 0), "purpose_count": bucket.get("purpose_count", 0)}
+            for days, bucket in zip(EXPIRY_WINDOWS_DAYS, buckets)
+        }
@@ -1,13 +1,12 @@
-from datetime import timedelta
-from typing import Any, Dict
-from app.cmp_widget.generator import WidgetBuilder
+from io import BytesIO
+from typing import Any, Dict, List, Optional
+from minio.error import S3Error
+from app.cmp_widget.generator import CookieBanner, WidgetConfigBundle, render_widget_loader
 from app.services.cookie_service import CookieManagementService
 from app.schemas.assets_schema import MetaCookies
 from app.services.data_fiduciary_service import DataFiduciaryService
 from app.core.config import settings
 import re
-import uuid
-import mimetypes
 import os
 import asyncio
 from app.core.logger import get_logger
@@ -15,6 +14,13 @@ from app.utils.business_logger import log_business_event
 
 logger = get_logger("api.widget_service")
 
+WIDGET_TRANSLATIONS_FILE = "app/cmp_widget/static_cookie_translation.json"
+WIDGET_RUNTIME_LOCAL_PATH = "app/cmp_widget/dist/cmp-runtime.iife.js"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+LOADER_CACHE_CONTROL = "public, max-age=300"
+
+_uploaded_runtime_versions = set()
+
 
 class WidgetService:
     """
@@ -52,6 +58,34 @@ class WidgetService:
         unit = unit.lower().rstrip("s")
         return {"value": value, "unit": unit}
 
+    def _group_cookies_by_category(self, cookies: List[Dict[str, Any]]) -> Dict[str, list]:
+        cookies_data: Dict[str, list] = {}
+        for cookie in cookies:
+            category = cookie.get("category", "other").lower()
+            expiry = self._normalize_expiry(cookie.get("lifespan", {"value": 1, "unit": "year"}))
+            cookies_data.setdefault(category, []).append(
+                {
+                    "name": cookie.get("cookie_name"),
+                    "description": cookie.get("translations", {}),
+                    "domain": cookie.get("hostname", ""),
+                    "expiry": expiry,
+                }
+            )
+        return cookies_data
+
+    def _build_widget_config(self, asset_id: str, cookies: List[Dict[str, Any]], df_info: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "COOKIES_DATA": self._group_cookies_by_category(cookies),
+            "WIDGET_NAME": asset_id,
+            "INPUT_JSON_FILE": WIDGET_TRANSLATIONS_FILE,
+            "DF_NAME": df_info.get("name", "Default Firm Name"),
+            "PRIVACY_URL": df_info.get("privacy_policy_url", ""),
+            "COOKIE_URL": df_info.get("cookie_policy_url", ""),
+            "LOGO_URL": df_info.get("df_logo_url"),
+            "SRC_TEMPLATE_PATH": "app/cmp_widget/src/template.html",
+            "COOKIE_CONSENT_URL": settings.COOKIE_CONSENT_URL,
+        }
+
     async def prepare_widget_config(self, user: Dict[str, Any], asset_id: str, s3_service) -> Dict[str, Any]:
         logger.info(
             f"Preparing widget configuration for asset_id={asset_id}",
@@ -81,30 +115,7 @@ class WidgetService:
         df_info = await self.df_service.get_details(df_id=user["df_id"], user=user)
         df_info = df_info["df"]["org_info"]
 
-        cookies_data: Dict[str, list] = {}
-        for cookie in cookies_result.get("cookies", []):
-            category = cookie.get("category", "other").lower()
-            expiry = self._normalize_expiry(cookie.get("lifespan", {"value": 1, "unit": "year"}))
-            cookies_data.setdefault(category, []).append(
-                {
-                    "name": cookie.get("cookie_name"),
-                    "description": cookie.get("translations", {}),
-                    "domain": cookie.get("hostname", ""),
-                    "expiry": expiry,
-                }
-            )
-
-        config = {
-            "COOKIES_DATA": cookies_data,
-            "WIDGET_NAME": asset_id,
-            "INPUT_JSON_FILE": "app/cmp_widget/static_cookie_translation.json",
-            "DF_NAME": df_info.get("name", "Default Firm Name"),
-            "PRIVACY_URL": df_info.get("privacy_policy_url", ""),
-            "COOKIE_URL": df_info.get("cookie_policy_url", ""),
-            "LOGO_URL": df_info.get("df_logo_url"),
-            "SRC_TEMPLATE_PATH": "app/cmp_widget/src/template.html",
-            "COOKIE_CONSENT_URL": settings.COOKIE_CONSENT_URL,
-        }
+        config = self._build_widget_config(asset_id, cookies_result.get("cookies", []), df_info)
 
         logger.info(
             f"Building and uploading widget for {asset_id}", extra={"user_id": user.get("id"), "df_id": user.get("df_id"), "asset_id": asset_id}
@@ -143,45 +154,70 @@ class WidgetService:
         )
         return build_result
 
-    async def build_production_widget(self, config: Dict[str, Any], s3_service) -> Dict[str, Any]:
-        widget_name = config.get("WIDGET_NAME", "unknown_widget")
-        logger.info(f"Initializing WidgetBuilder for {widget_name}", extra={"widget_name": widget_name})
-        builder = WidgetBuilder(config)
+    def _public_url(self, object_name: str) -> str:
+        return f"https://{settings.MINIO_BROWSER_URL}/{settings.COOKIE_CONSENT_BUCKET}/{object_name}"
+
+    def _put_script(self, s3_service, object_name: str, content: bytes, cache_control: str):
+        s3_service.put_object(
+            bucket_name=settings.COOKIE_CONSENT_BUCKET,
+            object_name=object_name,
+            data=BytesIO(content),
+            length=len(content),
+            content_type="application/javascript",
+            metadata={"Cache-Control": cache_control},
+        )
+
+    def _ensure_runtime_uploaded(self, s3_service) -> str:
+        """
+        Uploads the release's prebuilt runtime once. The runtime is compiled at image
+        build time (npm run build:runtime) and versioned by COOKIE_WIDGET_RUNTIME_VERSION.
+        """
+        version = settings.COOKIE_WIDGET_RUNTIME_VERSION
+        object_name = f"widget-runtime/{version}/cmp-runtime.iife.js"
+        if version in _uploaded_runtime_versions:
+            return object_name
+
         try:
-            loop = asyncio.get_running_loop()
-            logger.info("Starting build process...", extra={"widget_name": widget_name})
-            await loop.run_in_executor(None, builder.build)
-            logger.info("Build process completed.", extra={"widget_name": widget_name})
-
-            local_path = f"app/cmp_widget/dist/{widget_name}-cmp-widget.iife.js"
-            if not os.path.exists(local_path):
-                logger.error(f"Built file not found at {local_path}", extra={"widget_name": widget_name, "local_path": local_path})
-                raise FileNotFoundError(f"Built file not found at {local_path}")
-            logger.info(f"Built file found at {local_path}", extra={"widget_name": widget_name, "local_path": local_path})
-
-            filename = f"{widget_name}_.js"
-            content_type = mimetypes.guess_type(local_path)[0] or "text/js"
-            logger.info(
-                f"Uploading to S3 bucket {settings.COOKIE_CONSENT_BUCKET} as {filename} (content_type={content_type})",
-                extra={
-                    "widget_name": widget_name,
-                    "bucket": settings.COOKIE_CONSENT_BUCKET,
-                    "upload_filename": filename,
-                    "content_type": content_type,
-                },
-            )
+            s3_service.stat_object(settings.COOKIE_CONSENT_BUCKET, object_name)
+        except S3Error as e:
+            if e.code not in ("NoSuchKey", "NoSuchObject"):
+                raise
+            if not os.path.exists(WIDGET_RUNTIME_LOCAL_PATH):
+                raise FileNotFoundError(f"Widget runtime not built at {WIDGET_RUNTIME_LOCAL_PATH}")
+            logger.info(f"Uploading widget runtime {version} to {object_name}", extra={"runtime_version": version})
+            with open(WIDGET_RUNTIME_LOCAL_PATH, "rb") as runtime_file:
+                self._put_script(s3_service, object_name, runtime_file.read(), IMMUTABLE_CACHE_CONTROL)
 
-            s3_service.fput_object(
-                bucket_name=settings.COOKIE_CONSENT_BUCKET,
-                object_name=filename,
-                file_path=local_path,
-                content_type=content_type,
-            )
+        _uploaded_runtime_versions.add(version)
+        return object_name
 
-            file_url = f"https://{settings.MINIO_BROWSER_URL}/{settings.COOKIE_CONSENT_BUCKET}/{filename}"
+    def _publish_bundle(self, bundle: WidgetConfigBundle, s3_service) -> str:
+        runtime_object = self._ensure_runtime_uploaded(s3_service)
+        self._put_script(s3_service, bundle.object_name, bundle.render(), IMMUTABLE_CACHE_CONTROL)
 
-            logger.info(f"Widget uploaded and accessible at {file_url}", extra={"widget_name": widget_name, "file_url": file_url})
+        loader_name = f"{bundle.widget_name}_.js"
+        loader = render_widget_loader(self._public_url(bundle.object_name), self._public_url(runtime_object))
+        self._put_script(s3_service, loader_name, loader, LOADER_CACHE_CONTROL)
+        return self._public_url(loader_name)
+
+    async def build_production_widget(
+        self, config: Dict[str, Any], s3_service, banner_builder: Optional[CookieBanner] = None
+    ) -> Dict[str, Any]:
+        """
+        Publishes the per-asset config bundle next to the shared prebuilt runtime.
+        The asset's script URL ({asset_id}_.js) stays stable; it loads the
+        content-hashed bundle and the runtime, both of which are immutable.
+        """
+        widget_name = config.get("WIDGET_NAME", "unknown_widget")
+        try:
+            bundle = WidgetConfigBundle(config, banner_builder=banner_builder)
+            loop = asyncio.get_running_loop()
+            file_url = await loop.run_in_executor(None, self._publish_bundle, bundle, s3_service)
 
+            logger.info(
+                f"Widget config bundle {bundle.object_name} published; entry script at {file_url}",
+                extra={"widget_name": widget_name, "file_url": file_url},
+            )
             return {
                 "status": "success",
                 "message": f"Widget '{widget_name}' built and uploaded successfully.",
@@ -191,3 +227,33 @@ class WidgetService:
         except Exception as e:
             logger.error(f"Error during widget build/upload for {widget_name}: {e}", exc_info=True, extra={"widget_name": widget_name})
             return {"status": "error", "message": str(e), "url": None}
+
+    async def rebuild_widget_bundles(self, user: Dict[str, Any], asset_ids: List[str], s3_service) -> List[Dict[str, Any]]:
+        """
+        Republishes the config bundles of many assets concurrently. DF details and the
+        static translations are loaded once for the whole batch.
+        """
+        df_info = (await self.df_service.get_details(df_id=user["df_id"], user=user))["df"]["org_info"]
+        banner_builder = CookieBanner(file_path=WIDGET_TRANSLATIONS_FILE)
+        semaphore = asyncio.Semaphore(settings.WIDGET_BUNDLE_CONCURRENCY)
+
+        async def rebuild(asset_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                cookies_result = await self.cookie_service._get_all_published_cookies_for_website(asset_id, user["df_id"])
+                if not cookies_result.get("cookies"):
+                    return {"asset_id": asset_id, "status": "error", "message": "No published cookies found for this website.", "url": None}
+
+                config = self._build_widget_config(asset_id, cookies_result["cookies"], df_info)
+                result = await self.build_production_widget(config, s3_service, banner_builder=banner_builder)
+                if result.get("status") == "success":
+                    await self.cookie_service.asset_service.update_asset_cookie_fields(
+                        asset_id=asset_id, user=user, meta_cookies=MetaCookies(script_url=result["url"])
+                    )
+                return {"asset_id": asset_id, **result}
+
+        results = await asyncio.gather(*(rebuild(asset_id) for asset_id in asset_ids))
+        logger.info(
+            f"Rebuilt {sum(1 for r in results if r['status'] == 'success')}/{len(results)} widget bundles",
+            extra={"df_id": user.get("df_id")},
+        )
+        return list(results)
@@ -1,16 +1,31 @@
+import asyncio
+import copy
+import time
+from typing import Any, Dict, Tuple
+
+from app.core.config import settings
 from app.crud.assets_crud import AssetCrud
 from app.crud.collection_point_crud import CollectionPointCrud
 from app.crud.data_element_crud import DataElementCRUD
 from app.crud.data_principal_crud import DataPrincipalCRUD
 from app.crud.department_crud import DepartmentCRUD
 from app.crud.dpar_crud import DparCRUD
-from app.crud.grievance_crud import GrievanceCRUD
+from app.crud.grievance_crud import OPEN_GRIEVANCE_STATUSES, GrievanceCRUD
 from app.crud.purpose_crud import PurposeCRUD
 from app.crud.role_crud import RoleCRUD
 from app.crud.user_crud import UserCRUD
 from app.crud.vendor_crud import VendorCRUD
-from app.crud.consent_artifact_crud import ConsentArtifactCRUD
-from app.services.consent_artifact_service import ConsentArtifactService
+from app.services.dashboard_snapshot_service import DashboardSnapshotService
+
+# df_id -> (expires_at monotonic timestamp, dashboard payload)
+_dashboard_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def invalidate_dashboard_cache(df_id: str = None):
+    if df_id is None:
+        _dashboard_cache.clear()
+    else:
+        _dashboard_cache.pop(df_id, None)
 
 
 class DashboardService:
@@ -27,8 +42,7 @@ class DashboardService:
         grievance_crud: GrievanceCRUD,
         dpar_crud: DparCRUD,
         vendor_crud: VendorCRUD,
-        consent_artifact_crud: ConsentArtifactCRUD,
-        consent_artifact_service: ConsentArtifactService,
+        dashboard_snapshot_service: DashboardSnapshotService,
     ):
         self.departments_crud = departments_crud
         self.roles_crud = roles_crud
@@ -41,54 +55,53 @@ class DashboardService:
         self.grievance_crud = grievance_crud
         self.dpar_crud = dpar_crud
         self.vendor_crud = vendor_crud
-        self.consent_artifact_crud = consent_artifact_crud
-        self.consent_artifact_service = consent_artifact_service
+        self.dashboard_snapshot_service = dashboard_snapshot_service
 
     async def get_dashboard_detail(self, current_user: dict):
-
-        total_departments = await self.departments_crud.count_departments(current_user.get("df_id"))
-        total_roles = await self.roles_crud.count_roles(current_user.get("df_id"))
-        total_users = await self.users_crud.count_users(current_user.get("df_id"))
-
-        total_assets = await self.assets_crud.count_assets(current_user.get("df_id"))
-        list_of_assets_categories = await self.assets_crud.get_assets_categories(current_user.get("df_id"))
-        total_cookies = await self.assets_crud.get_total_cookie_count(current_user.get("df_id"))
-
-        total_legacy_data_principals = await self.data_principal_crud.count(table_name="dpd", where_clause="is_legacy = $1", values=[True])
-
-        total_new_data_principals = await self.data_principal_crud.count(table_name="dpd", where_clause="is_legacy = $1", values=[False])
-
-        total_data_elements = await self.data_elements_crud.count_data_elements(current_user.get("df_id"))
-        total_collected_data_elements = await self.consent_artifact_crud.count_collected_data_elements({})
-
-        total_purposes = await self.purposes_crud.count_consent_purposes(current_user.get("df_id"))
-        total_collected_purposes = await self.consent_artifact_crud.count_collected_purposes({})
-
-        total_collection_points = await self.collection_points_crud.count_collection_points(current_user.get("df_id"))
-        total_collected_collection_points = await self.consent_artifact_crud.count_collected_collection_points({})
-
-        active_grievances = await self.grievance_crud.count_grievances()
-        closed_grievances = 0
-        active_dpar_requests = await self.dpar_crud.count_requests({"status": {"$ne": "complete"}})
-        closed_dpar_requests = await self.dpar_crud.count_requests({"status": "complete"})
-        total_data_processors = await self.vendor_crud.count_vendors({"df_id": current_user.get("df_id"), "status": {"$ne": "archived"}})
-
-        total_consent_artifacts = await self.consent_artifact_crud.count_filtered_consent_artifacts({})
-
-        expiring_consents_seven_days = await self.consent_artifact_service.get_expiring_consents(df_id=current_user.get("df_id"), days_to_expire="7")
-        total_expiring_consent_in_seven_days = len(expiring_consents_seven_days)
-
-        expiring_consents_fifteen_days = await self.consent_artifact_service.get_expiring_consents(
-            df_id=current_user.get("df_id"), days_to_expire="15"
-        )
-        total_expiring_consent_in_fifteen_days = len(expiring_consents_fifteen_days)
-
-        expiring_consents_thirty_days = await self.consent_artifact_service.get_expiring_consents(
-            df_id=current_user.get("df_id"), days_to_expire="30"
+        df_id = current_user.get("df_id")
+
+        cached = _dashboard_cache.get(df_id)
+        if cached and cached[0] > time.monotonic():
+            return copy.deepcopy(cached[1])
+
+        (
+            total_departments,
+            total_roles,
+            total_users,
+            total_assets,
+            list_of_assets_categories,
+            total_cookies,
+            total_legacy_data_principals,
+            total_new_data_principals,
+            total_data_elements,
+            total_purposes,
+            total_collection_points,
+            active_grievances,
+            active_dpar_requests,
+            closed_dpar_requests,
+            total_data_processors,
+            consent_counters,
+        ) = await asyncio.gather(
+            self.departments_crud.count_departments(df_id),
+            self.roles_crud.count_roles(df_id),
+            self.users_crud.count_users(df_id),
+            self.assets_crud.count_assets(df_id),
+            self.assets_crud.get_assets_categories(df_id),
+            self.assets_crud.get_total_cookie_count(df_id),
+            self.data_principal_crud.count(table_name="dpd", where_clause="is_legacy = $1", values=[True]),
+            self.data_principal_crud.count(table_name="dpd", where_clause="is_legacy = $1", values=[False]),
+            self.data_elements_crud.count_data_elements(df_id),
+            self.purposes_crud.count_consent_purposes(df_id),
+            self.collection_points_crud.count_collection_points(df_id),
+            self.grievance_crud.count_grievances(query={"df_id": df_id, "request_status": {"$in": OPEN_GRIEVANCE_STATUSES}}),
+            self.dpar_crud.count_requests({"status": {"$ne": "complete"}}),
+            self.dpar_crud.count_requests({"status": "complete"}),
+            self.vendor_crud.count_vendors({"df_id": df_id, "status": {"$ne": "archived"}}),
+            self.dashboard_snapshot_service.get_consent_counters(df_id),
         )
-        total_expiring_consent_in_thirty_days = len(expiring_consents_thirty_days)
+        closed_grievances = 0
 
-        return {
+        dashboard = {
             "total_departments": total_departments,
             "total_roles": total_roles,
             "total_users": total_users,
@@ -98,18 +111,21 @@ class DashboardService:
             "total_cookies": total_cookies,
             "total_new_data_principals": total_new_data_principals,
             "total_data_elements": total_data_elements,
-            "total_collected_data_elements": total_collected_data_elements,
+            "total_collected_data_elements": consent_counters.get("total_collected_data_elements", 0),
             "total_purposes": total_purposes,
-            "total_collected_purposes": total_collected_purposes,
+            "total_collected_purposes": consent_counters.get("total_collected_purposes", 0),
             "total_collection_points": total_collection_points,
-            "total_collected_collection_points": total_collected_collection_points,
+            "total_collected_collection_points": consent_counters.get("total_collected_collection_points", 0),
             "active_grievances": active_grievances,
             "closed_grievances": closed_grievances,
             "active_dpar_requests": active_dpar_requests,
             "closed_dpar_requests": closed_dpar_requests,
             "total_data_processors": total_data_processors,
-            "total_consent_artifacts": total_consent_artifacts,
-            "total_expiring_consent_in_seven_days": total_expiring_consent_in_seven_days,
-            "total_expiring_consent_in_fifteen_days": total_expiring_consent_in_fifteen_days,
-            "total_expiring_consent_in_thirty_days": total_expiring_consent_in_thirty_days,
+            "total_consent_artifacts": consent_counters.get("total_consent_artifacts", 0),
+            "total_expiring_consent_in_seven_days": consent_counters.get("total_expiring_consent_in_seven_days", 0),
+            "total_expiring_consent_in_fifteen_days": consent_counters.get("total_expiring_consent_in_fifteen_days", 0),
+            "total_expiring_consent_in_thirty_days": consent_counters.get("total_expiring_consent_in_thirty_days", 0),
         }
+
+        _dashboard_cache[df_id] = (time.monotonic() + settings.DASHBOARD_CACHE_TTL_SECONDS, copy.deepcopy(dashboard))
+        return dashboard
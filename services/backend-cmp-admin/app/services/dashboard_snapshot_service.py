@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime, UTC
+from typing import Any, Dict
+
+from app.core.config import settings
+from app.crud.consent_artifact_crud import ConsentArtifactCRUD
+from app.crud.dashboard_snapshot_crud import DashboardSnapshotCRUD
+from app.services.consent_artifact_service import ConsentArtifactService
+
+
+class DashboardSnapshotService:
+    """
+    Maintains the per-DF snapshot of consent-derived dashboard counters.
+
+    These counters scan the consent artifact collection, so they are computed with
+    server-side aggregations, stored in `dashboard_snapshots` and only rebuilt once
+    the stored snapshot is older than DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS. The
+    dashboard snapshot scheduler refreshes them in the background.
+    """
+
+    def __init__(
+        self,
+        consent_artifact_crud: ConsentArtifactCRUD,
+        consent_artifact_service: ConsentArtifactService,
+        dashboard_snapshot_crud: DashboardSnapshotCRUD,
+    ):
+        self.consent_artifact_crud = consent_artifact_crud
+        self.consent_artifact_service = consent_artifact_service
+        self.dashboard_snapshot_crud = dashboard_snapshot_crud
+
+    async def compute_consent_counters(self, df_id: str) -> Dict[str, Any]:
+        query = {"df_id": df_id}
+
+        (
+            total_collected_data_elements,
+            total_collected_purposes,
+            total_collected_collection_points,
+            total_consent_artifacts,
+            expiring_consent_counts,
+        ) = await asyncio.gather(
+            self.consent_artifact_crud.count_collected_data_elements(query),
+            self.consent_artifact_crud.count_collected_purposes(query),
+            self.consent_artifact_crud.count_collected_collection_points(query),
+            self.consent_artifact_crud.count_filtered_consent_artifacts(query),
+            self.consent_artifact_service.get_expiring_consent_counts(df_id=df_id),
+        )
+
+        return {
+            "total_collected_data_elements": total_collected_data_elements,
+            "total_collected_purposes": total_collected_purposes,
+            "total_collected_collection_points": total_collected_collection_points,
+            "total_consent_artifacts": total_consent_artifacts,
+            "total_expiring_consent_in_seven_days": expiring_consent_counts["7"]["dp_count"],
+            "total_expiring_consent_in_fifteen_days": expiring_consent_counts["15"]["dp_count"],
+            "total_expiring_consent_in_thirty_days": expiring_consent_counts["30"]["dp_count"],
+        }
+
+    async def refresh_snapshot(self, df_id: str) -> Dict[str, Any]:
+        counters = await self.compute_consent_counters(df_id)
+        await self.dashboard_snapshot_crud.save_snapshot(df_id, counters)
+        return counters
+
+    async def get_consent_counters(self, df_id: str) -> Dict[str, Any]:
+        snapshot = await self.dashboard_snapshot_crud.get_snapshot(df_id)
+
+        if snapshot and snapshot.get("computed_at"):
+            computed_at = snapshot["computed_at"]
+            if computed_at.tzinfo is None:
+                computed_at = computed_at.replace(tzinfo=UTC)
+            age_seconds = (datetime.now(UTC) - computed_at).total_seconds()
+            if age_seconds < settings.DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS:
+                return snapshot["counters"]
+
+        return await self.refresh_snapshot(df_id)
@@ -27,10 +27,11 @@ class DataElementService:
         domain: Optional[str] = None,
         title: Optional[str] = None,
         id: Optional[str] = None,
+        after: Optional[str] = None,
     ) -> Dict[str, Any]:
         offset = (current_page - 1) * data_per_page
 
-        response = await self.crud.get_all_de_templates(domain=domain, title=title, id=id, offset=offset, limit=data_per_page)
+        response = await self.crud.get_all_de_templates(domain=domain, title=title, id=id, offset=offset, limit=data_per_page, after=after)
 
         total_items = response.get("total", 0)
         total_pages = (total_items + data_per_page - 1) // data_per_page
@@ -55,6 +56,7 @@ class DataElementService:
             "data_per_page": data_per_page,
             "total_items": total_items,
             "total_pages": total_pages,
+            "next_cursor": response.get("next_cursor"),
             "data": response.get("data", []),
         }
 
@@ -6,6 +6,7 @@ from app.schemas.data_fiduciary_schema import UpdateDataFiduciary
 from motor.motor_asyncio import AsyncIOMotorCollection
 from app.core.config import settings
 from app.utils.business_logger import log_business_event
+from app.utils.config_events import publish_config_change
 from typing import Dict, Any
 from app.utils.common import convert_objectid_to_str
 
@@ -107,6 +108,8 @@ class DataFiduciaryService:
             business_logs_collection=self.business_logs_collection,
         )
 
+        await publish_config_change("df", df_id)
+
         return {
             "msg": "Data fiduciary setup successfully",
             "df_id": df_id,
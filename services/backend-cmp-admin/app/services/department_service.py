@@ -150,15 +150,23 @@ class DepartmentService:
 
             department_df_id = department.get("df_id")
 
+            # One `$in` query covers users and admins; the emails are reused for duplicate messages.
+            try:
+                found_users = await self.user_crud.find_by_ids(
+                    list(dict.fromkeys([*update_data.department_users, *update_data.department_admins])),
+                    {"df_id": 1, "email": 1},
+                )
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"InvalidId: {str(e)}")
+            users_by_id = {user["_id"]: user for user in found_users}
+
             async def validate_users(user_ids: List[str]):
                 valid_users = set()
                 for uid in user_ids:
-                    try:
-                        user = await self.user_crud.get_user_by_id(uid)
-                    except Exception as e:
-                        raise HTTPException(status_code=500, detail=f"InvalidId: {str(e)}")
-
-                    if user and getattr(user, "df_id", None) == department_df_id:
+                    user = users_by_id.get(uid)
+                    if user and user.get("df_id") == department_df_id:
                         valid_users.add(uid)
                     else:
                         await log_business_event(
@@ -199,11 +207,7 @@ class DepartmentService:
             duplicate_users = set(new_users).intersection(existing_department_users)
 
             if duplicate_users:
-                user_names = []
-                for user_id in duplicate_users:
-                    user = await self.user_crud.get_user_by_id(user_id)
-                    if user:
-                        user_names.append(user.email or user_id)
+                user_names = [users_by_id[uid].get("email") or uid for uid in duplicate_users]
                 raise HTTPException(
                     status_code=400,
                     detail=f"The following users already exist in the department: {', '.join(user_names)}",
@@ -211,11 +215,7 @@ class DepartmentService:
 
             duplicate_admins = set(new_admins).intersection(existing_department_admins)
             if duplicate_admins:
-                admin_names = []
-                for admin_id in duplicate_admins:
-                    admin = await self.user_crud.get_user_by_id(admin_id)
-                    if admin:
-                        admin_names.append(admin.email or admin_id)
+                admin_names = [users_by_id[admin_id].get("email") or admin_id for admin_id in duplicate_admins]
                 raise HTTPException(
                     status_code=400,
                     detail=f"The following admins already exist in the department: {', '.join(admin_names)}",
@@ -250,11 +250,7 @@ class DepartmentService:
                 )
                 raise HTTPException(status_code=500, detail=f"Database update error: {str(e)}")
 
-            for user_id in new_users:
-                await self.user_crud.add_department_to_user(user_id, department_id)
-
-            for user_id in new_admins:
-                await self.user_crud.add_department_to_user(user_id, department_id)
+            await self.user_crud.bulk_update_memberships("user_departments", {uid: [department_id] for uid in new_users | new_admins})
 
             await log_business_event(
                 event_type="UPDATE_DEPT_USERS_SUCCESS",
@@ -1,13 +1,62 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime, timezone
 import aio_pika
+from motor.motor_asyncio import AsyncIOMotorCollection
 from app.services.webhooks_service import WebhooksService
 from app.core.logger import app_logger
 
 
 class EventClassificationService:
-    def __init__(self, webhooks_service: WebhooksService):
+    def __init__(self, webhooks_service: WebhooksService, consent_artifact_collection: Optional[AsyncIOMotorCollection] = None):
         self.webhooks_service = webhooks_service
+        self.consent_artifact_collection = consent_artifact_collection
+
+    async def _load_artifact_consents(self, agreement_id: Optional[str]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """(de_id, purpose_id) -> the artifact's data element fields merged with its consent entry."""
+        if self.consent_artifact_collection is None or not agreement_id:
+            return {}
+        artifact_doc = await self.consent_artifact_collection.find_one(
+            {"artifact.agreement_id": agreement_id}, {"artifact.consent_scope.data_elements": 1}
+        )
+        consents = {}
+        for element in ((artifact_doc or {}).get("artifact", {}).get("consent_scope") or {}).get("data_elements", []):
+            de_base = {
+                "de_id": element.get("de_id"),
+                "de_hash_id": element.get("de_hash_id"),
+                "title": element.get("title"),
+                "data_retention_period": element.get("data_retention_period"),
+            }
+            for consent in element.get("consents", []):
+                consents.setdefault((element.get("de_id"), consent.get("purpose_id")), {**de_base, **consent})
+        return consents
+
+    async def _expand_consent_changes(self, event_payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Converts a schema_version 2 consent event (compact change records) into the `purposes`
+        list of schema 1 events. Each change is re-hydrated from the agreement's latest artifact, so
+        subscribers keep receiving the full purpose entry (hash ids, processor details, mandatory
+        flags, ...) with the event's status. Changes the artifact no longer holds fall back to the
+        fields carried by the change record.
+        """
+        if "changes" not in event_payload:
+            return event_payload
+
+        expanded_payload = event_payload.copy()
+        artifact_consents = await self._load_artifact_consents(expanded_payload.get("agreement_id"))
+        purposes = []
+        for change in expanded_payload.pop("changes") or []:
+            purpose = artifact_consents.get((change.get("de_id"), change.get("purpose_id")))
+            if purpose is None:
+                purpose = {
+                    "de_id": change.get("de_id"),
+                    "title": change.get("de_title"),
+                    "purpose_id": change.get("purpose_id"),
+                    "purpose_title": change.get("purpose_title"),
+                    "data_processors": [{"data_processor_id": dpr_id} for dpr_id in change.get("data_processor_ids", [])],
+                }
+            purposes.append({**purpose, "consent_status": change.get("new_status"), "previous_consent_status": change.get("old_status")})
+        expanded_payload["purposes"] = purposes
+        return expanded_payload
 
     def _filter_payload(self, event_payload: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -52,6 +101,7 @@ class EventClassificationService:
         event_type_from_payload = event_payload.get("event_type", "UNKNOWN_EVENT").upper()
         app_logger.info(f"Processing event classification for event_type: {event_type_from_payload}")
 
+        event_payload = await self._expand_consent_changes(event_payload)
         filtered_event = self._filter_payload(event_payload)
 
         classified_event = self._perform_classification(filtered_event)
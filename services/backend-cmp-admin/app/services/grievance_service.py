@@ -1,11 +1,25 @@
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from fastapi import HTTPException
 from datetime import datetime, UTC
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorCollection
-from app.crud.grievance_crud import GrievanceCRUD
+from app.core.config import settings
+from app.crud.grievance_crud import GrievanceCRUD, decode_grievance_cursor
 from app.utils.business_logger import log_business_event
 
+# (df_id, query) -> (expires_at, count). Listing totals are allowed to lag by the TTL so a page load
+# during a grievance spike doesn't re-count the DF's whole backlog.
+_grievance_count_cache: Dict[Tuple[str, str], Tuple[float, int]] = {}
+
+
+def invalidate_grievance_counts(df_id: str = None):
+    if df_id is None:
+        _grievance_count_cache.clear()
+        return
+    for key in [key for key in _grievance_count_cache if key[0] == df_id]:
+        _grievance_count_cache.pop(key, None)
+
 
 class GrievanceService:
     def __init__(
@@ -18,16 +32,60 @@ class GrievanceService:
         self.business_logs_collection = business_logs_collection
         self.customer_notification_collection = customer_notification_collection
 
+    async def _approximate_count(self, cache_key: Tuple[str, str], query: Dict[str, Any]) -> int:
+        now = time.monotonic()
+        cached = _grievance_count_cache.get(cache_key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        count = await self.grievance_crud.count_grievances(query=query)
+        if len(_grievance_count_cache) >= 1024:
+            for key in [key for key, (expires_at, _) in _grievance_count_cache.items() if expires_at <= now]:
+                _grievance_count_cache.pop(key, None)
+        _grievance_count_cache[cache_key] = (now + settings.GRIEVANCE_COUNT_CACHE_TTL_SECONDS, count)
+        return count
+
+    async def _list_page(
+        self, query: Dict[str, Any], cache_key: Tuple[str, str], page: int, page_size: int, sort_order: str, after: Optional[str]
+    ):
+        if after:
+            try:
+                decode_grievance_cursor(after)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        total_count = await self._approximate_count(cache_key, query)
+        grievances, next_cursor = await self.grievance_crud.get_grievances(
+            query, page_size, sort_order=sort_order, after=after, skip=(page - 1) * page_size
+        )
+        pagination = {
+            "page": page,
+            "page_size": page_size,
+            "total": total_count,
+            "pages": (total_count + page_size - 1) // page_size,
+            "total_is_approximate": True,
+            "next_cursor": next_cursor,
+        }
+        return grievances, pagination
+
     async def get_all_grievances(
         self,
         current_user: dict,
         page: int = 1,
         page_size: int = 10,
+        status: Optional[List[str]] = None,
+        category: Optional[str] = None,
+        sub_category: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        sort_order: str = "desc",
+        after: Optional[str] = None,
     ) -> Dict[str, Any]:
-
-        skip = (page - 1) * page_size
-        total_count = await self.grievance_crud.count_grievances()
-        grievances = await self.grievance_crud.get_grievances(skip, page_size)
+        df_id = current_user.get("df_id")
+        query = GrievanceCRUD.build_query(
+            df_id, status=status, category=category, sub_category=sub_category, created_from=created_from, created_to=created_to
+        )
+        grievances, pagination = await self._list_page(query, (df_id, repr(sorted(query.items()))), page, page_size, sort_order, after)
 
         await log_business_event(
             event_type="GRIEVANCE_LIST_VIEWED",
@@ -35,22 +93,38 @@ class GrievanceService:
             context={
                 "page": page,
                 "page_size": page_size,
-                "total_items": total_count,
+                "total_items": pagination["total"],
             },
             message=f"User viewed grievance list (page={page}, size={page_size})",
             business_logs_collection=self.business_logs_collection,
         )
 
-        return {
-            "status": "success",
-            "data": grievances,
-            "pagination": {
-                "page": page,
-                "page_size": page_size,
-                "total": total_count,
-                "pages": (total_count + page_size - 1) // page_size,
-            },
-        }
+        return {"status": "success", "data": grievances, "pagination": pagination}
+
+    async def get_overdue_grievances(
+        self,
+        current_user: dict,
+        older_than_days: Optional[int] = None,
+        page: int = 1,
+        page_size: int = 10,
+        after: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Open grievances older than the SLA, oldest first."""
+        df_id = current_user.get("df_id")
+        older_than_days = older_than_days or settings.GRIEVANCE_SLA_DAYS
+        query = GrievanceCRUD.overdue_query(df_id, older_than_days)
+        # The query embeds "now", so the count is cached under the SLA window instead.
+        grievances, pagination = await self._list_page(query, (df_id, f"overdue:{older_than_days}"), page, page_size, "asc", after)
+
+        await log_business_event(
+            event_type="GRIEVANCE_SLA_BREACHES_VIEWED",
+            user_email=current_user.get("email"),
+            context={"older_than_days": older_than_days, "page": page, "page_size": page_size, "total_items": pagination["total"]},
+            message=f"User viewed grievances open longer than {older_than_days} days",
+            business_logs_collection=self.business_logs_collection,
+        )
+
+        return {"status": "success", "data": grievances, "pagination": pagination}
 
     async def view_grievance(self, current_user: dict, grievance_id: str) -> Dict[str, Any]:
 
@@ -102,6 +176,7 @@ class GrievanceService:
 
         grievance["request_status"] = "resolved"
         await self.grievance_crud.resolve_grievance(grievance_id)
+        invalidate_grievance_counts(grievance.get("df_id"))
 
         # Create notification for DP
         dp_id = grievance.get("dp_id")
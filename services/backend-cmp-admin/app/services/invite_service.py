@@ -1,5 +1,6 @@
 from fastapi import HTTPException
-from datetime import datetime, timedelta, UTC, timezone
+from datetime import datetime, timedelta, UTC
+from typing import Optional
 from bson import ObjectId
 
 from app.crud.data_fiduciary_crud import DataFiduciaryCRUD
@@ -333,54 +334,21 @@ class InviteService:
         current_user: dict,
         page: int = 1,
         page_size: int = 10,
+        pending_after: Optional[str] = None,
+        accepted_after: Optional[str] = None,
+        expired_after: Optional[str] = None,
     ):
         df_id = current_user["df_id"]
 
         user_email = current_user.get("email")
         user_id = str(current_user["_id"])
 
-        invites = await self.invite_crud.get_invites(df_id, page, page_size)
+        cursors = {"pending": pending_after, "accepted": accepted_after, "expired": expired_after}
+        for bucket, cursor in cursors.items():
+            if cursor and not ObjectId.is_valid(cursor):
+                raise HTTPException(status_code=400, detail=f"Invalid {bucket}_after cursor: {cursor}")
 
-        if not invites:
-            await log_business_event(
-                event_type="INVITE_LIST_SUCCESS",
-                user_email=user_email,
-                message="No invites found for the data fiduciary",
-                log_level="INFO",
-                context={"user_id": user_id, "df_id": df_id, "page": page, "page_size": page_size, "result_count": 0},
-                business_logs_collection=self.business_logs_collection,
-            )
-            return {"pending": [], "accepted": [], "expired": []}
-
-        pending = []
-        accepted = []
-        expired = []
-
-        current_time = datetime.now(UTC)
-
-        for invite in invites:
-            invite["_id"] = str(invite["_id"])
-
-            expiry_at = invite["expiry_at"]
-
-            if expiry_at.tzinfo is None:
-                expiry_at = expiry_at.replace(tzinfo=timezone.utc)
-
-            if invite["invite_status"] == "accepted":
-                accepted.append(invite)
-            elif expiry_at > current_time and invite["invite_status"] == "pending":
-                pending.append(invite)
-            elif expiry_at < current_time and invite["invite_status"] == "pending":
-                expired.append(invite)
-
-            def paginate(items: list) -> list:
-                start = (page - 1) * page_size
-                end = start + page_size
-                return items[start:end]
-
-            pending_paginated = paginate(pending)
-            accepted_paginated = paginate(accepted)
-            expired_paginated = paginate(expired)
+        result = await self.invite_crud.get_invites_by_status(df_id, page, page_size, cursors=cursors)
 
         await log_business_event(
             event_type="INVITE_LIST_SUCCESS",
@@ -392,19 +360,15 @@ class InviteService:
                 "df_id": df_id,
                 "page": page,
                 "page_size": page_size,
-                "total_invites": len(invites),
-                "pending_count": len(pending_paginated),
-                "accepted_count": len(accepted_paginated),
-                "expired_count": len(expired_paginated),
+                "total_invites": sum(result["counts"].values()),
+                "pending_count": result["counts"]["pending"],
+                "accepted_count": result["counts"]["accepted"],
+                "expired_count": result["counts"]["expired"],
             },
             business_logs_collection=self.business_logs_collection,
         )
 
-        return {
-            "pending": pending_paginated,
-            "accepted": accepted_paginated,
-            "expired": expired_paginated,
-        }
+        return result
 
     async def resend_invites(
         self,
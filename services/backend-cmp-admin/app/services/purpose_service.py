@@ -160,6 +160,7 @@ class PurposeService:
         industry: Optional[str] = None,
         sub_category: Optional[str] = None,
         title: Optional[str] = None,
+        after: Optional[str] = None,
     ):
         offset = (current_page - 1) * data_per_page
 
@@ -170,6 +171,7 @@ class PurposeService:
             industry=industry,
             sub_category=sub_category,
             title=title,
+            after=after,
         )
 
         total_items = response.get("total", 0)
@@ -198,6 +200,7 @@ class PurposeService:
             "data_per_page": data_per_page,
             "total_items": total_items,
             "total_pages": total_pages,
+            "next_cursor": response.get("next_cursor"),
             "data": response.get("data", []),
         }
 
@@ -1,11 +1,12 @@
+from collections import defaultdict
 from fastapi import HTTPException
 from datetime import datetime, UTC
-from app.core.rbac import reset_role_policies
+from app.core.rbac import reset_role_policies, reset_roles_policies
 from app.crud.user_crud import UserCRUD
-from app.schemas.role_schema import AddRole, UpdateRole, UpdateRolePermissions, UpdateRoleUser
+from app.schemas.role_schema import AddRole, BulkRoleMembershipUpdate, UpdateRole, UpdateRolePermissions, UpdateRoleUser
 from app.crud.role_crud import RoleCRUD
 from app.utils.business_logger import log_business_event
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List
 from bson import ObjectId
 
 
@@ -16,6 +17,35 @@ class RoleService:
         self.user_collection = user_collection
         self.business_logs_collection = business_logs_collection
 
+    async def _users_by_id(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Loads the df_id of every user in one `$in` query, keyed by user id."""
+        unique_ids = list(dict.fromkeys(user_ids))
+        if not unique_ids:
+            return {}
+        users = await self.user_crud.find_by_ids(unique_ids, {"df_id": 1, "email": 1})
+        return {user["_id"]: user for user in users}
+
+    async def _validate_users_in_df(self, user_ids: Iterable[str], df_id: str) -> Dict[str, Dict[str, Any]]:
+        users = await self._users_by_id(user_ids)
+        for user_id in dict.fromkeys(user_ids):
+            user = users.get(user_id)
+            if not user or user.get("df_id") != df_id:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"User {user_id} not found or does not belong to the same df_id",
+                )
+        return users
+
+    @staticmethod
+    def _sanitize_routes(routes_accessible) -> List[Dict[str, Any]]:
+        sanitized_routes = []
+        for r in routes_accessible:
+            if not getattr(r, "path", None):
+                continue
+            actions = list(dict.fromkeys(r.actions or []))
+            sanitized_routes.append({"path": r.path, "actions": actions})
+        return sanitized_routes
+
     async def add_role(self, role: AddRole, current_user: dict):
         try:
             user_id = str(current_user["_id"])
@@ -175,15 +205,8 @@ class RoleService:
 
         role_df_id = role.get("df_id")
 
-        valid_users = set()
-        for user_id in update_data.users_list:
-            user = await self.user_crud.get_user_by_id(user_id)
-            if not user or user.df_id != role_df_id:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"User {user_id} not found or does not belong to the same df_id",
-                )
-            valid_users.add(user_id)
+        await self._validate_users_in_df(update_data.users_list, role_df_id)
+        valid_users = set(update_data.users_list)
 
         existing_users = set(role.get("role_users", []))
         new_users = valid_users - existing_users
@@ -212,14 +235,10 @@ class RoleService:
         except HTTPException as e:
             raise HTTPException(status_code=500, detail=f"Database update error: {str(e)}")
 
-        for user_id in new_users:
-            try:
-                await self.user_crud.add_role_to_user(user_id, role_id)
-            except HTTPException as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Error updating user {user_id} roles: {str(e)}",
-                )
+        try:
+            await self.user_crud.bulk_update_memberships("user_roles", {user_id: [role_id] for user_id in new_users})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error updating user roles: {str(e)}")
         await log_business_event(
             event_type="ROLE_USERS_UPDATED",
             user_email=current_user.get("email"),
@@ -279,19 +298,14 @@ class RoleService:
                 detail="Unauthorized: Only role creators or system admins can modify role permissions",
             )
 
-        sanitized_routes = []
-        for r in update_data.routes_accessible:
-            if not getattr(r, "path", None):
-                continue
-            actions = list(dict.fromkeys(r.actions or []))
-            sanitized_routes.append({"path": r.path, "actions": actions})
+        sanitized_routes = self._sanitize_routes(update_data.routes_accessible)
 
         try:
             await self.role_crud.update_role_permissions(role_id, sanitized_routes)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Database update error: {str(e)}")
 
-        reset_role_policies(role_id, sanitized_routes)
+        await reset_role_policies(role_id, sanitized_routes)
         await log_business_event(
             event_type="ROLE_PERMISSIONS_UPDATED",
             user_email=current_user.get("email"),
@@ -495,24 +509,26 @@ class RoleService:
             raise HTTPException(status_code=403, detail="Unauthorized action")
 
         existing_roles = set(user.user_roles)
-        newly_added_roles = []
+        roles = list(dict.fromkeys(roles))
 
         for role_id in roles:
             if not ObjectId.is_valid(role_id):
                 raise HTTPException(status_code=400, detail=f"Invalid role ID: {role_id}")
 
-            role = await self.role_crud.find_by_id(role_id)
+        found_roles = {str(role["_id"]): role for role in await self.role_crud.find_by_ids(roles)}
+        for role_id in roles:
+            role = found_roles.get(role_id)
             if not role:
                 raise HTTPException(status_code=404, detail=f"Role not found: {role_id}")
 
             if role.get("df_id") != user.df_id:
                 raise HTTPException(status_code=400, detail=f"Role {role_id} belongs to a different df_id")
 
-            if role_id not in existing_roles:
-                await self.user_crud.add_role_to_user(user_id, role_id)
-                newly_added_roles.append(role_id)
-
-            await self.role_crud.add_user_to_role(role_id, user_id)
+        newly_added_roles = [role_id for role_id in roles if role_id not in existing_roles]
+        if newly_added_roles:
+            await self.user_crud.bulk_update_memberships("user_roles", {user_id: newly_added_roles})
+        if roles:
+            await self.role_crud.add_user_to_roles(roles, user_id)
 
         await log_business_event(
             event_type="ROLES_ASSIGNED",
@@ -535,6 +551,114 @@ class RoleService:
             "roles_assigned": newly_added_roles,
         }
 
+    async def bulk_update_role_memberships(self, update_data: BulkRoleMembershipUpdate, current_user: dict, system_admin_role_id: str):
+        """
+        Adds and removes users on many roles, and optionally resets their routes, in one pass: roles and users are
+        validated with one `$in` query each, memberships are written with one bulk_write per collection, and all
+        route changes become a single casbin policy diff followed by one reload broadcast.
+        """
+        genie_user_id = str(current_user["_id"])
+        df_id = current_user.get("df_id")
+        is_system_admin = system_admin_role_id in current_user.get("user_roles", [])
+
+        role_ids = [change.role_id for change in update_data.roles]
+        if not role_ids:
+            raise HTTPException(status_code=400, detail="No roles to update")
+        if len(set(role_ids)) != len(role_ids):
+            raise HTTPException(status_code=400, detail="Each role can appear only once per request")
+        for role_id in role_ids:
+            if not ObjectId.is_valid(role_id):
+                raise HTTPException(status_code=400, detail=f"Invalid role ID: {role_id}")
+
+        roles = {str(role["_id"]): role for role in await self.role_crud.find_by_ids(role_ids)}
+        missing_roles = [role_id for role_id in role_ids if role_id not in roles]
+        if missing_roles:
+            raise HTTPException(status_code=404, detail=f"Role not found: {', '.join(missing_roles)}")
+
+        unauthorized_roles = [role_id for role_id in role_ids if not (is_system_admin or genie_user_id == roles[role_id]["created_by"])]
+        if unauthorized_roles:
+            await log_business_event(
+                event_type="ROLE_USERS_UPDATE_FAILED",
+                user_email=current_user.get("email"),
+                message="Unauthorized to modify role users",
+                log_level="WARNING",
+                context={
+                    "user_id": genie_user_id,
+                    "df_id": df_id,
+                    "role_ids": unauthorized_roles,
+                    "reason": "Only role creators or system admins can modify role users",
+                },
+                business_logs_collection=self.business_logs_collection,
+            )
+            raise HTTPException(
+                status_code=403,
+                detail="Unauthorized: Only role creators or system admins can modify role users",
+            )
+
+        users = await self._users_by_id(user_id for change in update_data.roles for user_id in [*change.add_users, *change.remove_users])
+
+        role_updates: Dict[str, Dict[str, Any]] = {}
+        routes_by_role: Dict[str, List[Dict[str, Any]]] = {}
+        user_additions = defaultdict(list)
+        user_removals = defaultdict(list)
+        for change in update_data.roles:
+            role = roles[change.role_id]
+            conflicting = set(change.add_users) & set(change.remove_users)
+            if conflicting:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"User(s) {', '.join(sorted(conflicting))} cannot be both added to and removed from role {change.role_id}",
+                )
+            for user_id in [*change.add_users, *change.remove_users]:
+                user = users.get(user_id)
+                if not user or user.get("df_id") != role.get("df_id"):
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"User {user_id} not found or does not belong to the same df_id as role {change.role_id}",
+                    )
+
+            existing_users = list(role.get("role_users", []))
+            added = [user_id for user_id in dict.fromkeys(change.add_users) if user_id not in existing_users]
+            removed = {user_id for user_id in change.remove_users if user_id in existing_users}
+
+            fields = {}
+            if added or removed:
+                fields["role_users"] = [user_id for user_id in existing_users if user_id not in removed] + added
+                for user_id in added:
+                    user_additions[user_id].append(change.role_id)
+                for user_id in removed:
+                    user_removals[user_id].append(change.role_id)
+            if change.routes_accessible is not None:
+                fields["routes_accessible"] = routes_by_role[change.role_id] = self._sanitize_routes(change.routes_accessible)
+            if fields:
+                role_updates[change.role_id] = fields
+
+        try:
+            await self.role_crud.bulk_update_roles(role_updates)
+            await self.user_crud.bulk_update_memberships("user_roles", user_additions, user_removals)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database update error: {str(e)}")
+
+        policies_added, policies_removed = await reset_roles_policies(routes_by_role) if routes_by_role else (0, 0)
+
+        summary = {
+            "roles_updated": list(role_updates),
+            "users_added": sum(len(role_ids) for role_ids in user_additions.values()),
+            "users_removed": sum(len(role_ids) for role_ids in user_removals.values()),
+            "policies_added": policies_added,
+            "policies_removed": policies_removed,
+        }
+        await log_business_event(
+            event_type="ROLE_MEMBERSHIPS_BULK_UPDATED",
+            user_email=current_user.get("email"),
+            message="Role memberships updated successfully",
+            log_level="INFO",
+            context={"user_id": genie_user_id, "df_id": df_id, **summary},
+            business_logs_collection=self.business_logs_collection,
+        )
+
+        return {"message": "Role memberships updated successfully", **summary}
+
     async def get_all_frontend_routes(self, current_user: dict):
         from app.constants.frontend_routes import frontend_routes
 
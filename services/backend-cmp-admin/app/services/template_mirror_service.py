@@ -0,0 +1,114 @@
+from datetime import datetime, UTC
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logger import app_logger
+from app.crud.template_mirror_crud import TemplateMirrorCRUD
+
+
+CATALOGUE_PATHS = {
+    "purposes": "/purposes",
+    "data_elements": "/data-elements",
+}
+
+
+class TemplateMirrorService:
+    """Keeps the local template mirrors in step with the upstream catalogue service."""
+
+    def __init__(
+        self,
+        mirrors: Dict[str, TemplateMirrorCRUD],
+        http_client: Optional[httpx.AsyncClient] = None,
+        page_size: int = settings.TEMPLATE_MIRROR_PAGE_SIZE,
+    ):
+        self.mirrors = mirrors
+        self.http_client = http_client
+        self.page_size = page_size
+
+    async def sync_catalogue(self, kind: str, full: bool = False) -> Dict[str, Any]:
+        """Pull one catalogue into its mirror.
+
+        Incremental runs send the stored ETag and `updated_since` cursor; a full run
+        (or the first run) re-reads everything and drops templates no longer upstream.
+        """
+        mirror = self.mirrors[kind]
+        state = await mirror.get_state()
+        full = full or not state.get("full_sync_completed_at")
+        started_at = datetime.now(UTC)
+
+        params: Dict[str, Any] = {"limit": self.page_size}
+        headers: Dict[str, str] = {}
+        if not full:
+            if state.get("updated_since"):
+                params["updated_since"] = state["updated_since"]
+            if state.get("etag"):
+                headers["If-None-Match"] = state["etag"]
+
+        url = f"{settings.DATA_VEDA_URL}{CATALOGUE_PATHS[kind]}"
+        offset = 0
+        upserted = 0
+        etag = None
+        while True:
+            response = await self.http_client.get(url, params={**params, "offset": offset}, headers=headers if offset == 0 else {})
+            if offset == 0 and response.status_code == 304:
+                await mirror.save_state(last_checked_at=started_at)
+                return {"kind": kind, "full": full, "upserted": 0, "removed": 0, "not_modified": True}
+            response.raise_for_status()
+            if offset == 0:
+                etag = response.headers.get("ETag")
+
+            body = response.json()
+            templates = body.get("data", [])
+            upserted += await mirror.upsert_templates(templates, started_at)
+            offset += len(templates)
+            if not templates or offset >= body.get("total", 0):
+                break
+
+        removed = 0
+        state_update: Dict[str, Any] = {
+            "etag": etag,
+            "updated_since": started_at.isoformat(),
+            "last_checked_at": started_at,
+            "last_synced_at": started_at,
+            "source": "upstream",
+        }
+        if full:
+            removed = await mirror.remove_stale(started_at)
+            state_update["full_sync_completed_at"] = started_at
+        await mirror.save_state(**state_update)
+        return {"kind": kind, "full": full, "upserted": upserted, "removed": removed, "not_modified": False}
+
+    async def sync_all(self, full: bool = False) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        for kind in self.mirrors:
+            try:
+                results[kind] = await self.sync_catalogue(kind, full=full)
+            except Exception as e:
+                app_logger.error(f"Template mirror sync failed for {kind}: {e}", exc_info=True)
+        return results
+
+    async def import_snapshot(self, snapshot: Dict[str, Any]) -> Dict[str, int]:
+        """Load an exported snapshot; each catalogue present replaces the mirror contents."""
+        imported_at = datetime.now(UTC)
+        counts = {}
+        for kind, mirror in self.mirrors.items():
+            if kind not in snapshot:
+                continue
+            counts[kind] = await mirror.upsert_templates(snapshot[kind], imported_at)
+            await mirror.remove_stale(imported_at)
+            await mirror.save_state(
+                etag=None,
+                updated_since=snapshot.get("exported_at"),
+                last_synced_at=imported_at,
+                full_sync_completed_at=imported_at,
+                source="snapshot",
+            )
+        return counts
+
+    async def export_snapshot(self) -> Dict[str, Any]:
+        snapshot: Dict[str, Any] = {"exported_at": datetime.now(UTC).isoformat()}
+        for kind, mirror in self.mirrors.items():
+            snapshot[kind] = await mirror.export_templates()
+        return snapshot
@@ -1,15 +1,79 @@
+import asyncio
+import json
+import aio_pika
 from bson import ObjectId
+from app.core.config import settings
+from app.core.logger import app_logger
 from app.crud.vendor_crud import VendorCRUD
+from app.db.rabbitmq import publish_message, rabbitmq_pool
 from app.utils.business_logger import log_business_event
 from fastapi import HTTPException
 from datetime import datetime, UTC
-import re
+from typing import Any, Dict, Tuple
+import copy
 import string
 import random
+import time
 
 VALID_VENDOR_SORT_FIELDS = {"dpr_name", "industry", "dpr_country", "created_at"}
 VALID_VENDOR_SORT_ORDERS = {"asc", "desc"}
 
+VENDOR_CACHE_EVENTS_EXCHANGE = "vendor_cache_events_exchange"
+
+# df_id -> (expires_at monotonic timestamp, filter facet values)
+_vendor_facet_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def invalidate_vendor_facets(df_id: str = None):
+    if df_id is None:
+        _vendor_facet_cache.clear()
+    else:
+        _vendor_facet_cache.pop(df_id, None)
+
+
+async def broadcast_vendor_facets_invalidation(df_id: str):
+    """
+    Drops the DF's cached facets here and on every other instance through the vendor cache fanout exchange.
+    Publish failures are logged and swallowed: other instances converge within VENDOR_FACET_CACHE_TTL_SECONDS.
+    """
+    invalidate_vendor_facets(df_id)
+    try:
+        await publish_message(VENDOR_CACHE_EVENTS_EXCHANGE, json.dumps({"df_id": df_id}))
+    except Exception as e:
+        app_logger.warning(f"Failed to broadcast vendor facet invalidation for df_id={df_id}: {e}")
+
+
+async def run_vendor_facet_invalidation_listener():
+    """Drops cached vendor facets whenever any instance broadcasts a vendor change."""
+    while True:
+        connection, channel = None, None
+        try:
+            connection, channel = await rabbitmq_pool.get_connection()
+            exchange = await channel.declare_exchange(VENDOR_CACHE_EVENTS_EXCHANGE, aio_pika.ExchangeType.FANOUT, durable=True)
+            queue = await channel.declare_queue("", exclusive=True, auto_delete=True)
+            await queue.bind(exchange)
+            app_logger.info("Listening for vendor facet invalidation events...")
+
+            async with queue.iterator() as queue_iter:
+                async for message in queue_iter:
+                    async with message.process():
+                        try:
+                            invalidate_vendor_facets(json.loads(message.body.decode()).get("df_id"))
+                        except Exception as e:
+                            app_logger.error(f"Failed to apply vendor facet invalidation: {e}", exc_info=True)
+
+        except asyncio.CancelledError:
+            app_logger.info("Vendor facet invalidation listener cancelled.")
+            raise
+        except Exception as e:
+            app_logger.error(f"Vendor facet invalidation listener failed (restarting): {e}", exc_info=True)
+            # Events may have been missed while disconnected.
+            invalidate_vendor_facets()
+            await asyncio.sleep(5)
+        finally:
+            if connection and channel:
+                await rabbitmq_pool.release_connection(connection, channel)
+
 
 def generate_keys_and_secret(key_size=16, secret_size=64) -> tuple[str, str]:
     key_chars = string.ascii_letters + string.digits
@@ -49,6 +113,7 @@ class VendorService:
 
                 if existing_vendor:
                     await self.crud.update_vendor(existing_vendor["_id"], new_data)
+                    await broadcast_vendor_facets_invalidation(df_id)
                     await log_business_event(
                         event_type="VENDOR_UPDATE",
                         user_email=current_user.get("email"),
@@ -76,6 +141,7 @@ class VendorService:
             new_data["updated_at"] = datetime.now(UTC)
 
             result = await self.crud.create_vendor(new_data)
+            await broadcast_vendor_facets_invalidation(df_id)
             await log_business_event(
                 event_type="VENDOR_CREATE",
                 user_email=current_user.get("email"),
@@ -218,30 +284,25 @@ class VendorService:
         query = {"df_id": df_id, "status": {"$ne": "archived"}}
 
         if dpr_country:
-            query["dpr_country"] = {"$regex": dpr_country, "$options": "i"}
+            query["search_keys.dpr_country"] = dpr_country.lower()
         if dpr_country_risk:
-            query["dpr_country_risk"] = {"$regex": dpr_country_risk, "$options": "i"}
+            query["search_keys.dpr_country_risk"] = dpr_country_risk.lower()
         if industry:
-            query["industry"] = {"$regex": industry, "$options": "i"}
+            query["search_keys.industry"] = industry.lower()
         if processing_category:
-            query["processing_category"] = {"$in": [re.compile(val, re.IGNORECASE) for val in processing_category]}
+            query["search_keys.processing_category"] = {"$in": [val.lower() for val in processing_category]}
         if cross_border is not None:
             query["cross_border"] = cross_border
         if sub_processor is not None:
             query["sub_processor"] = sub_processor
         if audit_result:
-            query["audit_status.audit_result"] = {"$regex": audit_result, "$options": "i"}
+            query["search_keys.audit_result"] = audit_result.lower()
 
         if search:
-            query["$or"] = [
-                {"dpr_country": {"$regex": search, "$options": "i"}},
-                {"industry": {"$regex": search, "$options": "i"}},
-                {"dpr_name": {"$regex": search, "$options": "i"}},
-            ]
-
-        total_vendors = await self.crud.count_vendors(query)
-        vendors = await self.crud.get_vendors(query, sort_order, page, page_size)
-        filter_fields = await self.crud.get_filter_fields(df_id)
+            query["$text"] = {"$search": search}
+
+        vendors, total_vendors = await self.crud.search_vendors(query, sort_order, page, page_size)
+        filter_fields = await self.get_filter_fields(df_id)
 
         await log_business_event(
             event_type="GET_ALL_VENDORS_SUCCESS",
@@ -270,6 +331,15 @@ class VendorService:
             "vendors": vendors,
         }
 
+    async def get_filter_fields(self, df_id: str) -> Dict[str, Any]:
+        cached = _vendor_facet_cache.get(df_id)
+        if cached and cached[0] > time.monotonic():
+            return copy.deepcopy(cached[1])
+
+        filter_fields = await self.crud.get_filter_fields(df_id)
+        _vendor_facet_cache[df_id] = (time.monotonic() + settings.VENDOR_FACET_CACHE_TTL_SECONDS, copy.deepcopy(filter_fields))
+        return filter_fields
+
     async def get_one_vendor(self, vendor_id: str, current_user: dict):
 
         genie_user = current_user.get("_id")
@@ -379,6 +449,7 @@ class VendorService:
 
         try:
             result = await self.crud.archive_vendor(dpr_id)
+            await broadcast_vendor_facets_invalidation(df_id)
             if result.modified_count == 1:
                 await log_business_event(
                     event_type="DELETE_VENDOR_SUCCESS",
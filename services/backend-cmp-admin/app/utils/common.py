@@ -167,3 +167,30 @@ def ensure_utc(dt: Optional[datetime]) -> Optional[datetime]:
     if dt.tzinfo is None:
         return dt.replace(tzinfo=UTC)
     return dt
+
+
+def build_consent_grants(data_elements: list) -> list:
+    """
+    Flatten artifact consents into one entry per (de_id, purpose_id) with a datetime expiry.
+    Mirrors the `consent_grants` projection written by the backend-notice consent worker.
+    """
+    grants = []
+    for element in data_elements:
+        for consent in element.get("consents", []):
+            expiry = consent.get("consent_expiry_period")
+            expires_at = None
+            if isinstance(expiry, str) and expiry:
+                try:
+                    expires_at = ensure_utc(datetime.fromisoformat(expiry.replace("Z", "+00:00")))
+                except ValueError:
+                    expires_at = None
+            grants.append(
+                {
+                    "de_id": element.get("de_id"),
+                    "purpose_id": consent.get("purpose_id"),
+                    "purpose_title": consent.get("purpose_title"),
+                    "consent_status": consent.get("consent_status"),
+                    "expires_at": expires_at,
+                }
+            )
+    return grants
@@ -0,0 +1,21 @@
+import json
+from typing import Optional
+
+from app.db.rabbitmq import publish_message
+from app.core.logger import app_logger
+
+
+CONFIG_EVENTS_EXCHANGE = "config_events_exchange"
+
+
+async def publish_config_change(entity: str, df_id: str, cp_id: Optional[str] = None):
+    """
+    Broadcasts a collection point / data fiduciary change so that every notice
+    instance refreshes its cached configuration. Failures are logged and swallowed:
+    notice caches are TTL bound and converge without the event.
+    """
+    message = {"entity": entity, "df_id": df_id, "cp_id": cp_id}
+    try:
+        await publish_message(CONFIG_EVENTS_EXCHANGE, json.dumps(message))
+    except Exception as e:
+        app_logger.warning(f"Failed to publish config change for {entity} df_id={df_id} cp_id={cp_id}: {e}")
@@ -7,6 +7,7 @@ from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncI
 
 from app.core.config import settings
 from app.db.rabbitmq import publish_message, rabbitmq_pool, declare_queues
+from app.crud.consent_event_receipt_crud import ConsentEventReceiptCRUD
 from app.crud.webhook_events_crud import WebhookEventCRUD
 from app.crud.webhooks_crud import WebhooksCrud
 from app.services.event_classification_service import EventClassificationService
@@ -21,33 +22,51 @@ concur_master_db: AsyncIOMotorDatabase = db_client[settings.DB_NAME_CONCUR_MASTE
 
 webhook_events_collection: AsyncIOMotorCollection = concur_master_db["webhook_events"]
 webhooks_collection: AsyncIOMotorCollection = concur_master_db["webhooks"]
+consent_artifact_collection: AsyncIOMotorCollection = concur_master_db["consent_latest_artifacts"]
+consent_event_receipts_collection: AsyncIOMotorCollection = concur_master_db["consent_event_receipts"]
 business_logs_collection: str = "app-logs-business"
 
 webhook_event_crud = WebhookEventCRUD(collection=webhook_events_collection)
+consent_event_receipt_crud = ConsentEventReceiptCRUD(consent_event_receipts_collection)
 webhooks_crud = WebhooksCrud(webhooks_collection=webhooks_collection)
 webhooks_service = WebhooksService(
     webhook_crud=webhooks_crud, business_logs_collection=business_logs_collection, webhook_event_crud=webhook_event_crud
 )
 
-consent_classification_service = EventClassificationService(webhooks_service=webhooks_service)
+consent_classification_service = EventClassificationService(
+    webhooks_service=webhooks_service, consent_artifact_collection=consent_artifact_collection
+)
 
 
 async def process_consent_event(message: aio_pika.IncomingMessage, channel: aio_pika.Channel):
     event_id = None
+    # Events from the notice outbox carry a stable event_id; older producers' events are processed without de-duplication.
+    receipt_id = None
     try:
         event_payload = json.loads(message.body.decode())
-        event_id = event_payload.get("dp_id", "unknown") + "_" + event_payload.get("event_type", "unknown")
+        receipt_id = event_payload.get("event_id")
+        event_id = receipt_id or event_payload.get("dp_id", "unknown") + "_" + event_payload.get("event_type", "unknown")
+
+        if receipt_id and not await consent_event_receipt_crud.claim(receipt_id, settings.CONSENT_EVENT_CLAIM_LEASE_SECONDS):
+            logger.info(f"Consent event {event_id} was already processed. ACKING duplicate.")
+            receipt_id = None
+            await message.ack()
+            return
 
         logger.info(f"Processing consent event {event_id}...")
 
         await consent_classification_service.classify_and_publish_event(event_payload, channel)
 
+        if receipt_id:
+            await consent_event_receipt_crud.complete(receipt_id)
         logger.info(f"Consent event {event_id} processed successfully. ACKING.")
         await message.ack()
 
     except Exception as e:
         error_message = str(e)
         logger.exception(f"Error processing consent event {event_id}: {error_message}")
+        if receipt_id:
+            await consent_event_receipt_crud.release(receipt_id)
         await handle_failure(message, event_id, error_message, channel)
     finally:
         logger.info(f"Finished processing event {event_id}.")
@@ -75,6 +94,7 @@ async def main():
     logger.info("Consent event worker starting...")
     await rabbitmq_pool.init_pool()
     await declare_queues()
+    await consent_event_receipt_crud.ensure_indexes(settings.CONSENT_EVENT_RECEIPT_RETENTION_DAYS)
 
     while True:
         try:
@@ -7,7 +7,8 @@ import motor.motor_asyncio
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
 
 from app.core.config import settings
-from app.db.rabbitmq import declare_queues, rabbitmq_pool, publish_message
+from app.crud.consent_artifact_crud import ConsentArtifactCRUD
+from app.db.rabbitmq import declare_queues, rabbitmq_pool, publish_consent_processing
 from app.core.logger import setup_logging, get_logger
 from bson import ObjectId
 
@@ -15,6 +16,7 @@ from bson import ObjectId
 db_client: AsyncIOMotorClient = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI)
 concur_master_db: AsyncIOMotorDatabase = db_client[settings.DB_NAME_CONCUR_MASTER]
 consent_artifacts_collection: AsyncIOMotorCollection = concur_master_db["consent_latest_artifacts"]
+consent_artifact_crud = ConsentArtifactCRUD(consent_artifacts_collection)
 
 
 async def process_consent_expiry_event(message: aio_pika.IncomingMessage, channel: aio_pika.Channel):
@@ -29,8 +31,12 @@ async def process_consent_expiry_event(message: aio_pika.IncomingMessage, channe
         logger.info(f"Starting to process consent expiry for artifact {artifact_id}, purpose {purpose_id}...")
 
         message_payload = payload
+        # Keyed by agreement so the expiry lands on the same shard as the agreement's submissions.
+        agreement_id = await consent_artifact_crud.get_agreement_id(artifact_id)
+        if agreement_id:
+            message_payload["agreement_id"] = agreement_id
 
-        await publish_message("consent_processing_q", json.dumps(message_payload), channel=channel)
+        await publish_consent_processing(message_payload, channel=channel)
 
         logger.info(f"Consent expiry for artifact {artifact_id}, purpose {purpose_id} processed and sent to consent_processing_q. ACKING.")
         await message.ack()
@@ -81,6 +81,7 @@ async def run_expiry_scheduler(interval_seconds=180, window_days=31):
                                 message = {
                                     "event_type": "consent_expiry",
                                     "consent_artifact_id": artifact_id,
+                                    "df_id": consent_artifact_doc.get("df_id"),
                                     "data_element_id": data_element.get("de_id"),
                                     "purpose_id": consent.get("purpose_id"),
                                     "expiry_at": consent_expiry_period_str,
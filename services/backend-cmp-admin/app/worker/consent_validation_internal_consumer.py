@@ -1,4 +1,3 @@
-import asyncio
 import csv
 from datetime import UTC, datetime, timezone
 import hashlib
@@ -12,11 +11,15 @@ from fastapi import HTTPException
 
 from app.schemas.consent_validation_schema import VerificationRequest
 from app.core.config import settings
-from app.db.rabbitmq import rabbitmq_pool, declare_queues
 from minio import Minio
 from motor.motor_asyncio import AsyncIOMotorClient
 import aio_pika
 from app.core.logger import setup_logging, get_logger
+from app.worker.runtime import QueueConsumer, run_blocking, run_consumers, run_cpu_bound
+
+QUEUE_NAME = "consent_bulk_verification"
+
+logger = get_logger("worker.consent_validation_internal_consumer")
 
 MONGO_URL = settings.MONGO_URI
 DB_NAME = settings.DB_NAME_CONCUR_MASTER
@@ -35,6 +38,11 @@ consent_validation_files_collection = db["consent_validation_files"]
 customer_notifications_collection = db["customer_notifications"]
 
 
+def read_verification_rows(contents: bytes) -> list[dict]:
+    """Decodes and parses a verification CSV; runs in the worker process pool."""
+    return list(csv.DictReader(io.StringIO(contents.decode("utf-8-sig"))))
+
+
 def hash_shake256(value: str) -> str:
     if value:
         return hashlib.shake_256(value.encode()).hexdigest(length=32)
@@ -187,7 +195,7 @@ async def process_file(contents, filename, df_id, genie_user_id):
     )
 
     try:
-        text = contents.decode("utf-8-sig")
+        rows = await run_cpu_bound(read_verification_rows, contents)
     except UnicodeDecodeError:
         error_message = "Unable to decode file as UTF-8."
         await consent_validation_files_collection.find_one_and_update(
@@ -203,11 +211,10 @@ async def process_file(contents, filename, df_id, genie_user_id):
         logger.error(f"Error for {filename}: {error_message}")
         return
 
-    csv_reader = csv.DictReader(io.StringIO(text))
     results = []
     row_number = 0
 
-    for row in csv_reader:
+    for row in rows:
         row_number += 1
 
         dp_id = (row.get("dp_id") or "").strip() or None
@@ -329,7 +336,8 @@ async def handle_message(message: aio_pika.IncomingMessage):
                 return
 
             local_temp_path = os.path.join("/data/uploads/", filename)
-            s3_client.fget_object(
+            await run_blocking(
+                s3_client.fget_object,
                 settings.UNPROCESSED_VERIFICATION_FILES_BUCKET,
                 filename,
                 local_temp_path,
@@ -357,29 +365,10 @@ async def handle_message(message: aio_pika.IncomingMessage):
             raise
 
 
-async def main() -> None:
-
-    await rabbitmq_pool.init_pool()
-    await declare_queues()
-
-    connection, channel = await rabbitmq_pool.get_connection()
-    try:
-        await channel.set_qos(prefetch_count=10)
-        QUEUE_NAME = "consent_bulk_verification"
-
-        queue = await channel.declare_queue(QUEUE_NAME, durable=True)
-        logger.info(f"Waiting for messages on '{QUEUE_NAME}'...")
-
-        await queue.consume(handle_message)
-
-        await asyncio.Future()
-    finally:
-
-        await rabbitmq_pool.release_connection(connection, channel)
+CONSUMER = QueueConsumer(queue_name=QUEUE_NAME, handler=handle_message)
 
 
 if __name__ == "__main__":
     setup_logging()
-    logger = get_logger("worker.consent_validation_internal_consumer")
     logger.info("Consent validation internal consumer starting up.")
-    asyncio.run(main())
+    run_consumers([CONSUMER])
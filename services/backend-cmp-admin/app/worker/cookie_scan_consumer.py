@@ -1,5 +1,4 @@
 import json
-import asyncio
 import aio_pika
 import motor.motor_asyncio
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
@@ -10,8 +9,12 @@ from app.services.assets_service import AssetService
 from app.services.cookie_scan_service import CookieScanService
 from app.crud.cookie_crud import CookieCrud
 from app.crud.assets_crud import AssetCrud
-from app.db.rabbitmq import rabbitmq_pool, declare_queues
 from app.core.logger import setup_logging, get_logger
+from app.worker.runtime import QueueConsumer, run_consumers
+
+QUEUE_NAME = "cookie_scan_queue"
+
+logger = get_logger("worker.cookie_scan_consumer")
 
 db_client: AsyncIOMotorClient = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI)
 
@@ -65,29 +68,10 @@ async def process_message(message: aio_pika.IncomingMessage):
             logger.error(f"Error processing message for asset {asset_id}: {e}")
 
 
-async def main() -> None:
-
-    await rabbitmq_pool.init_pool()
-    await declare_queues()
-
-    connection, channel = await rabbitmq_pool.get_connection()
-    try:
-        await channel.set_qos(prefetch_count=10)
-        QUEUE_NAME = "cookie_scan_queue"
-
-        queue = await channel.declare_queue(QUEUE_NAME, durable=True)
-        logger.info(f"Waiting for messages on '{QUEUE_NAME}'...")
-
-        await queue.consume(process_message)
-
-        await asyncio.Future()
-    finally:
-
-        await rabbitmq_pool.release_connection(connection, channel)
+CONSUMER = QueueConsumer(queue_name=QUEUE_NAME, handler=process_message)
 
 
 if __name__ == "__main__":
     setup_logging()
-    logger = get_logger("worker.cookie_scan_consumer")
     logger.info("Cookie scan consumer starting up.")
-    asyncio.run(main())
+    run_consumers([CONSUMER])
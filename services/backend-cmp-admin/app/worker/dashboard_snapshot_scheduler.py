@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime, UTC
+import motor.motor_asyncio
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
+from app.core.config import settings
+from app.core.logger import setup_logging, get_logger
+from app.crud.consent_artifact_crud import ConsentArtifactCRUD
+from app.crud.dashboard_snapshot_crud import DashboardSnapshotCRUD
+from app.services.consent_artifact_service import ConsentArtifactService
+from app.services.dashboard_snapshot_service import DashboardSnapshotService
+from app.utils.common import build_consent_grants
+
+
+db_client: AsyncIOMotorClient = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI, tz_aware=True)
+concur_master_db: AsyncIOMotorDatabase = db_client[settings.DB_NAME_CONCUR_MASTER]
+
+consent_artifacts_collection: AsyncIOMotorCollection = concur_master_db["consent_latest_artifacts"]
+dashboard_snapshots_collection: AsyncIOMotorCollection = concur_master_db["dashboard_snapshots"]
+
+
+def format_utc_datetime(dt: datetime) -> str:
+    return dt.replace(tzinfo=None).isoformat(timespec="microseconds")
+
+
+async def backfill_consent_grants(consent_artifact_crud: ConsentArtifactCRUD, batch_size: int = 500):
+    """Populate `consent_grants` on artifacts written before the expiry projection existed."""
+    total = 0
+    while True:
+        docs = await consent_artifact_crud.get_artifacts_missing_consent_grants(batch_size).to_list(length=batch_size)
+        if not docs:
+            break
+        grants_by_id = {
+            doc["_id"]: build_consent_grants(doc.get("artifact", {}).get("consent_scope", {}).get("data_elements", [])) for doc in docs
+        }
+        await consent_artifact_crud.set_consent_grants(grants_by_id)
+        total += len(docs)
+    if total:
+        logger.info(f"Dashboard Snapshot Scheduler: Backfilled consent_grants on {total} consent artifacts.")
+
+
+async def run_dashboard_snapshot_scheduler(interval_seconds=settings.DASHBOARD_SNAPSHOT_INTERVAL_SECONDS):
+    logger.info(f"Dashboard Snapshot Scheduler started at {format_utc_datetime(datetime.now(UTC))}. Refreshing every {interval_seconds} seconds...")
+
+    consent_artifact_crud = ConsentArtifactCRUD(consent_artifacts_collection)
+    dashboard_snapshot_crud = DashboardSnapshotCRUD(dashboard_snapshots_collection)
+    snapshot_service = DashboardSnapshotService(
+        consent_artifact_crud,
+        ConsentArtifactService(consent_artifact_crud, "app-logs-business"),
+        dashboard_snapshot_crud,
+    )
+
+    await dashboard_snapshots_collection.create_index("df_id", unique=True)
+    await consent_artifact_crud.ensure_expiry_indexes()
+    await backfill_consent_grants(consent_artifact_crud)
+
+    try:
+        while True:
+            df_ids = set(await consent_artifacts_collection.distinct("df_id"))
+            df_ids.update(await dashboard_snapshot_crud.get_snapshot_df_ids())
+
+            for df_id in df_ids:
+                if not df_id:
+                    continue
+                try:
+                    counters = await snapshot_service.refresh_snapshot(df_id)
+                    logger.info(f"Dashboard Snapshot Scheduler: Refreshed snapshot for DF {df_id}: {counters}")
+                except Exception as e:
+                    logger.error(f"Dashboard Snapshot Scheduler: Failed to refresh snapshot for DF {df_id}: {e}", exc_info=True)
+
+            logger.info(f"Dashboard Snapshot Scheduler: Sleeping for {interval_seconds} seconds at {format_utc_datetime(datetime.now(UTC))}...")
+            await asyncio.sleep(interval_seconds)
+    except asyncio.CancelledError:
+        logger.info("Dashboard snapshot scheduler task cancelled gracefully.")
+    except Exception as e:
+        logger.critical(f"Dashboard Snapshot Scheduler: A critical error occurred in the main loop: {e}")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    logger = get_logger("worker.dashboard_snapshot_scheduler")
+    logger.info("Dashboard snapshot scheduler starting up.")
+    asyncio.run(run_dashboard_snapshot_scheduler())
@@ -1,9 +1,15 @@
 import asyncio
 import json
 import aio_pika
-from app.db.rabbitmq import publish_message, rabbitmq_pool, declare_queues
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.db.rabbitmq import publish_consent_processing, rabbitmq_pool, declare_queues
 from app.core.config import settings
 from app.core.logger import setup_logging, get_logger
+from app.crud.consent_artifact_crud import ConsentArtifactCRUD
+
+
+db_client = AsyncIOMotorClient(settings.MONGO_URI)
+consent_artifact_crud = ConsentArtifactCRUD(db_client[settings.DB_NAME_CONCUR_MASTER]["consent_latest_artifacts"])
 
 
 MAX_RETRIES = settings.DATA_RETENTION_MAX_RETRIES if hasattr(settings, "DATA_RETENTION_MAX_RETRIES") else 5
@@ -24,8 +30,12 @@ async def process_data_expiry_event(message: aio_pika.IncomingMessage, channel:
 
             logger.info(f"Starting to process data retention expiry event for artifact {consent_artifact_id}, data element {data_element_id}...")
             message_payload = payload
+            # Keyed by agreement so the expiry lands on the same shard as the agreement's submissions.
+            agreement_id = await consent_artifact_crud.get_agreement_id(consent_artifact_id)
+            if agreement_id:
+                message_payload["agreement_id"] = agreement_id
 
-            await publish_message("consent_processing_q", json.dumps(message_payload), channel=channel)
+            await publish_consent_processing(message_payload, channel=channel)
 
             logger.info(
                 f"Data retention expiry event for artifact {consent_artifact_id}, data element {data_element_id} processed successfully. ACKING."
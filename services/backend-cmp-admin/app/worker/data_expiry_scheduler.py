@@ -78,6 +78,7 @@ async def run_data_expiry_scheduler(interval_seconds=180, window_days=2):
                             message = {
                                 "event_type": "data_retention_expiry",
                                 "consent_artifact_id": artifact_id,
+                                "df_id": consent_artifact_doc.get("df_id"),
                                 "data_element_id": data_element.get("de_id"),
                                 "retention_expiry_at": data_retention_period_str,
                             }
@@ -7,7 +7,7 @@ from minio import Minio
 import hashlib
 from datetime import datetime, UTC
 from pydantic import BaseModel, computed_field, field_validator
-from typing import Optional, List
+from typing import Dict, List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
 import asyncpg
 import re
@@ -132,150 +132,139 @@ def validate_dp_data(dp: BulkDpApiModel) -> List[str]:
     return errors
 
 
-def collect_incoming_keys(dp_data_list: List[BulkDpApiModel]):
-    ids = {dp.dp_system_id for dp in dp_data_list}
-    emails = {e for dp in dp_data_list for e in (dp.dp_email or [])}
-    mobiles = {str(m) for dp in dp_data_list for m in (dp.dp_mobile or [])}
-    return ids, emails, mobiles
-
-
-async def fetch_existing_rows(ids, emails, mobiles):
-    pool = await init_postgres_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT dp_system_id, dp_email, dp_mobile
-            FROM dpd
-            WHERE dp_system_id = ANY($1)
-               OR dp_email && $2
-               OR dp_mobile && $3
-            """,
-            list(ids),
-            list(emails),
-            list(mobiles),
-        )
-        return rows
-
-
-def duplicate_handler(existing_rows, dp_data_list):
-    to_insert, to_fail = [], []
-    existing_ids = {row[0] for row in existing_rows}
-    existing_emails = {e for row in existing_rows for e in (row[1] or [])}
-    existing_mobiles = {str(m) for row in existing_rows for m in (row[2] or [])}
-
-    failure_reasons = {}
-    seen_dp_system_ids = set()
-    seen_emails = set()
-    seen_mobiles = set()
-
-    for dp in dp_data_list:
-        sid = dp.dp_system_id
-        emails = set(dp.dp_email or [])
-        mobiles = {str(m) for m in (dp.dp_mobile or [])}
-
-        if sid in seen_dp_system_ids or any(email in seen_emails for email in emails) or any(mobile in seen_mobiles for mobile in mobiles):
-            failure_reasons[sid] = "Duplicate record in batch"
-            to_fail.append(dp)
-        else:
-            seen_dp_system_ids.add(sid)
-            seen_emails.update(emails)
-            seen_mobiles.update(mobiles)
-
-            if sid in existing_ids or emails & existing_emails or mobiles & existing_mobiles:
-                failure_reasons[sid] = "Duplicate record in database"
-                to_fail.append(dp)
-            else:
-                to_insert.append(dp)
-
-    return to_insert, to_fail, failure_reasons
-
-
-async def bulk_insert_records(df_id, to_insert):
-    if not to_insert:
-        return 0
+DPD_COLUMNS = [
+    "dp_id",
+    "dp_system_id",
+    "dp_identifiers",
+    "dp_email",
+    "dp_mobile",
+    "dp_other_identifier",
+    "dp_preferred_lang",
+    "dp_country",
+    "dp_state",
+    "dp_active_devices",
+    "dp_tags",
+    "is_active",
+    "is_legacy",
+    "added_by",
+    "added_with",
+    "created_at_df",
+    "last_activity",
+    "dp_e",
+    "dp_m",
+    "is_deleted",
+    "consent_status",
+]
+
+CREATE_STAGING_SQL = f"""
+    CREATE TEMP TABLE dpd_incoming ON COMMIT DROP AS
+    SELECT 0 AS row_no, NULL::text AS failure_reason, {", ".join(DPD_COLUMNS)} FROM dpd WITH NO DATA
+"""
+
+CREATE_STAGING_KEYS_SQL = """
+    CREATE TEMP TABLE dpd_incoming_keys ON COMMIT DROP AS
+    SELECT row_no, 'id' AS kind, dp_system_id AS value FROM dpd_incoming
+    UNION ALL
+    SELECT row_no, 'email', unnest(dp_email) FROM dpd_incoming
+    UNION ALL
+    SELECT row_no, 'mobile', unnest(dp_mobile) FROM dpd_incoming
+"""
+
+# A row fails if it shares an identifier with an earlier row of the batch, or if any of its
+# identifiers already exists in dpd (btree on dp_system_id, GIN on dp_email/dp_mobile).
+MARK_DUPLICATES_SQL = """
+    WITH batch_dupes AS (
+        SELECT DISTINCT later.row_no
+        FROM dpd_incoming_keys later
+        JOIN dpd_incoming_keys earlier
+          ON earlier.kind = later.kind AND earlier.value = later.value AND earlier.row_no < later.row_no
+    ),
+    db_dupes AS (
+        SELECT DISTINCT k.row_no
+        FROM dpd_incoming_keys k
+        WHERE (k.kind = 'id' AND EXISTS (SELECT 1 FROM dpd d WHERE d.dp_system_id = k.value))
+           OR (k.kind = 'email' AND EXISTS (SELECT 1 FROM dpd d WHERE d.dp_email @> ARRAY[k.value]))
+           OR (k.kind = 'mobile' AND EXISTS (SELECT 1 FROM dpd d WHERE d.dp_mobile @> ARRAY[k.value]))
+    )
+    UPDATE dpd_incoming i
+    SET failure_reason = CASE
+        WHEN i.row_no IN (SELECT row_no FROM batch_dupes) THEN 'Duplicate record in batch'
+        ELSE 'Duplicate record in database'
+    END
+    WHERE i.row_no IN (SELECT row_no FROM batch_dupes) OR i.row_no IN (SELECT row_no FROM db_dupes)
+    RETURNING i.row_no, i.failure_reason
+"""
+
+INSERT_SURVIVORS_SQL = f"""
+    INSERT INTO dpd ({", ".join(DPD_COLUMNS)})
+    SELECT {", ".join(DPD_COLUMNS)} FROM dpd_incoming
+    WHERE failure_reason IS NULL
+    ORDER BY row_no
+    ON CONFLICT DO NOTHING
+    RETURNING dp_id
+"""
+
+
+def build_dpd_record(row_no: int, dp: BulkDpApiModel) -> tuple:
+    dp_model = AddBulkDPModel(
+        **dp.model_dump(),
+        added_by="",
+        added_with="/api/v1/dp-bulk-external",
+        is_deleted=False,
+        consent_status="unsent",
+    )
+    return (
+        row_no,
+        None,
+        uuid.uuid4(),
+        dp_model.dp_system_id,
+        dp_model.dp_identifiers,
+        dp_model.dp_email,
+        [str(m) for m in (dp_model.dp_mobile or [])],
+        [str(o) for o in (dp_model.dp_other_identifier or [])],
+        dp_model.dp_preferred_lang,
+        dp_model.dp_country,
+        dp_model.dp_state,
+        dp_model.dp_active_devices,
+        dp_model.dp_tags,
+        dp_model.is_active,
+        dp_model.is_legacy,
+        dp_model.added_by,
+        dp_model.added_with,
+        dp_model.created_at_df,
+        dp_model.last_activity,
+        dp_model.dp_e,
+        dp_model.dp_m,
+        dp_model.is_deleted,
+        dp_model.consent_status,
+    )
+
+
+async def ingest_batch(dp_data_list: List[BulkDpApiModel]) -> Tuple[int, Dict[int, str]]:
+    """
+    Loads the batch into a temporary table with COPY, marks in-batch and existing duplicates with
+    set-based joins, and inserts the survivors in one statement. Returns the inserted count and the
+    failure reason of each rejected batch index.
+    """
+    if not dp_data_list:
+        return 0, {}
 
     pool = await init_postgres_pool()
     async with pool.acquire() as conn:
         async with conn.transaction():
-            records = []
-            for dp in to_insert:
-                dp_model = AddBulkDPModel(
-                    dp_system_id=dp.dp_system_id,
-                    dp_identifiers=dp.dp_identifiers,
-                    dp_email=dp.dp_email,
-                    dp_mobile=dp.dp_mobile,
-                    dp_other_identifier=dp.dp_other_identifier,
-                    dp_preferred_lang=dp.dp_preferred_lang,
-                    dp_country=dp.dp_country,
-                    dp_state=dp.dp_state,
-                    dp_active_devices=dp.dp_active_devices,
-                    dp_tags=dp.dp_tags,
-                    is_active=dp.is_active,
-                    is_legacy=dp.is_legacy,
-                    created_at_df=dp.created_at_df,
-                    last_activity=dp.last_activity,
-                    added_by="",
-                    added_with="/api/v1/dp-bulk-external",
-                    is_deleted=False,
-                    consent_status="unsent",
-                )
-                records.append(
-                    (
-                        str(uuid.uuid4()),
-                        dp_model.dp_system_id,
-                        dp_model.dp_identifiers,
-                        dp_model.dp_email,
-                        [str(m) for m in (dp_model.dp_mobile or [])],
-                        [str(o) for o in (dp_model.dp_other_identifier or [])],
-                        dp_model.dp_preferred_lang,
-                        dp_model.dp_country,
-                        dp_model.dp_state,
-                        dp_model.dp_active_devices,
-                        dp_model.dp_tags,
-                        dp_model.is_active,
-                        dp_model.is_legacy,
-                        dp_model.added_by,
-                        dp_model.added_with,
-                        dp_model.created_at_df,
-                        dp_model.last_activity,
-                        dp_model.dp_e,
-                        dp_model.dp_m,
-                        dp_model.is_deleted,
-                        dp_model.consent_status,
-                    )
-                )
-
-            await conn.executemany(
-                """
-                INSERT INTO dpd (
-                    dp_id,
-                    dp_system_id,
-                    dp_identifiers,
-                    dp_email,
-                    dp_mobile,
-                    dp_other_identifier,
-                    dp_preferred_lang,
-                    dp_country,
-                    dp_state,
-                    dp_active_devices,
-                    dp_tags,
-                    is_active,
-                    is_legacy,
-                    added_by,
-                    added_with,
-                    created_at_df,
-                    last_activity,
-                    dp_e,
-                    dp_m,
-                    is_deleted,
-                    consent_status
-                )
-                VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,
-                        $11,$12,$13,$14,$15,$16,$17,$18, $19, $20, $21)
-                """,
-                records,
+            await conn.execute(CREATE_STAGING_SQL)
+            await conn.copy_records_to_table(
+                "dpd_incoming",
+                records=[build_dpd_record(row_no, dp) for row_no, dp in enumerate(dp_data_list)],
+                columns=["row_no", "failure_reason", *DPD_COLUMNS],
             )
-    return len(records)
+            await conn.execute(CREATE_STAGING_KEYS_SQL)
+            await conn.execute("CREATE INDEX ON dpd_incoming_keys (kind, value, row_no)")
+            await conn.execute("ANALYZE dpd_incoming_keys")
+
+            failures = {row["row_no"]: row["failure_reason"] for row in await conn.fetch(MARK_DUPLICATES_SQL)}
+            inserted = await conn.fetch(INSERT_SURVIVORS_SQL)
+    return len(inserted), failures
 
 
 async def handle_message(message: aio_pika.IncomingMessage) -> None:
@@ -290,8 +279,6 @@ async def handle_message(message: aio_pika.IncomingMessage) -> None:
         token = data.get("token")
         valid_dps = [BulkDpApiModel(**dp) for dp in valid_dps_raw]
 
-        await message.ack()
-
         all_failed = []
         valid_final = []
         for dp in valid_dps:
@@ -306,43 +293,44 @@ async def handle_message(message: aio_pika.IncomingMessage) -> None:
             else:
                 valid_final.append(dp)
 
-        ids, emails, mobiles = collect_incoming_keys(valid_final)
-        existing_rows = await fetch_existing_rows(ids, emails, mobiles)
-        to_insert, to_fail_dupes, failure_reasons = duplicate_handler(existing_rows, valid_final)
-
-        for dp in to_fail_dupes:
+        inserted_count, failure_reasons = await ingest_batch(valid_final)
+        for row_no, reason in sorted(failure_reasons.items()):
             all_failed.append(
                 {
-                    "dp": json.loads(dp.model_dump_json()),
-                    "failure_reason": failure_reasons.get(dp.dp_system_id, "Duplicate record"),
+                    "dp": json.loads(valid_final[row_no].model_dump_json()),
+                    "failure_reason": reason,
                 }
             )
 
-        inserted_count = await bulk_insert_records(df_id, to_insert)
         logger.info(f"Inserted {inserted_count} records for df_id {df_id}")
         logger.warning(f"Failed records count: {len(all_failed)}")
 
-        if all_failed:
+        job_id = data.get("job_id")
+        if batch_tag != "end":
+            # Every batch is reported, even without failures, so the report job can count completed batches.
             failed_message = json.dumps(
                 {
                     "df_id": df_id,
+                    "job_id": job_id,
+                    "batch_seq": data.get("batch_seq"),
                     "batch_tag": batch_tag,
                     "failed_records": all_failed,
                 }
             )
-            logger.warning(f"Publishing failed records message for df_id {df_id} with batch_tag {batch_tag}")
             await publish_message("failed_queue", failed_message)
-            logger.warning(f"Failed records sent to failed_queue for df_id {df_id} with batch_tag {batch_tag}")
-
-        if batch_tag == "end":
+            logger.info(f"Reported batch {data.get('batch_seq')} of job {job_id} for df_id {df_id} ({len(all_failed)} failed)")
+        else:
             end_time = datetime.now(UTC)
             await batch_collection.update_one(
                 {"df_id": df_id, "token": token},
                 {"$set": {"status": "end", "token": None, "end_time": end_time}},
             )
-            end_message = json.dumps({"df_id": df_id, "batch_tag": "end", "failed_records": []})
+            end_message = json.dumps({"df_id": df_id, "job_id": job_id, "batch_tag": "end", "failed_records": []})
             await publish_message("failed_queue", end_message)
 
+        # Acked only once the batch is ingested and reported, so a failure above redelivers it.
+        await message.ack()
+
     except json.JSONDecodeError as e:
         logger.error(f"JSON decode error in dp_external_processing_consumer: {e!r}")
         await message.reject(requeue=False)
@@ -1,4 +1,3 @@
-import asyncio
 import aio_pika
 import json
 from app.core.config import settings
@@ -18,8 +17,8 @@ import io
 import ast
 from bson import ObjectId
 import csv
-from app.db.rabbitmq import rabbitmq_pool, declare_queues
 from app.core.logger import setup_logging, get_logger
+from app.worker.runtime import QueueConsumer, run_blocking, run_consumers, run_cpu_bound
 
 
 CHUNK_SIZE = 1000
@@ -107,6 +106,8 @@ s3_client = Minio(settings.S3_URL, access_key=settings.MINIO_ROOT_USER, secret_k
 
 QUEUE_NAME = "dp_processing"
 
+logger = get_logger("worker.dp_processing_consumer")
+
 
 def safe_json_parse(value):
     if isinstance(value, str):
@@ -121,6 +122,26 @@ def safe_json_parse(value):
     return value
 
 
+def read_upload_chunks(contents: bytes, filename: str) -> List[pd.DataFrame]:
+    """Parses an uploaded CSV/Excel file into DataFrame chunks; runs in the worker process pool."""
+    if filename.endswith(".csv"):
+        return list(
+            pd.read_csv(
+                io.StringIO(contents.decode("utf-8")),
+                chunksize=CHUNK_SIZE,
+                keep_default_na=False,
+                converters={
+                    "dp_identifiers": safe_json_parse,
+                    "dp_email": safe_json_parse,
+                    "dp_mobile": lambda x: [str(i) for i in safe_json_parse(x)] if pd.notna(x) else [],
+                    "dp_active_devices": safe_json_parse,
+                },
+            )
+        )
+    df = pd.read_excel(io.BytesIO(contents))
+    return [df.iloc[i : i + CHUNK_SIZE] for i in range(0, len(df), CHUNK_SIZE)]
+
+
 async def create_user_notification(
     df_id: Optional[str],
     users_list: Optional[List[str]],
@@ -200,21 +221,7 @@ async def process_file(
             {"$set": {"status": "processing", "started_at": datetime.now(timezone.utc)}},
         )
 
-        if filename.endswith(".csv"):
-            chunks = pd.read_csv(
-                io.StringIO(contents.decode("utf-8")),
-                chunksize=CHUNK_SIZE,
-                keep_default_na=False,
-                converters={
-                    "dp_identifiers": safe_json_parse,
-                    "dp_email": safe_json_parse,
-                    "dp_mobile": lambda x: [str(i) for i in safe_json_parse(x)] if pd.notna(x) else [],
-                    "dp_active_devices": safe_json_parse,
-                },
-            )
-        else:
-            df = pd.read_excel(io.BytesIO(contents))
-            chunks = (df.iloc[i : i + CHUNK_SIZE] for i in range(0, len(df), CHUNK_SIZE))
+        chunks = await run_cpu_bound(read_upload_chunks, contents, filename)
     except Exception as e:
         logger.error(f"Error reading file {filename}: {e}", exc_info=True)
         await dp_file_processing_collection.find_one_and_update(
@@ -478,16 +485,17 @@ async def process_file(
         logger.warning(f"Processed {total}: {success_count} succeeded, {len(failed_records)} failed for file {filename}.")
         try:
 
-            failed_records_dir = os.path.dirname("failed_records.csv")
-            if failed_records_dir and not os.path.exists(failed_records_dir):
-                os.makedirs(failed_records_dir, exist_ok=True)
-
-            with open("failed_records.csv", "w", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=failed_records[0].keys())
-                writer.writeheader()
-                for rec in failed_records:
-                    writer.writerow(rec)
-            s3_client.fput_object(settings.FAILED_RECORDS_BUCKET, filename, "failed_records.csv")
+            failed_records_path = f"failed_records_{uuid.uuid4().hex}.csv"
+            try:
+                with open(failed_records_path, "w", newline="") as f:
+                    writer = csv.DictWriter(f, fieldnames=failed_records[0].keys())
+                    writer.writeheader()
+                    for rec in failed_records:
+                        writer.writerow(rec)
+                await run_blocking(s3_client.fput_object, settings.FAILED_RECORDS_BUCKET, filename, failed_records_path)
+            finally:
+                if os.path.exists(failed_records_path):
+                    os.remove(failed_records_path)
             logger.info(f"Uploaded failed records file {filename} to S3 bucket {settings.FAILED_RECORDS_BUCKET}.")
         except Exception as e:
             logger.error(f"Error uploading failed records for {filename}: {e}", exc_info=True)
@@ -568,7 +576,7 @@ async def handle_message(message: aio_pika.IncomingMessage) -> None:
 
             os.makedirs(os.path.dirname(local_temp_path), exist_ok=True)
 
-            s3_client.fget_object(settings.UNPROCESSED_FILES_BUCKET, filename, local_temp_path)
+            await run_blocking(s3_client.fget_object, settings.UNPROCESSED_FILES_BUCKET, filename, local_temp_path)
 
             if not os.path.exists(local_temp_path):
                 logger.error(f"File not found locally after S3 download: {local_temp_path}")
@@ -591,29 +599,10 @@ async def handle_message(message: aio_pika.IncomingMessage) -> None:
             logger.critical(f"Error processing message for file {filename}: {e}", exc_info=True)
 
 
-async def main() -> None:
-
-    await rabbitmq_pool.init_pool()
-    await declare_queues()
-
-    connection, channel = await rabbitmq_pool.get_connection()
-    try:
-        await channel.set_qos(prefetch_count=10)
-
-        queue = await channel.declare_queue(QUEUE_NAME, durable=True)
-        logger.info(f"Waiting for messages on '{QUEUE_NAME}'...")
-
-        await queue.consume(handle_message)
-
-        await asyncio.Future()
-    finally:
-
-        await rabbitmq_pool.release_connection(connection, channel)
+CONSUMER = QueueConsumer(queue_name=QUEUE_NAME, handler=handle_message, startup_hooks=[init_postgres_pool])
 
 
 if __name__ == "__main__":
     setup_logging()
-
-    logger = get_logger("worker.dp_processing_consumer")
     logger.info("DP Processing Consumer starting up.")
-    asyncio.run(main())
+    run_consumers([CONSUMER])
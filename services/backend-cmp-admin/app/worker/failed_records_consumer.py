@@ -1,16 +1,17 @@
+import asyncio
 import csv
-import os
+import io
 import json
-from datetime import datetime, UTC
+from datetime import datetime, timedelta, UTC
 from app.core.config import settings
 from typing import Optional, List
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
 import aio_pika
 from minio import Minio
-import asyncio
-from app.db.rabbitmq import rabbitmq_pool, declare_queues
+from minio.deleteobjects import DeleteObject
 from app.core.logger import setup_logging, get_logger
+from app.worker.runtime import QueueConsumer, run_blocking, run_consumers
 
 MONGO_URL = settings.MONGO_URI
 DB_NAME = settings.DB_NAME_CONCUR_MASTER
@@ -21,10 +22,18 @@ db = client[DB_NAME]
 df_register_collection = db["df_register"]
 genie_user_collection = db["cmp_users"]
 notification_collection = db["notifications"]
+jobs_collection = db["failed_records_jobs"]
+parts_collection = db["failed_records_parts"]
 
 s3_client = Minio(settings.S3_URL, access_key=settings.MINIO_ROOT_USER, secret_key=settings.MINIO_ROOT_PASSWORD, secure=settings.S3_SECURE)
 
 QUEUE_NAME = "failed_queue"
+PARTS_PREFIX = "failed_records/parts"
+CSV_HEADER = ["dp_system_id", "dp_email", "dp_mobile", "failure_reason"]
+READ_CHUNK_SIZE = 1024 * 1024
+COMPOSE_PART_SIZE = 8 * 1024 * 1024
+
+logger = get_logger("worker.failed_records_consumer")
 
 
 async def create_user_notification(
@@ -86,141 +95,314 @@ async def create_user_notification(
     }
 
     try:
-        notification_collection.insert_one(notification_doc)
+        await notification_collection.insert_one(notification_doc)
     except Exception as e:
         raise Exception(f"Failed to create notification: {str(e)}")
 
 
-def upload_file_to_s3(file_path, bucket_name, s3_key):
-    """Upload the file to MinIO (S3-like storage) only if it has data rows."""
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+def _render_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(CSV_HEADER)
+    return buffer.getvalue().encode("utf-8")
 
-        if len(lines) <= 1:
-            logger.info(f"No failed records to upload for {file_path}. Only header found. Skipping upload.")
-            return False
 
-        s3_client.fput_object(bucket_name, s3_key, file_path)
-        logger.info(f"Successfully uploaded {file_path} to MinIO: {bucket_name}/{s3_key}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to upload {file_path} to MinIO: {e}")
-        return False
+def _render_part(failed_records: List[dict]) -> bytes:
+    """CSV rows (without header) for one batch of failed records."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in failed_records:
+        dp = record["dp"]
+        writer.writerow(
+            [
+                dp.get("dp_system_id"),
+                ", ".join(dp.get("dp_email", [])),
+                ", ".join(str(m) for m in dp.get("dp_mobile", [])),
+                record["failure_reason"],
+            ]
+        )
+    return buffer.getvalue().encode("utf-8")
 
 
-def append_failed_records_to_csv(failed_records, file_path):
-    """Append failed records to a CSV file."""
-    if not file_path:
-        raise ValueError("The file path provided is empty.")
-    dir_path = os.path.dirname(file_path)
-    if not os.path.exists(dir_path) and dir_path != "":
-        os.makedirs(dir_path, exist_ok=True)
+def _put_part(object_name: str, payload: bytes):
+    s3_client.put_object(settings.FAILED_RECORDS_BUCKET_EXTERNAL, object_name, io.BytesIO(payload), len(payload), content_type="text/csv")
 
-    with open(file_path, mode="a", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
 
-        if file.tell() == 0:
-            writer.writerow(["dp_system_id", "dp_email", "dp_mobile", "failure_reason"])
+class ConcatenatedParts(io.RawIOBase):
+    """Readable stream of the CSV header followed by each part object, fetched one at a time."""
 
-        for record in failed_records:
-            dp = record["dp"]
-            writer.writerow(
-                [
-                    dp.get("dp_system_id"),
-                    ", ".join(dp.get("dp_email", [])),
-                    ", ".join(str(m) for m in dp.get("dp_mobile", [])),
-                    record["failure_reason"],
-                ]
-            )
+    def __init__(self, object_names: List[str]):
+        self._pending = iter(object_names)
+        self._current = None
+        self._buffer = _render_header()
 
+    def readable(self) -> bool:
+        return True
 
-def get_failed_file(df_id):
-    """Generate a consistent file name for a df_id per day."""
-    today_str = datetime.now().strftime("%Y%m%d")
-    return f"failed_records_{df_id}_{today_str}.csv"
+    def _next_chunk(self, size: int) -> bytes:
+        while True:
+            if self._current is None:
+                object_name = next(self._pending, None)
+                if object_name is None:
+                    return b""
+                self._current = s3_client.get_object(settings.FAILED_RECORDS_BUCKET_EXTERNAL, object_name)
+            data = self._current.read(size)
+            if data:
+                return data
+            self._current.close()
+            self._current.release_conn()
+            self._current = None
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(READ_CHUNK_SIZE), b""))
+
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            if not self._buffer:
+                self._buffer = self._next_chunk(min(remaining, READ_CHUNK_SIZE))
+                if not self._buffer:
+                    break
+            chunk, self._buffer = self._buffer[:remaining], self._buffer[remaining:]
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+
+def _compose_report(part_names: List[str], object_name: str):
+    """Streams the parts into one object with a multipart upload; memory stays bounded by COMPOSE_PART_SIZE."""
+    s3_client.put_object(
+        settings.FAILED_RECORDS_BUCKET_EXTERNAL,
+        object_name,
+        ConcatenatedParts(part_names),
+        length=-1,
+        part_size=COMPOSE_PART_SIZE,
+        content_type="text/csv",
+    )
+
+
+def _remove_parts(part_names: List[str]):
+    errors = s3_client.remove_objects(settings.FAILED_RECORDS_BUCKET_EXTERNAL, [DeleteObject(name) for name in part_names])
+    for error in errors:
+        logger.warning(f"Failed to delete failed-records part {error.name}: {error}")
+
+
+async def stage_part(job_id: str, batch_seq: int, failed_records: List[dict]):
+    """Writes a batch's failures as a numbered part object and records the batch as processed."""
+    object_name = None
+    if failed_records:
+        object_name = f"{PARTS_PREFIX}/{job_id}/{batch_seq:08d}.csv"
+        await run_blocking(_put_part, object_name, _render_part(failed_records))
+
+    await parts_collection.update_one(
+        {"_id": f"{job_id}:{batch_seq}"},
+        {
+            "$set": {
+                "job_id": job_id,
+                "batch_seq": batch_seq,
+                "failed_count": len(failed_records),
+                "object_name": object_name,
+                "staged_at": datetime.now(UTC),
+            }
+        },
+        upsert=True,
+    )
+
+
+async def notify_report_ready(df_id: str, object_name: str):
+    cursor = genie_user_collection.find({"df_id": df_id}, projection={"_id": 1})
+    users_list = [str(u["_id"]) async for u in cursor]
+    try:
+        await create_user_notification(
+            df_id=df_id,
+            users_list=users_list,
+            notification_title="Failed-records report ready",
+            notification_message=f"A report of failed records for batch {df_id} is now available.",
+            file_url=f"{settings.FAILED_RECORDS_BUCKET_EXTERNAL}/{object_name}",
+            category="reports",
+            priority="high",
+        )
+        logger.info("User notification created.")
+    except Exception as notif_err:
+        logger.warning(f"Failed to create user notification: {notif_err}")
+
+
+async def discard_job_parts(job_id: str):
+    """Removes a finished job's part objects and part records."""
+    part_names = [
+        part["object_name"]
+        async for part in parts_collection.find({"job_id": job_id, "object_name": {"$ne": None}}, projection={"object_name": 1})
+    ]
+    if part_names:
+        await run_blocking(_remove_parts, part_names)
+    await parts_collection.delete_many({"job_id": job_id})
+
+
+async def try_complete_job(job_id: str, partial: bool = False):
+    """
+    Assembles the report once the upload has ended and every published batch has a staged part.
+    With `partial` (set by the sweeper past the job deadline) it composes whatever is staged.
+    The open -> composing transition is atomic, so only one replica composes a job.
+    """
+    job = await jobs_collection.find_one({"_id": job_id})
+    if not job or job.get("status") != "open" or (not partial and job.get("expected_batches") is None):
+        return
+
+    staged = await parts_collection.count_documents({"job_id": job_id})
+    if not partial and staged < job["expected_batches"]:
+        logger.info(f"Failed-records job {job_id}: {staged}/{job['expected_batches']} batches staged.")
+        return
+
+    claimed = await jobs_collection.find_one_and_update(
+        {"_id": job_id, "status": "open"}, {"$set": {"status": "composing", "composing_at": datetime.now(UTC)}}
+    )
+    if not claimed:
+        return
+    if partial:
+        logger.warning(f"Failed-records job {job_id} passed its deadline; composing the report from {staged} staged batches.")
+
+    df_id = job["df_id"]
+    part_names, failed_count = [], 0
+    async for part in parts_collection.find({"job_id": job_id, "failed_count": {"$gt": 0}}, projection={"object_name": 1, "failed_count": 1}).sort(
+        "batch_seq", 1
+    ):
+        part_names.append(part["object_name"])
+        failed_count += part["failed_count"]
+
+    try:
+        object_name = None
+        if part_names:
+            object_name = f"failed_records/failed_records_{df_id}_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}_{job_id[:8]}.csv"
+            await run_blocking(_compose_report, part_names, object_name)
+            logger.info(f"Composed {len(part_names)} parts ({failed_count} failed records) into {object_name}")
+            await notify_report_ready(df_id, object_name)
+        else:
+            logger.info(f"No failed records for job {job_id}. Skipping upload.")
+
+        await jobs_collection.update_one(
+            {"_id": job_id},
+            {
+                "$set": {
+                    "status": "complete",
+                    "object_name": object_name,
+                    "failed_count": failed_count,
+                    "staged_batches": staged,
+                    "partial": partial,
+                    "completed_at": datetime.now(UTC),
+                }
+            },
+        )
+    except Exception as e:
+        await jobs_collection.update_one({"_id": job_id}, {"$set": {"status": "failed", "error": str(e)}})
+        try:
+            await discard_job_parts(job_id)
+        except Exception as cleanup_err:
+            logger.warning(f"Failed to discard parts of failed job {job_id}; the sweeper will retry: {cleanup_err}")
+        raise
 
+    await discard_job_parts(job_id)
 
-async def handle_message(message: aio_pika.IncomingMessage):
-    """Callback function to handle failed records and append to CSV."""
-    async with message.process():
+
+async def sweep_jobs():
+    """
+    Composes open jobs that can no longer complete on their own: the end of the upload was seen more than
+    FAILED_RECORDS_END_GRACE_SECONDS ago, or the job is older than FAILED_RECORDS_JOB_DEADLINE_SECONDS.
+    Jobs stuck in composing past the deadline are reopened, and parts left behind by finished jobs are removed.
+    """
+    now = datetime.now(UTC)
+    deadline = now - timedelta(seconds=settings.FAILED_RECORDS_JOB_DEADLINE_SECONDS)
+
+    await jobs_collection.update_many({"status": "composing", "composing_at": {"$lt": deadline}}, {"$set": {"status": "open"}})
+
+    overdue = jobs_collection.find(
+        {
+            "status": "open",
+            "$or": [
+                {"end_requested_at": {"$lt": now - timedelta(seconds=settings.FAILED_RECORDS_END_GRACE_SECONDS)}},
+                {"created_at": {"$lt": deadline}},
+            ],
+        },
+        projection={"_id": 1},
+    )
+    async for job in overdue:
         try:
-            logger.info("Processing new message for failed records consumer.")
-            body = message.body.decode()
-            data = json.loads(body)
-            logger.debug(f"Received message: {data}")
-            df_id = data.get("df_id")
-            batch_tag = data.get("batch_tag", "")
-            failed_records = data.get("failed_records", [])
+            await try_complete_job(job["_id"], partial=True)
+        except Exception as e:
+            logger.error(f"Failed to compose overdue failed-records job {job['_id']}: {e}", exc_info=True)
+
+    staged_job_ids = await parts_collection.distinct("job_id")
+    if staged_job_ids:
+        async for job in jobs_collection.find({"_id": {"$in": staged_job_ids}, "status": {"$in": ["complete", "failed"]}}, projection={"_id": 1}):
+            try:
+                await discard_job_parts(job["_id"])
+            except Exception as e:
+                logger.warning(f"Failed to discard parts of finished job {job['_id']}: {e}")
 
-            local_failed_file = get_failed_file(df_id)
-
-            append_failed_records_to_csv(failed_records, local_failed_file)
-            logger.info(f"Failed records for df_id {df_id} appended to {local_failed_file}")
-
-            if batch_tag == "end":
-                timestamp_str = datetime.now(UTC).strftime("%H%M%S")
-                upload_failed_file_name = f"failed_records_{df_id}_{datetime.now().strftime('%Y%m%d')}_{timestamp_str}.csv"
-
-                object_name = f"failed_records/{upload_failed_file_name}"
-
-                uploaded = upload_file_to_s3(local_failed_file, settings.FAILED_RECORDS_BUCKET_EXTERNAL, object_name)
-
-                if uploaded:
-                    cursor = genie_user_collection.find({"df_id": df_id})
-                    users = await cursor.to_list(length=None)
-                    users_list = [str(u["_id"]) for u in users]
-                    notification_title = "Failed-records report ready"
-                    notification_message = f"A report of failed records for batch {df_id} is now available."
-                    file_url = f"{settings.FAILED_RECORDS_BUCKET_EXTERNAL}/{object_name}"
-                    try:
-                        await create_user_notification(
-                            df_id=df_id,
-                            users_list=users_list,
-                            notification_title=notification_title,
-                            notification_message=notification_message,
-                            file_url=file_url,
-                            category="reports",
-                            priority="high",
-                        )
-                        logger.info("User notification created.")
-                    except Exception as notif_err:
-                        logger.warning(f"Failed to create user notification: {notif_err}")
-                    os.remove(local_failed_file)
-                    logger.info(f"Deleted local file {local_failed_file} after upload.")
-                else:
-                    logger.info(f"Keeping local file {local_failed_file} (either empty or upload failed).")
-
-                logger.info(f"Batch {df_id} processing complete. Uploaded {local_failed_file} as {upload_failed_file_name}")
-            else:
-                logger.info(f"Failed records for df_id {df_id} received, batch_tag != 'end', continuing to append.")
 
+async def run_job_sweeper(interval_seconds=settings.FAILED_RECORDS_SWEEP_INTERVAL_SECONDS):
+    while True:
+        try:
+            await sweep_jobs()
         except Exception as e:
-            logger.critical(f"Error processing message in failed_records_consumer: {e}", exc_info=True)
+            logger.error(f"Failed-records job sweep failed: {e}", exc_info=True)
+        await asyncio.sleep(interval_seconds)
 
 
-async def main() -> None:
+_sweeper_task: Optional[asyncio.Task] = None
 
-    await rabbitmq_pool.init_pool()
-    await declare_queues()
 
-    connection, channel = await rabbitmq_pool.get_connection()
-    try:
-        await channel.set_qos(prefetch_count=10)
+async def start_job_sweeper():
+    global _sweeper_task
+    await jobs_collection.create_index([("status", 1), ("created_at", 1)], name="idx_status_created_at")
+    await parts_collection.create_index([("job_id", 1), ("batch_seq", 1)], name="idx_job_batch_seq")
+    _sweeper_task = asyncio.create_task(run_job_sweeper())
+
+
+async def stop_job_sweeper():
+    global _sweeper_task
+    if _sweeper_task is not None:
+        _sweeper_task.cancel()
+        await asyncio.gather(_sweeper_task, return_exceptions=True)
+        _sweeper_task = None
 
-        queue = await channel.declare_queue(QUEUE_NAME, durable=True)
-        logger.info(f"Waiting for messages on '{QUEUE_NAME}'...")
 
-        await queue.consume(handle_message)
+async def handle_message(message: aio_pika.IncomingMessage):
+    """
+    Stages one batch's failed records, or handles the end of an upload, then checks for job completion.
+    Staging errors propagate so the message is requeued; a re-staged batch overwrites its own part.
+    """
+    async with message.process(requeue=True):
+        try:
+            data = json.loads(message.body.decode())
+        except json.JSONDecodeError as e:
+            logger.error(f"Dropping malformed failed-records message: {e!r}")
+            return
+        df_id = data.get("df_id")
+        job_id = data.get("job_id")
+        batch_tag = data.get("batch_tag", "")
+
+        if not job_id:
+            logger.warning(f"Dropping failed-records message without job_id for df_id {df_id}.")
+            return
+
+        if batch_tag != "end":
+            failed_records = data.get("failed_records", [])
+            await stage_part(job_id, data["batch_seq"], failed_records)
+            logger.info(f"Staged batch {data['batch_seq']} of job {job_id} for df_id {df_id} ({len(failed_records)} failed).")
+
+        try:
+            await try_complete_job(job_id)
+        except Exception as e:
+            # The batch is staged and the job is marked failed; redelivering would not change that.
+            logger.critical(f"Failed to compose failed-records report for job {job_id}: {e}", exc_info=True)
 
-        await asyncio.Future()
-    finally:
 
-        await rabbitmq_pool.release_connection(connection, channel)
+CONSUMER = QueueConsumer(
+    queue_name=QUEUE_NAME, handler=handle_message, startup_hooks=[start_job_sweeper], shutdown_hooks=[stop_job_sweeper]
+)
 
 
 if __name__ == "__main__":
     setup_logging()
-    logger = get_logger("worker.failed_records_consumer")
     logger.info("Failed Records Consumer starting up.")
-    asyncio.run(main())
+    run_consumers([CONSUMER])
@@ -8,10 +8,12 @@ import secrets, string
 from app.core.config import settings
 from motor.motor_asyncio import AsyncIOMotorClient
 import aio_pika
-import asyncio
 
-from app.db.rabbitmq import publish_message, rabbitmq_pool, declare_queues
+from app.db.rabbitmq import publish_message
 from app.core.logger import setup_logging, get_logger
+from app.worker.runtime import QueueConsumer, run_consumers
+
+logger = get_logger("worker.notice_notification_consumer")
 
 ln_tokens_table = "ln_tokens"
 
@@ -343,43 +345,20 @@ async def handle_message(message: aio_pika.IncomingMessage) -> None:
             data = json.loads(body)
             logger.info(f"Received message for notice notification: {data}")
 
-            await create_tables()
             await create_notifications_for_campaign(data["notice_notification_id"])
 
         except Exception as e:
             logger.critical(f"Error processing message in notice_notification_consumer: {e}", exc_info=True)
 
 
-async def main() -> None:
-
-    await rabbitmq_pool.init_pool()
-    await declare_queues()
-
-    # Use a dedicated connection for the consumer to avoid starving the pool
-    connection = await aio_pika.connect_robust(
-        host=settings.RABBITMQ_HOST,
-        port=settings.RABBITMQ_PORT,
-        login=settings.RABBITMQ_USER,
-        password=settings.RABBITMQ_PASSWORD,
-        virtualhost=settings.RABBITMQ_VHOST_NAME,
-    )
-    channel = await connection.channel()
-    try:
-        await channel.set_qos(prefetch_count=10)
-
-        queue = await channel.declare_queue(QUEUE_NAME, durable=True)
-        logger.info(f"Waiting for messages on '{QUEUE_NAME}'...")
-
-        await queue.consume(handle_message)
-
-        await asyncio.Future()
-    finally:
-        if not connection.is_closed:
-            await connection.close()
+CONSUMER = QueueConsumer(
+    queue_name=QUEUE_NAME,
+    handler=handle_message,
+    startup_hooks=[create_tables, init_postgres_pool],
+)
 
 
 if __name__ == "__main__":
     setup_logging()
-    logger = get_logger("worker.notice_notification_consumer")
     logger.info("Notice Notification Consumer starting up.")
-    asyncio.run(main())
+    run_consumers([CONSUMER])
@@ -0,0 +1,214 @@
+import asyncio
+import importlib
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+import aio_pika
+
+from app.core.config import settings
+from app.core.logger import get_logger, setup_logging
+from app.db.rabbitmq import declare_queues, rabbitmq_pool
+
+
+logger = get_logger("worker.runtime")
+
+MessageHandler = Callable[[aio_pika.IncomingMessage], Awaitable[None]]
+Hook = Callable[[], Awaitable[Any]]
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.WORKER_PROCESS_POOL_SIZE)
+    return _process_pool
+
+
+async def run_cpu_bound(func: Callable, *args):
+    """Runs a picklable, module-level function in the shared process pool."""
+    return await asyncio.get_running_loop().run_in_executor(_get_process_pool(), func, *args)
+
+
+async def run_blocking(func: Callable, *args):
+    """Runs blocking I/O (MinIO, file access) in the default thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+@dataclass
+class QueueConsumer:
+    """
+    A queue handler registered with the runtime. Concurrency defaults to WORKER_CONCURRENCY[queue_name]
+    or WORKER_DEFAULT_CONCURRENCY; startup hooks run once before consuming, not per message.
+    """
+
+    queue_name: str
+    handler: MessageHandler
+    concurrency: Optional[int] = None
+    startup_hooks: Sequence[Hook] = ()
+    shutdown_hooks: Sequence[Hook] = ()
+
+    def resolved_concurrency(self) -> int:
+        if self.concurrency:
+            return self.concurrency
+        return settings.WORKER_CONCURRENCY.get(self.queue_name, settings.WORKER_DEFAULT_CONCURRENCY)
+
+
+@dataclass
+class QueueMetrics:
+    processed: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    window_started: float = field(default_factory=time.monotonic)
+
+    def record(self, elapsed: float, ok: bool):
+        if ok:
+            self.processed += 1
+        else:
+            self.failed += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+
+    def snapshot_and_reset(self) -> Dict[str, float]:
+        handled = self.processed + self.failed
+        window = max(time.monotonic() - self.window_started, 1e-6)
+        snapshot = {
+            "processed": self.processed,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "throughput_per_sec": round(handled / window, 3),
+            "avg_latency_ms": round(self.total_seconds / handled * 1000, 1) if handled else 0.0,
+            "max_latency_ms": round(self.max_seconds * 1000, 1),
+        }
+        self.processed = self.failed = 0
+        self.total_seconds = self.max_seconds = 0.0
+        self.window_started = time.monotonic()
+        return snapshot
+
+
+class ConsumerRuntime:
+    """
+    Runs one or more queue consumers in a single process. Each queue gets its own channel with
+    prefetch equal to its concurrency and a semaphore bounding in-flight handlers. On SIGTERM/SIGINT
+    the consumers are cancelled and in-flight messages are drained before the pool is closed.
+    """
+
+    def __init__(self, consumers: List[QueueConsumer]):
+        self.consumers = consumers
+        self.metrics: Dict[str, QueueMetrics] = {consumer.queue_name: QueueMetrics() for consumer in consumers}
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    async def _dispatch(self, consumer: QueueConsumer, semaphore: asyncio.Semaphore, message: aio_pika.IncomingMessage):
+        metrics = self.metrics[consumer.queue_name]
+        async with semaphore:
+            metrics.in_flight += 1
+            started = time.perf_counter()
+            ok = True
+            try:
+                await consumer.handler(message)
+            except Exception as e:
+                ok = False
+                logger.error(f"Unhandled error in consumer for '{consumer.queue_name}': {e}", exc_info=True)
+                if not message.processed:
+                    await message.reject(requeue=False)
+            finally:
+                metrics.in_flight -= 1
+                metrics.record(time.perf_counter() - started, ok)
+
+    def _on_message(self, consumer: QueueConsumer, semaphore: asyncio.Semaphore) -> MessageHandler:
+        async def on_message(message: aio_pika.IncomingMessage):
+            task = asyncio.create_task(self._dispatch(consumer, semaphore, message))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        return on_message
+
+    async def _report_metrics(self):
+        while True:
+            await asyncio.sleep(settings.WORKER_METRICS_INTERVAL_SECONDS)
+            for queue_name, metrics in self.metrics.items():
+                snapshot = metrics.snapshot_and_reset()
+                logger.info(f"Queue metrics for '{queue_name}': {snapshot}", extra={"queue": queue_name, **snapshot})
+
+    def _install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self._stopping.set)
+            except NotImplementedError:
+                pass
+
+    async def run(self):
+        self._install_signal_handlers()
+        await rabbitmq_pool.init_pool()
+        await declare_queues()
+
+        for consumer in self.consumers:
+            for hook in consumer.startup_hooks:
+                await hook()
+
+        subscriptions = []
+        try:
+            for consumer in self.consumers:
+                concurrency = consumer.resolved_concurrency()
+                _, channel = await rabbitmq_pool.open_channel(prefetch_count=concurrency)
+                queue = await channel.declare_queue(consumer.queue_name, durable=True)
+                consumer_tag = await queue.consume(self._on_message(consumer, asyncio.Semaphore(concurrency)))
+                subscriptions.append((channel, queue, consumer_tag))
+                logger.info(f"Waiting for messages on '{consumer.queue_name}' with concurrency {concurrency}...")
+
+            reporter = asyncio.create_task(self._report_metrics())
+            await self._stopping.wait()
+            reporter.cancel()
+        finally:
+            logger.info("Stopping consumers and draining in-flight messages...")
+            for channel, queue, consumer_tag in subscriptions:
+                try:
+                    await queue.cancel(consumer_tag)
+                except Exception as e:
+                    logger.warning(f"Failed to cancel consumer on '{queue.name}': {e}")
+
+            pending = set()
+            if self._tasks:
+                _, pending = await asyncio.wait(set(self._tasks), timeout=settings.WORKER_DRAIN_TIMEOUT_SECONDS)
+
+            # Channels close before unfinished handlers are cancelled: the broker requeues their unacked
+            # messages, and `message.process()` skips its reject-on-error because the channel is closed.
+            for channel, _, _ in subscriptions:
+                if not channel.is_closed:
+                    await channel.close()
+
+            if pending:
+                logger.warning(f"{len(pending)} message(s) still in flight after drain timeout; they were requeued and are being cancelled.")
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+            for consumer in self.consumers:
+                for hook in consumer.shutdown_hooks:
+                    await hook()
+
+            await rabbitmq_pool.close_pool()
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False, cancel_futures=True)
+            logger.info("Consumer runtime stopped.")
+
+
+def run_consumers(consumers: List[QueueConsumer]):
+    asyncio.run(ConsumerRuntime(consumers).run())
+
+
+if __name__ == "__main__":
+    # python -m app.worker.runtime send_email_consumer cookie_scan_consumer ...
+    setup_logging()
+    modules = sys.argv[1:]
+    if not modules:
+        sys.exit("Usage: python -m app.worker.runtime <consumer_module> [<consumer_module> ...]")
+    run_consumers([importlib.import_module(f"app.worker.{name}").CONSUMER for name in modules])
@@ -1,6 +1,5 @@
 from io import BytesIO
 import os
-import time
 from bson import ObjectId
 import json
 
@@ -14,7 +13,7 @@ from fastapi import HTTPException
 from minio import Minio
 import aio_pika
 import asyncio
-from app.db.rabbitmq import rabbitmq_pool, declare_queues
+from app.worker.runtime import QueueConsumer, run_blocking, run_consumers
 from app.utils.mail_sender_utils import mail_sender
 from app.utils.sms_sender_utils import send_sms_notification
 from app.core.logger import setup_logging, get_logger
@@ -24,6 +23,8 @@ MAX_RETRIES = 3
 UPDATE_THRESHOLD = 10
 QUEUE_NAME = "send_email"
 
+logger = get_logger("worker.send_email_consumer")
+
 
 MONGO_URL = settings.MONGO_URI
 DB_NAME = settings.DB_NAME_CONCUR_MASTER
@@ -164,23 +165,21 @@ def read_email_template(template_name: str) -> str:
         raise HTTPException(status_code=500, detail=f"Failed to read template: {e}")
 
 
-async def prepare_notification_content(notification):
-    """Generate and upload HTML content for a notification (shared by both email and SMS)"""
-    email_html = read_email_template("legacy_notice.html")
-    email_html = await generate_dynamic_html(
-        notification["cp_id"],
-        notification["token"],
-        email_html,
-        notification["notification_id"],
-        notification["df_id"],
-    )
+legacy_notice_template: str | None = None
 
-    if not s3_client.bucket_exists(settings.NOTICE_WORKER_BUCKET):
-        s3_client.make_bucket(settings.NOTICE_WORKER_BUCKET)
 
-    file_path = f"legacy_notices/{notification['df_id']}/{notification['cp_id']}_{notification['notification_id']}.html"
-    html_bytes = BytesIO(email_html.encode("utf-8"))
+async def load_notice_template():
+    global legacy_notice_template
+    legacy_notice_template = read_email_template("legacy_notice.html")
+
+
+async def ensure_notice_bucket():
+    if not await run_blocking(s3_client.bucket_exists, settings.NOTICE_WORKER_BUCKET):
+        await run_blocking(s3_client.make_bucket, settings.NOTICE_WORKER_BUCKET)
+
 
+def upload_notice_html(file_path: str, email_html: str):
+    html_bytes = BytesIO(email_html.encode("utf-8"))
     s3_client.put_object(
         bucket_name=settings.NOTICE_WORKER_BUCKET,
         object_name=file_path,
@@ -189,6 +188,20 @@ async def prepare_notification_content(notification):
         content_type="text/html",
     )
 
+
+async def prepare_notification_content(notification):
+    """Generate and upload HTML content for a notification (shared by both email and SMS)"""
+    email_html = await generate_dynamic_html(
+        notification["cp_id"],
+        notification["token"],
+        legacy_notice_template,
+        notification["notification_id"],
+        notification["df_id"],
+    )
+
+    file_path = f"legacy_notices/{notification['df_id']}/{notification['cp_id']}_{notification['notification_id']}.html"
+    await run_blocking(upload_notice_html, file_path, email_html)
+
     return email_html
 
 
@@ -230,7 +243,7 @@ async def send_email_notification(notification, email_html):
             logger.error(
                 f"Email attempt {attempt+1} failed for {notification.get('dp_email')}, notification {notification.get('notification_id')}: {e}"
             )
-            time.sleep(1)
+            await asyncio.sleep(1)
 
     return False
 
@@ -364,30 +377,14 @@ async def handle_message(message: aio_pika.IncomingMessage) -> None:
             logger.critical(f"Error processing message in send_email_consumer: {e}", exc_info=True)
 
 
-async def main() -> None:
-
-    await init_postgres_pool()
-
-    await rabbitmq_pool.init_pool()
-    await declare_queues()
-
-    connection, channel = await rabbitmq_pool.get_connection()
-    try:
-        await channel.set_qos(prefetch_count=10)
-
-        queue = await channel.declare_queue(QUEUE_NAME, durable=True)
-        logger.info(f"Waiting for messages on '{QUEUE_NAME}'...")
-
-        await queue.consume(handle_message)
-
-        await asyncio.Future()
-    finally:
-
-        await rabbitmq_pool.release_connection(connection, channel)
+CONSUMER = QueueConsumer(
+    queue_name=QUEUE_NAME,
+    handler=handle_message,
+    startup_hooks=[init_postgres_pool, load_notice_template, ensure_notice_bucket],
+)
 
 
 if __name__ == "__main__":
     setup_logging()
-    logger = get_logger("worker.send_email_consumer")
     logger.info("Send Email Consumer starting up.")
-    asyncio.run(main())
+    run_consumers([CONSUMER])
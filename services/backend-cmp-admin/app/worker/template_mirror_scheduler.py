@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, UTC
+
+import httpx
+import motor.motor_asyncio
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.core.logger import setup_logging, get_logger
+from app.crud.template_mirror_crud import de_template_mirror, purpose_template_mirror
+from app.services.template_mirror_service import TemplateMirrorService
+
+
+db_client: AsyncIOMotorClient = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI, tz_aware=True)
+concur_master_db: AsyncIOMotorDatabase = db_client[settings.DB_NAME_CONCUR_MASTER]
+
+
+def format_utc_datetime(dt: datetime) -> str:
+    return dt.replace(tzinfo=None).isoformat(timespec="microseconds")
+
+
+def build_mirror_service(http_client: httpx.AsyncClient = None) -> TemplateMirrorService:
+    state_collection = concur_master_db["template_mirror_state"]
+    return TemplateMirrorService(
+        {
+            "purposes": purpose_template_mirror(concur_master_db["purpose_templates"], state_collection),
+            "data_elements": de_template_mirror(concur_master_db["de_templates"], state_collection),
+        },
+        http_client=http_client,
+    )
+
+
+async def import_snapshot_file(service: TemplateMirrorService, path: str):
+    with open(path, "r", encoding="utf-8") as snapshot_file:
+        snapshot = json.load(snapshot_file)
+    counts = await service.import_snapshot(snapshot)
+    logger.info(f"Template Mirror Scheduler: Imported snapshot {path}: {counts}")
+
+
+async def export_snapshot_file(service: TemplateMirrorService, path: str):
+    snapshot = await service.export_snapshot()
+    with open(path, "w", encoding="utf-8") as snapshot_file:
+        json.dump(snapshot, snapshot_file, ensure_ascii=False, default=str)
+    logger.info(f"Template Mirror Scheduler: Exported snapshot to {path}.")
+
+
+async def run_template_mirror_scheduler(
+    interval_seconds=settings.TEMPLATE_MIRROR_SYNC_INTERVAL_SECONDS,
+    full_interval_seconds=settings.TEMPLATE_MIRROR_FULL_SYNC_INTERVAL_SECONDS,
+):
+    logger.info(f"Template Mirror Scheduler started at {format_utc_datetime(datetime.now(UTC))}. Syncing every {interval_seconds} seconds...")
+
+    async with httpx.AsyncClient(timeout=30) as http_client:
+        service = build_mirror_service(http_client)
+        for mirror in service.mirrors.values():
+            await mirror.ensure_indexes()
+
+        if settings.TEMPLATE_MIRROR_SNAPSHOT_PATH:
+            ready = [await mirror.is_ready() for mirror in service.mirrors.values()]
+            if not all(ready):
+                await import_snapshot_file(service, settings.TEMPLATE_MIRROR_SNAPSHOT_PATH)
+
+        last_full_sync = 0.0
+        try:
+            while True:
+                full = time.monotonic() - last_full_sync >= full_interval_seconds
+                results = await service.sync_all(full=full)
+                if full and len(results) == len(service.mirrors):
+                    last_full_sync = time.monotonic()
+                logger.info(f"Template Mirror Scheduler: Sync results: {results}")
+
+                await asyncio.sleep(interval_seconds)
+        except asyncio.CancelledError:
+            logger.info("Template mirror scheduler task cancelled gracefully.")
+        except Exception as e:
+            logger.critical(f"Template Mirror Scheduler: A critical error occurred in the main loop: {e}")
+
+
+async def run_snapshot_command(import_path: str = None, export_path: str = None):
+    service = build_mirror_service()
+    for mirror in service.mirrors.values():
+        await mirror.ensure_indexes()
+    if import_path:
+        await import_snapshot_file(service, import_path)
+    if export_path:
+        await export_snapshot_file(service, export_path)
+
+
+if __name__ == "__main__":
+    # python -m app.worker.template_mirror_scheduler [--import-snapshot PATH | --export-snapshot PATH]
+    setup_logging()
+    logger = get_logger("worker.template_mirror_scheduler")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--import-snapshot", dest="import_path")
+    parser.add_argument("--export-snapshot", dest="export_path")
+    args = parser.parse_args()
+
+    if args.import_path or args.export_path:
+        asyncio.run(run_snapshot_command(args.import_path, args.export_path))
+    else:
+        logger.info("Template mirror scheduler starting up.")
+        asyncio.run(run_template_mirror_scheduler())
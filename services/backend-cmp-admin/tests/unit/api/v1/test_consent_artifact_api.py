@@ -144,7 +144,7 @@ def test_get_expiring_consents(mock_service, mock_user, side_effect, return_valu
     assert res.status_code == expected_status
     if expected_status == 200:
         assert res.json() == return_value
-        mock_service.get_expiring_consents.assert_called_once_with(mock_user["df_id"], None, None)
+        mock_service.get_expiring_consents.assert_called_once_with(mock_user["df_id"], None, None, page=1, limit=500)
     elif expected_status == 500:
         assert res.json()["detail"] == "Internal Server Error"
     else:
@@ -131,6 +131,7 @@ def test_list_data_element_templates_endpoint(mock_service, service_return_value
                 user=mock_service.get_all_data_element_templates.call_args.kwargs["user"],
                 current_page=1,
                 data_per_page=20,
+                after=None,
                 **query_params,
             )
         else:
@@ -141,6 +142,7 @@ def test_list_data_element_templates_endpoint(mock_service, service_return_value
                 domain=None,
                 title=None,
                 id=None,
+                after=None,
             )
 
 
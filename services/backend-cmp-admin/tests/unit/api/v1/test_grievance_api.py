@@ -74,7 +74,18 @@ def test_get_all_grievances_success(mock_service, page, page_size, side_effect,
     assert res.status_code == expected_status
     if expected_status == status.HTTP_200_OK:
         assert "grievances" in res.json()
-        mock_service.get_all_grievances.assert_called_once_with(page=page, page_size=page_size, current_user=ANY)
+        mock_service.get_all_grievances.assert_called_once_with(
+            page=page,
+            page_size=page_size,
+            current_user=ANY,
+            status=None,
+            category=None,
+            sub_category=None,
+            created_from=None,
+            created_to=None,
+            sort_order="desc",
+            after=None,
+        )
 
 
 def test_get_all_grievances_validation_failure():
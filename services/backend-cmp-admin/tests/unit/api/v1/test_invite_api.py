@@ -156,7 +156,7 @@ def test_get_all_invites_success(mock_service, mock_user, page, page_size, side_
     assert res.status_code == expected_status
     if expected_status == status.HTTP_200_OK:
         assert "invites" in res.json()
-        mock_service.get_all_invites.assert_called_once_with(mock_user, page, page_size)
+        mock_service.get_all_invites.assert_called_once_with(mock_user, page, page_size, None, None, None)
 
 
 def test_get_all_invites_validation_failure():
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 from bson import ObjectId
+from datetime import datetime, timedelta, UTC
 from motor.motor_asyncio import AsyncIOMotorCollection
 from app.crud.consent_artifact_crud import ConsentArtifactCRUD
 
@@ -111,61 +112,38 @@ async def test_get_expiring_consent_artifacts(crud, mock_collection, dummy_conse
 
 
 @pytest.mark.asyncio
-async def test_count_collected_data_elements(crud, mock_collection, dummy_consent_artifact_data):
-    mock_collection.find.return_value.__aiter__.return_value = iter(
-        [
-            dummy_consent_artifact_data,
-            {
-                "_id": ObjectId(),
-                "cp_id": "cp456",
-                "artifact": {
-                    "consent_scope": {
-                        "data_elements": [
-                            {"de_id": "de1"},
-                            {"de_id": "de3"},
-                        ]
-                    }
-                },
-            },
-            {"_id": ObjectId(), "cp_id": "cp789"},
-            {"_id": ObjectId(), "cp_id": "cp101", "artifact": {"consent_scope": {}}},
-        ]
-    )
+async def test_count_collected_data_elements(crud, mock_collection):
+    mock_collection.aggregate.return_value.to_list = AsyncMock(return_value=[{"total": 3}])
     query = {"status": "active"}
 
     result = await crud.count_collected_data_elements(query)
 
-    mock_collection.find.assert_called_once_with(query)
-
+    pipeline = mock_collection.aggregate.call_args[0][0]
+    assert pipeline[0] == {"$match": query}
+    assert {"$group": {"_id": "$artifact.consent_scope.data_elements.de_id"}} in pipeline
     assert result == 3
 
 
 @pytest.mark.asyncio
-async def test_count_collected_purposes(crud, mock_collection, dummy_consent_artifact_data):
-    mock_collection.find.return_value.__aiter__.return_value = iter(
-        [
-            dummy_consent_artifact_data,
-            {
-                "_id": ObjectId(),
-                "cp_id": "cp456",
-                "artifact": {
-                    "consent_scope": {
-                        "data_elements": [
-                            {"de_id": "de4", "consents": [{"purpose_id": "p1"}, {"purpose_id": "p4"}]},
-                        ]
-                    }
-                },
-            },
-            {"_id": ObjectId(), "cp_id": "cp789"},
-            {"_id": ObjectId(), "cp_id": "cp101", "artifact": {"consent_scope": {"data_elements": [{"de_id": "de5"}]}}},
-        ]
-    )
+async def test_count_collected_data_elements_empty(crud, mock_collection):
+    mock_collection.aggregate.return_value.to_list = AsyncMock(return_value=[])
+
+    result = await crud.count_collected_data_elements({})
+
+    assert result == 0
+
+
+@pytest.mark.asyncio
+async def test_count_collected_purposes(crud, mock_collection):
+    mock_collection.aggregate.return_value.to_list = AsyncMock(return_value=[{"total": 4}])
     query = {"status": "active"}
 
     result = await crud.count_collected_purposes(query)
 
-    mock_collection.find.assert_called_once_with(query)
-
+    pipeline = mock_collection.aggregate.call_args[0][0]
+    assert pipeline[0] == {"$match": query}
+    assert {"$unwind": "$artifact.consent_scope.data_elements.consents"} in pipeline
+    assert {"$group": {"_id": "$artifact.consent_scope.data_elements.consents.purpose_id"}} in pipeline
     assert result == 4
 
 
@@ -178,3 +156,76 @@ async def test_count_collected_collection_points(crud, mock_collection):
 
     mock_collection.distinct.assert_called_once_with("cp_id", query)
     assert result == 3
+
+
+@pytest.mark.asyncio
+async def test_count_expiring_consents_by_window(crud, mock_collection):
+    now = datetime(2025, 1, 1, 10, 0, 0, 123456, tzinfo=UTC)
+    boundaries = [now + timedelta(days=7), now + timedelta(days=15), now + timedelta(days=30)]
+    mock_collection.aggregate.return_value.to_list = AsyncMock(
+        return_value=[{"0": [{"_id": None, "dp_count": 2, "purpose_count": 3}], "1": [], "2": [{"_id": None, "dp_count": 3, "purpose_count": 6}]}]
+    )
+
+    result = await crud.count_expiring_consents_by_window("df1", now, boundaries, dp_id="dp1")
+
+    pipeline = mock_collection.aggregate.call_args[0][0]
+    assert pipeline[0]["$match"]["df_id"] == "df1"
+    assert pipeline[0]["$match"]["dp_id"] == "dp1"
+    assert pipeline[1] == {"$unwind": "$consent_grants"}
+    facets = pipeline[-1]["$facet"]
+    # Each window matches grants on their own expiry before DPs and purposes are counted.
+    assert [facets[str(i)][0] for i in range(3)] == [{"$match": {"consent_grants.expires_at": {"$lte": boundary}}} for boundary in boundaries]
+    assert facets["0"][1]["$group"]["_id"] == "$dp_id"
+    assert result == [
+        {"dp_count": 2, "purpose_count": 3},
+        {"dp_count": 0, "purpose_count": 0},
+        {"dp_count": 3, "purpose_count": 6},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_count_expiring_consents_by_window_empty(crud, mock_collection):
+    now = datetime(2025, 1, 1, tzinfo=UTC)
+    mock_collection.aggregate.return_value.to_list = AsyncMock(return_value=[])
+
+    result = await crud.count_expiring_consents_by_window("df1", now, [now + timedelta(days=7)])
+
+    assert result == [{"dp_count": 0, "purpose_count": 0}]
+
+
+@pytest.mark.asyncio
+async def test_get_expiring_consents_by_dp_pages_on_dp(crud, mock_collection):
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    end = start + timedelta(days=7)
+    rows = [{"dp_id": "dp1", "df_id": "df1", "next_expiry": start + timedelta(days=1), "grants": [{"purpose_id": "p1"}, {"purpose_id": "p2"}]}]
+    mock_collection.aggregate.return_value.to_list = AsyncMock(return_value=rows)
+
+    result = await crud.get_expiring_consents_by_dp("df1", start, end, 20, 10)
+
+    pipeline = mock_collection.aggregate.call_args[0][0]
+    assert "dp_id" not in pipeline[0]["$match"]
+    group_index = next(i for i, stage in enumerate(pipeline) if "$group" in stage)
+    assert pipeline[group_index]["$group"]["_id"] == "$dp_id"
+    # Skip and limit come after the grouping, so they count DPs rather than grants.
+    assert pipeline.index({"$skip": 20}) > group_index
+    assert pipeline.index({"$limit": 10}) > group_index
+    assert pipeline[group_index + 1] == {"$sort": {"next_expiry": 1, "_id": 1}}
+    assert result == rows
+
+
+@pytest.mark.asyncio
+async def test_get_agreement_id(crud, mock_collection):
+    artifact_id = "60d0fe4f3460595e63456789"
+    mock_collection.find_one.return_value = {"_id": ObjectId(artifact_id), "artifact": {"agreement_id": "agr-1"}}
+
+    assert await crud.get_agreement_id(artifact_id) == "agr-1"
+    mock_collection.find_one.assert_awaited_once_with({"_id": ObjectId(artifact_id)}, {"artifact.agreement_id": 1})
+
+
+@pytest.mark.asyncio
+async def test_get_agreement_id_missing_or_invalid(crud, mock_collection):
+    mock_collection.find_one.return_value = None
+
+    assert await crud.get_agreement_id("60d0fe4f3460595e63456789") is None
+    assert await crud.get_agreement_id("not-an-object-id") is None
+    mock_collection.find_one.assert_awaited_once()
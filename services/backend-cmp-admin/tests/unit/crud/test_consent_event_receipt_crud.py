@@ -0,0 +1,64 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import DuplicateKeyError
+
+from app.crud.consent_event_receipt_crud import ConsentEventReceiptCRUD
+
+
+@pytest.fixture
+def mock_collection():
+    collection = MagicMock(spec=AsyncIOMotorCollection)
+    collection.insert_one = AsyncMock()
+    collection.find_one_and_update = AsyncMock(return_value=None)
+    collection.update_one = AsyncMock()
+    collection.delete_one = AsyncMock()
+    collection.create_index = AsyncMock()
+    return collection
+
+
+@pytest.fixture
+def crud(mock_collection):
+    return ConsentEventReceiptCRUD(mock_collection)
+
+
+@pytest.mark.asyncio
+async def test_claim_new_event(crud, mock_collection):
+    assert await crud.claim("agr-1:h:consent_granted", 300) is True
+
+    receipt = mock_collection.insert_one.await_args.args[0]
+    assert receipt["_id"] == "agr-1:h:consent_granted"
+    assert receipt["status"] == "processing"
+    mock_collection.find_one_and_update.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_claim_duplicate_event_is_refused(crud, mock_collection):
+    mock_collection.insert_one.side_effect = DuplicateKeyError("dup")
+
+    assert await crud.claim("e1", 300) is False
+
+    query = mock_collection.find_one_and_update.await_args.args[0]
+    # Only an expired processing claim can be taken over; completed receipts never match.
+    assert query["_id"] == "e1"
+    assert query["status"] == "processing"
+    assert "$lt" in query["claimed_at"]
+
+
+@pytest.mark.asyncio
+async def test_claim_takes_over_expired_claim(crud, mock_collection):
+    mock_collection.insert_one.side_effect = DuplicateKeyError("dup")
+    mock_collection.find_one_and_update.return_value = {"_id": "e1", "status": "processing"}
+
+    assert await crud.claim("e1", 300) is True
+
+
+@pytest.mark.asyncio
+async def test_complete_and_release(crud, mock_collection):
+    await crud.complete("e1")
+    await crud.release("e2")
+
+    query, update = mock_collection.update_one.await_args.args
+    assert query == {"_id": "e1"}
+    assert update["$set"]["status"] == "completed"
+    mock_collection.delete_one.assert_awaited_once_with({"_id": "e2", "status": "processing"})
@@ -2,7 +2,8 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorCollection
-from app.crud.grievance_crud import GrievanceCRUD
+from datetime import datetime, UTC
+from app.crud.grievance_crud import GRIEVANCE_LIST_PROJECTION, GrievanceCRUD, encode_grievance_cursor
 
 
 @pytest.fixture
@@ -52,41 +53,80 @@ def dummy_grievance_data():
 async def test_count_grievances(crud, mock_grievance_collection):
     mock_grievance_collection.count_documents.return_value = 5
 
-    result = await crud.count_grievances()
+    result = await crud.count_grievances("df123")
 
-    mock_grievance_collection.count_documents.assert_called_once_with({})
+    mock_grievance_collection.count_documents.assert_called_once_with({"df_id": "df123"})
     assert result == 5
 
 
+def test_build_query_scopes_and_filters():
+    created_from = datetime(2026, 1, 1, tzinfo=UTC)
+
+    query = GrievanceCRUD.build_query("df123", status=["open", "resolved"], category="billing", created_from=created_from)
+
+    assert query == {
+        "df_id": "df123",
+        "request_status": {"$in": ["open", "resolved"]},
+        "category": "billing",
+        "created_at": {"$gte": created_from},
+    }
+
+
 @pytest.mark.asyncio
-async def test_get_grievances(crud, mock_grievance_collection, dummy_grievance_data):
-    mock_grievance_collection.find.return_value.to_list.return_value = [dummy_grievance_data.copy()]
-    skip = 0
-    limit = 10
-    projection = {
-        "_id": 1,
-        "subject": 1,
-        "request_status": 1,
-        "created_at": 1,
-        "last_updated_at": 1,
-        "is_verified": 1,
-        "is_registered_user": 1,
-        "email": 1,
-        "mobile_number": 1,
-        "dp_type": 1,
-        "business_entity": 1,
-        "data_processor": 1,
-        "ticket_allocated": 1,
+async def test_get_grievances_first_page(crud, mock_grievance_collection, dummy_grievance_data):
+    cursor = mock_grievance_collection.find.return_value
+    cursor.sort.return_value = cursor
+    docs = [{**dummy_grievance_data, "_id": ObjectId(), "created_at": datetime(2026, 1, day, tzinfo=UTC)} for day in (3, 2, 1)]
+    cursor.to_list.return_value = docs
+
+    result, next_cursor = await crud.get_grievances({"df_id": "df123"}, limit=2, skip=20)
+
+    mock_grievance_collection.find.assert_called_once_with({"df_id": "df123"}, GRIEVANCE_LIST_PROJECTION)
+    cursor.sort.assert_called_once_with([("created_at", -1), ("_id", -1)])
+    cursor.skip.assert_called_once_with(20)
+    cursor.limit.assert_called_once_with(3)
+    assert [g["_id"] for g in result] == [str(docs[0]["_id"]), str(docs[1]["_id"])]
+    assert next_cursor == encode_grievance_cursor(docs[1])
+
+
+@pytest.mark.asyncio
+async def test_get_grievances_after_cursor_uses_keyset(crud, mock_grievance_collection):
+    cursor = mock_grievance_collection.find.return_value
+    cursor.sort.return_value = cursor
+    created_at = datetime(2026, 1, 2, tzinfo=UTC)
+    grievance_id = ObjectId()
+
+    result, next_cursor = await crud.get_grievances(
+        {"df_id": "df123"}, limit=10, after=encode_grievance_cursor({"_id": grievance_id, "created_at": created_at}), skip=50
+    )
+
+    query = mock_grievance_collection.find.call_args.args[0]
+    assert query == {
+        "$and": [
+            {"df_id": "df123"},
+            {"$or": [{"created_at": {"$lt": created_at}}, {"created_at": created_at, "_id": {"$lt": grievance_id}}]},
+        ]
     }
+    cursor.skip.assert_not_called()
+    assert result == [] and next_cursor is None
+
+
+def test_overdue_query_uses_open_statuses():
+    now = datetime(2026, 3, 1, tzinfo=UTC)
+
+    query = GrievanceCRUD.overdue_query("df123", 30, now=now)
+
+    assert query == {"df_id": "df123", "request_status": {"$in": ["open"]}, "created_at": {"$lt": datetime(2026, 1, 30, tzinfo=UTC)}}
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes(crud, mock_grievance_collection):
+    mock_grievance_collection.create_index = AsyncMock()
 
-    result = await crud.get_grievances(skip, limit)
+    await crud.ensure_indexes()
 
-    mock_grievance_collection.find.assert_called_once_with({}, projection)
-    mock_grievance_collection.find.return_value.skip.assert_called_once_with(skip)
-    mock_grievance_collection.find.return_value.limit.assert_called_once_with(limit)
-    mock_grievance_collection.find.return_value.to_list.assert_called_once_with(length=limit)
-    assert len(result) == 1
-    assert result[0]["_id"] == str(dummy_grievance_data["_id"])
+    names = [call.kwargs["name"] for call in mock_grievance_collection.create_index.call_args_list]
+    assert names == ["idx_df_created", "idx_df_status_created", "idx_df_category_created"]
 
 
 @pytest.mark.asyncio
@@ -1,4 +1,5 @@
 import pytest
+from datetime import datetime, UTC
 from unittest.mock import AsyncMock, MagicMock
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorCollection
@@ -111,19 +112,54 @@ async def test_update_invite_data(crud, mock_collection, dummy_invite_data):
 
 
 @pytest.mark.asyncio
-async def test_get_invites(crud, mock_collection, dummy_invite_data):
-    mock_collection.find.return_value.to_list.return_value = [dummy_invite_data.copy()]
-    df_id = dummy_invite_data["invited_df"]
-    page = 1
-    page_size = 10
-
-    result = await crud.get_invites(df_id, page, page_size)
-
-    mock_collection.find.assert_called_once_with({"invited_df": df_id, "is_deleted": False})
-    mock_collection.find.return_value.skip.assert_called_once_with((page - 1) * page_size)
-    mock_collection.find.return_value.limit.assert_called_once_with(page_size)
-    mock_collection.find.return_value.to_list.assert_called_once_with(length=None)
-    assert result == [dummy_invite_data]
+async def test_get_invites_by_status_builds_one_facet(crud, mock_collection, dummy_invite_data):
+    now = datetime(2026, 1, 1, tzinfo=UTC)
+    cursor_id = ObjectId()
+    mock_collection.aggregate.return_value.to_list = AsyncMock(return_value=[{"pending": [], "accepted": [], "expired": [], "counts": []}])
+
+    await crud.get_invites_by_status("df123", page=3, page_size=10, cursors={"expired": str(cursor_id)}, now=now)
+
+    pipeline = mock_collection.aggregate.call_args.args[0]
+    assert pipeline[0] == {"$match": {"invited_df": "df123", "invite_status": {"$in": ["pending", "accepted"]}, "is_deleted": False}}
+    facets = pipeline[1]["$facet"]
+    assert facets["pending"][0] == {"$match": {"invite_status": "pending", "expiry_at": {"$gt": now}}}
+    assert {"$skip": 20} in facets["pending"]
+    assert facets["expired"][0] == {"$match": {"invite_status": "pending", "expiry_at": {"$lte": now}}}
+    assert facets["expired"][1] == {"$match": {"_id": {"$lt": cursor_id}}}
+    assert not any("$skip" in stage for stage in facets["expired"])
+    assert facets["accepted"][-1] == {"$limit": 11}
+
+
+@pytest.mark.asyncio
+async def test_get_invites_by_status_counts_and_cursors(crud, mock_collection, dummy_invite_data):
+    pending = [{**dummy_invite_data, "_id": ObjectId()} for _ in range(3)]
+    mock_collection.aggregate.return_value.to_list = AsyncMock(
+        return_value=[
+            {
+                "pending": pending,
+                "accepted": [],
+                "expired": [],
+                "counts": [{"_id": "pending", "count": 7}, {"_id": "expired", "count": 1}],
+            }
+        ]
+    )
+
+    result = await crud.get_invites_by_status("df123", page=1, page_size=2)
+
+    assert [invite["_id"] for invite in result["pending"]] == [str(pending[0]["_id"]), str(pending[1]["_id"])]
+    assert result["next_cursors"] == {"pending": str(pending[1]["_id"]), "accepted": None, "expired": None}
+    assert result["counts"] == {"pending": 7, "accepted": 0, "expired": 1}
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes(crud, mock_collection):
+    mock_collection.create_index = AsyncMock()
+
+    await crud.ensure_indexes()
+
+    mock_collection.create_index.assert_awaited_once_with(
+        [("invited_df", 1), ("invite_status", 1), ("expiry_at", 1)], name="idx_invited_df_status_expiry"
+    )
 
 
 @pytest.mark.asyncio
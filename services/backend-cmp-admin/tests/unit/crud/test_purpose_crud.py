@@ -235,3 +235,29 @@ async def test_get_all_purpose_templates_with_all_params(purpose_crud: PurposeCR
         "sub_category": "loan",
         "title": "Personal Loan",
     }
+
+
+@pytest.mark.asyncio
+async def test_get_all_purpose_templates_served_from_ready_mirror(
+    mock_purpose_template_collection,
+    mock_purpose_master_collection,
+    mock_purpose_master_translated_collection,
+    monkeypatch,
+):
+    mirror = MagicMock()
+    mirror.is_ready = AsyncMock(return_value=True)
+    mirror.list_templates = AsyncMock(return_value={"total": 1, "data": [{"purpose_id": "p1"}], "next_cursor": None})
+    crud = PurposeCRUD(
+        mock_purpose_template_collection,
+        mock_purpose_master_collection,
+        mock_purpose_master_translated_collection,
+        template_mirror=mirror,
+    )
+    monkeypatch.setattr(httpx, "AsyncClient", MagicMock(side_effect=AssertionError("upstream must not be called")))
+
+    result = await crud.get_all_purpose_templates(limit=10, industry="bank", after="p0")
+
+    assert result["data"] == [{"purpose_id": "p1"}]
+    mirror.list_templates.assert_awaited_once_with(
+        offset=0, limit=10, after="p0", id=None, industry="bank", sub_category=None, title=None
+    )
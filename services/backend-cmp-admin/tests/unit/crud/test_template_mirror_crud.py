@@ -0,0 +1,105 @@
+import pytest
+from datetime import datetime, UTC
+from unittest.mock import AsyncMock, MagicMock
+
+from app.crud.template_mirror_crud import de_template_mirror, purpose_template_mirror
+
+
+def make_cursor(docs):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.skip.return_value = cursor
+    cursor.limit.return_value = cursor
+
+    async def async_iterator():
+        for doc in docs:
+            yield doc
+
+    cursor.__aiter__ = MagicMock(side_effect=lambda: async_iterator())
+    return cursor
+
+
+@pytest.fixture
+def template_collection():
+    collection = MagicMock()
+    collection.bulk_write = AsyncMock()
+    collection.count_documents = AsyncMock(return_value=0)
+    collection.delete_many = AsyncMock(return_value=MagicMock(deleted_count=0))
+    return collection
+
+
+@pytest.fixture
+def state_collection():
+    collection = MagicMock()
+    collection.find_one = AsyncMock(return_value=None)
+    collection.update_one = AsyncMock()
+    return collection
+
+
+@pytest.mark.asyncio
+async def test_upsert_templates_keys_on_upstream_id(template_collection, state_collection):
+    mirror = purpose_template_mirror(template_collection, state_collection)
+    synced_at = datetime.now(UTC)
+
+    count = await mirror.upsert_templates(
+        [{"purpose_id": "p1", "industry": "bank", "translations": {"eng": "Loan Offers"}}, {"industry": "no-id"}],
+        synced_at,
+    )
+
+    assert count == 1
+    operations = template_collection.bulk_write.call_args.args[0]
+    assert operations[0]._filter == {"_id": "p1"}
+    assert operations[0]._doc["$set"]["title_lc"] == "loan offers"
+    assert operations[0]._doc["$set"]["synced_at"] == synced_at
+    assert template_collection.bulk_write.call_args.kwargs == {"ordered": False}
+
+
+@pytest.mark.asyncio
+async def test_is_ready_requires_completed_full_sync(template_collection, state_collection):
+    mirror = de_template_mirror(template_collection, state_collection)
+
+    assert await mirror.is_ready() is False
+
+    state_collection.find_one.return_value = {"_id": "data_elements", "full_sync_completed_at": datetime.now(UTC)}
+    assert await mirror.is_ready() is True
+    state_collection.find_one.assert_called_with({"_id": "data_elements"})
+
+
+def test_build_query_uses_prefix_title_and_declared_filters(template_collection, state_collection):
+    mirror = purpose_template_mirror(template_collection, state_collection)
+
+    query = mirror.build_query(industry="bank", sub_category="retail", title="Loan (A)", domain="ignored")
+
+    assert query == {"industry": "bank", "sub_category": "retail", "title_lc": {"$regex": r"^loan\ \(a\)"}}
+
+
+@pytest.mark.asyncio
+async def test_list_templates_keyset_page(template_collection, state_collection):
+    mirror = de_template_mirror(template_collection, state_collection)
+    template_collection.count_documents.return_value = 5
+    cursor = make_cursor([{"_id": "d3", "title": "Email", "title_lc": "email", "synced_at": 1}, {"_id": "d4", "title": "Phone", "title_lc": "phone", "synced_at": 1}])
+    template_collection.find.return_value = cursor
+
+    result = await mirror.list_templates(offset=40, limit=2, after="d2", domain="contact")
+
+    template_collection.count_documents.assert_awaited_once_with({"domain": "contact"})
+    template_collection.find.assert_called_once_with({"$and": [{"domain": "contact"}, {"_id": {"$gt": "d2"}}]})
+    cursor.skip.assert_not_called()
+    assert result == {
+        "total": 5,
+        "data": [{"title": "Email", "id": "d3"}, {"title": "Phone", "id": "d4"}],
+        "next_cursor": "d4",
+    }
+
+
+@pytest.mark.asyncio
+async def test_list_templates_offset_page_without_cursor(template_collection, state_collection):
+    mirror = de_template_mirror(template_collection, state_collection)
+    cursor = make_cursor([{"_id": "d1", "title": "Email"}])
+    template_collection.find.return_value = cursor
+
+    result = await mirror.list_templates(offset=20, limit=20)
+
+    template_collection.find.assert_called_once_with({})
+    cursor.skip.assert_called_once_with(20)
+    assert result["next_cursor"] is None
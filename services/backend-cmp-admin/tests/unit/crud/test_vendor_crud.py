@@ -2,7 +2,7 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorCollection
-from app.crud.vendor_crud import VendorCRUD
+from app.crud.vendor_crud import SEARCH_KEYS_STAGE, VendorCRUD, build_search_keys
 from pymongo import ASCENDING, DESCENDING
 
 
@@ -14,6 +14,8 @@ def mock_vendor_collection():
     collection.update_one = AsyncMock()
     collection.count_documents = AsyncMock(return_value=0)
     collection.distinct = AsyncMock(return_value=[])
+    collection.update_many = AsyncMock()
+    collection.create_index = AsyncMock()
 
     cursor = MagicMock()
     cursor.sort.return_value = cursor
@@ -92,7 +94,10 @@ async def test_update_vendor(crud, mock_vendor_collection, dummy_vendor_data):
 
     result = await crud.update_vendor(vendor_id, update_data)
 
-    mock_vendor_collection.update_one.assert_called_once_with({"_id": ObjectId(vendor_id)}, {"$set": update_data})
+    mock_vendor_collection.update_one.assert_called_once_with(
+        {"_id": ObjectId(vendor_id)},
+        [{"$set": {"name": {"$literal": "Updated Vendor Name"}}}, SEARCH_KEYS_STAGE],
+    )
     assert result == mock_update_result
 
 
@@ -107,6 +112,13 @@ async def test_count_vendors(crud, mock_vendor_collection):
     assert result == 10
 
 
+def mock_aggregate(collection, documents):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=documents)
+    collection.aggregate = MagicMock(return_value=cursor)
+    return collection.aggregate
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "sort_order, expected_sort_dir",
@@ -116,54 +128,59 @@ async def test_count_vendors(crud, mock_vendor_collection):
         ("any_other", DESCENDING),
     ],
 )
-async def test_get_vendors(crud, mock_vendor_collection, dummy_vendor_data, sort_order, expected_sort_dir):
-    mock_vendor_collection.find.return_value.__aiter__.return_value = iter([dummy_vendor_data.copy()])
+async def test_search_vendors(crud, mock_vendor_collection, dummy_vendor_data, sort_order, expected_sort_dir):
+    aggregate = mock_aggregate(mock_vendor_collection, [{"vendors": [dummy_vendor_data.copy()], "total": [{"count": 11}]}])
 
-    query = {"df_id": dummy_vendor_data["df_id"]}
-    page = 1
+    query = {"df_id": dummy_vendor_data["df_id"], "search_keys.industry": "it"}
+    page = 2
     page_size = 10
 
-    result = await crud.get_vendors(query, sort_order, page, page_size)
+    vendors, total = await crud.search_vendors(query, sort_order, page, page_size)
+
+    pipeline = aggregate.call_args.args[0]
+    assert pipeline[0] == {"$match": query}
+    assert pipeline[1]["$facet"]["vendors"][:3] == [
+        {"$sort": {"created_at": expected_sort_dir, "_id": expected_sort_dir}},
+        {"$skip": 10},
+        {"$limit": 10},
+    ]
+    assert pipeline[1]["$facet"]["total"] == [{"$count": "count"}]
+    assert total == 11
+    assert vendors[0]["_id"] == str(dummy_vendor_data["_id"])
+
 
-    mock_vendor_collection.find.assert_called_once_with(query)
-    mock_vendor_collection.find.return_value.sort.assert_called_once_with("created_at", expected_sort_dir)
-    mock_vendor_collection.find.return_value.skip.assert_called_once_with((page - 1) * page_size)
-    mock_vendor_collection.find.return_value.limit.assert_called_once_with(page_size)
-    assert len(result) == 1
-    assert result[0]["_id"] == str(dummy_vendor_data["_id"])
+@pytest.mark.asyncio
+async def test_search_vendors_no_matches(crud, mock_vendor_collection):
+    mock_aggregate(mock_vendor_collection, [{"vendors": [], "total": []}])
+
+    vendors, total = await crud.search_vendors({"df_id": "df123"}, "desc", 1, 10)
+
+    assert vendors == []
+    assert total == 0
 
 
 @pytest.mark.asyncio
 async def test_get_filter_fields(crud, mock_vendor_collection, dummy_vendor_data):
     df_id = dummy_vendor_data["df_id"]
-    query = {"df_id": df_id, "status": {"$ne": "archived"}}
-
-    mock_vendor_collection.distinct.side_effect = [
-        ["USA", "IND"],
-        ["low", "medium"],
-        ["IT", "Finance"],
-        ["pass", "fail"],
-    ]
-    mock_vendor_collection.find.return_value.__aiter__.return_value = iter(
+    aggregate = mock_aggregate(
+        mock_vendor_collection,
         [
-            {"processing_category": ["marketing", "analytics"]},
-            {"processing_category": ["finance", "marketing"]},
-            {"processing_category": ["hr"]},
-            {},
-            {"processing_category": "invalid_type"},
-            {"processing_category": None},
-        ]
+            {
+                "dpr_country": [{"_id": "USA"}, {"_id": "IND"}, {"_id": None}],
+                "dpr_country_risk": [{"_id": "medium"}, {"_id": "low"}],
+                "industry": [{"_id": "IT"}, {"_id": "Finance"}],
+                "processing_category": [{"_id": "marketing"}, {"_id": "hr"}, {"_id": "analytics"}, {"_id": "finance"}],
+                "audit_result": [{"_id": "pass"}, {"_id": "fail"}, {"_id": ""}],
+            }
+        ],
     )
 
     result = await crud.get_filter_fields(df_id)
 
-    mock_vendor_collection.distinct.assert_any_call("dpr_country", query)
-    mock_vendor_collection.distinct.assert_any_call("dpr_country_risk", query)
-    mock_vendor_collection.distinct.assert_any_call("industry", query)
-    mock_vendor_collection.distinct.assert_any_call("audit_status.audit_result", query)
-
-    mock_vendor_collection.find.assert_called_with(query, {"processing_category": 1})
-
+    aggregate.assert_called_once()
+    pipeline = aggregate.call_args.args[0]
+    assert pipeline[0] == {"$match": {"df_id": df_id, "status": {"$ne": "archived"}}}
+    assert set(pipeline[1]["$facet"]) == {"dpr_country", "dpr_country_risk", "industry", "processing_category", "audit_result"}
     assert result == {
         "dpr_country": ["IND", "USA"],
         "dpr_country_risk": ["low", "medium"],
@@ -175,6 +192,48 @@ async def test_get_filter_fields(crud, mock_vendor_collection, dummy_vendor_data
     }
 
 
+def test_build_search_keys(dummy_vendor_data):
+    vendor = {**dummy_vendor_data, "dpr_name": "Acme Cloud", "processing_category": ["Marketing", "HR"]}
+
+    assert build_search_keys(vendor) == {
+        "dpr_name": "acme cloud",
+        "dpr_country": "usa",
+        "dpr_country_risk": "low",
+        "industry": "it",
+        "audit_result": "pass",
+        "processing_category": ["marketing", "hr"],
+    }
+    assert build_search_keys({"processing_category": "invalid_type"})["processing_category"] == []
+
+
+@pytest.mark.asyncio
+async def test_create_vendor_stores_search_keys(crud, mock_vendor_collection, dummy_vendor_data):
+    vendor = dummy_vendor_data.copy()
+
+    await crud.create_vendor(vendor)
+
+    inserted = mock_vendor_collection.insert_one.call_args.args[0]
+    assert inserted["search_keys"]["industry"] == "it"
+    assert inserted["search_keys"]["processing_category"] == ["marketing", "analytics"]
+
+
+@pytest.mark.asyncio
+async def test_backfill_search_keys(crud, mock_vendor_collection):
+    mock_vendor_collection.update_many.return_value = MagicMock(modified_count=3)
+
+    assert await crud.backfill_search_keys() == 3
+    mock_vendor_collection.update_many.assert_awaited_once_with({"search_keys": {"$exists": False}}, [SEARCH_KEYS_STAGE])
+
+
+@pytest.mark.asyncio
+async def test_ensure_search_indexes(crud, mock_vendor_collection):
+    await crud.ensure_search_indexes()
+
+    names = [call.kwargs["name"] for call in mock_vendor_collection.create_index.call_args_list]
+    assert "idx_df_vendor_text" in names
+    assert "idx_df_processing_category_created" in names
+
+
 @pytest.mark.asyncio
 async def test_archive_vendor(crud, mock_vendor_collection, dummy_vendor_data):
     vendor_id = str(dummy_vendor_data["_id"])
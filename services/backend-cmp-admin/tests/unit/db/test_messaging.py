@@ -0,0 +1,230 @@
+import asyncio
+import aio_pika
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.db.messaging import (
+    CONSENT_PROCESSING_SHARD_RETRY_EXCHANGE,
+    CONSENT_PROCESSING_SHARD_RETRY_QUEUE,
+    AsyncRabbitMQConnectionPool,
+    RabbitMQPublisher,
+    consent_processing_partition_key,
+    consent_processing_queue_for,
+    consent_processing_shard_queues,
+    declare_consent_processing_shards,
+    owned_consent_processing_shards,
+)
+
+
+def test_queue_for_is_stable_per_agreement():
+    submission = {"consent_artifact": {"artifact": {"agreement_id": "agr-1"}}}
+    otp = {"event_type": "otp_verification", "consent_artifact_id": "agr-1"}
+    expiry = {"event_type": "consent_expiry", "consent_artifact_id": "artifact-9", "agreement_id": "agr-1"}
+
+    queue = consent_processing_queue_for(submission, 8)
+
+    assert queue in consent_processing_shard_queues(8)
+    assert consent_processing_queue_for(dict(submission), 8) == queue
+    assert consent_processing_queue_for(otp, 8) == queue
+    assert consent_processing_queue_for(expiry, 8) == queue
+
+
+def test_partition_key_prefers_agreement_over_artifact():
+    assert consent_processing_partition_key({"consent_artifact_id": "artifact-9", "agreement_id": "agr-1"}) == "agr-1"
+    assert consent_processing_partition_key({"consent_artifact_id": "artifact-9"}) == "artifact-9"
+
+
+def test_growing_shard_count_moves_few_agreements():
+    keys = [{"agreement_id": f"agr-{i}"} for i in range(1000)]
+
+    moved = sum(consent_processing_queue_for(key, 8) != consent_processing_queue_for(key, 9) for key in keys)
+
+    # Jump hashing moves ~1/9 of the keys when going from 8 to 9 shards.
+    assert moved < 200
+
+
+def test_owned_shards_partition_every_shard_once():
+    owned = [owned_consent_processing_shards(index, 3, 8) for index in range(3)]
+
+    assert owned[0] == ["consent_processing_q.0", "consent_processing_q.3", "consent_processing_q.6"]
+    assert sorted(sum(owned, [])) == sorted(consent_processing_shard_queues(8))
+
+
+def test_owned_shards_single_worker_takes_all():
+    assert owned_consent_processing_shards(0, 1, 4) == consent_processing_shard_queues(4)
+
+
+@pytest.mark.asyncio
+async def test_retry_returns_to_original_shard():
+    channel = MagicMock()
+    retry_exchange = MagicMock()
+    retry_queue = MagicMock()
+    retry_queue.bind = AsyncMock()
+    channel.declare_exchange = AsyncMock(return_value=retry_exchange)
+    channel.declare_queue = AsyncMock(return_value=retry_queue)
+
+    await declare_consent_processing_shards(channel, 2, 5000)
+
+    declared = {call.args[0]: call.kwargs["arguments"] for call in channel.declare_queue.await_args_list}
+    # The retry queue dead-letters to the default exchange, i.e. back to the queue named by the routing key.
+    assert declared[CONSENT_PROCESSING_SHARD_RETRY_QUEUE] == {"x-dead-letter-exchange": "", "x-message-ttl": 5000}
+    for shard in consent_processing_shard_queues(2):
+        # No x-dead-letter-routing-key: a rejected message keeps its shard queue as routing key.
+        assert declared[shard] == {"x-dead-letter-exchange": CONSENT_PROCESSING_SHARD_RETRY_EXCHANGE}
+    assert [call.kwargs["routing_key"] for call in retry_queue.bind.await_args_list] == consent_processing_shard_queues(2)
+
+
+class FakeChannel:
+    def __init__(self):
+        self.is_closed = False
+        self.default_exchange = MagicMock(publish=AsyncMock())
+        self.exchanges = {}
+        self.get_exchange = AsyncMock(side_effect=self._get_exchange)
+        self.set_qos = AsyncMock()
+
+    async def _get_exchange(self, name):
+        return self.exchanges.setdefault(name, MagicMock(publish=AsyncMock()))
+
+
+@pytest.fixture
+def publisher_channel():
+    return FakeChannel()
+
+
+@pytest.fixture
+def publisher(publisher_channel):
+    pool = MagicMock()
+    pool.open_channel = AsyncMock(return_value=(MagicMock(), publisher_channel))
+    return RabbitMQPublisher(pool, ["plain_q", "webhook_main"], {"config_events_exchange": "fanout"}, channel_count=1, batch_size=2)
+
+
+@pytest.mark.asyncio
+async def test_publish_to_plain_queue_uses_default_exchange(publisher, publisher_channel):
+    await publisher.publish("plain_q", "hello")
+
+    message = publisher_channel.default_exchange.publish.await_args.args[0]
+    assert message.body == b"hello" and message.delivery_mode == aio_pika.DeliveryMode.PERSISTENT
+    assert publisher_channel.default_exchange.publish.await_args.kwargs["routing_key"] == "plain_q"
+    publisher_channel.get_exchange.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_publish_to_exchange_and_routed_queue(publisher, publisher_channel):
+    await publisher.publish("config_events_exchange", "{}")
+    await publisher.publish("webhook_main", "{}")
+
+    assert publisher_channel.exchanges["config_events_exchange"].publish.await_args.kwargs["routing_key"] == ""
+    assert publisher_channel.exchanges["webhook_exchange"].publish.await_args.kwargs["routing_key"] == "webhook_main"
+    publisher_channel.default_exchange.publish.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_publish_rejects_unknown_destination(publisher):
+    with pytest.raises(ValueError):
+        await publisher.publish("unknown_q", "{}")
+
+
+@pytest.mark.asyncio
+async def test_exchange_handles_are_cached_per_channel(publisher, publisher_channel):
+    await publisher.publish("config_events_exchange", "a")
+    await publisher.publish("config_events_exchange", "b")
+
+    assert publisher_channel.get_exchange.await_count == 1
+
+    other_channel = FakeChannel()
+    await publisher.publish("config_events_exchange", "c", channel=other_channel)
+
+    assert other_channel.get_exchange.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_publish_channel_replaced_when_closed(publisher, publisher_channel):
+    await publisher.publish("plain_q", "a")
+    publisher_channel.is_closed = True
+    replacement = FakeChannel()
+    publisher.pool.open_channel.return_value = (MagicMock(), replacement)
+
+    await publisher.publish("plain_q", "b")
+
+    assert replacement.default_exchange.publish.await_count == 1
+    assert publisher.pool.open_channel.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_publish_many_confirms_in_batches(publisher, publisher_channel):
+    in_flight, peak = 0, 0
+
+    async def confirm(message, routing_key):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+
+    publisher_channel.default_exchange.publish.side_effect = confirm
+
+    published = await publisher.publish_many("plain_q", ["a", "b", "c", aio_pika.Message(body=b"d")])
+
+    assert published == 4
+    assert peak == 2
+    bodies = [call.args[0].body for call in publisher_channel.default_exchange.publish.await_args_list]
+    assert bodies == [b"a", b"b", b"c", b"d"]
+
+
+@pytest.mark.asyncio
+async def test_publish_many_raises_when_a_confirm_fails(publisher, publisher_channel):
+    publisher_channel.default_exchange.publish.side_effect = [None, aio_pika.exceptions.DeliveryError(None, None), None, None]
+
+    with pytest.raises(aio_pika.exceptions.DeliveryError):
+        await publisher.publish_many("plain_q", ["a", "b", "c", "d"])
+
+    # A nacked batch stops the publish; the next batch is never written.
+    assert publisher_channel.default_exchange.publish.await_count == 2
+
+
+def make_connection(channels):
+    connection = MagicMock()
+    connection.is_closed = False
+    connection.channel = AsyncMock(side_effect=channels)
+    return connection
+
+
+@pytest.mark.asyncio
+async def test_release_connection_returns_open_channel_to_pool():
+    pool = AsyncRabbitMQConnectionPool(pool_size=2, connection_count=1)
+    connection, channel = make_connection([]), FakeChannel()
+
+    await pool.release_connection(connection, channel)
+
+    assert await pool.get_connection() == (connection, channel)
+
+
+@pytest.mark.asyncio
+async def test_release_connection_replaces_closed_channel():
+    pool = AsyncRabbitMQConnectionPool(pool_size=2, connection_count=1)
+    replacement = FakeChannel()
+    connection = make_connection([replacement])
+    pool._connections = [connection]
+    closed = FakeChannel()
+    closed.is_closed = True
+
+    await pool.release_connection(connection, closed)
+
+    assert await pool.get_connection() == (connection, replacement)
+    connection.channel.assert_awaited_once_with(publisher_confirms=True)
+
+
+@pytest.mark.asyncio
+async def test_open_channel_replaces_closed_connection(monkeypatch):
+    pool = AsyncRabbitMQConnectionPool(pool_size=2, connection_count=1)
+    stale = make_connection([])
+    stale.is_closed = True
+    channel = FakeChannel()
+    fresh = make_connection([channel])
+    pool._connections = [stale]
+    monkeypatch.setattr(pool, "_connect", AsyncMock(return_value=fresh))
+
+    assert await pool.open_channel(prefetch_count=5) == (fresh, channel)
+    assert pool._connections == [fresh]
+    channel.set_qos.assert_awaited_once_with(prefetch_count=5)
+    stale.channel.assert_not_called()
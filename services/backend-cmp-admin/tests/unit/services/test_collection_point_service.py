@@ -12,6 +12,13 @@ from app.services.notice_service import NoticeService
 from app.services.data_fiduciary_service import DataFiduciaryService
 
 
+@pytest.fixture(autouse=True)
+def mock_publish_config_change(monkeypatch):
+    mock = AsyncMock()
+    monkeypatch.setattr("app.services.collection_point_service.publish_config_change", mock)
+    return mock
+
+
 @pytest.fixture
 def mock_collection_point_crud():
     return MagicMock(spec=CollectionPointCrud)
@@ -244,6 +251,7 @@ async def test_publish_collection_point_success(
     mock_minio_client,
     user_data,
     enriched_de_purpose_data,
+    mock_publish_config_change,
     monkeypatch,
 ):
     cp_id = "existing_cp_id"
@@ -284,6 +292,7 @@ async def test_publish_collection_point_success(
     mock_minio_client.presigned_get_object.assert_called_once()
     mock_collection_point_crud.update_cp_by_id.assert_called_once()
     mock_log.assert_called_once()
+    mock_publish_config_change.assert_awaited_once_with("cp", "df123", cp_id)
     assert result["cp_status"] == "published"
     assert result["notice_url"] == "http://minio/notice.html"
 
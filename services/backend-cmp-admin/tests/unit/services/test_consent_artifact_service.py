@@ -250,20 +250,36 @@ async def test_get_consent_artifact_by_id_no_user_df_id(consent_artifact_service
     assert exc.value.detail == "User Not Found"
 
 
+@pytest.fixture
+def sample_expiring_grants():
+    return [
+        {
+            "dp_id": "dp1",
+            "df_id": "df123",
+            "next_expiry": datetime.now() + timedelta(days=5),
+            "grants": [
+                {"de_id": "de1", "purpose_id": "p1", "purpose_title": "Purpose 1", "expires_at": datetime.now() + timedelta(days=5)},
+                {"de_id": "de1", "purpose_id": "p2", "purpose_title": "Purpose 2", "expires_at": datetime.now() + timedelta(days=10)},
+            ],
+        }
+    ]
+
+
 @pytest.mark.asyncio
-async def test_get_expiring_consents_success(
-    consent_artifact_service, mock_consent_artifact_crud, current_user_data, sample_consent_artifact, monkeypatch
-):
-    mock_cursor = AsyncMock()
-    mock_cursor.to_list.return_value = [sample_consent_artifact]
-    mock_consent_artifact_crud.get_expiring_consent_artifacts.return_value = mock_cursor
+async def test_get_expiring_consents_success(consent_artifact_service, mock_consent_artifact_crud, current_user_data, sample_expiring_grants, monkeypatch):
+    sample_expiring_grants[0]["grants"] = sample_expiring_grants[0]["grants"][:1]
+    mock_consent_artifact_crud.get_expiring_consents_by_dp = AsyncMock(return_value=sample_expiring_grants)
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.consent_artifact_service.log_business_event", mock_log)
 
     result = await consent_artifact_service.get_expiring_consents(df_id=current_user_data["df_id"], days_to_expire="7")
 
-    mock_consent_artifact_crud.get_expiring_consent_artifacts.assert_called_once()
+    mock_consent_artifact_crud.get_expiring_consents_by_dp.assert_called_once()
+    args, kwargs = mock_consent_artifact_crud.get_expiring_consents_by_dp.call_args
+    assert args[0] == "df123"
+    assert (args[2] - args[1]).days == 7
+    assert args[3:] == (0, 500)
     mock_log.assert_called_once()
     assert isinstance(result, list)
     assert len(result) == 1
@@ -273,14 +289,11 @@ async def test_get_expiring_consents_success(
 
 @pytest.mark.asyncio
 async def test_get_expiring_consents_no_matching_consents(consent_artifact_service, mock_consent_artifact_crud, current_user_data, monkeypatch):
-    mock_cursor = AsyncMock()
-    mock_cursor.to_list.return_value = []
-    mock_consent_artifact_crud.get_expiring_consent_artifacts.return_value = mock_cursor
+    mock_consent_artifact_crud.get_expiring_consents_by_dp = AsyncMock(return_value=[])
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.consent_artifact_service.log_business_event", mock_log)
 
-    mock_log.reset_mock()
     result = await consent_artifact_service.get_expiring_consents(df_id=current_user_data["df_id"], days_to_expire="7")
 
     assert result == []
@@ -289,20 +302,18 @@ async def test_get_expiring_consents_no_matching_consents(consent_artifact_servi
 
 @pytest.mark.asyncio
 async def test_get_expiring_consents_with_dp_id_filter(
-    consent_artifact_service, mock_consent_artifact_crud, current_user_data, sample_consent_artifact, monkeypatch
+    consent_artifact_service, mock_consent_artifact_crud, current_user_data, sample_expiring_grants, monkeypatch
 ):
-    mock_cursor = AsyncMock()
-    mock_cursor.to_list.return_value = [sample_consent_artifact]
-    mock_consent_artifact_crud.get_expiring_consent_artifacts.return_value = mock_cursor
+    mock_consent_artifact_crud.get_expiring_consents_by_dp = AsyncMock(return_value=sample_expiring_grants)
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.consent_artifact_service.log_business_event", mock_log)
 
-    mock_log.reset_mock()
-    result = await consent_artifact_service.get_expiring_consents(df_id=current_user_data["df_id"], dp_id="dp1", days_to_expire="15")
+    result = await consent_artifact_service.get_expiring_consents(df_id=current_user_data["df_id"], dp_id="dp1", days_to_expire="15", page=2, limit=10)
 
-    args, _ = mock_consent_artifact_crud.get_expiring_consent_artifacts.call_args
-    assert args[0]["dp_id"] == "dp1"
+    args, kwargs = mock_consent_artifact_crud.get_expiring_consents_by_dp.call_args
+    assert kwargs["dp_id"] == "dp1"
+    assert args[3:] == (10, 10)
     assert len(result) == 1
     assert result[0].dp_id == "dp1"
     assert len(result[0].expiring_purposes) == 2
@@ -311,21 +322,41 @@ async def test_get_expiring_consents_with_dp_id_filter(
 
 @pytest.mark.asyncio
 async def test_get_expiring_consents_default_30_days(
-    consent_artifact_service, mock_consent_artifact_crud, current_user_data, sample_consent_artifact, monkeypatch
+    consent_artifact_service, mock_consent_artifact_crud, current_user_data, sample_expiring_grants, monkeypatch
 ):
-    mock_cursor = AsyncMock()
-    mock_cursor.to_list.return_value = [sample_consent_artifact]
-    mock_consent_artifact_crud.get_expiring_consent_artifacts.return_value = mock_cursor
+    mock_consent_artifact_crud.get_expiring_consents_by_dp = AsyncMock(return_value=sample_expiring_grants)
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.consent_artifact_service.log_business_event", mock_log)
 
-    mock_log.reset_mock()
     result = await consent_artifact_service.get_expiring_consents(df_id=current_user_data["df_id"], days_to_expire=None)
 
-    args, _ = mock_consent_artifact_crud.get_expiring_consent_artifacts.call_args
-    assert "$lte" in args[0]["artifact.consent_scope.data_elements.consents.consent_expiry_period"]
+    args, _ = mock_consent_artifact_crud.get_expiring_consents_by_dp.call_args
+    assert (args[2] - args[1]).days == 30
     assert len(result) == 1
     assert result[0].dp_id == "dp1"
     assert len(result[0].expiring_purposes) == 2
     mock_log.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_expiring_consent_counts_cumulative(consent_artifact_service, mock_consent_artifact_crud, current_user_data):
+    mock_consent_artifact_crud.count_expiring_consents_by_window = AsyncMock(
+        return_value=[
+            {"dp_count": 2, "purpose_count": 3},
+            {"dp_count": 3, "purpose_count": 4},
+            {"dp_count": 3, "purpose_count": 4},
+        ]
+    )
+
+    result = await consent_artifact_service.get_expiring_consent_counts(current_user_data["df_id"])
+
+    args, kwargs = mock_consent_artifact_crud.count_expiring_consents_by_window.call_args
+    assert args[0] == "df123"
+    assert [(boundary - args[1]).days for boundary in args[2]] == [7, 15, 30]
+    assert kwargs["dp_id"] is None
+    assert result == {
+        "7": {"dp_count": 2, "purpose_count": 3},
+        "15": {"dp_count": 3, "purpose_count": 4},
+        "30": {"dp_count": 3, "purpose_count": 4},
+    }
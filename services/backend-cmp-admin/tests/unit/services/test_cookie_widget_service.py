@@ -1,4 +1,3 @@
-import os
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
@@ -292,10 +291,9 @@ async def test_prepare_widget_config_cookies_data_structure(
 # ---------------- TEST build_production_widget ---------------- #
 
 
-@pytest.mark.asyncio
-async def test_build_production_widget_success(widget_service, mock_s3_service, tmp_path):
-    """Test successful widget build and upload"""
-    config = {
+@pytest.fixture
+def widget_config():
+    return {
         "WIDGET_NAME": "test_widget",
         "COOKIES_DATA": {"essential": []},
         "DF_NAME": "Test Org",
@@ -307,121 +305,99 @@ async def test_build_production_widget_success(widget_service, mock_s3_service,
         "COOKIE_CONSENT_URL": "https://consent.example.com",
     }
 
-    # Create a fake built file
-    dist_dir = tmp_path / "app" / "cmp_widget" / "dist"
-    dist_dir.mkdir(parents=True)
-    fake_file = dist_dir / "test_widget-cmp-widget.iife.js"
-    fake_file.write_text("// widget code")
 
-    with patch("app.cmp_widget.generator.WidgetBuilder") as mock_builder_class:
-        mock_builder = MagicMock()
-        mock_builder_class.return_value = mock_builder
+@pytest.fixture(autouse=True)
+def runtime_already_uploaded(monkeypatch):
+    monkeypatch.setattr("app.services.cookie_widget_service._uploaded_runtime_versions", {"1.0.0"})
+    monkeypatch.setattr("app.services.cookie_widget_service.settings.COOKIE_WIDGET_RUNTIME_VERSION", "1.0.0")
+    monkeypatch.setattr("app.services.cookie_widget_service.settings.COOKIE_CONSENT_BUCKET", "consent-bucket")
+    monkeypatch.setattr("app.services.cookie_widget_service.settings.MINIO_BROWSER_URL", "s3.example.com")
 
-        with patch("os.path.exists", return_value=True):
-            with patch("app.services.cookie_widget_service.settings") as mock_settings:
-                mock_settings.COOKIE_CONSENT_BUCKET = "consent-bucket"
-                mock_settings.S3_URL = "s3.example.com"
 
-                result = await widget_service.build_production_widget(config=config, s3_service=mock_s3_service)
+@pytest.mark.asyncio
+async def test_build_production_widget_success(widget_service, mock_s3_service, widget_config):
+    """Config bundle and loader are uploaded without running a per-asset build"""
+    result = await widget_service.build_production_widget(config=widget_config, s3_service=mock_s3_service)
 
-        assert result["status"] == "success"
-        assert "test_widget" in result["message"]
-        assert "test_widget_.js" in result["url"]
-        assert "s3.example.com/consent-bucket/test_widget_.js" in result["url"]
+    assert result["status"] == "success"
+    assert "test_widget" in result["message"]
+    assert result["url"] == "https://s3.example.com/consent-bucket/test_widget_.js"
 
-        # Verify builder was called
-        mock_builder.build.assert_called_once()
+    uploaded = {c.kwargs["object_name"]: c.kwargs for c in mock_s3_service.put_object.call_args_list}
+    assert len(uploaded) == 2
+    bundle_name = next(name for name in uploaded if name.startswith("widget-configs/test_widget."))
+    assert uploaded[bundle_name]["metadata"]["Cache-Control"].endswith("immutable")
 
-        # Verify S3 upload was called
-        mock_s3_service.fput_object.assert_called_once()
+    loader = uploaded["test_widget_.js"]["data"].getvalue().decode()
+    assert bundle_name in loader
+    assert "widget-runtime/1.0.0/cmp-runtime.iife.js" in loader
 
 
 @pytest.mark.asyncio
-async def test_build_production_widget_file_not_found(widget_service, mock_s3_service):
-    """Test widget build when output file is not found"""
-    config = {
-        "WIDGET_NAME": "test_widget",
-        "COOKIES_DATA": {"essential": []},
-        "DF_NAME": "Test Org",
-        "PRIVACY_URL": "https://example.com/privacy",
-        "COOKIE_URL": "https://example.com/cookies",
-        "LOGO_URL": "https://example.com/logo.png",
-        "INPUT_JSON_FILE": "app/cmp_widget/static_cookie_translation.json",
-        "SRC_TEMPLATE_PATH": "app/cmp_widget/src/template.html",
-        "COOKIE_CONSENT_URL": "https://consent.example.com",
-    }
+async def test_build_production_widget_bundle_is_content_hashed(widget_service, mock_s3_service, widget_config):
+    """Identical config yields the same bundle name; changed config yields a new one"""
+    await widget_service.build_production_widget(config=widget_config, s3_service=mock_s3_service)
+    await widget_service.build_production_widget(config=widget_config, s3_service=mock_s3_service)
+    await widget_service.build_production_widget(config={**widget_config, "DF_NAME": "Other Org"}, s3_service=mock_s3_service)
+
+    bundle_names = [
+        c.kwargs["object_name"] for c in mock_s3_service.put_object.call_args_list if c.kwargs["object_name"].startswith("widget-configs/")
+    ]
+    assert bundle_names[0] == bundle_names[1]
+    assert bundle_names[2] != bundle_names[0]
 
-    with patch("app.cmp_widget.generator.WidgetBuilder") as mock_builder_class:
-        mock_builder = MagicMock()
-        mock_builder_class.return_value = mock_builder
 
-        with patch("os.path.exists", return_value=False):
-            result = await widget_service.build_production_widget(config=config, s3_service=mock_s3_service)
+@pytest.mark.asyncio
+async def test_build_production_widget_uploads_runtime_once(widget_service, mock_s3_service, widget_config, monkeypatch, tmp_path):
+    """The prebuilt runtime is uploaded when missing from the bucket"""
+    from minio.error import S3Error
 
-    assert result["status"] == "error"
-    assert "not found" in result["message"].lower()
-    assert result["url"] is None
+    runtime_file = tmp_path / "cmp-runtime.iife.js"
+    runtime_file.write_text("// runtime")
+    monkeypatch.setattr("app.services.cookie_widget_service._uploaded_runtime_versions", set())
+    monkeypatch.setattr("app.services.cookie_widget_service.WIDGET_RUNTIME_LOCAL_PATH", str(runtime_file))
+    mock_s3_service.stat_object.side_effect = S3Error("NoSuchKey", "missing", "resource", "req", "host", MagicMock())
 
-    # Verify S3 upload was NOT called
-    mock_s3_service.fput_object.assert_not_called()
+    await widget_service.build_production_widget(config=widget_config, s3_service=mock_s3_service)
+    await widget_service.build_production_widget(config=widget_config, s3_service=mock_s3_service)
 
+    mock_s3_service.stat_object.assert_called_once()
+    uploaded = [c.kwargs["object_name"] for c in mock_s3_service.put_object.call_args_list]
+    assert uploaded.count("widget-runtime/1.0.0/cmp-runtime.iife.js") == 1
 
-@pytest.mark.asyncio
-async def test_build_production_widget_build_exception(widget_service, mock_s3_service):
-    """Test widget build when builder raises exception"""
-    config = {
-        "WIDGET_NAME": "test_widget",
-        "COOKIES_DATA": {"essential": []},
-        "DF_NAME": "Test Org",
-        "PRIVACY_URL": "https://example.com/privacy",
-        "COOKIE_URL": "https://example.com/cookies",
-        "LOGO_URL": "https://example.com/logo.png",
-        "INPUT_JSON_FILE": "app/cmp_widget/static_cookie_translation.json",
-        "SRC_TEMPLATE_PATH": "app/cmp_widget/src/template.html",
-        "COOKIE_CONSENT_URL": "https://consent.example.com",
-    }
 
-    with patch("app.cmp_widget.generator.WidgetBuilder") as mock_builder_class:
-        mock_builder = MagicMock()
-        mock_builder.build.side_effect = Exception("Build process failed")
-        mock_builder_class.return_value = mock_builder
+@pytest.mark.asyncio
+async def test_build_production_widget_s3_exception(widget_service, mock_s3_service, widget_config):
+    """Test widget build when S3 upload fails"""
+    mock_s3_service.put_object.side_effect = Exception("S3 upload failed")
 
-        result = await widget_service.build_production_widget(config=config, s3_service=mock_s3_service)
+    result = await widget_service.build_production_widget(config=widget_config, s3_service=mock_s3_service)
 
     assert result["status"] == "error"
-    assert "Build process failed" in result["message"]
+    assert "S3 upload failed" in result["message"]
     assert result["url"] is None
 
 
-@pytest.mark.asyncio
-async def test_build_production_widget_s3_exception(widget_service, mock_s3_service):
-    """Test widget build when S3 upload fails"""
-    config = {
-        "WIDGET_NAME": "test_widget",
-        "COOKIES_DATA": {"essential": []},
-        "DF_NAME": "Test Org",
-        "PRIVACY_URL": "https://example.com/privacy",
-        "COOKIE_URL": "https://example.com/cookies",
-        "LOGO_URL": "https://example.com/logo.png",
-        "INPUT_JSON_FILE": "app/cmp_widget/static_cookie_translation.json",
-        "SRC_TEMPLATE_PATH": "app/cmp_widget/src/template.html",
-        "COOKIE_CONSENT_URL": "https://consent.example.com",
-    }
+# ---------------- TEST rebuild_widget_bundles ---------------- #
+
 
-    # Mock S3 service to raise exception
-    mock_s3_service.fput_object.side_effect = Exception("S3 upload failed")
+@pytest.mark.asyncio
+async def test_rebuild_widget_bundles(
+    widget_service, mock_cookie_service, mock_df_service, mock_s3_service, mock_user, sample_cookies, sample_df_info
+):
+    """DF details are loaded once and every asset with cookies gets a new bundle"""
+    mock_df_service.get_details.return_value = sample_df_info
 
-    with patch("app.cmp_widget.generator.WidgetBuilder") as mock_builder_class:
-        mock_builder = MagicMock()
-        mock_builder_class.return_value = mock_builder
+    async def published_cookies(asset_id, df_id):
+        if asset_id == "empty":
+            return {"cookies": [], "total_items": 0}
+        return {"cookies": sample_cookies, "total_items": 3}
 
-        with patch("os.path.exists", return_value=True):
-            with patch("app.services.cookie_widget_service.settings") as mock_settings:
-                mock_settings.COOKIE_CONSENT_BUCKET = "consent-bucket"
-                mock_settings.S3_URL = "s3.example.com"
+    mock_cookie_service._get_all_published_cookies_for_website.side_effect = published_cookies
 
-                result = await widget_service.build_production_widget(config=config, s3_service=mock_s3_service)
+    results = await widget_service.rebuild_widget_bundles(user=mock_user, asset_ids=["a1", "a2", "empty"], s3_service=mock_s3_service)
 
-    assert result["status"] == "error"
-    assert "S3 upload failed" in result["message"]
-    assert result["url"] is None
+    assert [r["status"] for r in results] == ["success", "success", "error"]
+    assert results[0]["url"].endswith("/a1_.js")
+    mock_df_service.get_details.assert_called_once_with(df_id="df123", user=mock_user)
+    assert mock_cookie_service.asset_service.update_asset_cookie_fields.await_count == 2
@@ -1,6 +1,8 @@
 import pytest
+from datetime import datetime, UTC
 from unittest.mock import AsyncMock, MagicMock
-from app.services.dashboard_service import DashboardService
+from app.services.dashboard_service import DashboardService, invalidate_dashboard_cache
+from app.services.dashboard_snapshot_service import DashboardSnapshotService
 
 
 # ---------------- FIXTURES ---------------- #
@@ -111,10 +113,37 @@ def mock_consent_artifact_crud():
 def mock_consent_artifact_service():
     """Mock ConsentArtifactService"""
     service = MagicMock()
-    service.get_expiring_consents = AsyncMock()
+    service.get_expiring_consent_counts = AsyncMock(
+        return_value={
+            "7": {"dp_count": 0, "purpose_count": 0},
+            "15": {"dp_count": 0, "purpose_count": 0},
+            "30": {"dp_count": 0, "purpose_count": 0},
+        }
+    )
     return service
 
 
+@pytest.fixture
+def mock_dashboard_snapshot_crud():
+    """Mock DashboardSnapshotCRUD with no stored snapshot"""
+    crud = MagicMock()
+    crud.get_snapshot = AsyncMock(return_value=None)
+    crud.save_snapshot = AsyncMock()
+    return crud
+
+
+@pytest.fixture
+def dashboard_snapshot_service(mock_consent_artifact_crud, mock_consent_artifact_service, mock_dashboard_snapshot_crud):
+    return DashboardSnapshotService(mock_consent_artifact_crud, mock_consent_artifact_service, mock_dashboard_snapshot_crud)
+
+
+@pytest.fixture(autouse=True)
+def clear_dashboard_cache():
+    invalidate_dashboard_cache()
+    yield
+    invalidate_dashboard_cache()
+
+
 @pytest.fixture
 def dashboard_service(
     mock_departments_crud,
@@ -128,8 +157,7 @@ def dashboard_service(
     mock_grievance_crud,
     mock_dpar_crud,
     mock_vendor_crud,
-    mock_consent_artifact_crud,
-    mock_consent_artifact_service,
+    dashboard_snapshot_service,
 ):
     """Create DashboardService instance with all mocked dependencies"""
     return DashboardService(
@@ -144,8 +172,7 @@ def dashboard_service(
         grievance_crud=mock_grievance_crud,
         dpar_crud=mock_dpar_crud,
         vendor_crud=mock_vendor_crud,
-        consent_artifact_crud=mock_consent_artifact_crud,
-        consent_artifact_service=mock_consent_artifact_service,
+        dashboard_snapshot_service=dashboard_snapshot_service,
     )
 
 
@@ -205,11 +232,11 @@ async def test_get_dashboard_detail_success(
 
     mock_consent_artifact_crud.count_filtered_consent_artifacts.return_value = 500
 
-    mock_consent_artifact_service.get_expiring_consents.side_effect = [
-        [{"id": "1"}, {"id": "2"}],  # 7 days - 2 items
-        [{"id": "1"}, {"id": "2"}, {"id": "3"}],  # 15 days - 3 items
-        [{"id": "1"}, {"id": "2"}, {"id": "3"}, {"id": "4"}],  # 30 days - 4 items
-    ]
+    mock_consent_artifact_service.get_expiring_consent_counts.return_value = {
+        "7": {"dp_count": 2, "purpose_count": 2},
+        "15": {"dp_count": 3, "purpose_count": 3},
+        "30": {"dp_count": 4, "purpose_count": 5},
+    }
 
     # Call the method
     result = await dashboard_service.get_dashboard_detail(mock_user)
@@ -275,10 +302,7 @@ async def test_get_dashboard_detail_success(
     mock_vendor_crud.count_vendors.assert_called_once_with({"df_id": "df123", "status": {"$ne": "archived"}})
 
     # Check expiring consents
-    assert mock_consent_artifact_service.get_expiring_consents.call_count == 3
-    mock_consent_artifact_service.get_expiring_consents.assert_any_call(df_id="df123", days_to_expire="7")
-    mock_consent_artifact_service.get_expiring_consents.assert_any_call(df_id="df123", days_to_expire="15")
-    mock_consent_artifact_service.get_expiring_consents.assert_any_call(df_id="df123", days_to_expire="30")
+    mock_consent_artifact_service.get_expiring_consent_counts.assert_called_once_with(df_id="df123")
 
 
 @pytest.mark.asyncio
@@ -325,7 +349,6 @@ async def test_get_dashboard_detail_with_zeros(
     mock_vendor_crud.count_vendors.return_value = 0
 
     mock_consent_artifact_crud.count_filtered_consent_artifacts.return_value = 0
-    mock_consent_artifact_service.get_expiring_consents.return_value = []
 
     result = await dashboard_service.get_dashboard_detail(mock_user)
 
@@ -404,7 +427,6 @@ async def test_get_dashboard_detail_response_structure(
     mock_dpar_crud.count_requests.return_value = 1
     mock_vendor_crud.count_vendors.return_value = 1
     mock_consent_artifact_crud.count_filtered_consent_artifacts.return_value = 1
-    mock_consent_artifact_service.get_expiring_consents.return_value = []
 
     result = await dashboard_service.get_dashboard_detail(mock_user)
 
@@ -478,7 +500,11 @@ async def test_get_dashboard_detail_data_types(
     mock_dpar_crud.count_requests.return_value = 15
     mock_vendor_crud.count_vendors.return_value = 8
     mock_consent_artifact_crud.count_filtered_consent_artifacts.return_value = 500
-    mock_consent_artifact_service.get_expiring_consents.return_value = [{"id": "1"}]
+    mock_consent_artifact_service.get_expiring_consent_counts.return_value = {
+        "7": {"dp_count": 1, "purpose_count": 1},
+        "15": {"dp_count": 1, "purpose_count": 1},
+        "30": {"dp_count": 1, "purpose_count": 1},
+    }
 
     result = await dashboard_service.get_dashboard_detail(mock_user)
 
@@ -506,3 +532,87 @@ async def test_get_dashboard_detail_data_types(
     assert isinstance(result["total_expiring_consent_in_seven_days"], int)
     assert isinstance(result["total_expiring_consent_in_fifteen_days"], int)
     assert isinstance(result["total_expiring_consent_in_thirty_days"], int)
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard_detail_uses_fresh_snapshot(
+    dashboard_service,
+    mock_user,
+    mock_departments_crud,
+    mock_roles_crud,
+    mock_users_crud,
+    mock_assets_crud,
+    mock_data_principal_crud,
+    mock_data_elements_crud,
+    mock_purposes_crud,
+    mock_collection_points_crud,
+    mock_grievance_crud,
+    mock_dpar_crud,
+    mock_vendor_crud,
+    mock_consent_artifact_crud,
+    mock_consent_artifact_service,
+    mock_dashboard_snapshot_crud,
+):
+    """Consent-derived counters come from a fresh snapshot without scanning artifacts"""
+    for crud, method in [
+        (mock_departments_crud, "count_departments"),
+        (mock_roles_crud, "count_roles"),
+        (mock_users_crud, "count_users"),
+        (mock_assets_crud, "count_assets"),
+        (mock_assets_crud, "get_total_cookie_count"),
+        (mock_data_principal_crud, "count"),
+        (mock_data_elements_crud, "count_data_elements"),
+        (mock_purposes_crud, "count_consent_purposes"),
+        (mock_collection_points_crud, "count_collection_points"),
+        (mock_grievance_crud, "count_grievances"),
+        (mock_dpar_crud, "count_requests"),
+        (mock_vendor_crud, "count_vendors"),
+    ]:
+        getattr(crud, method).return_value = 1
+    mock_assets_crud.get_assets_categories.return_value = []
+    mock_dashboard_snapshot_crud.get_snapshot.return_value = {
+        "df_id": "df123",
+        "computed_at": datetime.now(UTC),
+        "counters": {
+            "total_collected_data_elements": 11,
+            "total_collected_purposes": 12,
+            "total_collected_collection_points": 13,
+            "total_consent_artifacts": 14,
+            "total_expiring_consent_in_seven_days": 1,
+            "total_expiring_consent_in_fifteen_days": 2,
+            "total_expiring_consent_in_thirty_days": 3,
+        },
+    }
+
+    result = await dashboard_service.get_dashboard_detail(mock_user)
+
+    assert result["total_collected_data_elements"] == 11
+    assert result["total_consent_artifacts"] == 14
+    assert result["total_expiring_consent_in_thirty_days"] == 3
+    mock_consent_artifact_crud.count_collected_data_elements.assert_not_called()
+    mock_consent_artifact_service.get_expiring_consent_counts.assert_not_called()
+    mock_dashboard_snapshot_crud.save_snapshot.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard_detail_is_cached_per_df(
+    dashboard_service,
+    mock_user,
+    mock_departments_crud,
+    mock_assets_crud,
+    mock_data_principal_crud,
+    mock_dpar_crud,
+    mock_consent_artifact_crud,
+    mock_consent_artifact_service,
+):
+    """A second call inside the TTL is served from the in-process cache"""
+    mock_departments_crud.count_departments.return_value = 5
+    mock_assets_crud.get_assets_categories.return_value = []
+
+    first = await dashboard_service.get_dashboard_detail(mock_user)
+    mock_departments_crud.count_departments.return_value = 6
+    second = await dashboard_service.get_dashboard_detail(mock_user)
+
+    assert first["total_departments"] == 5
+    assert second["total_departments"] == 5
+    mock_departments_crud.count_departments.assert_called_once_with("df123")
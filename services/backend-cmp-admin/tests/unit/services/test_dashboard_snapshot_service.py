@@ -0,0 +1,89 @@
+import pytest
+from datetime import datetime, timedelta, UTC
+from unittest.mock import AsyncMock, MagicMock
+from app.services.dashboard_snapshot_service import DashboardSnapshotService
+
+
+@pytest.fixture
+def mock_consent_artifact_crud():
+    crud = MagicMock()
+    crud.count_collected_data_elements = AsyncMock(return_value=4)
+    crud.count_collected_purposes = AsyncMock(return_value=6)
+    crud.count_collected_collection_points = AsyncMock(return_value=2)
+    crud.count_filtered_consent_artifacts = AsyncMock(return_value=50)
+    return crud
+
+
+@pytest.fixture
+def mock_consent_artifact_service():
+    service = MagicMock()
+    service.get_expiring_consent_counts = AsyncMock(
+        return_value={
+            "7": {"dp_count": 1, "purpose_count": 1},
+            "15": {"dp_count": 2, "purpose_count": 3},
+            "30": {"dp_count": 3, "purpose_count": 5},
+        }
+    )
+    return service
+
+
+@pytest.fixture
+def mock_dashboard_snapshot_crud():
+    crud = MagicMock()
+    crud.get_snapshot = AsyncMock(return_value=None)
+    crud.save_snapshot = AsyncMock()
+    return crud
+
+
+@pytest.fixture
+def service(mock_consent_artifact_crud, mock_consent_artifact_service, mock_dashboard_snapshot_crud):
+    return DashboardSnapshotService(mock_consent_artifact_crud, mock_consent_artifact_service, mock_dashboard_snapshot_crud)
+
+
+@pytest.mark.asyncio
+async def test_get_consent_counters_builds_missing_snapshot(
+    service, mock_consent_artifact_crud, mock_consent_artifact_service, mock_dashboard_snapshot_crud
+):
+    counters = await service.get_consent_counters("df1")
+
+    assert counters == {
+        "total_collected_data_elements": 4,
+        "total_collected_purposes": 6,
+        "total_collected_collection_points": 2,
+        "total_consent_artifacts": 50,
+        "total_expiring_consent_in_seven_days": 1,
+        "total_expiring_consent_in_fifteen_days": 2,
+        "total_expiring_consent_in_thirty_days": 3,
+    }
+    mock_consent_artifact_crud.count_collected_data_elements.assert_called_once_with({"df_id": "df1"})
+    mock_consent_artifact_service.get_expiring_consent_counts.assert_called_once_with(df_id="df1")
+    mock_dashboard_snapshot_crud.save_snapshot.assert_called_once_with("df1", counters)
+
+
+@pytest.mark.asyncio
+async def test_get_consent_counters_returns_fresh_snapshot(service, mock_consent_artifact_crud, mock_dashboard_snapshot_crud):
+    mock_dashboard_snapshot_crud.get_snapshot.return_value = {
+        "df_id": "df1",
+        "computed_at": datetime.now(UTC),
+        "counters": {"total_consent_artifacts": 7},
+    }
+
+    counters = await service.get_consent_counters("df1")
+
+    assert counters == {"total_consent_artifacts": 7}
+    mock_consent_artifact_crud.count_filtered_consent_artifacts.assert_not_called()
+    mock_dashboard_snapshot_crud.save_snapshot.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_consent_counters_rebuilds_stale_snapshot(service, mock_dashboard_snapshot_crud):
+    mock_dashboard_snapshot_crud.get_snapshot.return_value = {
+        "df_id": "df1",
+        "computed_at": (datetime.now(UTC) - timedelta(days=1)).replace(tzinfo=None),
+        "counters": {"total_consent_artifacts": 7},
+    }
+
+    counters = await service.get_consent_counters("df1")
+
+    assert counters["total_consent_artifacts"] == 50
+    mock_dashboard_snapshot_crud.save_snapshot.assert_called_once()
@@ -24,6 +24,13 @@ from app.core.config import settings
 
 # ---------------- FIXTURES -----------------
 
+@pytest.fixture(autouse=True)
+def mock_publish_config_change(monkeypatch):
+    mock = AsyncMock()
+    monkeypatch.setattr("app.services.data_fiduciary_service.publish_config_change", mock)
+    return mock
+
+
 @pytest.fixture
 def mock_data_fiduciary_crud():
     return AsyncMock(spec=DataFiduciaryCRUD)
@@ -110,7 +117,7 @@ def mock_update_payload_partial():
 @pytest.mark.asyncio
 async def test_setup_success_full_payload(
     service, mock_data_fiduciary_crud, mock_user_collection, mock_user,
-    mock_update_payload_full, monkeypatch
+    mock_update_payload_full, mock_publish_config_change, monkeypatch
 ):
     df_id = "df123"
     mock_data_fiduciary_crud.get_data_fiduciary.return_value = {"_id": ObjectId(), "df_id": df_id}
@@ -136,6 +143,7 @@ async def test_setup_success_full_payload(
     assert result["msg"] == "Data fiduciary setup successfully"
     assert result["df_id"] == df_id
     mock_log_event.assert_called_once()
+    mock_publish_config_change.assert_awaited_once_with("df", df_id)
 
 
 @pytest.mark.asyncio
@@ -189,10 +189,8 @@ async def test_update_department_users_success_add_new_user(
         **sample_department_in_db,
         "department_admins": [current_user_data["_id"]],  # Make current_user a department admin
     }
-    mock_user_crud.get_user_by_id.return_value = sample_user_model  # For validation of new_user_id
-    mock_user_crud.get_user_by_id.return_value.df_id = current_user_data["df_id"]  # Ensure df_id matches
+    mock_user_crud.find_by_ids.return_value = [{"_id": new_user_id, "df_id": current_user_data["df_id"], "email": "new@example.com"}]
     mock_department_crud.update_department.return_value = MagicMock(modified_count=1)
-    mock_user_crud.add_department_to_user.return_value = None
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.department_service.log_business_event", mock_log)
@@ -200,9 +198,9 @@ async def test_update_department_users_success_add_new_user(
     result = await department_service.update_department_users(department_id, update_data, current_user_data, system_admin_role_id)
 
     mock_department_crud.find_by_id.assert_called_once_with(department_id)
-    mock_user_crud.get_user_by_id.assert_called_once_with(new_user_id)
+    mock_user_crud.find_by_ids.assert_called_once_with([new_user_id], {"df_id": 1, "email": 1})
     mock_department_crud.update_department.assert_called_once()
-    mock_user_crud.add_department_to_user.assert_called_once_with(new_user_id, department_id)
+    mock_user_crud.bulk_update_memberships.assert_called_once_with("user_departments", {new_user_id: [department_id]})
     mock_log.assert_called_once()
 
     assert result["message"] == "Department users and admins updated successfully"
@@ -284,7 +282,7 @@ async def test_update_department_users_invalid_user_id_format(
         **sample_department_in_db,
         "department_admins": [current_user_data["_id"]],
     }
-    mock_user_crud.get_user_by_id.side_effect = Exception("InvalidId")
+    mock_user_crud.find_by_ids.side_effect = Exception("InvalidId")
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.department_service.log_business_event", mock_log)
@@ -309,7 +307,7 @@ async def test_update_department_users_user_not_found(
         **sample_department_in_db,
         "department_admins": [current_user_data["_id"]],
     }
-    mock_user_crud.get_user_by_id.return_value = None
+    mock_user_crud.find_by_ids.return_value = []
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.department_service.log_business_event", mock_log)
@@ -319,7 +317,7 @@ async def test_update_department_users_user_not_found(
 
     assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
     assert f"User {non_existent_user_id} not found" in exc_info.value.detail
-    mock_user_crud.get_user_by_id.assert_called_once_with(non_existent_user_id)
+    mock_user_crud.find_by_ids.assert_called_once_with([non_existent_user_id], {"df_id": 1, "email": 1})
     mock_log.assert_called_once()
 
 
@@ -335,25 +333,7 @@ async def test_update_department_users_user_df_id_mismatch(
         **sample_department_in_db,
         "department_admins": [current_user_data["_id"]],
     }
-    # Mock return value correctly as a UserModel object
-    mismatch_user_model = UserModel(
-        _id=mismatch_user_id,
-        id=mismatch_user_id,
-        first_name="Mismatch",
-        last_name="User",
-        email="mismatch@example.com",
-        designation="Software Engineer",
-        contact=9876543210,
-        df_id="other_df",  # Mismatch df_id
-        token="mismatch_token",
-        is_email_verified=True,
-        user_roles=[],
-        user_departments=[],
-        user_plan=[],
-        password="mismatch_password",
-        created_at=datetime.now(UTC),
-    )
-    mock_user_crud.get_user_by_id.return_value = mismatch_user_model
+    mock_user_crud.find_by_ids.return_value = [{"_id": mismatch_user_id, "df_id": "other_df", "email": "mismatch@example.com"}]
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.department_service.log_business_event", mock_log)
@@ -363,7 +343,7 @@ async def test_update_department_users_user_df_id_mismatch(
 
     assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
     assert "does not belong to the same df_id as the department" in exc_info.value.detail
-    mock_user_crud.get_user_by_id.assert_called_once_with(mismatch_user_id)
+    mock_user_crud.find_by_ids.assert_called_once_with([mismatch_user_id], {"df_id": 1, "email": 1})
     mock_log.assert_called_once()
 
 
@@ -386,8 +366,7 @@ async def test_update_department_users_overlap_users_admins(
         **sample_department_in_db,
         "department_admins": [current_user_data["_id"]],
     }
-    mock_user_crud.get_user_by_id.return_value = sample_user_model
-    mock_user_crud.get_user_by_id.return_value.df_id = current_user_data["df_id"]
+    mock_user_crud.find_by_ids.return_value = [{"_id": user_id, "df_id": current_user_data["df_id"], "email": "user@example.com"}]
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.department_service.log_business_event", mock_log)
@@ -420,8 +399,7 @@ async def test_update_department_users_duplicate_existing_user(
         "department_admins": [current_user_data["_id"]],
         "department_users": [existing_user_id],  # User already exists
     }
-    mock_user_crud.get_user_by_id.return_value = sample_user_model
-    mock_user_crud.get_user_by_id.return_value.df_id = current_user_data["df_id"]
+    mock_user_crud.find_by_ids.return_value = [{"_id": existing_user_id, "df_id": current_user_data["df_id"], "email": "user@example.com"}]
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.department_service.log_business_event", mock_log)
@@ -454,8 +432,7 @@ async def test_update_department_users_duplicate_existing_admin(
         "department_admins": [current_user_data["_id"], existing_admin_id],  # Admin already exists
         "department_users": [],
     }
-    mock_user_crud.get_user_by_id.return_value = sample_user_model
-    mock_user_crud.get_user_by_id.return_value.df_id = current_user_data["df_id"]
+    mock_user_crud.find_by_ids.return_value = [{"_id": existing_admin_id, "df_id": current_user_data["df_id"], "email": "user@example.com"}]
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.department_service.log_business_event", mock_log)
@@ -481,11 +458,8 @@ async def test_update_department_users_promote_user_to_admin(
         "department_users": [promoted_user_id],  # User is currently a regular user
         "department_admins": [current_user_data["_id"]],  # Current user is an admin
     }
-    mock_user_crud.get_user_by_id.return_value = sample_user_model
-    mock_user_crud.get_user_by_id.return_value.id = promoted_user_id
-    mock_user_crud.get_user_by_id.return_value.df_id = current_user_data["df_id"]
+    mock_user_crud.find_by_ids.return_value = [{"_id": promoted_user_id, "df_id": current_user_data["df_id"], "email": "user@example.com"}]
     mock_department_crud.update_department.return_value = MagicMock(modified_count=1)
-    mock_user_crud.add_department_to_user.return_value = None
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.department_service.log_business_event", mock_log)
@@ -511,11 +485,8 @@ async def test_update_department_users_demote_admin_to_user(
         "department_users": [],
         "department_admins": [current_user_data["_id"], demoted_admin_id],  # Admin is currently an admin
     }
-    mock_user_crud.get_user_by_id.return_value = sample_user_model
-    mock_user_crud.get_user_by_id.return_value.id = demoted_admin_id
-    mock_user_crud.get_user_by_id.return_value.df_id = current_user_data["df_id"]
+    mock_user_crud.find_by_ids.return_value = [{"_id": demoted_admin_id, "df_id": current_user_data["df_id"], "email": "user@example.com"}]
     mock_department_crud.update_department.return_value = MagicMock(modified_count=1)
-    mock_user_crud.add_department_to_user.return_value = None
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.department_service.log_business_event", mock_log)
@@ -540,8 +511,7 @@ async def test_update_department_users_db_update_error(
         **sample_department_in_db,
         "department_admins": [current_user_data["_id"]],
     }
-    mock_user_crud.get_user_by_id.return_value = sample_user_model
-    mock_user_crud.get_user_by_id.return_value.df_id = current_user_data["df_id"]
+    mock_user_crud.find_by_ids.return_value = [{"_id": new_user_id, "df_id": current_user_data["df_id"], "email": "user@example.com"}]
     mock_department_crud.update_department.side_effect = Exception("DB update error")
 
     mock_log = AsyncMock()
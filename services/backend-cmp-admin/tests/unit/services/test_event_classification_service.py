@@ -164,3 +164,129 @@ async def test_event_classification_logic(classification_service, mock_webhooks_
     assert "classification_timestamp" in payload_sent
 
     assert result["event_ids"] == ["evt999"]
+
+
+async def test_classify_compact_changes_routes_to_dpr_webhook(classification_service, mock_webhooks_service):
+    event = {
+        "schema_version": 2,
+        "event_type": "consent_withdrawn",
+        "df_id": "df123",
+        "dp_id": "dp789",
+        "changes": [
+            {"de_id": "de1", "purpose_id": "p1", "old_status": "approved", "new_status": "denied", "data_processor_ids": ["dpr1"]},
+            {"de_id": "de1", "purpose_id": "p2", "old_status": None, "new_status": "denied", "data_processor_ids": ["dpr2"]},
+        ],
+    }
+
+    mock_webhooks_service.list_webhooks.return_value = [
+        {"_id": "w3", "webhook_for": "dpr", "dpr_id": "dpr1", "subscribed_events": ["CONSENT_WITHDRAWN"]},
+    ]
+    mock_webhooks_service._publish_webhook_event.return_value = "evt789"
+
+    result = await classification_service.classify_and_publish_event(event)
+
+    assert result["event_ids"] == ["evt789"]
+    payload = mock_webhooks_service._publish_webhook_event.call_args.kwargs["payload"]
+    assert "changes" not in payload
+    assert payload["purposes"] == [
+        {
+            "de_id": "de1",
+            "title": None,
+            "purpose_id": "p1",
+            "purpose_title": None,
+            "consent_status": "denied",
+            "previous_consent_status": "approved",
+            "data_processors": [{"data_processor_id": "dpr1"}],
+        }
+    ]
+
+
+def v1_flattened_purposes(data_elements):
+    """The purposes list schema 1 consent events carried: data element fields merged with each consent."""
+    purposes = []
+    for element in data_elements:
+        de_base = {
+            "de_id": element.get("de_id"),
+            "de_hash_id": element.get("de_hash_id"),
+            "title": element.get("title"),
+            "data_retention_period": element.get("data_retention_period"),
+        }
+        for consent in element.get("consents", []):
+            purposes.append({**de_base, **consent})
+    return purposes
+
+
+async def test_compact_changes_webhook_body_matches_v1_shape(mock_webhooks_service):
+    data_elements = [
+        {
+            "de_id": "de1",
+            "de_hash_id": "deh1",
+            "title": "Email",
+            "data_retention_period": "2027-01-01T00:00:00",
+            "consents": [
+                {
+                    "purpose_id": "p1",
+                    "purpose_hash_id": "ph1",
+                    "purpose_title": "Marketing",
+                    "consent_status": "denied",
+                    "consent_mode": "STORE",
+                    "cross_border": True,
+                    "is_legal_mandatory": False,
+                    "data_processors": [
+                        {"data_processor_id": "dpr1", "data_processor_name": "Mailer", "cross_border_data_transfer": True},
+                    ],
+                }
+            ],
+        }
+    ]
+    artifact_collection = MagicMock()
+    artifact_collection.find_one = AsyncMock(return_value={"artifact": {"consent_scope": {"data_elements": data_elements}}})
+    service = EventClassificationService(webhooks_service=mock_webhooks_service, consent_artifact_collection=artifact_collection)
+
+    v1_event = {
+        "dp_id": "dp789",
+        "df_id": "df123",
+        "cp_name": "Signup",
+        "event_type": "consent_withdrawn",
+        "timestamp": "2026-10-19T00:00:00Z",
+        "purposes": v1_flattened_purposes(data_elements),
+    }
+    v2_event = {
+        "schema_version": 2,
+        "event_id": "req:consent_withdrawn",
+        "dp_id": "dp789",
+        "df_id": "df123",
+        "cp_id": "cp1",
+        "cp_name": "Signup",
+        "agreement_id": "ag1",
+        "version": 2,
+        "event_type": "consent_withdrawn",
+        "timestamp": "2026-10-19T00:00:00Z",
+        "changes": [
+            {"de_id": "de1", "de_title": "Email", "purpose_id": "p1", "purpose_title": "Marketing", "old_status": "approved", "new_status": "denied", "data_processor_ids": ["dpr1"]}
+        ],
+    }
+    mock_webhooks_service.list_webhooks.return_value = [
+        {"_id": "w1", "webhook_for": "df", "subscribed_events": ["CONSENT_WITHDRAWN"]},
+        {"_id": "w2", "webhook_for": "dpr", "dpr_id": "dpr1", "subscribed_events": ["CONSENT_WITHDRAWN"]},
+    ]
+    mock_webhooks_service._publish_webhook_event.return_value = "evt1"
+
+    await service.classify_and_publish_event(v1_event)
+    v1_bodies = [call.kwargs["payload"] for call in mock_webhooks_service._publish_webhook_event.call_args_list]
+    mock_webhooks_service._publish_webhook_event.reset_mock()
+
+    await service.classify_and_publish_event(v2_event)
+    v2_bodies = [call.kwargs["payload"] for call in mock_webhooks_service._publish_webhook_event.call_args_list]
+
+    artifact_collection.find_one.assert_awaited_with({"artifact.agreement_id": "ag1"}, {"artifact.consent_scope.data_elements": 1})
+    assert len(v2_bodies) == len(v1_bodies) == 2
+    for v1_body, v2_body in zip(v1_bodies, v2_bodies):
+        # Version 2 only adds fields; every schema 1 field is present with the same value.
+        assert "changes" not in v2_body
+        for key, value in v1_body.items():
+            if key in ("purposes", "classification_timestamp"):
+                continue
+            assert v2_body[key] == value
+        assert [{k: v for k, v in p.items() if k != "previous_consent_status"} for p in v2_body["purposes"]] == v1_body["purposes"]
+        assert all(p["previous_consent_status"] == "approved" for p in v2_body["purposes"])
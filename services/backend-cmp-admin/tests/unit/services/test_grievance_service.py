@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, AsyncMock
 from fastapi import HTTPException
-from app.services.grievance_service import GrievanceService
+from app.services.grievance_service import GrievanceService, invalidate_grievance_counts
 from app.crud.grievance_crud import GrievanceCRUD
 from datetime import datetime, UTC
 from bson import ObjectId
@@ -22,24 +22,68 @@ def service(mock_grievance_crud, mock_customer_notification_collection):
 def mock_user():
     return {"_id": "user123", "email": "test@example.com", "df_id": "df123"}
 
+@pytest.fixture(autouse=True)
+def clear_grievance_count_cache():
+    invalidate_grievance_counts()
+    yield
+    invalidate_grievance_counts()
+
 @pytest.mark.asyncio
 async def test_get_all_grievances_success(service, mock_grievance_crud, mock_user, monkeypatch):
     mock_grievance_crud.count_grievances.return_value = 2
-    mock_grievance_crud.get_grievances.return_value = [
-        {"_id": ObjectId(), "subject": "Grievance 1"},
-        {"_id": ObjectId(), "subject": "Grievance 2"},
-    ]
+    mock_grievance_crud.get_grievances.return_value = (
+        [{"_id": str(ObjectId()), "subject": "Grievance 1"}, {"_id": str(ObjectId()), "subject": "Grievance 2"}],
+        None,
+    )
     mock_log_business_event = AsyncMock()
     monkeypatch.setattr("app.services.grievance_service.log_business_event", mock_log_business_event)
 
     result = await service.get_all_grievances(mock_user, page=1, page_size=2)
 
-    mock_grievance_crud.count_grievances.assert_called_once()
-    mock_grievance_crud.get_grievances.assert_called_once_with(0, 2)
+    mock_grievance_crud.count_grievances.assert_called_once_with(query={"df_id": "df123"})
+    mock_grievance_crud.get_grievances.assert_called_once_with({"df_id": "df123"}, 2, sort_order="desc", after=None, skip=0)
     mock_log_business_event.assert_called_once()
     assert result["status"] == "success"
     assert len(result["data"]) == 2
     assert result["pagination"]["total"] == 2
+    assert result["pagination"]["next_cursor"] is None
+
+@pytest.mark.asyncio
+async def test_get_all_grievances_filters_and_caches_count(service, mock_grievance_crud, mock_user, monkeypatch):
+    mock_grievance_crud.count_grievances.return_value = 40
+    mock_grievance_crud.get_grievances.return_value = ([], "cursor")
+    monkeypatch.setattr("app.services.grievance_service.log_business_event", AsyncMock())
+
+    for _ in range(2):
+        await service.get_all_grievances(mock_user, page=2, page_size=10, status=["open"], category="billing")
+
+    query = {"df_id": "df123", "request_status": "open", "category": "billing"}
+    mock_grievance_crud.count_grievances.assert_called_once_with(query=query)
+    assert mock_grievance_crud.get_grievances.call_args.args == (query, 10)
+    assert mock_grievance_crud.get_grievances.call_args.kwargs["skip"] == 10
+
+@pytest.mark.asyncio
+async def test_get_all_grievances_rejects_bad_cursor(service, mock_grievance_crud, mock_user):
+    with pytest.raises(HTTPException) as exc:
+        await service.get_all_grievances(mock_user, after="garbage")
+
+    assert exc.value.status_code == 400
+    mock_grievance_crud.get_grievances.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_get_overdue_grievances_oldest_first(service, mock_grievance_crud, mock_user, monkeypatch):
+    mock_grievance_crud.count_grievances.return_value = 1
+    mock_grievance_crud.get_grievances.return_value = ([{"_id": "g1"}], None)
+    monkeypatch.setattr("app.services.grievance_service.log_business_event", AsyncMock())
+
+    result = await service.get_overdue_grievances(mock_user, older_than_days=7)
+
+    query = mock_grievance_crud.get_grievances.call_args.args[0]
+    assert query["df_id"] == "df123"
+    assert query["request_status"] == {"$in": ["open"]}
+    assert (datetime.now(UTC) - query["created_at"]["$lt"]).days == 7
+    assert mock_grievance_crud.get_grievances.call_args.kwargs["sort_order"] == "asc"
+    assert result["data"] == [{"_id": "g1"}]
 
 @pytest.mark.asyncio
 async def test_view_grievance_success(service, mock_grievance_crud, mock_user, monkeypatch):
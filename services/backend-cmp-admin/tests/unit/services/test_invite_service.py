@@ -184,15 +184,35 @@ async def test_verify_token_expired(invite_service, mock_invite_crud, mock_user_
 # --- Tests for get_all_invites ---
 @pytest.mark.asyncio
 async def test_get_all_invites_success(invite_service, mock_invite_crud, current_user_data, monkeypatch):
-    mock_invite_crud.get_invites.return_value = []
+    listing = {
+        "pending": [{"_id": "p1"}],
+        "accepted": [],
+        "expired": [],
+        "counts": {"pending": 4, "accepted": 2, "expired": 0},
+        "next_cursors": {"pending": "p1", "accepted": None, "expired": None},
+    }
+    mock_invite_crud.get_invites_by_status.return_value = listing
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.invite_service.log_business_event", mock_log)
 
-    result = await invite_service.get_all_invites(current_user_data)
+    cursor = str(ObjectId())
+    result = await invite_service.get_all_invites(current_user_data, page=1, page_size=1, accepted_after=cursor)
 
-    assert result == {"pending": [], "accepted": [], "expired": []}
-    mock_log.assert_called_once()
+    assert result == listing
+    mock_invite_crud.get_invites_by_status.assert_awaited_once_with(
+        "df123", 1, 1, cursors={"pending": None, "accepted": cursor, "expired": None}
+    )
+    assert mock_log.call_args.kwargs["context"]["total_invites"] == 6
+
+
+@pytest.mark.asyncio
+async def test_get_all_invites_rejects_bad_cursor(invite_service, mock_invite_crud, current_user_data):
+    with pytest.raises(HTTPException) as exc:
+        await invite_service.get_all_invites(current_user_data, pending_after="not-an-id")
+
+    assert exc.value.status_code == 400
+    mock_invite_crud.get_invites_by_status.assert_not_called()
 
 
 # --- Tests for resend_invites ---
@@ -7,7 +7,15 @@ from bson import ObjectId
 from app.services.role_service import RoleService
 from app.crud.role_crud import RoleCRUD
 from app.crud.user_crud import UserCRUD
-from app.schemas.role_schema import AddRole, UpdateRole, UpdateRolePermissions, UpdateRoleUser
+from app.schemas.role_schema import (
+    AddRole,
+    BulkRoleMembershipUpdate,
+    RoleMembershipChange,
+    RoutePermission,
+    UpdateRole,
+    UpdateRolePermissions,
+    UpdateRoleUser,
+)
 from app.schemas.auth_schema import UserInDB as User
 
 # --- Fixtures ---
@@ -170,7 +178,7 @@ async def test_update_role_users_success(
     sample_role_in_db["created_by"] = current_user_data["_id"]
 
     mock_role_crud.find_by_id.return_value = sample_role_in_db
-    mock_user_crud.get_user_by_id.return_value = sample_user_in_db
+    mock_user_crud.find_by_ids.return_value = [{"_id": user_id, "df_id": sample_user_in_db.df_id}]
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.role_service.log_business_event", mock_log)
@@ -178,9 +186,9 @@ async def test_update_role_users_success(
     result = await role_service.update_role_users(role_id, update_data, current_user_data, system_admin_role_id)
 
     mock_role_crud.find_by_id.assert_called_once_with(role_id)
-    mock_user_crud.get_user_by_id.assert_called_once_with(user_id)
+    mock_user_crud.find_by_ids.assert_called_once_with([user_id], {"df_id": 1, "email": 1})
     mock_role_crud.update_role_users.assert_called_once_with(role_id, [user_id])
-    mock_user_crud.add_role_to_user.assert_called_once_with(user_id, role_id)
+    mock_user_crud.bulk_update_memberships.assert_called_once_with("user_roles", {user_id: [role_id]})
     assert result["message"] == "Users added to role successfully"
     assert user_id in result["updated_users"]
     mock_log.assert_called_once()
@@ -213,7 +221,7 @@ async def test_update_role_permissions_success(role_service, mock_role_crud, cur
     sample_role_in_db["created_by"] = current_user_data["_id"]
 
     mock_role_crud.find_by_id.return_value = sample_role_in_db
-    mock_reset_role_policies = MagicMock()
+    mock_reset_role_policies = AsyncMock()
     monkeypatch.setattr("app.services.role_service.reset_role_policies", mock_reset_role_policies)
 
     mock_log = AsyncMock()
@@ -312,19 +320,97 @@ async def test_assign_roles_to_user_success(
     user_id = sample_user_in_db.id
     role_id = str(sample_role_in_db["_id"])
     mock_user_crud.get_user_by_id.return_value = sample_user_in_db
-    mock_role_crud.find_by_id.return_value = sample_role_in_db
+    mock_role_crud.find_by_ids.return_value = [sample_role_in_db]
 
     mock_log = AsyncMock()
     monkeypatch.setattr("app.services.role_service.log_business_event", mock_log)
 
     result = await role_service.assign_roles_to_user(user_id, [role_id], current_user_data, system_admin_role_id)
 
-    mock_user_crud.add_role_to_user.assert_called_once_with(user_id, role_id)
-    mock_role_crud.add_user_to_role.assert_called_once_with(role_id, user_id)
+    mock_role_crud.find_by_ids.assert_called_once_with([role_id])
+    mock_user_crud.bulk_update_memberships.assert_called_once_with("user_roles", {user_id: [role_id]})
+    mock_role_crud.add_user_to_roles.assert_called_once_with([role_id], user_id)
     assert result["message"] == "Roles assigned to user successfully"
     mock_log.assert_called_once()
 
 
+# --- Tests for bulk_update_role_memberships ---
+@pytest.mark.asyncio
+async def test_bulk_update_role_memberships_success(
+    role_service, mock_role_crud, mock_user_crud, current_user_data, sample_role_in_db, system_admin_role_id, monkeypatch
+):
+    role_id = str(sample_role_in_db["_id"])
+    kept_user, removed_user, added_user = str(ObjectId()), str(ObjectId()), str(ObjectId())
+    sample_role_in_db["role_users"] = [kept_user, removed_user]
+    update_data = BulkRoleMembershipUpdate(
+        roles=[
+            RoleMembershipChange(
+                role_id=role_id,
+                add_users=[added_user, kept_user],
+                remove_users=[removed_user],
+                routes_accessible=[RoutePermission(path="/roles", actions=["read", "read"])],
+            )
+        ]
+    )
+    mock_role_crud.find_by_ids.return_value = [sample_role_in_db]
+    mock_user_crud.find_by_ids.return_value = [{"_id": uid, "df_id": current_user_data["df_id"]} for uid in (kept_user, removed_user, added_user)]
+    mock_reset_roles_policies = AsyncMock(return_value=(1, 0))
+    monkeypatch.setattr("app.services.role_service.reset_roles_policies", mock_reset_roles_policies)
+    mock_log = AsyncMock()
+    monkeypatch.setattr("app.services.role_service.log_business_event", mock_log)
+
+    result = await role_service.bulk_update_role_memberships(update_data, current_user_data, system_admin_role_id)
+
+    mock_role_crud.find_by_ids.assert_called_once_with([role_id])
+    mock_user_crud.find_by_ids.assert_called_once()
+    routes = [{"path": "/roles", "actions": ["read"]}]
+    mock_role_crud.bulk_update_roles.assert_called_once_with({role_id: {"role_users": [kept_user, added_user], "routes_accessible": routes}})
+    mock_user_crud.bulk_update_memberships.assert_called_once_with("user_roles", {added_user: [role_id]}, {removed_user: [role_id]})
+    mock_reset_roles_policies.assert_called_once_with({role_id: routes})
+    assert result["users_added"] == 1
+    assert result["users_removed"] == 1
+    assert result["policies_added"] == 1
+    mock_log.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_role_memberships_user_in_other_df(
+    role_service, mock_role_crud, mock_user_crud, current_user_data, sample_role_in_db, system_admin_role_id, monkeypatch
+):
+    role_id = str(sample_role_in_db["_id"])
+    user_id = str(ObjectId())
+    update_data = BulkRoleMembershipUpdate(roles=[RoleMembershipChange(role_id=role_id, add_users=[user_id])])
+    mock_role_crud.find_by_ids.return_value = [sample_role_in_db]
+    mock_user_crud.find_by_ids.return_value = [{"_id": user_id, "df_id": "other_df"}]
+    monkeypatch.setattr("app.services.role_service.log_business_event", AsyncMock())
+
+    with pytest.raises(HTTPException) as exc_info:
+        await role_service.bulk_update_role_memberships(update_data, current_user_data, system_admin_role_id)
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+    mock_role_crud.bulk_update_roles.assert_not_called()
+    mock_user_crud.bulk_update_memberships.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_role_memberships_unauthorized(
+    role_service, mock_role_crud, current_user_data, sample_role_in_db, system_admin_role_id, monkeypatch
+):
+    role_id = str(sample_role_in_db["_id"])
+    sample_role_in_db["created_by"] = str(ObjectId())
+    update_data = BulkRoleMembershipUpdate(roles=[RoleMembershipChange(role_id=role_id, add_users=[str(ObjectId())])])
+    mock_role_crud.find_by_ids.return_value = [sample_role_in_db]
+    mock_log = AsyncMock()
+    monkeypatch.setattr("app.services.role_service.log_business_event", mock_log)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await role_service.bulk_update_role_memberships(update_data, current_user_data, system_admin_role_id)
+
+    assert exc_info.value.status_code == status.HTTP_403_FORBIDDEN
+    mock_role_crud.bulk_update_roles.assert_not_called()
+    mock_log.assert_called_once()
+
+
 # --- Tests for get_all_frontend_routes ---
 @pytest.mark.asyncio
 async def test_get_all_frontend_routes_success(role_service, current_user_data):
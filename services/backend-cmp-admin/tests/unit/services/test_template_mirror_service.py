@@ -0,0 +1,104 @@
+import pytest
+from datetime import datetime, UTC
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.template_mirror_service import TemplateMirrorService
+
+
+def make_response(status_code=200, body=None, etag=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {"ETag": etag} if etag else {}
+    response.json.return_value = body or {}
+    response.raise_for_status = MagicMock()
+    return response
+
+
+@pytest.fixture
+def mirror():
+    mirror = MagicMock()
+    mirror.get_state = AsyncMock(return_value={})
+    mirror.save_state = AsyncMock()
+    mirror.upsert_templates = AsyncMock(side_effect=lambda templates, synced_at: len(templates))
+    mirror.remove_stale = AsyncMock(return_value=1)
+    mirror.export_templates = AsyncMock(return_value=[{"id": "d1"}])
+    return mirror
+
+
+@pytest.fixture
+def http_client():
+    client = MagicMock()
+    client.get = AsyncMock()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_first_sync_pages_through_catalogue_and_marks_full(mirror, http_client):
+    http_client.get.side_effect = [
+        make_response(body={"data": [{"id": "d1"}, {"id": "d2"}], "total": 3}, etag='"v1"'),
+        make_response(body={"data": [{"id": "d3"}], "total": 3}),
+    ]
+    service = TemplateMirrorService({"data_elements": mirror}, http_client=http_client, page_size=2)
+
+    result = await service.sync_catalogue("data_elements")
+
+    assert result == {"kind": "data_elements", "full": True, "upserted": 3, "removed": 1, "not_modified": False}
+    first_call, second_call = http_client.get.call_args_list
+    assert first_call.kwargs["params"] == {"limit": 2, "offset": 0}
+    assert second_call.kwargs["params"] == {"limit": 2, "offset": 2}
+    mirror.remove_stale.assert_awaited_once()
+    saved = mirror.save_state.call_args.kwargs
+    assert saved["etag"] == '"v1"'
+    assert saved["full_sync_completed_at"] == saved["last_synced_at"]
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_sends_cursor_and_etag(mirror, http_client):
+    mirror.get_state.return_value = {"full_sync_completed_at": datetime.now(UTC), "etag": '"v1"', "updated_since": "2026-01-01T00:00:00+00:00"}
+    http_client.get.return_value = make_response(body={"data": [{"id": "d9"}], "total": 1}, etag='"v2"')
+    service = TemplateMirrorService({"data_elements": mirror}, http_client=http_client)
+
+    result = await service.sync_catalogue("data_elements")
+
+    call = http_client.get.call_args
+    assert call.kwargs["params"]["updated_since"] == "2026-01-01T00:00:00+00:00"
+    assert call.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert result["full"] is False
+    mirror.remove_stale.assert_not_awaited()
+    assert "full_sync_completed_at" not in mirror.save_state.call_args.kwargs
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_not_modified(mirror, http_client):
+    mirror.get_state.return_value = {"full_sync_completed_at": datetime.now(UTC), "etag": '"v1"'}
+    http_client.get.return_value = make_response(status_code=304)
+    service = TemplateMirrorService({"purposes": mirror}, http_client=http_client)
+
+    result = await service.sync_catalogue("purposes")
+
+    assert result["not_modified"] is True
+    mirror.upsert_templates.assert_not_awaited()
+    assert list(mirror.save_state.call_args.kwargs) == ["last_checked_at"]
+
+
+@pytest.mark.asyncio
+async def test_import_snapshot_replaces_mirror_and_marks_ready(mirror):
+    service = TemplateMirrorService({"purposes": MagicMock(), "data_elements": mirror})
+
+    counts = await service.import_snapshot({"exported_at": "2026-01-01T00:00:00+00:00", "data_elements": [{"id": "d1"}, {"id": "d2"}]})
+
+    assert counts == {"data_elements": 2}
+    mirror.remove_stale.assert_awaited_once()
+    saved = mirror.save_state.call_args.kwargs
+    assert saved["source"] == "snapshot"
+    assert saved["full_sync_completed_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_export_snapshot(mirror):
+    service = TemplateMirrorService({"data_elements": mirror})
+
+    snapshot = await service.export_snapshot()
+
+    assert snapshot["data_elements"] == [{"id": "d1"}]
+    assert "exported_at" in snapshot
@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, AsyncMock
 from fastapi import HTTPException, status
 from bson import ObjectId
 
+from app.services import vendor_service as vendor_service_module
 from app.services.vendor_service import VendorService
 from app.crud.vendor_crud import VendorCRUD
 from app.schemas.vendor_schema import CreateMyVendor
@@ -19,6 +20,20 @@ def mock_vendor_crud():
     return crud
 
 
+@pytest.fixture(autouse=True)
+def clear_facet_cache():
+    vendor_service_module.invalidate_vendor_facets()
+    yield
+    vendor_service_module.invalidate_vendor_facets()
+
+
+@pytest.fixture(autouse=True)
+def mock_publish_message(monkeypatch):
+    publish = AsyncMock()
+    monkeypatch.setattr("app.services.vendor_service.publish_message", publish)
+    return publish
+
+
 @pytest.fixture
 def vendor_service(mock_vendor_crud):
     """VendorService with mocked CRUD + mocked user collection."""
@@ -94,8 +109,7 @@ async def test_update_vendor_success(vendor_service, mock_vendor_crud, current_u
 # -------------------------------------------------------------------
 @pytest.mark.asyncio
 async def test_get_all_my_vendors_success(vendor_service, mock_vendor_crud, current_user_data, monkeypatch):
-    mock_vendor_crud.count_vendors.return_value = 0
-    mock_vendor_crud.get_vendors.return_value = []
+    mock_vendor_crud.search_vendors.return_value = ([], 0)
     mock_vendor_crud.get_filter_fields.return_value = {}
 
     mock_log = AsyncMock()
@@ -120,6 +134,81 @@ async def test_get_all_my_vendors_success(vendor_service, mock_vendor_crud, curr
     mock_log.assert_awaited()
 
 
+@pytest.mark.asyncio
+async def test_get_all_my_vendors_builds_indexed_query(vendor_service, mock_vendor_crud, current_user_data, monkeypatch):
+    mock_vendor_crud.search_vendors.return_value = ([{"_id": "v1"}], 1)
+    mock_vendor_crud.get_filter_fields.return_value = {"industry": ["IT"]}
+    monkeypatch.setattr("app.services.vendor_service.log_business_event", AsyncMock())
+
+    result = await vendor_service.get_all_my_vendors(
+        current_user=current_user_data,
+        dpr_country="USA",
+        dpr_country_risk=None,
+        industry="IT",
+        processing_category=["Marketing"],
+        cross_border=True,
+        sub_processor=None,
+        audit_result="Pass",
+        search="acme",
+        sort_order="desc",
+        page=1,
+        page_size=10,
+    )
+
+    query = mock_vendor_crud.search_vendors.call_args.args[0]
+    assert query == {
+        "df_id": "df123",
+        "status": {"$ne": "archived"},
+        "search_keys.dpr_country": "usa",
+        "search_keys.industry": "it",
+        "search_keys.processing_category": {"$in": ["marketing"]},
+        "cross_border": True,
+        "search_keys.audit_result": "pass",
+        "$text": {"$search": "acme"},
+    }
+    assert result["pagination"]["total_vendors"] == 1
+    assert result["filter_fields"] == {"industry": ["IT"]}
+
+
+@pytest.mark.asyncio
+async def test_filter_fields_cached_until_vendor_write(vendor_service, mock_vendor_crud, current_user_data, add_vendor_data, monkeypatch):
+    mock_vendor_crud.get_filter_fields.return_value = {"industry": ["IT"]}
+    mock_vendor_crud.create_vendor.return_value = MagicMock(inserted_id=ObjectId())
+    monkeypatch.setattr("app.services.vendor_service.log_business_event", AsyncMock())
+
+    await vendor_service.get_filter_fields("df123")
+    await vendor_service.get_filter_fields("df123")
+    assert mock_vendor_crud.get_filter_fields.await_count == 1
+
+    await vendor_service.create_or_update_vendor(None, add_vendor_data, current_user_data)
+    await vendor_service.get_filter_fields("df123")
+    assert mock_vendor_crud.get_filter_fields.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_vendor_write_broadcasts_facet_invalidation(vendor_service, mock_vendor_crud, current_user_data, add_vendor_data, mock_publish_message, monkeypatch):
+    mock_vendor_crud.create_vendor.return_value = MagicMock(inserted_id=ObjectId())
+    monkeypatch.setattr("app.services.vendor_service.log_business_event", AsyncMock())
+
+    await vendor_service.create_or_update_vendor(None, add_vendor_data, current_user_data)
+
+    exchange, body = mock_publish_message.await_args.args
+    assert exchange == vendor_service_module.VENDOR_CACHE_EVENTS_EXCHANGE
+    assert body == '{"df_id": "%s"}' % current_user_data["df_id"]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_failure_still_invalidates_locally(vendor_service, mock_vendor_crud, mock_publish_message):
+    mock_vendor_crud.get_filter_fields.return_value = {"industry": ["IT"]}
+    mock_publish_message.side_effect = RuntimeError("broker down")
+
+    await vendor_service.get_filter_fields("df123")
+    await vendor_service_module.broadcast_vendor_facets_invalidation("df123")
+    await vendor_service.get_filter_fields("df123")
+
+    assert mock_vendor_crud.get_filter_fields.await_count == 2
+
+
 # -------------------------------------------------------------------
 # GET ONE VENDOR
 # -------------------------------------------------------------------
@@ -0,0 +1,69 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.worker import consent_event_consumer as consumer
+
+
+def incoming(payload):
+    message = MagicMock()
+    message.body = json.dumps(payload).encode()
+    message.headers = {}
+    message.ack = AsyncMock()
+    message.nack = AsyncMock()
+    return message
+
+
+@pytest.fixture
+def deps():
+    receipts = MagicMock()
+    receipts.claim = AsyncMock(return_value=True)
+    receipts.complete = AsyncMock()
+    receipts.release = AsyncMock()
+    classifier = MagicMock()
+    classifier.classify_and_publish_event = AsyncMock()
+    with patch.object(consumer, "consent_event_receipt_crud", receipts), patch.object(
+        consumer, "consent_classification_service", classifier
+    ), patch.object(consumer, "logger", MagicMock(), create=True):
+        yield receipts, classifier
+
+
+@pytest.mark.asyncio
+async def test_event_is_processed_once_per_event_id(deps):
+    receipts, classifier = deps
+    payload = {"event_id": "agr-1:h:consent_granted", "dp_id": "dp1", "event_type": "consent_granted"}
+
+    first = incoming(payload)
+    await consumer.process_consent_event(first, MagicMock())
+    receipts.claim.return_value = False
+    duplicate = incoming(payload)
+    await consumer.process_consent_event(duplicate, MagicMock())
+
+    classifier.classify_and_publish_event.assert_awaited_once()
+    receipts.complete.assert_awaited_once_with("agr-1:h:consent_granted")
+    first.ack.assert_awaited_once()
+    duplicate.ack.assert_awaited_once()
+    receipts.release.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_failed_event_releases_its_claim_for_the_retry(deps):
+    receipts, classifier = deps
+    classifier.classify_and_publish_event.side_effect = RuntimeError("webhook down")
+    message = incoming({"event_id": "e1", "dp_id": "dp1", "event_type": "consent_granted"})
+
+    await consumer.process_consent_event(message, MagicMock())
+
+    receipts.complete.assert_not_awaited()
+    receipts.release.assert_awaited_once_with("e1")
+    message.nack.assert_awaited_once_with(requeue=False)
+
+
+@pytest.mark.asyncio
+async def test_event_without_event_id_is_not_deduplicated(deps):
+    receipts, classifier = deps
+
+    await consumer.process_consent_event(incoming({"dp_id": "dp1", "event_type": "consent_granted"}), MagicMock())
+
+    receipts.claim.assert_not_awaited()
+    classifier.classify_and_publish_event.assert_awaited_once()
@@ -0,0 +1,132 @@
+import json
+import pytest
+from datetime import datetime, UTC
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.worker import dp_external_processing_consumer as consumer
+
+
+def make_dp(system_id, email):
+    return consumer.BulkDpApiModel(
+        dp_system_id=system_id,
+        dp_identifiers=["email"],
+        dp_email=[email],
+        dp_mobile=[9999999999],
+        is_legacy=False,
+        created_at_df=datetime(2026, 1, 1, tzinfo=UTC),
+        last_activity=None,
+    )
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeAcquire:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, *args):
+        return False
+
+
+@pytest.fixture
+def conn():
+    connection = MagicMock()
+    connection.transaction = MagicMock(return_value=FakeTransaction())
+    connection.execute = AsyncMock()
+    connection.copy_records_to_table = AsyncMock()
+    connection.fetch = AsyncMock()
+    pool = MagicMock()
+    pool.acquire = MagicMock(return_value=FakeAcquire(connection))
+    with patch.object(consumer, "init_postgres_pool", AsyncMock(return_value=pool)):
+        yield connection
+
+
+def test_build_dpd_record_matches_staging_columns():
+    record = consumer.build_dpd_record(4, make_dp("S1", "A@B.COM"))
+
+    assert len(record) == len(consumer.DPD_COLUMNS) + 2
+    assert record[0] == 4 and record[1] is None
+    columns = dict(zip(["row_no", "failure_reason", *consumer.DPD_COLUMNS], record))
+    assert columns["dp_email"] == ["a@b.com"]
+    assert columns["dp_mobile"] == ["9999999999"]
+    assert columns["added_with"] == "/api/v1/dp-bulk-external"
+    assert len(columns["dp_e"]) == 1 and len(columns["dp_m"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_ingest_batch_copies_rows_and_returns_failures(conn):
+    conn.fetch.side_effect = [
+        [{"row_no": 1, "failure_reason": "Duplicate record in batch"}, {"row_no": 2, "failure_reason": "Duplicate record in database"}],
+        [{"dp_id": "x"}],
+    ]
+
+    inserted, failures = await consumer.ingest_batch([make_dp("S1", "a@b.com"), make_dp("S1", "c@d.com"), make_dp("S3", "e@f.com")])
+
+    assert inserted == 1
+    assert failures == {1: "Duplicate record in batch", 2: "Duplicate record in database"}
+    copy_args = conn.copy_records_to_table.call_args
+    assert copy_args.args[0] == "dpd_incoming"
+    assert [record[0] for record in copy_args.kwargs["records"]] == [0, 1, 2]
+    assert conn.fetch.call_args_list[1].args[0] == consumer.INSERT_SURVIVORS_SQL
+
+
+@pytest.mark.asyncio
+async def test_ingest_batch_empty_skips_database(conn):
+    assert await consumer.ingest_batch([]) == (0, {})
+    conn.execute.assert_not_called()
+
+
+def test_mark_duplicates_uses_indexed_predicates():
+    sql = consumer.MARK_DUPLICATES_SQL
+    assert "d.dp_system_id = k.value" in sql
+    assert "d.dp_email @> ARRAY[k.value]" in sql
+    assert "d.dp_mobile @> ARRAY[k.value]" in sql
+    assert "earlier.row_no < later.row_no" in sql
+
+
+def batch_message(payload):
+    message = MagicMock()
+    message.body = json.dumps(payload).encode()
+    message.ack = AsyncMock()
+    message.nack = AsyncMock()
+    message.reject = AsyncMock()
+    return message
+
+
+@pytest.fixture(autouse=True)
+def worker_logger():
+    # The module logger is created in __main__.
+    with patch.object(consumer, "logger", MagicMock(), create=True):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_handle_message_acks_after_reporting_batch():
+    message = batch_message({"df_id": "df1", "job_id": "job1", "batch_seq": 1, "batch_tag": None, "valid_data": []})
+
+    with patch.object(consumer, "ingest_batch", AsyncMock(return_value=(0, {}))), patch.object(consumer, "publish_message", AsyncMock()) as publish:
+        await consumer.handle_message(message)
+
+    assert publish.await_args.args[0] == "failed_queue"
+    message.ack.assert_awaited_once()
+    message.nack.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_handle_message_requeues_without_acking_on_failure():
+    message = batch_message({"df_id": "df1", "job_id": "job1", "batch_seq": 1, "batch_tag": None, "valid_data": []})
+
+    with patch.object(consumer, "ingest_batch", AsyncMock(side_effect=RuntimeError("postgres down"))):
+        await consumer.handle_message(message)
+
+    message.ack.assert_not_called()
+    message.nack.assert_awaited_once_with(requeue=True)
@@ -0,0 +1,53 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.worker import consent_expiry_consumer, data_expiry_consumer
+
+
+def incoming(payload):
+    message = MagicMock()
+    message.body = json.dumps(payload).encode()
+    message.ack = AsyncMock()
+    message.nack = AsyncMock()
+    return message
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "module, payload",
+    [
+        (consent_expiry_consumer, {"event_type": "consent_expiry", "consent_artifact_id": "artifact-9", "purpose_id": "p1"}),
+        (data_expiry_consumer, {"event_type": "data_retention_expiry", "consent_artifact_id": "artifact-9", "data_element_id": "de1"}),
+    ],
+)
+async def test_expiry_is_published_with_its_agreement_id(module, payload):
+    crud = MagicMock()
+    crud.get_agreement_id = AsyncMock(return_value="agr-1")
+    publish = AsyncMock()
+    message = incoming(payload)
+    handler = module.process_consent_expiry_event if module is consent_expiry_consumer else module.process_data_expiry_event
+
+    with patch.object(module, "consent_artifact_crud", crud), patch.object(module, "publish_consent_processing", publish), patch.object(
+        module, "logger", MagicMock(), create=True
+    ):
+        await handler(message, MagicMock())
+
+    crud.get_agreement_id.assert_awaited_once_with("artifact-9")
+    assert publish.await_args.args[0] == {**payload, "agreement_id": "agr-1"}
+    message.ack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_expiry_without_artifact_falls_back_to_artifact_key():
+    crud = MagicMock()
+    crud.get_agreement_id = AsyncMock(return_value=None)
+    publish = AsyncMock()
+    payload = {"event_type": "consent_expiry", "consent_artifact_id": "artifact-9"}
+
+    with patch.object(consent_expiry_consumer, "consent_artifact_crud", crud), patch.object(
+        consent_expiry_consumer, "publish_consent_processing", publish
+    ), patch.object(consent_expiry_consumer, "logger", MagicMock(), create=True):
+        await consent_expiry_consumer.process_consent_expiry_event(incoming(payload), MagicMock())
+
+    assert "agreement_id" not in publish.await_args.args[0]
@@ -0,0 +1,248 @@
+import io
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.worker import failed_records_consumer as consumer
+
+
+
+class FakeObject(io.BytesIO):
+    def release_conn(self):
+        pass
+
+
+class AsyncIter:
+    def __init__(self, items):
+        self.items = list(items)
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self.items)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+async def run_inline(func, *args):
+    return func(*args)
+
+
+def failed(system_id, reason="Duplicate record"):
+    return {"dp": {"dp_system_id": system_id, "dp_email": ["a@b.c"], "dp_mobile": [9999999999]}, "failure_reason": reason}
+
+
+@pytest.fixture
+def collections():
+    jobs = MagicMock()
+    jobs.find_one = AsyncMock()
+    jobs.find_one_and_update = AsyncMock()
+    jobs.update_one = AsyncMock()
+    parts = MagicMock()
+    parts.update_one = AsyncMock()
+    parts.count_documents = AsyncMock()
+    parts.delete_many = AsyncMock()
+    parts.distinct = AsyncMock(return_value=[])
+    with patch.object(consumer, "jobs_collection", jobs), patch.object(consumer, "parts_collection", parts), patch.object(
+        consumer, "run_blocking", run_inline
+    ):
+        yield jobs, parts
+
+
+def test_render_part_has_no_header():
+    rows = consumer._render_part([failed("dp1"), failed("dp2", "Invalid email")]).decode().splitlines()
+
+    assert rows == ["dp1,a@b.c,9999999999,Duplicate record", "dp2,a@b.c,9999999999,Invalid email"]
+
+
+def test_concatenated_parts_streams_header_then_parts_in_order():
+    objects = {"p1": b"dp1,x\n", "p2": b"dp2,y\n"}
+    s3_client = MagicMock()
+    s3_client.get_object.side_effect = lambda bucket, name: FakeObject(objects[name])
+
+    with patch.object(consumer, "s3_client", s3_client):
+        stream = consumer.ConcatenatedParts(["p1", "p2"])
+        chunks = []
+        while chunk := stream.read(4):
+            assert len(chunk) <= 4
+            chunks.append(chunk)
+
+    assert b"".join(chunks) == b"dp_system_id,dp_email,dp_mobile,failure_reason\r\ndp1,x\ndp2,y\n"
+    assert [call.args[1] for call in s3_client.get_object.call_args_list] == ["p1", "p2"]
+
+
+@pytest.mark.asyncio
+async def test_stage_part_without_failures_only_records_batch(collections):
+    _, parts = collections
+    s3_client = MagicMock()
+
+    with patch.object(consumer, "s3_client", s3_client):
+        await consumer.stage_part("job1", 3, [])
+
+    s3_client.put_object.assert_not_called()
+    assert parts.update_one.call_args.args[0] == {"_id": "job1:3"}
+    assert parts.update_one.call_args.args[1]["$set"]["object_name"] is None
+
+
+@pytest.mark.asyncio
+async def test_stage_part_writes_numbered_part(collections):
+    _, parts = collections
+    s3_client = MagicMock()
+
+    with patch.object(consumer, "s3_client", s3_client):
+        await consumer.stage_part("job1", 12, [failed("dp1")])
+
+    assert s3_client.put_object.call_args.args[1] == "failed_records/parts/job1/00000012.csv"
+    assert parts.update_one.call_args.args[1]["$set"]["failed_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_try_complete_job_waits_for_all_batches(collections):
+    jobs, parts = collections
+    jobs.find_one.return_value = {"_id": "job1", "df_id": "df1", "status": "open", "expected_batches": 3}
+    parts.count_documents.return_value = 2
+
+    await consumer.try_complete_job("job1")
+
+    jobs.find_one_and_update.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_try_complete_job_waits_for_end_of_upload(collections):
+    jobs, parts = collections
+    jobs.find_one.return_value = {"_id": "job1", "df_id": "df1", "status": "open"}
+
+    await consumer.try_complete_job("job1")
+
+    parts.count_documents.assert_not_called()
+    jobs.find_one_and_update.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_try_complete_job_skips_when_another_replica_claimed(collections):
+    jobs, parts = collections
+    jobs.find_one.return_value = {"_id": "job1", "df_id": "df1", "status": "open", "expected_batches": 1}
+    parts.count_documents.return_value = 1
+    jobs.find_one_and_update.return_value = None
+
+    await consumer.try_complete_job("job1")
+
+    jobs.update_one.assert_not_called()
+    parts.delete_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_try_complete_job_composes_and_cleans_up(collections):
+    jobs, parts = collections
+    job = {"_id": "job1abcdef", "df_id": "df1", "status": "open", "expected_batches": 2}
+    jobs.find_one.return_value = job
+    jobs.find_one_and_update.return_value = job
+    parts.count_documents.return_value = 2
+    parts.find = MagicMock(
+        side_effect=[
+            AsyncIter([{"object_name": "a", "failed_count": 2}, {"object_name": "b", "failed_count": 1}]),
+            AsyncIter([{"object_name": "a"}, {"object_name": "b"}]),
+        ]
+    )
+
+    with patch.object(consumer, "_compose_report") as compose, patch.object(consumer, "_remove_parts") as remove, patch.object(
+        consumer, "notify_report_ready", AsyncMock()
+    ) as notify:
+        await consumer.try_complete_job("job1abcdef")
+
+    part_names, object_name = compose.call_args.args
+    assert part_names == ["a", "b"]
+    assert object_name.startswith("failed_records/failed_records_df1_")
+    notify.assert_awaited_once_with("df1", object_name)
+    final = jobs.update_one.call_args.args[1]["$set"]
+    assert final["status"] == "complete" and final["failed_count"] == 3
+    remove.assert_called_once_with(["a", "b"])
+    parts.delete_many.assert_awaited_once_with({"job_id": "job1abcdef"})
+
+
+@pytest.mark.asyncio
+async def test_try_complete_job_marks_failed_when_compose_fails(collections):
+    jobs, parts = collections
+    job = {"_id": "job1", "df_id": "df1", "status": "open", "expected_batches": 1}
+    jobs.find_one.return_value = job
+    jobs.find_one_and_update.return_value = job
+    parts.count_documents.return_value = 1
+    parts.find = MagicMock(side_effect=[AsyncIter([{"object_name": "a", "failed_count": 1}]), AsyncIter([{"object_name": "a"}])])
+
+    with patch.object(consumer, "_compose_report", side_effect=RuntimeError("minio down")), patch.object(consumer, "_remove_parts") as remove:
+        with pytest.raises(RuntimeError):
+            await consumer.try_complete_job("job1")
+
+    assert jobs.update_one.call_args.args[1]["$set"]["status"] == "failed"
+    remove.assert_called_once_with(["a"])
+    parts.delete_many.assert_awaited_once_with({"job_id": "job1"})
+
+
+@pytest.mark.asyncio
+async def test_try_complete_job_partial_composes_what_is_staged(collections):
+    jobs, parts = collections
+    job = {"_id": "job1", "df_id": "df1", "status": "open"}
+    jobs.find_one.return_value = job
+    jobs.find_one_and_update.return_value = job
+    parts.count_documents.return_value = 1
+    parts.find = MagicMock(side_effect=[AsyncIter([]), AsyncIter([])])
+
+    await consumer.try_complete_job("job1", partial=True)
+
+    final = jobs.update_one.call_args.args[1]["$set"]
+    assert final["status"] == "complete" and final["partial"] is True and final["staged_batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_jobs_composes_overdue_and_discards_finished_parts(collections):
+    jobs, parts = collections
+    jobs.update_many = AsyncMock()
+    jobs.find = MagicMock(side_effect=[AsyncIter([{"_id": "overdue"}]), AsyncIter([{"_id": "done"}])])
+    parts.distinct.return_value = ["done", "open"]
+
+    with patch.object(consumer, "try_complete_job", AsyncMock()) as complete, patch.object(consumer, "discard_job_parts", AsyncMock()) as discard:
+        await consumer.sweep_jobs()
+
+    assert jobs.update_many.call_args.args[0]["status"] == "composing"
+    overdue_query = jobs.find.call_args_list[0].args[0]
+    assert overdue_query["status"] == "open" and len(overdue_query["$or"]) == 2
+    complete.assert_awaited_once_with("overdue", partial=True)
+    assert jobs.find.call_args_list[1].args[0] == {"_id": {"$in": ["done", "open"]}, "status": {"$in": ["complete", "failed"]}}
+    discard.assert_awaited_once_with("done")
+
+
+class ProcessedMessage:
+    def __init__(self, body):
+        self.body = body
+        self.requeue = None
+
+    def process(self, requeue=False):
+        self.requeue = requeue
+        return ProcessContext()
+
+
+class ProcessContext:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_handle_message_propagates_staging_errors_for_redelivery(collections):
+    message = ProcessedMessage(b'{"df_id": "df1", "job_id": "job1", "batch_seq": 2, "failed_records": []}')
+
+    with patch.object(consumer, "stage_part", AsyncMock(side_effect=RuntimeError("mongo down"))), patch.object(
+        consumer, "try_complete_job", AsyncMock()
+    ) as complete:
+        with pytest.raises(RuntimeError):
+            await consumer.handle_message(message)
+
+    assert message.requeue is True
+    complete.assert_not_called()
@@ -0,0 +1,160 @@
+import asyncio
+import pytest
+from aio_pika.message import ProcessContext
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.worker import runtime
+from app.worker.runtime import ConsumerRuntime, QueueConsumer
+
+
+def incoming():
+    message = MagicMock()
+    message.processed = False
+    message.reject = AsyncMock()
+    return message
+
+
+@pytest.fixture
+def broker():
+    """Patches the pool so `run` subscribes without RabbitMQ; yields the captured on_message callbacks."""
+    callbacks = {}
+    channel = MagicMock()
+    channel.is_closed = False
+    channel.close = AsyncMock()
+
+    async def declare_queue(name, durable=True):
+        queue = MagicMock()
+        queue.name = name
+
+        async def consume(callback):
+            callbacks[name] = callback
+            return f"tag-{name}"
+
+        queue.consume = consume
+        queue.cancel = AsyncMock()
+        return queue
+
+    channel.declare_queue = declare_queue
+    pool = MagicMock()
+    pool.init_pool = AsyncMock()
+    pool.open_channel = AsyncMock(return_value=(MagicMock(), channel))
+    pool.close_pool = AsyncMock()
+    with patch.object(runtime, "rabbitmq_pool", pool), patch.object(runtime, "declare_queues", AsyncMock()), patch.object(
+        ConsumerRuntime, "_install_signal_handlers"
+    ):
+        yield callbacks, channel, pool
+
+
+async def wait_for(condition):
+    while not condition():
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_in_flight_handlers_are_bounded_by_concurrency():
+    release = asyncio.Event()
+    running, peak = 0, 0
+
+    async def handler(message):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        running -= 1
+
+    consumer = QueueConsumer("q", handler, concurrency=2)
+    consumer_runtime = ConsumerRuntime([consumer])
+    on_message = consumer_runtime._on_message(consumer, asyncio.Semaphore(2))
+
+    for _ in range(5):
+        await on_message(incoming())
+    await wait_for(lambda: running == 2)
+    await asyncio.sleep(0.01)
+
+    assert peak == 2
+    assert consumer_runtime.metrics["q"].in_flight == 2
+    release.set()
+    await asyncio.gather(*consumer_runtime._tasks)
+    assert peak == 2
+    assert consumer_runtime.metrics["q"].processed == 5
+
+
+@pytest.mark.asyncio
+async def test_handler_error_rejects_unprocessed_message():
+    consumer = QueueConsumer("q", AsyncMock(side_effect=ValueError("boom")), concurrency=1)
+    consumer_runtime = ConsumerRuntime([consumer])
+    message = incoming()
+
+    await consumer_runtime._dispatch(consumer, asyncio.Semaphore(1), message)
+
+    message.reject.assert_awaited_once_with(requeue=False)
+    assert consumer_runtime.metrics["q"].failed == 1
+    assert consumer_runtime.metrics["q"].in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_handler_error_leaves_settled_message_alone():
+    consumer = QueueConsumer("q", AsyncMock(side_effect=ValueError("boom")), concurrency=1)
+    message = incoming()
+    message.processed = True
+
+    await ConsumerRuntime([consumer])._dispatch(consumer, asyncio.Semaphore(1), message)
+
+    message.reject.assert_not_awaited()
+
+
+class DeliveredMessage:
+    """Enough of aio_pika's IncomingMessage for its real `process()` context manager to ack and reject."""
+
+    def __init__(self, channel, fast):
+        self.channel = channel
+        self.fast = fast
+        self.processed = False
+        self.redelivered = False
+        self.ack = AsyncMock(side_effect=self._settle)
+        self.reject = AsyncMock(side_effect=self._settle)
+
+    async def _settle(self, *args, **kwargs):
+        self.processed = True
+
+    def process(self, requeue=False, reject_on_redelivered=False, ignore_processed=False):
+        return ProcessContext(self, requeue=requeue, reject_on_redelivered=reject_on_redelivered, ignore_processed=ignore_processed)
+
+
+@pytest.mark.asyncio
+async def test_stop_requeues_handlers_still_running_after_drain(broker):
+    callbacks, channel, pool = broker
+
+    async def close():
+        channel.is_closed = True
+
+    channel.close = AsyncMock(side_effect=close)
+    release_fast = asyncio.Event()
+
+    async def handler(message):
+        async with message.process():
+            await (release_fast.wait() if message.fast else asyncio.Event().wait())
+
+    consumer_runtime = ConsumerRuntime([QueueConsumer("q", handler, concurrency=2)])
+    fast, stuck = DeliveredMessage(channel, fast=True), DeliveredMessage(channel, fast=False)
+
+    with patch.object(runtime.settings, "WORKER_DRAIN_TIMEOUT_SECONDS", 0.05):
+        run = asyncio.create_task(consumer_runtime.run())
+        await wait_for(lambda: "q" in callbacks)
+        await callbacks["q"](fast)
+        await callbacks["q"](stuck)
+        await wait_for(lambda: consumer_runtime.metrics["q"].in_flight == 2)
+
+        consumer_runtime._stopping.set()
+        await asyncio.sleep(0)
+        release_fast.set()
+        await asyncio.wait_for(run, timeout=1)
+
+    fast.ack.assert_awaited_once()
+    # The channel was closed before the stuck handler was cancelled, so process() did not reject it
+    # and the broker requeues the unacked message.
+    stuck.ack.assert_not_awaited()
+    stuck.reject.assert_not_awaited()
+    assert not consumer_runtime._tasks
+    channel.close.assert_awaited_once()
+    pool.close_pool.assert_awaited_once()
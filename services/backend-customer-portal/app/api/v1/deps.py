@@ -4,6 +4,7 @@ from app.db.dependencies import (
     get_concur_master_db,
     get_dpar_requests_collection,
     get_consent_artifact_collection,
+    get_consent_active_state_collection,
 )
 from app.services.dpar_request_service import DPARRequestService
 from motor.motor_asyncio import AsyncIOMotorCollection
@@ -17,9 +18,10 @@ async def get_dpar_request_service(
     db: AsyncIOMotorCollection = Depends(get_concur_master_db),
     dpa_requests_collection: AsyncIOMotorCollection = Depends(get_dpar_requests_collection),
     consent_artifact_collection: AsyncIOMotorCollection = Depends(get_consent_artifact_collection),
+    active_consent_collection: AsyncIOMotorCollection = Depends(get_consent_active_state_collection),
 ) -> DPARRequestService:
 
-    return DPARRequestService(dpa_requests_collection, consent_artifact_collection)
+    return DPARRequestService(dpa_requests_collection, consent_artifact_collection, active_consent_collection)
 
 
 async def get_current_user(
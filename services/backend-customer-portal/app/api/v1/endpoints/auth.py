@@ -3,9 +3,9 @@ from fastapi import APIRouter, Depends, Header, Query
 
 from app.api.v1.deps import get_current_user
 from app.db.session import get_postgres_pool
-from app.db.dependencies import get_df_register_collection
 from app.services.auth_service import (
     handle_login,
+    handle_otp_delivery_status,
     handle_otp_verification,
     handle_resend_otp,
 )
@@ -20,10 +20,9 @@ async def dpar_login(
     mobile: Optional[str] = Query(None),
     df_id: Optional[str] = Header(None),
     pool=Depends(get_postgres_pool),
-    df_register_collection=Depends(get_df_register_collection),
 ):
     app_logger.info(f"API Call: /login-preference-center for email: {email}, mobile: {mobile}")
-    return await handle_login(email=email, mobile=mobile, df_id=df_id, pool=pool, df_register_collection=df_register_collection)
+    return await handle_login(email=email, mobile=mobile, df_id=df_id, pool=pool)
 
 
 @router.post("/validate-otp")
@@ -48,10 +47,15 @@ async def resend_otp(
     mobile: Optional[str] = Query(None),
     df_id: Optional[str] = Header(None),
     pool=Depends(get_postgres_pool),
-    df_register_collection=Depends(get_df_register_collection),
 ):
     app_logger.info(f"API Call: /resend-otp for email: {email}, mobile: {mobile}")
-    return await handle_resend_otp(email=email, mobile=mobile, df_id=df_id, pool=pool, df_register_collection=df_register_collection)
+    return await handle_resend_otp(email=email, mobile=mobile, df_id=df_id, pool=pool)
+
+
+@router.get("/otp-delivery/{delivery_id}")
+async def otp_delivery_status(delivery_id: str):
+    app_logger.info(f"API Call: /otp-delivery/{delivery_id}")
+    return await handle_otp_delivery_status(delivery_id)
 
 
 @router.get("/me")
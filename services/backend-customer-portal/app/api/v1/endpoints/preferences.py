@@ -2,7 +2,12 @@ from fastapi import APIRouter, Depends, Request
 from motor.motor_asyncio import AsyncIOMotorCollection
 
 from app.api.v1.deps import get_current_user
-from app.db.dependencies import get_consent_artifact_collection, get_dpar_requests_collection, get_grievance_collection
+from app.db.dependencies import (
+    get_consent_artifact_collection,
+    get_consent_latest_pointer_collection,
+    get_dpar_requests_collection,
+    get_grievance_collection,
+)
 from app.services.consent_transaction_service import ConsentTransactionService
 from app.core.logger import app_logger
 
@@ -14,9 +19,10 @@ async def get_all_consent_transactions(
     request: Request,
     current_user: dict = Depends(get_current_user),
     consent_artifact_collection: AsyncIOMotorCollection = Depends(get_consent_artifact_collection),
+    latest_pointer_collection: AsyncIOMotorCollection = Depends(get_consent_latest_pointer_collection),
 ):
     app_logger.info(f"API Call: /get-all-consent-transactions for dp_id: {current_user.get('dp_id')}")
-    service = ConsentTransactionService(consent_artifact_collection)
+    service = ConsentTransactionService(consent_artifact_collection, latest_pointer_collection=latest_pointer_collection)
     return await service.get_all_consent_transactions(
         dp_id=current_user.get("dp_id"),
     )
@@ -30,6 +30,15 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
     OTP_EXPIRY_SECONDS: int = 300
+    OTP_RESEND_COOLDOWN_SECONDS: int = 60
+    OTP_DELIVERY_CONCURRENCY: int = 20
+    OTP_DELIVERY_MAX_ATTEMPTS: int = 3
+    OTP_SMTP_POOL_SIZE: int = 4
+    OTP_SMTP_IDLE_SECONDS: int = 60
+    OTP_SMTP_CREDENTIALS_CACHE_SECONDS: int = 300
+    # Routes every OTP email to a local sink (python -m app.utils.smtp_sink) instead of the DF's SMTP server.
+    OTP_SMTP_SINK_HOST: str = ""
+    OTP_SMTP_SINK_PORT: int = 1025
 
     S3_URL: str
     MINIO_ROOT_USER: str
@@ -38,6 +47,10 @@ class Settings(BaseSettings):
     MINIO_BROWSER_URL: str
     CUSTOMER_PORTAL_BUCKET: str
     KYC_DOCUMENTS_BUCKET: str
+    UPLOAD_MAX_FILE_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_PART_SIZE_BYTES: int = 5 * 1024 * 1024
+    UPLOAD_CONCURRENCY: int = 4
+    UPLOAD_ALLOWED_CONTENT_TYPES: List[str] = ["application/pdf", "image/jpeg", "image/png"]
 
     RABBITMQ_HOST: str
     RABBITMQ_PORT: int = 5672
@@ -46,6 +59,14 @@ class Settings(BaseSettings):
     RABBITMQ_PASSWORD: str
     RABBITMQ_VHOST_NAME: str
     RABBITMQ_POOL_SIZE: int = 5
+    RABBITMQ_CONNECTION_COUNT: int = 2
+    RABBITMQ_PUBLISHER_CHANNELS: int = 4
+    RABBITMQ_PUBLISH_BATCH_SIZE: int = 200
+    CONSENT_PROCESSING_SHARDS: int = 8
+
+    NOTIFICATION_JOB_INTERVAL_SECONDS: int = 120
+    SCHEDULER_LEASE_SECONDS: int = 60
+    SCHEDULER_RUN_RETENTION_DAYS: int = 14
 
     class Config:
         case_sensitive = True
@@ -0,0 +1,209 @@
+import asyncio
+import os
+import random
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.logger import app_logger
+
+
+class LeaseLost(Exception):
+    """Raised inside a job when its lease has been taken over by another replica."""
+
+
+class JobLease:
+    """A Mongo-backed lease on one job partition.
+
+    Each acquisition increments `token`, so the token doubles as a fencing token:
+    a holder whose token is no longer current must stop writing.
+    """
+
+    def __init__(self, lease_collection: AsyncIOMotorCollection, name: str, owner: str, ttl_seconds: int):
+        self.lease_collection = lease_collection
+        self.name = name
+        self.owner = owner
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.token: Optional[int] = None
+
+    async def acquire(self) -> Optional[int]:
+        now = datetime.now(UTC)
+        try:
+            doc = await self.lease_collection.find_one_and_update(
+                {"_id": self.name, "$or": [{"expires_at": {"$lte": now}}, {"owner": self.owner}]},
+                {"$set": {"owner": self.owner, "acquired_at": now, "expires_at": now + self.ttl}, "$inc": {"token": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            return None
+        self.token = doc["token"]
+        return self.token
+
+    def _held_filter(self) -> Dict[str, Any]:
+        return {"_id": self.name, "owner": self.owner, "token": self.token}
+
+    async def renew(self) -> bool:
+        now = datetime.now(UTC)
+        result = await self.lease_collection.update_one(
+            {**self._held_filter(), "expires_at": {"$gt": now}},
+            {"$set": {"expires_at": now + self.ttl}},
+        )
+        return result.matched_count == 1
+
+    async def check(self):
+        """Fencing check for jobs to call between write batches."""
+        doc = await self.lease_collection.find_one({**self._held_filter(), "expires_at": {"$gt": datetime.now(UTC)}}, projection={"_id": 1})
+        if not doc:
+            raise LeaseLost(f"Lease {self.name} (token {self.token}) is no longer held by {self.owner}")
+
+    async def release(self):
+        await self.lease_collection.update_one(self._held_filter(), {"$set": {"expires_at": datetime.now(UTC)}})
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    func: Callable[[Optional[str], JobLease], Awaitable[Optional[Dict[str, Any]]]]
+    interval_seconds: int
+    partitions: Optional[Callable[[], Awaitable[List[Optional[str]]]]] = None
+
+
+class ClusterJobScheduler:
+    """Runs interval jobs once across all replicas.
+
+    A job may be split into partitions (e.g. one per df_id); every partition has its own
+    lease, so replicas share a large backlog instead of duplicating it, and a partition
+    still being worked on is never started twice. Every run is recorded in `run_collection`.
+    """
+
+    def __init__(
+        self,
+        lease_collection: AsyncIOMotorCollection,
+        run_collection: AsyncIOMotorCollection,
+        lease_seconds: int = 60,
+        run_retention_days: int = 14,
+        owner: Optional[str] = None,
+    ):
+        self.lease_collection = lease_collection
+        self.run_collection = run_collection
+        self.lease_seconds = lease_seconds
+        self.run_retention_days = run_retention_days
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.jobs: List[ScheduledJob] = []
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def ensure_indexes(self):
+        await self.run_collection.create_index([("job", 1), ("started_at", -1)], name="idx_job_started_at")
+        await self.run_collection.create_index(
+            "started_at", expireAfterSeconds=self.run_retention_days * 86400, name="idx_started_at_ttl"
+        )
+
+    def add_job(self, name: str, func, interval_seconds: int, partitions=None):
+        self.jobs.append(ScheduledJob(name=name, func=func, interval_seconds=interval_seconds, partitions=partitions))
+
+    def lease_for(self, job: ScheduledJob, partition: Optional[str]) -> JobLease:
+        name = job.name if job.partitions is None else f"{job.name}:{partition or '-'}"
+        return JobLease(self.lease_collection, name, self.owner, self.lease_seconds)
+
+    async def _run_with_heartbeat(self, job: ScheduledJob, partition: Optional[str], lease: JobLease):
+        work = asyncio.create_task(job.func(partition, lease))
+        renew_every = max(1, self.lease_seconds / 3)
+        try:
+            while True:
+                done, _ = await asyncio.wait({work}, timeout=renew_every)
+                if done:
+                    return work.result()
+                if not await lease.renew():
+                    raise LeaseLost(f"Lease {lease.name} expired while the job was running")
+        finally:
+            if not work.done():
+                work.cancel()
+                await asyncio.gather(work, return_exceptions=True)
+
+    async def run_partition(self, job: ScheduledJob, partition: Optional[str]) -> Optional[str]:
+        """Runs one partition if its lease can be taken; returns the run status or None if skipped."""
+        lease = self.lease_for(job, partition)
+        if await lease.acquire() is None:
+            return None
+
+        started_at = datetime.now(UTC)
+        started = time.monotonic()
+        run = await self.run_collection.insert_one(
+            {
+                "job": job.name,
+                "partition": partition,
+                "owner": self.owner,
+                "fencing_token": lease.token,
+                "status": "running",
+                "started_at": started_at,
+            }
+        )
+        status, counts, error = "succeeded", None, None
+        try:
+            counts = await self._run_with_heartbeat(job, partition, lease)
+        except LeaseLost as e:
+            status, error = "lease_lost", str(e)
+            app_logger.warning(f"Scheduled job {job.name} [{partition}] lost its lease: {e}")
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            status, error = "failed", str(e)
+            app_logger.error(f"Scheduled job {job.name} [{partition}] failed: {e}", exc_info=True)
+        finally:
+            await lease.release()
+            await self.run_collection.update_one(
+                {"_id": run.inserted_id},
+                {
+                    "$set": {
+                        "status": status,
+                        "finished_at": datetime.now(UTC),
+                        "duration_ms": int((time.monotonic() - started) * 1000),
+                        "counts": counts,
+                        "error": error,
+                    }
+                },
+            )
+        return status
+
+    async def run_job(self, job: ScheduledJob):
+        partitions = await job.partitions() if job.partitions else [None]
+        # Replicas walk the partitions in different orders so they pick up different ones first.
+        random.shuffle(partitions)
+        for partition in partitions:
+            if self._stopping.is_set():
+                break
+            await self.run_partition(job, partition)
+
+    async def _loop(self, job: ScheduledJob):
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            try:
+                await self.run_job(job)
+            except Exception as e:
+                app_logger.error(f"Scheduled job {job.name} could not be dispatched: {e}", exc_info=True)
+            delay = max(0, job.interval_seconds - (time.monotonic() - started))
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        self._stopping.clear()
+        self._tasks = [asyncio.create_task(self._loop(job)) for job in self.jobs]
+
+    async def stop(self):
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -54,6 +54,20 @@ async def get_consent_artifact_collection(
     return concur_master_db["consent_latest_artifacts"]
 
 
+async def get_consent_latest_pointer_collection(
+    concur_master_db: AsyncIOMotorDatabase = Depends(get_concur_master_db),
+) -> AsyncIOMotorCollection:
+    """Provides the 'consent_latest_pointers' collection."""
+    return concur_master_db["consent_latest_pointers"]
+
+
+async def get_consent_active_state_collection(
+    concur_master_db: AsyncIOMotorDatabase = Depends(get_concur_master_db),
+) -> AsyncIOMotorCollection:
+    """Provides the 'consent_active_state' collection."""
+    return concur_master_db["consent_active_state"]
+
+
 async def get_purpose_master_collection(
     concur_master_db: AsyncIOMotorDatabase = Depends(get_concur_master_db),
 ) -> AsyncIOMotorCollection:
@@ -93,6 +107,14 @@ def get_consent_artifact_collection_direct(app) -> AsyncIOMotorCollection:
     return get_concur_master_db_direct(app)["consent_latest_artifacts"]
 
 
+def get_consent_latest_pointer_collection_direct(app) -> AsyncIOMotorCollection:
+    return get_concur_master_db_direct(app)["consent_latest_pointers"]
+
+
+def get_consent_active_state_collection_direct(app) -> AsyncIOMotorCollection:
+    return get_concur_master_db_direct(app)["consent_active_state"]
+
+
 def get_notifications_collection_direct(app) -> AsyncIOMotorCollection:
     return get_concur_master_db_direct(app)["customer_notifications"]
 
@@ -101,6 +123,14 @@ def get_renewal_collection_direct(app) -> AsyncIOMotorCollection:
     return get_concur_master_db_direct(app)["renewal_notification"]
 
 
+def get_scheduler_lease_collection_direct(app) -> AsyncIOMotorCollection:
+    return get_concur_master_db_direct(app)["scheduler_leases"]
+
+
+def get_scheduler_job_run_collection_direct(app) -> AsyncIOMotorCollection:
+    return get_concur_master_db_direct(app)["scheduler_job_runs"]
+
+
 async def get_concur_logs_db(
     client: AsyncIOMotorClient = Depends(get_db_client),
 ) -> AsyncIOMotorDatabase:
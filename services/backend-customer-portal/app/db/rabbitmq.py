@@ -1,10 +1,18 @@
+import json
+
 import aio_pika
-import asyncio
 import httpx
-import time
-from typing import Optional, Tuple
+from typing import Iterable, Optional
 from app.core.config import settings
 from app.core.logger import app_logger
+from app.db.messaging import (
+    AsyncRabbitMQConnectionPool,
+    OutgoingMessage,
+    RabbitMQPublisher,
+    consent_processing_queue_for,
+    consent_processing_shard_queues,
+    declare_consent_processing_shards,
+)
 
 
 RABBITMQ_HOST = settings.RABBITMQ_HOST
@@ -15,8 +23,6 @@ RABBITMQ_PASSWORD = settings.RABBITMQ_PASSWORD
 RABBITMQ_VHOST = settings.RABBITMQ_VHOST_NAME
 RABBIT_API_URL = f"http://{RABBITMQ_HOST}:{RABBITMQ_MANAGEMENT_PORT}/api"
 POOL_SIZE = settings.RABBITMQ_POOL_SIZE
-RABBIT_MQ_RETRY_DELAY = 60
-RABBIT_MQ_RETRY_LIMIT = 10
 
 QUEUES = [
     "data_element_translation",
@@ -38,6 +44,7 @@ QUEUES = [
     "consent_processing_q",
     "consent_processing_retry_q",
     "consent_processing_dlq",
+    "otp_delivery_q",
 ]
 
 EXCHANGES = {
@@ -54,75 +61,19 @@ EXCHANGES = {
 
 QUEUES.extend(["consent_expiry_delay_queue", "consent_expiry_queue"])
 
+OTP_DELIVERY_QUEUE = "otp_delivery_q"
+
+# Declared separately from QUEUES because they carry dead-letter arguments.
+CONSENT_PROCESSING_SHARD_QUEUES = consent_processing_shard_queues(settings.CONSENT_PROCESSING_SHARDS)
 
-class AsyncRabbitMQConnectionPool:
-    """Async RabbitMQ Connection Pool using aio-pika with robust reconnection."""
-
-    def __init__(self, pool_size: int = POOL_SIZE):
-        self.pool_size = pool_size
-        self._pool: asyncio.Queue = asyncio.Queue()
-        self._initialized = False
-
-    async def _create_connection(self) -> Tuple[aio_pika.RobustConnection, aio_pika.Channel]:
-        """Creates a new aio-pika connection and channel."""
-        retry_times = 0
-        while retry_times <= RABBIT_MQ_RETRY_LIMIT:
-            try:
-                connection = await aio_pika.connect_robust(
-                    host=RABBITMQ_HOST,
-                    port=RABBITMQ_PORT,
-                    login=RABBITMQ_USER,
-                    password=RABBITMQ_PASSWORD,
-                    virtualhost=RABBITMQ_VHOST,
-                )
-                channel = await connection.channel()
-                await channel.set_qos(prefetch_count=20)
-                return connection, channel
-            except aio_pika.exceptions.CONNECTION_EXCEPTIONS as e:
-                retry_times += 1
-                app_logger.error(f"Failed to connect to RabbitMQ: {e} - Retry {retry_times}/{RABBIT_MQ_RETRY_LIMIT}")
-                time.sleep(RABBIT_MQ_RETRY_DELAY)
-
-    async def init_pool(self):
-        """Initializes the connection pool by populating it with connections."""
-        if self._initialized:
-            app_logger.warning("RabbitMQ pool already initialized.")
-            return
-
-        app_logger.info(f"Initializing RabbitMQ pool with {self.pool_size} connections...")
-        for _ in range(self.pool_size):
-            conn, channel = await self._create_connection()
-            await self._pool.put((conn, channel))
-        self._initialized = True
-        app_logger.info("RabbitMQ pool initialized successfully!")
-
-    async def get_connection(self) -> Tuple[aio_pika.RobustConnection, aio_pika.Channel]:
-        """Retrieves a connection and channel from the pool."""
-        return await self._pool.get()
-
-    async def release_connection(self, connection: aio_pika.RobustConnection, channel: aio_pika.Channel):
-        """Releases a connection back to the pool."""
-        if not connection.is_closed:
-            await self._pool.put((connection, channel))
-        else:
-            app_logger.warning("Connection was closed, creating a new one to replace it.")
-            try:
-                conn, new_channel = await self._create_connection()
-                await self._pool.put((conn, new_channel))
-            except aio_pika.exceptions.ConnectionError:
-                app_logger.error("Failed to create a new connection to replace the closed one.")
-
-    async def close_pool(self):
-        """Closes all connections in the pool."""
-        app_logger.info("Closing all connections in the pool...")
-        while not self._pool.empty():
-            connection, _ = await self._pool.get()
-            if not connection.is_closed:
-                await connection.close()
-        app_logger.info("RabbitMQ connections closed!")
-
-
-rabbitmq_pool = AsyncRabbitMQConnectionPool(pool_size=POOL_SIZE)
+rabbitmq_pool = AsyncRabbitMQConnectionPool(pool_size=POOL_SIZE, connection_count=settings.RABBITMQ_CONNECTION_COUNT)
+publisher = RabbitMQPublisher(
+    rabbitmq_pool,
+    [*QUEUES, *CONSENT_PROCESSING_SHARD_QUEUES],
+    EXCHANGES,
+    channel_count=settings.RABBITMQ_PUBLISHER_CHANNELS,
+    batch_size=settings.RABBITMQ_PUBLISH_BATCH_SIZE,
+)
 
 
 async def create_vhost():
@@ -280,6 +231,9 @@ async def declare_queues():
         consent_processing_dlq_queue = await channel.get_queue("consent_processing_dlq")
         await consent_processing_dlq_queue.bind(consent_processing_dlq_exchange, routing_key="consent_processing_dlq")
         app_logger.info("'consent_processing_dlq' bound to 'consent_processing_dlq_exchange'.")
+        await declare_consent_processing_shards(
+            channel, settings.CONSENT_PROCESSING_SHARDS, settings.CONSENT_RETRY_DELAY_MS if hasattr(settings, "CONSENT_RETRY_DELAY_MS") else 5000
+        )
 
         for queue in [
             q
@@ -315,95 +269,21 @@ async def publish_message(
     expiration: Optional[int] = None,
 ):
     """
-    Publishes a message to the specified RabbitMQ queue or exchange.
-    If a channel is provided, it uses that channel. Otherwise, it acquires a connection
-    and channel from the pool, publishes, and releases them.
+    Publishes a message to the specified RabbitMQ queue or exchange and waits for the broker confirm.
+    If a channel is provided, it uses that channel; otherwise one of the shared publisher channels.
     Includes optional correlation_id, reply_to, and expiration for RPC patterns and TTL messages.
     """
-    app_logger.info(f"Publishing message to queue/exchange '{queue_name}': {message}")
-
-    if queue_name not in QUEUES and queue_name not in EXCHANGES:
-        app_logger.error(f"Invalid queue or exchange name for publishing: {queue_name}")
-        raise ValueError(f"Invalid queue or exchange name: {queue_name}")
-
-    _connection = None
-    _channel = None
-
-    if channel:
+    await publisher.publish(queue_name, message, channel=channel, correlation_id=correlation_id, reply_to=reply_to, expiration=expiration)
 
-        _channel = channel
-        app_logger.debug(f"Using provided channel for publishing to '{queue_name}'.")
-    else:
 
-        _connection, _channel = await rabbitmq_pool.get_connection()
-        app_logger.debug(f"Acquired new connection/channel from pool for publishing to '{queue_name}'.")
+async def publish_many(queue_name: str, messages: Iterable[OutgoingMessage], channel: Optional[aio_pika.Channel] = None) -> int:
+    """
+    Publishes many messages to one queue or exchange with batched confirms.
+    Items may be plain bodies or messages built with `app.db.messaging.build_message` for per-message properties.
+    """
+    return await publisher.publish_many(queue_name, messages, channel=channel)
 
-    try:
-        exchange_obj = None
-        routing_key_obj = queue_name
-
-        if queue_name == "webhook_main":
-            exchange_obj = await _channel.get_exchange("webhook_exchange")
-            routing_key_obj = "webhook_main"
-        elif queue_name == "webhook_retry":
-            exchange_obj = await _channel.get_exchange("retry_exchange")
-            routing_key_obj = "webhook_retry"
-        elif queue_name == "webhook_dlq":
-            exchange_obj = await _channel.get_exchange("dlq_exchange")
-            routing_key_obj = "webhook_dlq"
-        elif queue_name == "consent_events_q":
-            exchange_obj = await _channel.get_exchange("consent_events_exchange")
-            routing_key_obj = "consent_events_q"
-        elif queue_name == "consent_retry_q":
-            exchange_obj = await _channel.get_exchange("consent_retry_exchange")
-            routing_key_obj = "consent_retry_q"
-        elif queue_name == "consent_dlq":
-            exchange_obj = await _channel.get_exchange("consent_dlq_exchange")
-            routing_key_obj = "consent_dlq"
-        elif queue_name == "consent_expiry_delay_queue":
-
-            exchange_obj = _channel.default_exchange
-            routing_key_obj = "consent_expiry_delay_queue"
-        elif queue_name == "consent_expiry_queue":
-            exchange_obj = await _channel.get_exchange("consent_expiry_exchange")
-            routing_key_obj = "consent_expiry"
-        elif queue_name == "consent_processing_q":
-
-            exchange_obj = _channel.default_exchange
-            routing_key_obj = "consent_processing_q"
-        elif queue_name == "consent_processing_retry_q":
-            exchange_obj = await _channel.get_exchange("consent_processing_retry_exchange")
-            routing_key_obj = "consent_processing_retry_q"
-        elif queue_name == "consent_processing_dlq":
-            exchange_obj = await _channel.get_exchange("consent_processing_dlq_exchange")
-            routing_key_obj = "consent_processing_dlq"
-        elif queue_name in EXCHANGES:
-            exchange_obj = await _channel.get_exchange(queue_name)
-            routing_key_obj = ""
-        else:
-            exchange_obj = _channel.default_exchange
-
-        message_properties = {
-            "body": message.encode(),
-            "delivery_mode": aio_pika.DeliveryMode.PERSISTENT,
-        }
-        if correlation_id:
-            message_properties["correlation_id"] = correlation_id
-        if reply_to:
-            message_properties["reply_to"] = reply_to
-        if expiration is not None:
-            message_properties["expiration"] = expiration
-
-        await exchange_obj.publish(
-            aio_pika.Message(**message_properties),
-            routing_key=routing_key_obj,
-        )
-        app_logger.info(f"Message published to queue/exchange '{queue_name}'.")
-    except Exception as e:
-        app_logger.error(f"Failed to publish message to queue/exchange '{queue_name}': {e}")
-        raise
-    finally:
 
-        if _connection and _channel:
-            await rabbitmq_pool.release_connection(_connection, _channel)
-            app_logger.debug(f"Released connection/channel back to pool after publishing to '{queue_name}'.")
+async def publish_consent_processing(payload: dict, channel: Optional[aio_pika.Channel] = None):
+    """Publishes to the consent_processing_q shard owning the payload's agreement, preserving per-agreement order."""
+    await publisher.publish(consent_processing_queue_for(payload, settings.CONSENT_PROCESSING_SHARDS), json.dumps(payload), channel=channel)
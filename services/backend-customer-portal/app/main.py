@@ -8,9 +8,13 @@ from slowapi.errors import RateLimitExceeded
 from app.api.routers import api_router
 
 from app.db.dependencies import (
+    get_consent_active_state_collection_direct,
     get_consent_artifact_collection_direct,
+    get_consent_latest_pointer_collection_direct,
     get_notifications_collection_direct,
     get_renewal_collection_direct,
+    get_scheduler_job_run_collection_direct,
+    get_scheduler_lease_collection_direct,
 )
 from app.db.session import (
     close_mongo_connection,
@@ -21,7 +25,9 @@ from app.db.session import (
     get_postgres_pool,
     close_postgres_pool,
 )
-from app.services.notifications_schedular import start_notification_scheduler
+from app.services.notifications_schedular import start_notification_scheduler, stop_notification_scheduler
+from app.services.consent_transaction_service import ConsentTransactionService
+from app.services.dpar_request_service import DPARRequestService
 from app.utils.s3_utils import make_s3_bucket
 from app.core.config import settings
 from app.middleware.request_context import RequestContextMiddleware
@@ -47,10 +53,18 @@ async def lifespan(app: FastAPI):
         notifications_collection = get_notifications_collection_direct(app)
         renewal_collection = get_renewal_collection_direct(app)
 
+        await ConsentTransactionService(
+            consent_artifact_collection,
+            latest_pointer_collection=get_consent_latest_pointer_collection_direct(app),
+        ).ensure_indexes()
+        await DPARRequestService.ensure_indexes(get_consent_active_state_collection_direct(app))
+
         await start_notification_scheduler(
             consent_artifact_collection,
             notifications_collection,
             renewal_collection,
+            get_scheduler_lease_collection_direct(app),
+            get_scheduler_job_run_collection_direct(app),
         )
         make_s3_bucket([settings.KYC_DOCUMENTS_BUCKET], client)
 
@@ -61,6 +75,7 @@ async def lifespan(app: FastAPI):
         raise
 
     yield
+    await stop_notification_scheduler()
     await rabbitmq_pool.close_pool()
     await close_postgres_pool()
     app_logger.info("Shutting down application...")
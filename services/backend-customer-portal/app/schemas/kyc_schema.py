@@ -2,8 +2,18 @@ from pydantic import BaseModel
 from typing import List, Optional
 
 
+class UploadedDocumentInfo(BaseModel):
+    field: str
+    url: str
+    filename: str
+    content_type: str
+    size: int
+    sha256: str
+
+
 class KYCUploadResponse(BaseModel):
     message: str
     kyc_front_url: str
     kyc_back_url: str
     request_attachment_urls: Optional[List[str]] = None
+    documents: List[UploadedDocumentInfo] = []
@@ -6,18 +6,46 @@ from fastapi import HTTPException
 from app.core.config import settings
 from app.core.security import create_jwt_token
 
-from app.services.email_templates import generate_email_template
+from app.services.otp_delivery_service import enqueue_otp_email
 from app.utils.hashing import hash_shake256
-from app.utils.mail_utils import mailSender, get_email_credentials
 from app.core.logger import app_logger
-from app.utils.otp_utils import store_otp, get_otp, delete_otp
+from app.utils.otp_utils import (
+    BLOCK_WINDOW_HOURS,
+    delete_otp,
+    get_attempts,
+    get_delivery_status,
+    get_otp,
+    parse_ts,
+    store_attempts,
+    store_otp,
+)
 
 
 def _generate_otp() -> str:
     return f"{random.randint(100000, 999999)}"
 
 
-async def handle_login(email: Optional[str], mobile: Optional[str], df_id: str, pool, df_register_collection):
+async def _issue_otp(user_input: str, otp_data: dict) -> str:
+    """
+    Stores a fresh OTP for `user_input`, or keeps the current one if it was issued inside the
+    resend cooldown, so a quick resend doesn't invalidate the code that is already on its way.
+    """
+    now = datetime.now(UTC)
+    existing = await get_otp(user_input)
+    if existing and existing.get("df_id") == otp_data["df_id"] and existing.get("issued_at"):
+        issued_at = await parse_ts(existing["issued_at"])
+        if issued_at.tzinfo is None:
+            issued_at = issued_at.replace(tzinfo=UTC)
+        if now - issued_at < timedelta(seconds=settings.OTP_RESEND_COOLDOWN_SECONDS):
+            app_logger.info(f"Reusing OTP issued at {existing['issued_at']} for {user_input} inside the resend cooldown")
+            return existing["otp"]
+
+    otp = _generate_otp()
+    await store_otp(user_input, {"otp": otp, **otp_data, "issued_at": now.isoformat()})
+    return otp
+
+
+async def handle_login(email: Optional[str], mobile: Optional[str], df_id: str, pool):
     app_logger.info(f"Handling login for email: {email}, mobile: {mobile}, df_id: {df_id}")
     if not df_id:
         app_logger.warning("Login failed: df_id is required")
@@ -44,13 +72,9 @@ async def handle_login(email: Optional[str], mobile: Optional[str], df_id: str,
     dp_id = str(result["dp_id"]) if is_existing else None
     app_logger.debug(f"User existence check: is_existing={is_existing}, dp_id={dp_id}")
 
-    otp = _generate_otp()
-    app_logger.info(f"Generated OTP for {user_input}")
-
-    await store_otp(
+    await _issue_otp(
         user_input,
         {
-            "otp": otp,
             "df_id": df_id,
             "dp_id": dp_id,
             "email": email,
@@ -60,17 +84,13 @@ async def handle_login(email: Optional[str], mobile: Optional[str], df_id: str,
             "is_existing": is_existing,
         },
     )
+    app_logger.info(f"Issued OTP for {user_input}")
 
+    delivery_id = None
     if email:
-        email_template = generate_email_template("There!", otp)
-        credentials = await get_email_credentials(df_id, df_register_collection)
-        if credentials:
-            await mailSender(destination_email=email, subject="Your OTP for Concur Login", email_template=email_template, credentials=credentials)
-        else:
-            app_logger.info(f"Skipping email sending for {email} due to missing credentials.")
-        app_logger.info(f"OTP email sent to {email}")
+        delivery_id = await enqueue_otp_email(df_id, email, "Your OTP for Concur Login")
 
-    return {"success": True, "message": "OTP sent successfully"}
+    return {"success": True, "message": "OTP sent successfully", "delivery_id": delivery_id}
 
 
 async def handle_otp_verification(email, mobile, df_id, otp_input):
@@ -109,7 +129,7 @@ async def handle_otp_verification(email, mobile, df_id, otp_input):
 MAX_RESEND_LIMIT = 3
 
 
-async def handle_resend_otp(email: Optional[str], mobile: Optional[str], df_id: str, pool, df_register_collection):
+async def handle_resend_otp(email: Optional[str], mobile: Optional[str], df_id: str, pool):
     app_logger.info(f"Handling OTP resend for email: {email}, mobile: {mobile}, df_id: {df_id}")
     if not df_id:
         app_logger.warning("OTP resend failed: df_id is required")
@@ -127,7 +147,7 @@ async def handle_resend_otp(email: Optional[str], mobile: Optional[str], df_id:
 
     now = datetime.now(UTC)
 
-    attempts = [parse_ts(ts) for ts in attempts]
+    attempts = [await parse_ts(ts) for ts in attempts]
 
     attempts = [ts for ts in attempts if ts > now - timedelta(hours=BLOCK_WINDOW_HOURS)]
     app_logger.debug(f"Current OTP attempts for {user_input}: {len(attempts)}")
@@ -156,13 +176,9 @@ async def handle_resend_otp(email: Optional[str], mobile: Optional[str], df_id:
     dp_id = str(result["dp_id"]) if is_existing else None
     app_logger.debug(f"User existence check for resend: is_existing={is_existing}, dp_id={dp_id}")
 
-    otp = _generate_otp()
-    app_logger.info(f"Generated new OTP for {user_input} during resend")
-
-    await store_otp(
+    await _issue_otp(
         user_input,
         {
-            "otp": otp,
             "df_id": df_id,
             "field": column,
             "hash": hashed,
@@ -172,14 +188,17 @@ async def handle_resend_otp(email: Optional[str], mobile: Optional[str], df_id:
             "is_existing": is_existing,
         },
     )
+    app_logger.info(f"Issued OTP for {user_input} during resend")
 
+    delivery_id = None
     if email:
-        email_template = generate_email_template("There!", otp)
-        credentials = await get_email_credentials(df_id, df_register_collection)
-        if credentials:
-            await mailSender(destination_email=email, subject="Your New OTP for Concur Login", email_template=email_template, credentials=credentials)
-        else:
-            app_logger.info(f"Skipping email sending for {email} due to missing credentials.")
-        app_logger.info(f"New OTP email sent to {email}")
-
-    return {"success": True, "message": "OTP resent successfully"}
+        delivery_id = await enqueue_otp_email(df_id, email, "Your New OTP for Concur Login")
+
+    return {"success": True, "message": "OTP resent successfully", "delivery_id": delivery_id}
+
+
+async def handle_otp_delivery_status(delivery_id: str):
+    status = await get_delivery_status(delivery_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="OTP delivery not found or expired")
+    return status
@@ -4,7 +4,7 @@ from hashlib import shake_256
 from bson import ObjectId
 from fastapi import HTTPException
 from motor.motor_asyncio import AsyncIOMotorCollection
-from app.db.rabbitmq import publish_message
+from app.db.rabbitmq import publish_consent_processing
 from app.schemas.consent_schema import UpdateConsent
 from app.core.logger import app_logger
 import json
@@ -84,7 +84,7 @@ class ConsentService:
             "consent_artifact": new_artifact,
         }
         app_logger.info(f"Publishing consent revocation message for agreement_id: {agreement_id}")
-        await publish_message("consent_processing_q", json.dumps(message_payload))
+        await publish_consent_processing(message_payload)
 
         return {
             "message": "Consent purpose(s) revoked. New artifact created.",
@@ -118,7 +118,7 @@ class ConsentService:
             "consent_artifact": new_artifact,
         }
         app_logger.info(f"Publishing consent grant message for agreement_id: {agreement_id}")
-        await publish_message("consent_processing_q", json.dumps(message_payload))
+        await publish_consent_processing(message_payload)
 
         return {
             "message": "Consent purpose(s) granted. New artifact created.",
@@ -173,7 +173,7 @@ class ConsentService:
             "consent_artifact": new_artifact,
         }
         app_logger.info(f"Publishing consent renewal message for agreement_id: {agreement_id}")
-        await publish_message("consent_processing_q", json.dumps(message_payload))
+        await publish_consent_processing(message_payload)
 
         return {
             "message": "Consent renewed successfully. New artifact created.",
@@ -1,12 +1,17 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import HTTPException
 from motor.motor_asyncio import AsyncIOMotorCollection
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
 
 from app.utils.common import clean_mongo_doc
 from app.core.logger import app_logger
 
+# One document per dp_id whose pointers have been backfilled from a full artifact scan.
+POINTER_SEED_COLLECTION = "consent_latest_pointer_seeds"
+
 
 class ConsentTransactionService:
     def __init__(
@@ -14,10 +19,29 @@ class ConsentTransactionService:
         consent_artifact_collection: AsyncIOMotorCollection,
         dpar_collection: Optional[AsyncIOMotorCollection] = None,
         grievance_collection: Optional[AsyncIOMotorCollection] = None,
+        latest_pointer_collection: Optional[AsyncIOMotorCollection] = None,
     ):
         self.collection = consent_artifact_collection
         self.dpar_collection = dpar_collection
         self.grievance_collection = grievance_collection
+        self.latest_pointer_collection = latest_pointer_collection
+        self.pointer_seed_collection = latest_pointer_collection.database[POINTER_SEED_COLLECTION] if latest_pointer_collection is not None else None
+
+    async def ensure_indexes(self):
+        """
+        Indexes backing chain resolution ($graphLookup walks agreement_hash_id ->
+        artifact.linked_agreement_hash) and the latest-per-collection-point pointers.
+        """
+        await self.collection.create_index([("artifact.agreement_id", ASCENDING)], name="idx_artifact_agreement_id")
+        await self.collection.create_index([("agreement_hash_id", ASCENDING)], name="idx_agreement_hash_id")
+        await self.collection.create_index([("artifact.linked_agreement_hash", ASCENDING)], name="idx_linked_agreement_hash")
+        if self.latest_pointer_collection is not None:
+            await self.latest_pointer_collection.create_index(
+                [("dp_id", ASCENDING), ("df_id", ASCENDING), ("cp_id", ASCENDING)],
+                name="idx_dp_df_cp_latest",
+                unique=True,
+            )
+            await self.pointer_seed_collection.create_index([("dp_id", ASCENDING)], name="idx_dp_seeded", unique=True)
 
     def _parse_iso(self, dt_str: Optional[str]) -> datetime:
         """
@@ -45,6 +69,16 @@ class ConsentTransactionService:
             app_logger.warning("get_all_consent_transactions failed: dp_id is required")
             raise HTTPException(status_code=400, detail="dp_id is required")
 
+        # The consent worker only writes pointers for collection points it processes, so pointers are
+        # trusted once this dp_id has been seeded from a full scan, not merely because some exist.
+        if await self._pointers_seeded(dp_id):
+            latest_artifacts = await self._get_latest_from_pointers(dp_id)
+            if latest_artifacts:
+                return {
+                    "message": "Latest consent transactions retrieved successfully per collection point",
+                    "data": latest_artifacts,
+                }
+
         query = {
             "artifact.data_principal.dp_id": dp_id,
         }
@@ -86,39 +120,136 @@ class ConsentTransactionService:
         latest_artifacts = [v["doc"] for v in latest_by_cp.values()]
         latest_artifacts.sort(key=lambda d: (d.get("artifact", {}).get("cp_name") or "").lower())
 
+        await self._seed_latest_pointers(dp_id, latest_artifacts)
+
         return {
             "message": "Latest consent transactions retrieved successfully per collection point",
             "data": latest_artifacts,
         }
 
-    async def get_consent_transaction(self, agreement_id: str):
-        visited = set()
-        chain = []
+    async def _get_latest_from_pointers(self, dp_id: str) -> List[dict]:
+        """
+        Resolve the latest artifact per collection point from the pointer collection
+        maintained by the consent worker, joined back to the artifact in one round trip.
+        """
+        if self.latest_pointer_collection is None:
+            return []
+
+        pipeline = [
+            {"$match": {"dp_id": dp_id}},
+            {
+                "$lookup": {
+                    "from": self.collection.name,
+                    "localField": "artifact_id",
+                    "foreignField": "_id",
+                    "as": "latest",
+                }
+            },
+            {"$unwind": "$latest"},
+            {"$replaceRoot": {"newRoot": "$latest"}},
+        ]
+        latest_artifacts = await self.latest_pointer_collection.aggregate(pipeline).to_list(length=None)
+        for doc in latest_artifacts:
+            doc["_id"] = str(doc["_id"])
+        latest_artifacts.sort(key=lambda d: (d.get("artifact", {}).get("cp_name") or "").lower())
+        app_logger.debug(f"Resolved {len(latest_artifacts)} latest artifacts from pointers for dp_id: {dp_id}")
+        return latest_artifacts
 
-        async def fetch_by_agreement_id(aid: str):
-            return await self.collection.find_one({"artifact.agreement_id": aid})
+    async def _pointers_seeded(self, dp_id: str) -> bool:
+        if self.pointer_seed_collection is None:
+            return False
+        return await self.pointer_seed_collection.find_one({"dp_id": dp_id}, {"_id": 1}) is not None
 
-        async def fetch_by_hash(hash_id: str):
-            return await self.collection.find_one({"agreement_hash_id": hash_id})
+    async def _seed_latest_pointers(self, dp_id: str, latest_artifacts: List[dict]):
+        """
+        Backfill pointers for data principals whose artifacts predate the pointer collection, then mark
+        the dp_id seeded. Pointers the consent worker already wrote are kept: it applies the same choice
+        (the terminal artifact with the latest agreement_date) and compares against the stored agreement_date.
+        """
+        if self.latest_pointer_collection is None or not latest_artifacts:
+            return
+
+        operations = []
+        for doc in latest_artifacts:
+            artifact = doc.get("artifact", {}) or {}
+            df_id = doc.get("df_id") or (artifact.get("data_fiduciary", {}) or {}).get("df_id")
+            cp_id = doc.get("cp_id") or artifact.get("cp_id")
+            if not df_id or not cp_id:
+                continue
+            operations.append(
+                UpdateOne(
+                    {"dp_id": dp_id, "df_id": df_id, "cp_id": cp_id},
+                    {
+                        "$setOnInsert": {
+                            "artifact_id": ObjectId(doc["_id"]),
+                            "agreement_id": artifact.get("agreement_id"),
+                            "agreement_hash_id": doc.get("agreement_hash_id"),
+                            "agreement_date": self._parse_iso((artifact.get("data_fiduciary", {}) or {}).get("agreement_date")),
+                            "cp_name": artifact.get("cp_name"),
+                            "updated_at": datetime.now(timezone.utc),
+                        }
+                    },
+                    upsert=True,
+                )
+            )
 
-        async def traverse_forward(current_doc):
-            nonlocal chain
-            while current_doc and current_doc["artifact"]["agreement_id"] not in visited:
-                visited.add(current_doc["artifact"]["agreement_id"])
-                chain.append(current_doc)
-                linked_hash = current_doc["artifact"].get("linked_agreement_hash")
-                if not linked_hash:
-                    break
-                current_doc = await fetch_by_hash(linked_hash)
+        try:
+            if operations:
+                await self.latest_pointer_collection.bulk_write(operations, ordered=False)
+            await self.pointer_seed_collection.update_one(
+                {"dp_id": dp_id}, {"$setOnInsert": {"seeded_at": datetime.now(timezone.utc)}}, upsert=True
+            )
+        except Exception as e:
+            app_logger.warning(f"Failed to seed latest consent pointers for dp_id: {dp_id}: {e}")
 
+    async def resolve_consent_chain(self, agreement_id: str) -> List[dict]:
+        """
+        Fetch an agreement and every artifact reachable through linked_agreement_hash
+        in a single $graphLookup aggregation, ordered from the base agreement onwards.
+        """
+        pipeline = [
+            {"$match": {"artifact.agreement_id": agreement_id}},
+            {"$limit": 1},
+            {
+                "$graphLookup": {
+                    "from": self.collection.name,
+                    "startWith": "$artifact.linked_agreement_hash",
+                    "connectFromField": "artifact.linked_agreement_hash",
+                    "connectToField": "agreement_hash_id",
+                    "as": "linked_chain",
+                    "depthField": "chain_depth",
+                }
+            },
+        ]
+        result = await self.collection.aggregate(pipeline).to_list(length=1)
+        if not result:
+            return []
+
+        base_doc = result[0]
+        linked_chain = sorted(base_doc.pop("linked_chain", []), key=lambda d: d.get("chain_depth", 0))
+
+        chain = [base_doc]
+        visited = {base_doc["artifact"]["agreement_id"]}
+        seen_depths = set()
+        for doc in linked_chain:
+            depth = doc.pop("chain_depth", None)
+            doc_agreement_id = doc.get("artifact", {}).get("agreement_id")
+            if depth in seen_depths:
+                continue
+            if doc_agreement_id in visited:
+                break
+            seen_depths.add(depth)
+            visited.add(doc_agreement_id)
+            chain.append(doc)
+        return chain
+
+    async def get_consent_transaction(self, agreement_id: str):
         app_logger.info(f"Fetching consent transaction chain for agreement_id: {agreement_id}")
-        base_doc = await fetch_by_agreement_id(agreement_id)
-        if not base_doc:
+        chain = await self.resolve_consent_chain(agreement_id)
+        if not chain:
             app_logger.warning(f"Consent agreement not found for ID: {agreement_id}")
             raise HTTPException(status_code=404, detail="Agreement ID not found")
-        app_logger.debug(f"Found base artifact for agreement_id: {agreement_id}")
-
-        await traverse_forward(base_doc)
+        app_logger.debug(f"Resolved {len(chain)} artifacts in chain for agreement_id: {agreement_id}")
 
         return {"agreement_chain": clean_mongo_doc(chain)}
 
@@ -30,9 +30,15 @@ class DPARRequestService:
         self,
         dpa_requests_collection: AsyncIOMotorCollection,
         consent_artifact_collection: Optional[AsyncIOMotorCollection],
+        active_consent_collection: Optional[AsyncIOMotorCollection] = None,
     ):
         self.requests_collection = dpa_requests_collection
         self.consent_artifact_collection = consent_artifact_collection
+        self.active_consent_collection = active_consent_collection
+
+    @staticmethod
+    async def ensure_indexes(active_consent_collection: AsyncIOMotorCollection):
+        await active_consent_collection.create_index([("dp_id", 1), ("de_id", 1)], unique=True, name="idx_dp_de_active_state")
 
     async def get_my_requests(self, current_user: dict) -> List[DPARRequestOut]:
         app_logger.info(f"Fetching DPAR requests for user: {current_user.get('email') or current_user.get('mobile')}")
@@ -335,13 +341,79 @@ class DPARRequestService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    @staticmethod
+    def _format_active_state(state: dict) -> List[dict]:
+        data_element = {"de_id": state.get("de_id"), "de_hash_id": state.get("de_hash_id"), "title": state.get("title")}
+        return [
+            {
+                "agreement_id": agreement.get("agreement_id"),
+                "cp_name": agreement.get("cp_name", "Unknown"),
+                "data_element": data_element,
+                "purposes": agreement.get("purposes", []),
+            }
+            for agreement in (state.get("agreements") or {}).values()
+            if agreement.get("purposes")
+        ]
+
+    async def _seed_active_state(self, dp_id: str, data_element_id: str, latest_by_cp: dict):
+        """
+        Backfills the read model from a fallback scan and marks the entry `seeded`, i.e. complete.
+        The consent worker only writes the collection point it is processing, so an entry it created
+        for a DP with older artifacts is missing their agreements until this runs. Agreements the
+        worker already wrote win over the scanned ones.
+        """
+        state = {"agreements": {}}
+        for artifact_doc in latest_by_cp.values():
+            artifact = artifact_doc.get("artifact", {})
+            for de in artifact.get("consent_scope", {}).get("data_elements", []):
+                if de.get("de_id") != data_element_id:
+                    continue
+                state["de_hash_id"] = de.get("de_hash_id")
+                state["title"] = de.get("title")
+                purposes = [
+                    {
+                        "purpose_id": consent.get("purpose_id"),
+                        "purpose_title": consent.get("purpose_title"),
+                        "consent_status": consent.get("consent_status"),
+                        "consent_timestamp": consent.get("consent_timestamp"),
+                        "consent_expiry_period": consent.get("consent_expiry_period"),
+                    }
+                    for consent in de.get("consents", [])
+                    if consent.get("consent_status", "").lower() not in ["denied", "expired"]
+                ]
+                if purposes:
+                    state["agreements"][str(artifact.get("cp_id") or artifact.get("cp_name"))] = {
+                        "agreement_id": artifact.get("agreement_id"),
+                        "cp_name": artifact.get("cp_name", "Unknown"),
+                        "artifact_id": str(artifact_doc.get("_id")),
+                        "purposes": purposes,
+                    }
+        update = {
+            "agreements": {"$mergeObjects": [{"$literal": state["agreements"]}, {"$ifNull": ["$agreements", {}]}]},
+            "de_hash_id": {"$ifNull": ["$de_hash_id", {"$literal": state.get("de_hash_id")}]},
+            "title": {"$ifNull": ["$title", {"$literal": state.get("title")}]},
+            "seeded": True,
+            "updated_at": datetime.now(UTC),
+        }
+        try:
+            await self.active_consent_collection.update_one({"dp_id": dp_id, "de_id": data_element_id}, [{"$set": update}], upsert=True)
+        except Exception as e:
+            app_logger.warning(f"Failed to seed active consent state for dp_id {dp_id}, de_id {data_element_id}: {e}")
+
     async def _get_active_consents_for_data_element(
         self, dp_id: Optional[str], data_element_id: str, core_identifier: Optional[str] = None, secondary_identifier: Optional[str] = None
     ) -> List[dict]:
         """
         Get all active consents (not denied or expired) for a specific data element.
+        Known DPs are served from the (dp_id, de_id) read model maintained by the consent worker once
+        that entry has been seeded; identifier-only lookups and unseeded entries fall back to scanning artifacts.
         Returns formatted consent data for frontend consumption and revocation.
         """
+        if dp_id and self.active_consent_collection is not None:
+            state = await self.active_consent_collection.find_one({"dp_id": dp_id, "de_id": data_element_id})
+            if state and state.get("seeded"):
+                return self._format_active_state(state)
+
         if self.consent_artifact_collection is None:
 
             return []
@@ -382,6 +454,9 @@ class DPARRequestService:
                 if cp_name not in latest_by_cp or version > latest_by_cp[cp_name].get("artifact", {}).get("agreement_version", 0):
                     latest_by_cp[cp_name] = artifact
 
+            if dp_id and self.active_consent_collection is not None:
+                await self._seed_active_state(dp_id, data_element_id, latest_by_cp)
+
             active_consents = []
 
             for artifact_doc in latest_by_cp.values():
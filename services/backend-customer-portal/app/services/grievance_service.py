@@ -9,7 +9,7 @@ from app.schemas import token
 from app.utils.mail_utils import mailSender, get_email_credentials
 from app.core.logger import app_logger
 from app.schemas.grievance_schema import GrievanceCreateRequest
-from app.utils.s3_utils import upload_file_to_s3
+from app.utils.s3_utils import stream_uploads_to_s3, uploaded_document_record
 from app.utils.common import clean_mongo_doc
 from app.core.config import settings
 
@@ -152,12 +152,11 @@ class GrievanceService:
         if not user_request:
             raise HTTPException(status_code=404, detail="Request not found")
 
-        uploaded_urls = []
-        for file in files:
-            url = upload_file_to_s3(file, s3_client)
-            uploaded_urls.append(url)
+        documents = await stream_uploads_to_s3(files, s3_client)
+        uploaded_urls = [document.url for document in documents]
+        uploaded_details = [uploaded_document_record(document, field="uploaded_files") for document in documents]
 
-        update_data = {"$push": {"uploaded_files": {"$each": uploaded_urls}}}
+        update_data = {"$push": {"uploaded_files": {"$each": uploaded_urls}, "uploaded_file_details": {"$each": uploaded_details}}}
 
         await self.collection.update_one({"_id": ObjectId(grievance_id)}, update_data)
 
@@ -165,4 +164,5 @@ class GrievanceService:
             "status": "success",
             "message": f"{len(uploaded_urls)} reference document(s) uploaded successfully",
             "uploaded_files": uploaded_urls,
+            "uploaded_file_details": uploaded_details,
         }
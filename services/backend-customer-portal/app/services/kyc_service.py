@@ -1,7 +1,7 @@
 from typing import List, Optional
 from bson import ObjectId
 from fastapi import HTTPException, UploadFile
-from app.utils.s3_utils import upload_file_to_s3
+from app.utils.s3_utils import stream_uploads_to_s3, uploaded_document_record
 from app.schemas.kyc_schema import KYCUploadResponse
 from minio import Minio
 from app.core.logger import app_logger
@@ -23,21 +23,20 @@ async def handle_kyc_upload(
         app_logger.warning(f"KYC upload failed for request_id {request_id}: Request not found.")
         raise HTTPException(status_code=404, detail="Request not found")
 
-    kyc_front_url = upload_file_to_s3(kyc_front, s3_client)
-    kyc_back_url = upload_file_to_s3(kyc_back, s3_client)
+    attachments = upload_pdfs or []
+    documents = await stream_uploads_to_s3([kyc_front, kyc_back, *attachments], s3_client)
+    fields = ["kyc_front", "kyc_back", *(["request_attachments"] * len(attachments))]
+    kyc_front_url, kyc_back_url = documents[0].url, documents[1].url
 
     update_data = {
         "kyc_front": kyc_front_url,
         "kyc_back": kyc_back_url,
+        "kyc_documents": [uploaded_document_record(document, field=field) for document, field in zip(documents, fields)],
     }
 
-    if upload_pdfs:
-        attachment_urls = []
-        for pdf in upload_pdfs:
-            pdf_url = upload_file_to_s3(pdf, s3_client)
-            attachment_urls.append(pdf_url)
-        update_data["request_attachments"] = attachment_urls
-        app_logger.debug(f"Uploaded {len(attachment_urls)} additional PDF attachments for request {request_id}")
+    if attachments:
+        update_data["request_attachments"] = [document.url for document in documents[2:]]
+        app_logger.debug(f"Uploaded {len(attachments)} additional PDF attachments for request {request_id}")
 
     await collection.update_one(
         {"_id": ObjectId(request_id), "requested_by": str(current_user.get("dp_id"))},
@@ -50,4 +49,5 @@ async def handle_kyc_upload(
         kyc_front_url=kyc_front_url,
         kyc_back_url=kyc_back_url,
         request_attachment_urls=update_data.get("request_attachments"),
+        documents=update_data["kyc_documents"],
     )
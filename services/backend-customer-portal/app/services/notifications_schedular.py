@@ -1,18 +1,40 @@
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from fastapi import Depends
 from motor.motor_asyncio import AsyncIOMotorCollection
-from app.db.dependencies import get_consent_artifact_collection, get_notifications_collection, get_renewal_collection
+
+from app.core.config import settings
+from app.core.job_scheduler import ClusterJobScheduler
 from app.services.notifications_service import NotificationService
 
-scheduler = AsyncIOScheduler()
+scheduler: ClusterJobScheduler = None
 
 
 async def start_notification_scheduler(
-    consent_artifact_collection: AsyncIOMotorCollection = Depends(get_consent_artifact_collection),
-    notifications_collection: AsyncIOMotorCollection = Depends(get_notifications_collection),
-    renewal_collection: AsyncIOMotorCollection = Depends(get_renewal_collection),
+    consent_artifact_collection: AsyncIOMotorCollection,
+    notifications_collection: AsyncIOMotorCollection,
+    renewal_collection: AsyncIOMotorCollection,
+    lease_collection: AsyncIOMotorCollection,
+    job_run_collection: AsyncIOMotorCollection,
 ):
-    """Initialize APScheduler to run notification jobs."""
+    """Schedule expiry-notification generation once across all replicas, partitioned by df_id."""
+    global scheduler
     service = NotificationService(consent_artifact_collection, notifications_collection, renewal_collection)
-    scheduler.add_job(service.generate_notifications, "interval", minutes=2)
+    await service.ensure_indexes()
+
+    scheduler = ClusterJobScheduler(
+        lease_collection,
+        job_run_collection,
+        lease_seconds=settings.SCHEDULER_LEASE_SECONDS,
+        run_retention_days=settings.SCHEDULER_RUN_RETENTION_DAYS,
+    )
+    await scheduler.ensure_indexes()
+    scheduler.add_job(
+        "expiry_notifications",
+        service.generate_notifications,
+        interval_seconds=settings.NOTIFICATION_JOB_INTERVAL_SECONDS,
+        partitions=service.pending_partitions,
+    )
     scheduler.start()
+
+
+async def stop_notification_scheduler():
+    if scheduler:
+        await scheduler.stop()
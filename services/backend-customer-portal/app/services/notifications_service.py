@@ -1,12 +1,30 @@
+from collections import Counter
 from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional, Set, Tuple
+
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 
+from app.core.job_scheduler import JobLease
 from app.schemas.notifications import NotificationOut, PaginatedNotifications
 from app.utils.common import clean_mongo_doc
 from app.core.logger import app_logger
 
 
+RENEWAL_CHUNK_SIZE = 500
+DUPLICATE_KEY_ERROR = 11000
+PENDING_RENEWAL_FILTER = {"$or": [{"notification_sent": False}, {"notification_sent": {"$exists": False}}]}
+ALL_PARTITIONS = object()
+ARTIFACT_PROJECTION = {
+    "artifact.data_principal.dp_id": 1,
+    "artifact.cp_name": 1,
+    "artifact.agreement_id": 1,
+    "artifact.consent_scope.data_elements": 1,
+}
+
+
 class NotificationService:
     def __init__(
         self,
@@ -39,207 +57,251 @@ class NotificationService:
     async def mark_as_read(self, notification_id: str):
         await self.notifications_collection.update_one({"_id": ObjectId(notification_id)}, {"$set": {"status": "read"}})
 
-    async def generate_notifications(self):
-        """Scan renewal collection for all types of expiry events and create notifications."""
-        app_logger.info("Generating all expiry notifications...")
-        now = datetime.now(UTC)
-
-        cursor = self.renewal_collection.find({"$or": [{"notification_sent": False}, {"notification_sent": {"$exists": False}}]})
-        all_events = [doc async for doc in cursor]
-
-        for event in all_events:
-            event_id = event.get("_id")
-            event_type = event.get("event_type")
-
-            if event_type == "consent_expiry":
-                app_logger.info(f"Processing consent renewal event {event_id}...")
-                consent_artifact_id = event.get("consent_artifact_id")
-                purpose_id = event.get("purpose_id")
-                expiry_at = event.get("expiry_at")
-
-                if not all([consent_artifact_id, purpose_id, expiry_at]):
-                    app_logger.warning(f"Skipping consent renewal event {event_id} - missing required fields")
-                    await self.renewal_collection.update_one(
-                        {"_id": event_id},
-                        {"$set": {"notification_sent": True, "updated_at": now, "status": "skipped_missing_fields"}},
-                    )
-                    continue
-
-                artifact = await self.consent_artifact_collection.find_one({"_id": ObjectId(consent_artifact_id)})
-                if not artifact:
-                    app_logger.warning(f"Skipping consent renewal event {event_id} - consent artifact not found")
-                    await self.renewal_collection.update_one(
-                        {"_id": event_id},
-                        {"$set": {"notification_sent": True, "updated_at": now, "status": "skipped_artifact_not_found"}},
-                    )
-                    continue
-
-                artifact_doc = artifact.get("artifact") or {}
-                dp_id = (artifact_doc.get("data_principal") or {}).get("dp_id")
-                cp_name = artifact_doc.get("cp_name", "")
-                agreement_id = artifact_doc.get("agreement_id", "")
-
-                if not dp_id:
-                    app_logger.warning(f"Skipping consent renewal event {event_id} - no dp_id found in artifact")
-                    await self.renewal_collection.update_one(
-                        {"_id": event_id},
-                        {"$set": {"notification_sent": True, "updated_at": now, "status": "skipped_no_dp_id"}},
-                    )
-                    continue
-
-                data_element_title = ""
-                purpose_title = ""
-
-                for de in artifact_doc["consent_scope"]["data_elements"]:
-                    if de["de_id"] == event.get("data_element_id"):
-                        data_element_title = de["title"]
-                        for consent in de["consents"]:
-                            if consent["purpose_id"] == purpose_id:
-                                purpose_title = consent["purpose_title"]
-                                break
-                        break
-
-                if not (data_element_title and purpose_title):
-                    app_logger.warning(f"Skipping consent renewal event {event_id} - data element or purpose not found in artifact")
-                    await self.renewal_collection.update_one(
-                        {"_id": event_id},
-                        {"$set": {"notification_sent": True, "updated_at": now, "status": "skipped_de_or_purpose_not_found"}},
-                    )
-                    continue
-
-                exists = await self.notifications_collection.find_one(
-                    {
-                        "dp_id": dp_id,
-                        "artifact_id": consent_artifact_id,
-                        "data_element_id": event.get("data_element_id"),
-                        "purpose_id": purpose_id,
-                        "type": "CONSENT_RENEWAL",
-                    }
-                )
-                if exists:
-                    app_logger.info(f"Consent renewal notification already exists for dp_id {dp_id} - purpose {purpose_id}")
-                    await self.renewal_collection.update_one(
-                        {"_id": event_id},
-                        {"$set": {"notification_sent": True, "updated_at": now}},
-                    )
-                    continue
-
-                app_logger.info(f"Creating consent renewal notification for dp_id {dp_id} - purpose {purpose_id}")
-                await self.notifications_collection.insert_one(
-                    {
-                        "dp_id": dp_id,
-                        "artifact_id": consent_artifact_id,
-                        "type": "CONSENT_RENEWAL",
-                        "title": "Consent renewal required",
-                        "message": f"Your consent for {data_element_title} (purpose: {purpose_title}) is soon going to expire and requires renewal by {expiry_at}.",
-                        "status": "unread",
-                        "created_at": now,
-                        "expiry_date": datetime.fromisoformat(expiry_at.replace("Z", "+00:00")),
-                        "data_element_id": event.get("data_element_id"),
-                        "data_element_title": data_element_title,
-                        "purpose_id": purpose_id,
-                        "purpose_title": purpose_title,
-                        "cp_name": cp_name,
-                        "agreement_id": agreement_id,
-                    }
-                )
-                await self.renewal_collection.update_one(
-                    {"_id": event_id},
-                    {"$set": {"notification_sent": True, "updated_at": now}},
-                )
-            elif event_type == "data_retention_expiry":
-                app_logger.info(f"Processing data retention expiry event {event_id}...")
-                consent_artifact_id = event.get("consent_artifact_id")
-                data_element_id = event.get("data_element_id")
-                retention_expiry_at = event.get("retention_expiry_at")
-
-                if not all([consent_artifact_id, data_element_id, retention_expiry_at]):
-                    app_logger.warning(f"Skipping data retention event {event_id} - missing required fields")
-                    await self.renewal_collection.update_one(
-                        {"_id": event_id},
-                        {"$set": {"notification_sent": True, "updated_at": now, "status": "skipped_missing_fields"}},
-                    )
-                    continue
-
-                artifact = await self.consent_artifact_collection.find_one({"_id": ObjectId(consent_artifact_id)})
-                if not artifact:
-                    app_logger.warning(f"Skipping data retention event {event_id} - consent artifact not found")
-                    await self.renewal_collection.update_one(
-                        {"_id": event_id},
-                        {"$set": {"notification_sent": True, "updated_at": now, "status": "skipped_artifact_not_found"}},
-                    )
-                    continue
-
-                artifact_doc = artifact.get("artifact") or {}
-                dp_id = (artifact_doc.get("data_principal") or {}).get("dp_id")
-                cp_name = artifact_doc.get("cp_name", "")
-                agreement_id = artifact_doc.get("agreement_id", "")
-
-                if not dp_id:
-                    app_logger.warning(f"Skipping data retention event {event_id} - no dp_id found in artifact")
-                    await self.renewal_collection.update_one(
-                        {"_id": event_id},
-                        {"$set": {"notification_sent": True, "updated_at": now, "status": "skipped_no_dp_id"}},
-                    )
-                    continue
-
-                data_element_title = ""
-                for de in artifact_doc["consent_scope"]["data_elements"]:
-                    if de["de_id"] == data_element_id:
-                        data_element_title = de["title"]
-                        break
-
-                if not data_element_title:
-                    app_logger.warning(f"Skipping data retention event {event_id} - data element not found in artifact")
-                    await self.renewal_collection.update_one(
-                        {"_id": event_id},
-                        {"$set": {"notification_sent": True, "updated_at": now, "status": "skipped_de_not_found"}},
-                    )
-                    continue
+    async def ensure_indexes(self):
+        """
+        Indexes backing the renewal pipeline: pending-event paging and notification dedup.
+        Notifications written before dedup keys existed are backfilled first; a failure to build
+        the unique index is raised, since without it retried events would notify twice.
+        """
+        await self.renewal_collection.create_index([("notification_sent", 1), ("_id", 1)], name="idx_notification_sent_id")
+        await self.renewal_collection.create_index([("notification_sent", 1), ("df_id", 1), ("_id", 1)], name="idx_notification_sent_df_id")
+        await self.backfill_dedup_keys()
+        try:
+            await self.notifications_collection.create_index("dedup_key", unique=True, sparse=True, name="idx_notification_dedup_key")
+        except OperationFailure as e:
+            app_logger.error(f"Could not create unique dedup index on notifications: {e}")
+            raise
+
+    @staticmethod
+    def _dedup_key(notification: dict) -> str:
+        return ":".join(
+            [
+                notification["type"],
+                notification["dp_id"],
+                notification["artifact_id"],
+                str(notification.get("data_element_id")),
+                str(notification.get("purpose_id") or ""),
+            ]
+        )
 
-                exists = await self.notifications_collection.find_one(
-                    {
-                        "dp_id": dp_id,
-                        "artifact_id": consent_artifact_id,
-                        "data_element_id": data_element_id,
-                        "type": "DATA_RETENTION_EXPIRY",
-                    }
-                )
-                if exists:
-                    app_logger.info(f"Data retention notification already exists for dp_id {dp_id} - data element {data_element_id}")
-                    await self.renewal_collection.update_one(
-                        {"_id": event_id},
-                        {"$set": {"notification_sent": True, "updated_at": now}},
-                    )
+    async def backfill_dedup_keys(self, batch_size: int = RENEWAL_CHUNK_SIZE) -> int:
+        """
+        Sets dedup_key on renewal notifications that predate it. When several old notifications share a
+        key, only the oldest gets it; the rest stay keyless (the index is sparse) so the unique index builds.
+        """
+        query = {"dedup_key": {"$exists": False}, "type": {"$in": ["CONSENT_RENEWAL", "DATA_RETENTION_EXPIRY"]}}
+        projection = {"type": 1, "dp_id": 1, "artifact_id": 1, "data_element_id": 1, "purpose_id": 1}
+        cursor = self.notifications_collection.find(query, projection).sort("_id", 1)
+
+        claimed: Set[str] = set()
+        backfilled = duplicates = 0
+
+        async def flush(batch: List[Tuple[Any, str]]) -> None:
+            nonlocal backfilled, duplicates
+            keys = {key for _, key in batch}
+            async for doc in self.notifications_collection.find({"dedup_key": {"$in": list(keys)}}, {"dedup_key": 1}):
+                claimed.add(doc["dedup_key"])
+            operations = []
+            for _id, key in batch:
+                if key in claimed:
+                    duplicates += 1
                     continue
-
-                app_logger.info(f"Creating data retention notification for dp_id {dp_id} - data element {data_element_id}")
-                await self.notifications_collection.insert_one(
-                    {
-                        "dp_id": dp_id,
-                        "artifact_id": consent_artifact_id,
-                        "type": "DATA_RETENTION_EXPIRY",
-                        "title": "Data retention period expiring",
-                        "message": f"The data retention period for {data_element_title} is soon going to expire on {retention_expiry_at}.",
-                        "status": "unread",
-                        "created_at": now,
-                        "expiry_date": datetime.fromisoformat(retention_expiry_at.replace("Z", "+00:00")),
-                        "data_element_id": data_element_id,
-                        "data_element_title": data_element_title,
-                        "cp_name": cp_name,
-                        "agreement_id": agreement_id,
-                    }
-                )
-                await self.renewal_collection.update_one(
-                    {"_id": event_id},
-                    {"$set": {"notification_sent": True, "updated_at": now}},
-                )
+                claimed.add(key)
+                operations.append(UpdateOne({"_id": _id, "dedup_key": {"$exists": False}}, {"$set": {"dedup_key": key}}))
+            if operations:
+                await self.notifications_collection.bulk_write(operations, ordered=False)
+                backfilled += len(operations)
+
+        batch: List[Tuple[Any, str]] = []
+        async for doc in cursor:
+            if not all(doc.get(field) for field in ("type", "dp_id", "artifact_id")):
+                continue
+            batch.append((doc["_id"], self._dedup_key(doc)))
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+
+        if backfilled or duplicates:
+            app_logger.info(f"Backfilled dedup_key on {backfilled} notifications; left {duplicates} duplicates without one.")
+        return backfilled
+
+    @staticmethod
+    def _find_data_element(artifact_doc: dict, data_element_id: Optional[str]) -> Optional[dict]:
+        for de in (artifact_doc.get("consent_scope") or {}).get("data_elements", []):
+            if de.get("de_id") == data_element_id:
+                return de
+        return None
+
+    def _build_notification(self, event: dict, artifacts: Dict[str, dict], now: datetime) -> Tuple[Optional[dict], Optional[str]]:
+        """Returns (notification, None) for an event that should notify, or (None, skip_status)."""
+        event_type = event.get("event_type")
+        consent_artifact_id = event.get("consent_artifact_id")
+        data_element_id = event.get("data_element_id")
+
+        if event_type == "consent_expiry":
+            purpose_id = event.get("purpose_id")
+            expiry_at = event.get("expiry_at")
+            if not all([consent_artifact_id, purpose_id, expiry_at]):
+                return None, "skipped_missing_fields"
+        elif event_type == "data_retention_expiry":
+            purpose_id = None
+            expiry_at = event.get("retention_expiry_at")
+            if not all([consent_artifact_id, data_element_id, expiry_at]):
+                return None, "skipped_missing_fields"
+        else:
+            return None, "skipped_unknown_event_type"
+
+        artifact = artifacts.get(consent_artifact_id)
+        if not artifact:
+            return None, "skipped_artifact_not_found"
+
+        artifact_doc = artifact.get("artifact") or {}
+        dp_id = (artifact_doc.get("data_principal") or {}).get("dp_id")
+        if not dp_id:
+            return None, "skipped_no_dp_id"
+
+        data_element = self._find_data_element(artifact_doc, data_element_id)
+        data_element_title = data_element.get("title", "") if data_element else ""
+        notification = {
+            "dp_id": dp_id,
+            "artifact_id": consent_artifact_id,
+            "status": "unread",
+            "created_at": now,
+            "expiry_date": datetime.fromisoformat(expiry_at.replace("Z", "+00:00")),
+            "data_element_id": data_element_id,
+            "data_element_title": data_element_title,
+            "cp_name": artifact_doc.get("cp_name", ""),
+            "agreement_id": artifact_doc.get("agreement_id", ""),
+        }
+
+        if event_type == "consent_expiry":
+            purpose_title = ""
+            for consent in (data_element or {}).get("consents", []):
+                if consent.get("purpose_id") == purpose_id:
+                    purpose_title = consent.get("purpose_title", "")
+                    break
+            if not (data_element_title and purpose_title):
+                return None, "skipped_de_or_purpose_not_found"
+            notification.update(
+                {
+                    "type": "CONSENT_RENEWAL",
+                    "title": "Consent renewal required",
+                    "message": f"Your consent for {data_element_title} (purpose: {purpose_title}) is soon going to expire and requires renewal by {expiry_at}.",
+                    "purpose_id": purpose_id,
+                    "purpose_title": purpose_title,
+                }
+            )
+        else:
+            if not data_element_title:
+                return None, "skipped_de_not_found"
+            notification.update(
+                {
+                    "type": "DATA_RETENTION_EXPIRY",
+                    "title": "Data retention period expiring",
+                    "message": f"The data retention period for {data_element_title} is soon going to expire on {expiry_at}.",
+                }
+            )
+
+        notification["dedup_key"] = self._dedup_key(notification)
+        return notification, None
+
+    async def _fetch_artifacts(self, events: List[dict]) -> Dict[str, dict]:
+        artifact_ids = {event.get("consent_artifact_id") for event in events}
+        object_ids = [ObjectId(artifact_id) for artifact_id in artifact_ids if isinstance(artifact_id, str) and ObjectId.is_valid(artifact_id)]
+        if not object_ids:
+            return {}
+        cursor = self.consent_artifact_collection.find({"_id": {"$in": object_ids}}, projection=ARTIFACT_PROJECTION)
+        return {str(doc["_id"]): doc async for doc in cursor}
+
+    async def _insert_notifications(self, notifications: List[Tuple[Any, dict]]) -> Set[Any]:
+        """Inserts notifications, treating dedup-key collisions as success. Returns event ids that failed."""
+        if not notifications:
+            return set()
+        try:
+            await self.notifications_collection.insert_many([doc for _, doc in notifications], ordered=False)
+        except BulkWriteError as e:
+            failed = {
+                notifications[error["index"]][0]
+                for error in e.details.get("writeErrors", [])
+                if error.get("code") != DUPLICATE_KEY_ERROR
+            }
+            if failed:
+                app_logger.error(f"Failed to insert {len(failed)} expiry notifications; their events will be retried.")
+            return failed
+        return set()
+
+    async def _process_renewal_chunk(self, events: List[dict], now: datetime) -> Counter:
+        artifacts = await self._fetch_artifacts(events)
+
+        outcomes: Counter = Counter()
+        statuses: Dict[Any, Optional[str]] = {}
+        notifications: List[Tuple[Any, dict]] = []
+        for event in events:
+            notification, skip_status = self._build_notification(event, artifacts, now)
+            statuses[event["_id"]] = skip_status
+            if notification:
+                notifications.append((event["_id"], notification))
             else:
-                app_logger.warning(f"Unknown event type: {event_type} for event {event_id}. Skipping.")
-                await self.renewal_collection.update_one(
-                    {"_id": event_id},
-                    {"$set": {"notification_sent": True, "updated_at": now, "status": "skipped_unknown_event_type"}},
-                )
+                outcomes[skip_status] += 1
+
+        failed = await self._insert_notifications(notifications)
+        outcomes["notified"] += len(notifications) - len(failed)
+        outcomes["failed"] += len(failed)
+
+        operations = []
+        for event_id, skip_status in statuses.items():
+            if event_id in failed:
+                continue
+            update = {"notification_sent": True, "updated_at": now}
+            if skip_status:
+                update["status"] = skip_status
+            operations.append(UpdateOne({"_id": event_id, **PENDING_RENEWAL_FILTER}, {"$set": update}))
+        if operations:
+            await self.renewal_collection.bulk_write(operations, ordered=False)
+        return outcomes
+
+    async def pending_partitions(self) -> List[Optional[str]]:
+        """df_ids with unsent expiry events; None stands for events written before df_id was recorded."""
+        partitions: List[Optional[str]] = [df_id for df_id in await self.renewal_collection.distinct("df_id", PENDING_RENEWAL_FILTER) if df_id]
+        if await self.renewal_collection.find_one({**PENDING_RENEWAL_FILTER, "df_id": None}, projection={"_id": 1}):
+            partitions.append(None)
+        return partitions
+
+    async def generate_notifications(self, df_id: Any = ALL_PARTITIONS, lease: Optional[JobLease] = None) -> Dict[str, int]:
+        """
+        Pages through unsent expiry events by _id and creates notifications a chunk at a time:
+        one $in query for the referenced artifacts, one insert_many deduplicated by the unique
+        dedup_key index, and one bulk_write marking the events.
+
+        When run as a scheduled partition, only the events of `df_id` are processed and the
+        lease is checked before each chunk so a replica that lost its lease stops writing.
+        """
+        app_logger.info(f"Generating expiry notifications{'' if df_id is ALL_PARTITIONS else f' for df_id {df_id}'}...")
+        now = datetime.now(UTC)
+
+        totals: Counter = Counter()
+        last_id = None
+        while True:
+            query = dict(PENDING_RENEWAL_FILTER)
+            if df_id is not ALL_PARTITIONS:
+                query["df_id"] = df_id
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            events = await self.renewal_collection.find(query).sort("_id", 1).limit(RENEWAL_CHUNK_SIZE).to_list(length=RENEWAL_CHUNK_SIZE)
+            if not events:
+                break
+
+            if lease:
+                await lease.check()
+            outcomes = await self._process_renewal_chunk(events, now)
+            totals.update(outcomes)
+            last_id = events[-1]["_id"]
+            app_logger.info(f"Processed {len(events)} expiry events up to {last_id}: {dict(outcomes)}")
+
+        app_logger.info(f"Finished generating expiry notifications: {dict(totals)}")
+        return dict(totals)
 
     async def get_notification(self, notification_id: str):
         return await self.notifications_collection.find_one({"_id": ObjectId(notification_id)})
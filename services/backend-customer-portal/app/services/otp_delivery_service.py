@@ -0,0 +1,30 @@
+import json
+import uuid
+from datetime import UTC, datetime
+
+from app.core.logger import app_logger
+from app.db.rabbitmq import OTP_DELIVERY_QUEUE, publish_message
+from app.utils.otp_utils import store_delivery_status
+
+
+async def enqueue_otp_email(df_id: str, email: str, subject: str) -> str:
+    """
+    Queues delivery of the OTP currently stored for `email` and returns a delivery id the
+    login UI can poll. The OTP itself stays in Redis; the worker reads it at send time.
+    """
+    delivery_id = uuid.uuid4().hex
+    await store_delivery_status(delivery_id, "queued")
+    await publish_message(
+        OTP_DELIVERY_QUEUE,
+        json.dumps(
+            {
+                "delivery_id": delivery_id,
+                "df_id": df_id,
+                "email": email,
+                "subject": subject,
+                "requested_at": datetime.now(UTC).isoformat(),
+            }
+        ),
+    )
+    app_logger.info(f"Queued OTP email delivery {delivery_id} for {email}")
+    return delivery_id
@@ -1,6 +1,9 @@
 import smtplib
+import threading
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from typing import Dict, List, Tuple
 from pydantic import BaseModel
 import secrets
 from app.core.logger import app_logger
@@ -76,6 +79,94 @@ async def mailSender(destination_email: str, subject: str, email_template: str,
             pass
 
 
+def build_email_message(sender_email: str, destination_email: str, subject: str, email_template: str) -> str:
+    msg = MIMEMultipart("alternative")
+    msg["From"] = sender_email
+    msg["To"] = destination_email
+    msg["Subject"] = subject
+    msg.attach(MIMEText(email_template, "html"))
+    return msg.as_string()
+
+
+class SMTPSessionPool:
+    """
+    Keeps authenticated SMTP sessions open per (host, port, username) so consecutive sends skip
+    the connect/STARTTLS/login handshake. Blocking; callers run `send` in a thread.
+    Sessions idle longer than `idle_seconds` are closed instead of reused.
+    """
+
+    def __init__(self, max_idle_per_server: int = 4, idle_seconds: int = 60, timeout: int = 30):
+        self.max_idle_per_server = max_idle_per_server
+        self.idle_seconds = idle_seconds
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, int, str], List[Tuple[float, smtplib.SMTP]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(credentials: EmailSenderCredentials) -> Tuple[str, int, str]:
+        return (credentials.server_addr, credentials.server_port, credentials.username or "")
+
+    def _connect(self, credentials: EmailSenderCredentials) -> smtplib.SMTP:
+        server = smtplib.SMTP(credentials.server_addr, credentials.server_port, timeout=self.timeout)
+        server.ehlo()
+        if server.has_extn("starttls"):
+            server.starttls()
+            server.ehlo()
+        if credentials.username and server.has_extn("auth"):
+            server.login(credentials.username, credentials.password)
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _acquire(self, credentials: EmailSenderCredentials) -> smtplib.SMTP:
+        key = self._key(credentials)
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    break
+                last_used, server = idle.pop()
+            if time.monotonic() - last_used < self.idle_seconds:
+                try:
+                    if server.noop()[0] == 250:
+                        return server
+                except (smtplib.SMTPException, OSError):
+                    pass
+            self._close(server)
+        return self._connect(credentials)
+
+    def _release(self, credentials: EmailSenderCredentials, server: smtplib.SMTP):
+        key = self._key(credentials)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_server:
+                idle.append((time.monotonic(), server))
+                return
+        self._close(server)
+
+    def send(self, credentials: EmailSenderCredentials, destination_email: str, message: str):
+        server = self._acquire(credentials)
+        try:
+            server.sendmail(credentials.sender_email, destination_email, message)
+        except (smtplib.SMTPException, OSError):
+            # The session is in an unknown state; drop it rather than return it to the pool.
+            self._close(server)
+            raise
+        self._release(credentials, server)
+
+    def close(self):
+        with self._lock:
+            sessions = [server for idle in self._idle.values() for _, server in idle]
+            self._idle = {}
+        for server in sessions:
+            self._close(server)
+
+
 def GenereateInviteToken(prefix: str = "", length: int = 32):
     token = secrets.token_urlsafe(length)
     return f"{prefix}-{token}"
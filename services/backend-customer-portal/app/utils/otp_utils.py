@@ -1,7 +1,7 @@
 from app.db.session import get_redis
 from app.core.config import settings
 import json
-from datetime import datetime
+from datetime import datetime, UTC
 from app.core.logger import app_logger
 
 BLOCK_WINDOW_HOURS = 24
@@ -79,3 +79,35 @@ async def store_attempts(key: str, attempts: list):
     except Exception as e:
         app_logger.error(f"Failed to store attempts for key: {key}: {e}", exc_info=True)
         raise
+
+
+async def store_delivery_status(delivery_id: str, status: str, **details):
+    redis = get_redis()
+    key = f"otp_delivery:{delivery_id}"
+    try:
+        record = {"delivery_id": delivery_id, "status": status, "updated_at": datetime.now(UTC).isoformat(), **details}
+        await redis.setex(key, settings.OTP_EXPIRY_SECONDS, json.dumps(record))
+        app_logger.debug(f"OTP delivery {delivery_id} marked {status}.")
+    except Exception as e:
+        app_logger.error(f"Failed to store OTP delivery status for {delivery_id}: {e}", exc_info=True)
+
+
+async def get_delivery_status(delivery_id: str) -> dict:
+    redis = get_redis()
+    try:
+        data = await redis.get(f"otp_delivery:{delivery_id}")
+        return json.loads(data) if data else None
+    except Exception as e:
+        app_logger.error(f"Failed to get OTP delivery status for {delivery_id}: {e}", exc_info=True)
+        return None
+
+
+async def claim_delivery_slot(dedup_key: str) -> bool:
+    """True if no identical OTP email was sent inside the resend cooldown window."""
+    redis = get_redis()
+    return bool(await redis.set(f"otp_delivery_sent:{dedup_key}", "1", nx=True, ex=settings.OTP_RESEND_COOLDOWN_SECONDS))
+
+
+async def release_delivery_slot(dedup_key: str):
+    redis = get_redis()
+    await redis.delete(f"otp_delivery_sent:{dedup_key}")
@@ -1,4 +1,8 @@
+import asyncio
+import hashlib
 import uuid
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Dict, List, Optional, Sequence
 from fastapi import HTTPException, UploadFile
 from minio import Minio, S3Error
 from app.core.config import settings
@@ -31,26 +35,137 @@ def make_s3_bucket(bucket_names: list[str], s3_client: Minio):
             set_bucket_expiry(s3_client, bucket_name, days=60)
 
 
-def upload_file_to_s3(file: UploadFile, s3_client: Minio) -> str:
-    try:
+# Leading bytes each accepted content type must start with; a renamed or mislabelled file is rejected.
+CONTENT_TYPE_SIGNATURES: Dict[str, Sequence[bytes]] = {
+    "application/pdf": (b"%PDF-",),
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+}
+
+
+@dataclass
+class UploadedDocument:
+    url: str
+    object_name: str
+    filename: str
+    content_type: str
+    size: int
+    sha256: str
+
+
+class _StreamingUploadReader:
+    """
+    File-like wrapper handed to Minio.put_object. Every chunk MinIO pulls is size-checked, hashed
+    and, for the first bytes, matched against the declared content type, so a bad file fails
+    mid-stream and MinIO aborts the multipart upload instead of storing it.
+    """
+
+    def __init__(self, source: BinaryIO, content_type: str, max_bytes: int):
+        self.source = source
+        self.signatures = CONTENT_TYPE_SIGNATURES.get(content_type, ())
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self._head = b""
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.source.read(size)
+        if not chunk:
+            return chunk
+
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise HTTPException(status_code=413, detail=f"File exceeds the {self.max_bytes} byte upload limit")
+
+        if self.signatures and self._head is not None:
+            self._head += chunk
+            longest = max(len(signature) for signature in self.signatures)
+            if len(self._head) >= longest:
+                if not any(self._head.startswith(signature) for signature in self.signatures):
+                    raise HTTPException(status_code=415, detail="File content does not match its declared content type")
+                self._head = None
+
+        self.sha256.update(chunk)
+        return chunk
+
 
-        file_extension = file.filename.split(".")[-1]
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
+def _stream_file_to_s3(
+    file: UploadFile, s3_client: Minio, bucket_name: str, object_name: str, content_type: str, max_bytes: int
+) -> _StreamingUploadReader:
+    file.file.seek(0)
+    reader = _StreamingUploadReader(file.file, content_type, max_bytes)
+    s3_client.put_object(bucket_name, object_name, reader, -1, content_type=content_type, part_size=settings.UPLOAD_PART_SIZE_BYTES)
+    if reader._head:
+        # Shorter than every signature for its type, so it cannot be a valid file of that type.
+        s3_client.remove_object(bucket_name, object_name)
+        raise HTTPException(status_code=415, detail="File content does not match its declared content type")
+    return reader
 
-        file.file.seek(0, 2)
-        file_size = file.file.tell()
-        file.file.seek(0)
 
-        s3_client.put_object(
-            settings.KYC_DOCUMENTS_BUCKET,
-            unique_filename,
-            file.file,
-            file_size,
-            content_type=file.content_type,
-        )
+async def stream_upload_to_s3(
+    file: UploadFile,
+    s3_client: Minio,
+    bucket_name: Optional[str] = None,
+    allowed_content_types: Optional[Sequence[str]] = None,
+    max_bytes: Optional[int] = None,
+) -> UploadedDocument:
+    """
+    Uploads one file to MinIO in UPLOAD_PART_SIZE_BYTES chunks from a worker thread, enforcing the
+    size and content-type limits while streaming, and returns its URL with the SHA-256 of its content.
+    """
+    bucket_name = bucket_name or settings.KYC_DOCUMENTS_BUCKET
+    allowed_content_types = allowed_content_types or settings.UPLOAD_ALLOWED_CONTENT_TYPES
+    max_bytes = max_bytes or settings.UPLOAD_MAX_FILE_BYTES
 
-        file_url = f"https://{settings.MINIO_BROWSER_URL}/{settings.KYC_DOCUMENTS_BUCKET}/{unique_filename}"
-        return file_url
+    content_type = (file.content_type or "").split(";")[0].strip().lower()
+    if content_type not in allowed_content_types:
+        raise HTTPException(status_code=415, detail=f"Unsupported file type '{file.content_type}' for {file.filename}")
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"{file.filename} exceeds the {max_bytes} byte upload limit")
 
+    file_extension = file.filename.split(".")[-1]
+    object_name = f"{uuid.uuid4()}.{file_extension}"
+    try:
+        reader = await asyncio.to_thread(_stream_file_to_s3, file, s3_client, bucket_name, object_name, content_type, max_bytes)
     except S3Error as e:
         raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
+
+    return UploadedDocument(
+        url=f"https://{settings.MINIO_BROWSER_URL}/{bucket_name}/{object_name}",
+        object_name=object_name,
+        filename=file.filename,
+        content_type=content_type,
+        size=reader.size,
+        sha256=reader.sha256.hexdigest(),
+    )
+
+
+async def stream_uploads_to_s3(files: List[UploadFile], s3_client: Minio, **limits) -> List[UploadedDocument]:
+    """
+    Uploads the files concurrently (at most UPLOAD_CONCURRENCY at a time) and returns them in input order.
+    If any upload fails, the ones that succeeded are removed so a request never points at a partial set.
+    """
+    semaphore = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
+
+    async def upload(file: UploadFile) -> UploadedDocument:
+        async with semaphore:
+            return await stream_upload_to_s3(file, s3_client, **limits)
+
+    results = await asyncio.gather(*(upload(file) for file in files), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if not errors:
+        return results
+
+    bucket_name = limits.get("bucket_name") or settings.KYC_DOCUMENTS_BUCKET
+    for result in results:
+        if isinstance(result, UploadedDocument):
+            try:
+                await asyncio.to_thread(s3_client.remove_object, bucket_name, result.object_name)
+            except S3Error as e:
+                app_logger.warning(f"Could not remove orphaned upload {result.object_name}: {e}")
+    raise errors[0]
+
+
+def uploaded_document_record(document: UploadedDocument, **fields) -> dict:
+    """The document metadata stored on the owning request."""
+    return {**asdict(document), **fields}
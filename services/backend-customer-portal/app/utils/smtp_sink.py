@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import os
+from datetime import datetime, UTC
+from email import message_from_bytes
+from typing import List, Optional
+
+from app.core.logger import app_logger
+
+
+class SMTPSink:
+    """
+    A minimal SMTP server that accepts every message and keeps it instead of delivering it.
+    Used for local runs and tests of the OTP delivery worker (set OTP_SMTP_SINK_HOST/PORT).
+    It speaks just enough SMTP for smtplib: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP and QUIT.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 1025, maildir: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.maildir = maildir
+        self.messages: List[dict] = []
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        app_logger.info(f"SMTP sink listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def _store(self, mail_from: str, rcpt_to: List[str], data: bytes):
+        parsed = message_from_bytes(data)
+        record = {"mail_from": mail_from, "rcpt_to": rcpt_to, "subject": parsed.get("Subject"), "data": data, "received_at": datetime.now(UTC)}
+        self.messages.append(record)
+        if self.maildir:
+            os.makedirs(self.maildir, exist_ok=True)
+            path = os.path.join(self.maildir, f"{record['received_at'].strftime('%Y%m%dT%H%M%S%f')}-{len(self.messages)}.eml")
+            with open(path, "wb") as eml:
+                eml.write(data)
+        app_logger.info(f"SMTP sink accepted a message for {', '.join(rcpt_to)}: {record['subject']}")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        mail_from, rcpt_to = None, []
+        await reply("220 smtp-sink ready")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors="replace").strip()
+                verb = command[:4].upper()
+
+                if verb == "EHLO":
+                    await reply("250-smtp-sink")
+                    await reply("250 8BITMIME")
+                elif verb == "HELO":
+                    await reply("250 smtp-sink")
+                elif verb == "MAIL":
+                    mail_from, rcpt_to = command.partition(":")[2].strip().strip("<>"), []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    rcpt_to.append(command.partition(":")[2].strip().strip("<>"))
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while True:
+                        data_line = await reader.readline()
+                        if not data_line or data_line in (b".\r\n", b".\n"):
+                            break
+                        lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                    self._store(mail_from, rcpt_to, b"".join(lines))
+                    mail_from, rcpt_to = None, []
+                    await reply("250 OK: queued")
+                elif verb == "RSET":
+                    mail_from, rcpt_to = None, []
+                    await reply("250 OK")
+                elif verb == "NOOP":
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+if __name__ == "__main__":
+    # python -m app.utils.smtp_sink --port 1025 --maildir logs/smtp_sink
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--maildir")
+    args = parser.parse_args()
+    asyncio.run(SMTPSink(args.host, args.port, args.maildir).serve_forever())
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import signal
+import smtplib
+import time
+from datetime import datetime, UTC
+from typing import Dict, Optional, Tuple
+
+import aio_pika
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.core.logger import setup_logging, get_logger
+from app.db.rabbitmq import OTP_DELIVERY_QUEUE, publish_message, rabbitmq_pool
+from app.db.session import connect_with_polling
+from app.services.email_templates import generate_email_template
+from app.utils.hashing import hash_shake256
+from app.utils.mail_utils import EmailSenderCredentials, SMTPSessionPool, build_email_message, get_email_credentials
+from app.utils.otp_utils import claim_delivery_slot, get_otp, release_delivery_slot, store_delivery_status
+
+logger = get_logger("worker.otp_delivery_consumer")
+
+db_client = AsyncIOMotorClient(settings.MONGO_URI, tz_aware=True)
+df_register_collection = db_client[settings.DB_NAME_CONCUR_MASTER]["df_register"]
+
+smtp_pool = SMTPSessionPool(max_idle_per_server=settings.OTP_SMTP_POOL_SIZE, idle_seconds=settings.OTP_SMTP_IDLE_SECONDS)
+
+# df_id -> (expires_at, credentials); misses are cached too so an unconfigured DF doesn't hit Mongo per OTP.
+_credentials_cache: Dict[str, Tuple[float, Optional[EmailSenderCredentials]]] = {}
+
+
+def _route_to_sink(credentials: Optional[EmailSenderCredentials]) -> EmailSenderCredentials:
+    return EmailSenderCredentials(
+        username="",
+        password="",
+        server_addr=settings.OTP_SMTP_SINK_HOST,
+        server_port=settings.OTP_SMTP_SINK_PORT,
+        sender_email=credentials.sender_email if credentials and credentials.sender_email else "otp@localhost",
+    )
+
+
+async def get_cached_credentials(df_id: str) -> Optional[EmailSenderCredentials]:
+    cached = _credentials_cache.get(df_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    credentials = await get_email_credentials(df_id, df_register_collection)
+    if settings.OTP_SMTP_SINK_HOST:
+        credentials = _route_to_sink(credentials)
+    _credentials_cache[df_id] = (time.monotonic() + settings.OTP_SMTP_CREDENTIALS_CACHE_SECONDS, credentials)
+    return credentials
+
+
+async def deliver_otp_email(payload: dict) -> str:
+    """
+    Sends the OTP currently stored for the payload's email and records the outcome under its delivery id.
+    The OTP is read from Redis at send time, so a job for a code that has expired or been replaced is dropped,
+    and the same code is sent at most once per resend cooldown.
+    """
+    delivery_id = payload["delivery_id"]
+    df_id = payload["df_id"]
+    email = payload["email"]
+    attempt = payload.get("attempt", 1)
+
+    otp_record = await get_otp(email)
+    if not otp_record or otp_record.get("df_id") != df_id:
+        await store_delivery_status(delivery_id, "expired")
+        return "expired"
+
+    otp = otp_record["otp"]
+    dedup_key = hash_shake256(f"{df_id}:{email}:{otp}")
+    if not await claim_delivery_slot(dedup_key):
+        logger.info(f"OTP delivery {delivery_id} skipped: the same code was already sent inside the cooldown")
+        await store_delivery_status(delivery_id, "deduplicated")
+        return "deduplicated"
+
+    credentials = await get_cached_credentials(df_id)
+    if not credentials:
+        await release_delivery_slot(dedup_key)
+        await store_delivery_status(delivery_id, "skipped", reason="missing_smtp_credentials")
+        logger.info(f"OTP delivery {delivery_id} skipped due to missing SMTP credentials for df_id {df_id}")
+        return "skipped"
+
+    await store_delivery_status(delivery_id, "sending", attempt=attempt)
+    message = build_email_message(credentials.sender_email, email, payload["subject"], generate_email_template("There!", otp))
+    try:
+        await asyncio.to_thread(smtp_pool.send, credentials, email, message)
+    except (smtplib.SMTPException, OSError) as e:
+        await release_delivery_slot(dedup_key)
+        if isinstance(e, smtplib.SMTPAuthenticationError):
+            _credentials_cache.pop(df_id, None)
+
+        if attempt < settings.OTP_DELIVERY_MAX_ATTEMPTS:
+            logger.warning(f"OTP delivery {delivery_id} attempt {attempt} failed, retrying: {e}")
+            await store_delivery_status(delivery_id, "retrying", attempt=attempt, error=str(e))
+            await asyncio.sleep(min(2**attempt, 10))
+            await publish_message(OTP_DELIVERY_QUEUE, json.dumps({**payload, "attempt": attempt + 1}))
+            return "retrying"
+
+        logger.error(f"OTP delivery {delivery_id} failed after {attempt} attempts: {e}")
+        await store_delivery_status(delivery_id, "failed", attempt=attempt, error=str(e))
+        return "failed"
+
+    await store_delivery_status(delivery_id, "sent", attempt=attempt, sent_at=datetime.now(UTC).isoformat())
+    logger.info(f"OTP delivery {delivery_id} sent to {email}")
+    return "sent"
+
+
+async def handle_message(message: aio_pika.IncomingMessage) -> None:
+    async with message.process():
+        try:
+            await deliver_otp_email(json.loads(message.body.decode()))
+        except Exception as e:
+            logger.critical(f"Error processing message in otp_delivery_consumer: {e}", exc_info=True)
+
+
+async def main():
+    await connect_with_polling()
+    await rabbitmq_pool.init_pool()
+    connection, channel = await rabbitmq_pool.open_channel(prefetch_count=settings.OTP_DELIVERY_CONCURRENCY)
+    queue = await channel.declare_queue(OTP_DELIVERY_QUEUE, durable=True)
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except NotImplementedError:
+            pass
+
+    # Up to OTP_DELIVERY_CONCURRENCY messages are handled at once; unacked ones are redelivered
+    # after a restart and the delivery slot stops them from being sent twice.
+    consumer_tag = await queue.consume(handle_message)
+    logger.info(f"OTP delivery consumer listening on '{OTP_DELIVERY_QUEUE}' with concurrency {settings.OTP_DELIVERY_CONCURRENCY}.")
+    try:
+        await stopping.wait()
+    finally:
+        await queue.cancel(consumer_tag)
+        await channel.close()
+        await rabbitmq_pool.close_pool()
+        await asyncio.to_thread(smtp_pool.close)
+        db_client.close()
+        logger.info("OTP delivery consumer stopped.")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    logger.info("OTP Delivery Consumer starting up.")
+    asyncio.run(main())
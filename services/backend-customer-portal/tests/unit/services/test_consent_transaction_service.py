@@ -0,0 +1,117 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from bson import ObjectId
+
+from app.services.consent_transaction_service import ConsentTransactionService
+
+
+def artifact_doc(agreement_id, agreement_hash, linked_hash=None, depth=None, agreement_date="2025-01-01T00:00:00", cp_id="cp1", cp_name="Signup"):
+    doc = {
+        "_id": ObjectId(),
+        "agreement_hash_id": agreement_hash,
+        "artifact": {
+            "agreement_id": agreement_id,
+            "cp_id": cp_id,
+            "cp_name": cp_name,
+            "linked_agreement_hash": linked_hash,
+            "data_principal": {"dp_id": "dp1"},
+            "data_fiduciary": {"df_id": "df1", "agreement_date": agreement_date},
+        },
+    }
+    if depth is not None:
+        doc["chain_depth"] = depth
+    return doc
+
+
+def aggregate_returning(docs):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=docs)
+    return MagicMock(return_value=cursor)
+
+
+@pytest.fixture
+def pointer_collection():
+    collection = MagicMock()
+    collection.bulk_write = AsyncMock()
+    collection.database = MagicMock()
+    collection.database.__getitem__.return_value.update_one = AsyncMock()
+    return collection
+
+
+@pytest.fixture
+def service(pointer_collection):
+    return ConsentTransactionService(MagicMock(), latest_pointer_collection=pointer_collection)
+
+
+@pytest.mark.asyncio
+async def test_resolve_consent_chain_keeps_one_artifact_per_depth(service):
+    base = artifact_doc("agr-3", "h3", linked_hash="h2")
+    base["linked_chain"] = [
+        artifact_doc("agr-1", "h1", depth=1),
+        artifact_doc("agr-2", "h2", linked_hash="h1", depth=0),
+        artifact_doc("agr-2b", "h2", linked_hash="h1", depth=0),
+    ]
+    service.collection.aggregate = aggregate_returning([base])
+
+    chain = await service.resolve_consent_chain("agr-3")
+
+    assert [doc["artifact"]["agreement_id"] for doc in chain] == ["agr-3", "agr-2", "agr-1"]
+    assert all("chain_depth" not in doc for doc in chain)
+
+
+@pytest.mark.asyncio
+async def test_resolve_consent_chain_stops_at_a_cycle(service):
+    base = artifact_doc("agr-2", "h2", linked_hash="h1")
+    base["linked_chain"] = [artifact_doc("agr-1", "h1", linked_hash="h2", depth=0), artifact_doc("agr-2", "h2", linked_hash="h1", depth=1)]
+    service.collection.aggregate = aggregate_returning([base])
+
+    chain = await service.resolve_consent_chain("agr-2")
+
+    assert [doc["artifact"]["agreement_id"] for doc in chain] == ["agr-2", "agr-1"]
+
+
+@pytest.mark.asyncio
+async def test_resolve_consent_chain_unknown_agreement(service):
+    service.collection.aggregate = aggregate_returning([])
+
+    assert await service.resolve_consent_chain("missing") == []
+
+
+@pytest.mark.asyncio
+async def test_seed_latest_pointers_inserts_without_overwriting_worker_pointers(service, pointer_collection):
+    doc = artifact_doc("agr-1", "h1", agreement_date="2025-03-01T12:00:00Z")
+    doc["_id"] = str(doc["_id"])
+    no_cp = artifact_doc("agr-2", "h2", cp_id=None)
+    no_cp["_id"] = str(no_cp["_id"])
+
+    await service._seed_latest_pointers("dp1", [doc, no_cp])
+
+    (operation,) = pointer_collection.bulk_write.await_args.args[0]
+    assert operation._filter == {"dp_id": "dp1", "df_id": "df1", "cp_id": "cp1"}
+    assert set(operation._doc) == {"$setOnInsert"}
+    inserted = operation._doc["$setOnInsert"]
+    assert inserted["artifact_id"] == ObjectId(doc["_id"])
+    assert inserted["agreement_hash_id"] == "h1"
+    assert inserted["agreement_date"] == datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+    assert operation._upsert is True
+    seeds = pointer_collection.database["consent_latest_pointer_seeds"]
+    assert seeds.update_one.await_args.args[0] == {"dp_id": "dp1"}
+
+
+@pytest.mark.asyncio
+async def test_full_scan_picks_terminal_artifact_with_latest_agreement_date(service):
+    older_terminal = artifact_doc("agr-a", "ha", agreement_date="2025-01-01T00:00:00")
+    superseded = artifact_doc("agr-b", "hb", agreement_date="2025-06-01T00:00:00")
+    newer_terminal = artifact_doc("agr-c", "hc", linked_hash="hb", agreement_date="2025-03-01T00:00:00")
+    cursor = MagicMock()
+    cursor.__aiter__.return_value = [older_terminal, superseded, newer_terminal]
+    service.collection.find = MagicMock(return_value=cursor)
+    service._pointers_seeded = AsyncMock(return_value=False)
+    service._seed_latest_pointers = AsyncMock()
+
+    result = await service.get_all_consent_transactions("dp1")
+
+    assert [doc["artifact"]["agreement_id"] for doc in result["data"]] == ["agr-c"]
+    service._seed_latest_pointers.assert_awaited_once_with("dp1", result["data"])
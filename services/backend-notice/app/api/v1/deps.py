@@ -1,4 +1,3 @@
-import json
 from typing import Optional, Dict, Any
 from fastapi import Header, HTTPException, Depends, Request
 from pymongo.database import Database
@@ -6,6 +5,7 @@ from contextlib import contextmanager
 
 from app.db.session import get_mongo_master_db, get_redis, get_tracer
 from app.core.logger import get_logger
+from app.services.config_cache_service import get_df_config
 
 
 logger = get_logger("api.deps")
@@ -38,17 +38,7 @@ async def get_validated_df(
 
     span_name = "dependency:get_validated_df"
     with tracer.start_as_current_span(span_name) if tracer else open_span(span_name) as span:
-        redis_key = f"{x_df_id}_detail"
-
-        redis_data = await redis_client.get(redis_key)
-        matching_df = json.loads(redis_data) if redis_data else None
-
-        if not matching_df:
-            logger.info(f"DF {x_df_id} not in cache, checking MongoDB...", extra={"df_id": x_df_id})
-            matching_df = await db.df_keys.find_one({"df_id": x_df_id})
-            if matching_df:
-                logger.info(f"DF {x_df_id} found in MongoDB, caching now.", extra={"df_id": x_df_id})
-                await redis_client.set(redis_key, json.dumps(matching_df, default=str))
+        matching_df = await get_df_config(x_df_id, db, redis_client)
 
         if not matching_df:
             logger.warning(f"DF {x_df_id} not found.", extra={"df_id": x_df_id})
@@ -4,13 +4,14 @@ import hashlib
 import json
 import os
 from datetime import datetime, timedelta, timezone
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from app.db.session import get_mongo_master_db, get_redis
 from app.schemas.consent_schema import TokenModel
 from app.services.consent_service import handle_submit_consent, get_redirection_and_fallback_url
 from app.services.notice_service import retrieve_notice_html, retrieve_otp_html
+from app.utils.notice_cache import NoticeVariant
 from pymongo.database import Database
-from app.db.rabbitmq import publish_message
+from app.db.rabbitmq import publish_consent_processing
 
 from app.utils.verification_utils import (
     OTP_LENGTH,
@@ -32,17 +33,30 @@ router = APIRouter()
 logger = get_logger("api.notice_endpoint")
 
 
+def _variant_response(request: Request, variant: NoticeVariant) -> Response:
+    """Serve a precompressed page variant, answering conditional requests with 304."""
+    headers = {
+        "Cache-Control": "private, no-cache, must-revalidate",
+        "ETag": variant.etag,
+        "Vary": "Accept-Encoding",
+    }
+    if request.headers.get("if-none-match") == variant.etag:
+        return Response(status_code=304, headers=headers)
+
+    body, encoding = variant.encoded(request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="text/html", headers=headers)
+
+
 @router.get("/get-notice/{token}", response_class=HTMLResponse, tags=["Notices"])
 async def get_notice(request: Request, token: str):
     """Decode JWT token and retrieve the notice HTML."""
     logger.debug(f"Received token: {token}")
 
     try:
-        html = await retrieve_notice_html(token=token, request=request)
-        return HTMLResponse(
-            content=html,
-            headers={"Cache-Control": "no-store, no-cache, must-revalidate"},
-        )
+        variant = await retrieve_notice_html(token=token, request=request)
+        return _variant_response(request, variant)
     except HTTPException as http_exc:
         logger.warning(f"HTTPException in get_notice: {http_exc.detail}", exc_info=True)
         raise http_exc
@@ -58,11 +72,8 @@ async def get_notice(request: Request, token: str):
     logger.debug(f"Received token for OTP page: {token}")
 
     try:
-        html = await retrieve_otp_html(token=token, request=request)
-        return HTMLResponse(
-            content=html,
-            headers={"Cache-Control": "no-store, no-cache, must-revalidate"},
-        )
+        variant = await retrieve_otp_html(token=token, request=request)
+        return _variant_response(request, variant)
     except HTTPException as http_exc:
         logger.warning(f"HTTPException in get_otp_page: {http_exc.detail}", exc_info=True)
         raise http_exc
@@ -127,7 +138,7 @@ async def verify_otp(request: Request, token: str, otp: str, gdb: Database = Dep
             "event_type": "otp_verification",
             "consent_artifact_id": agreement_id,
         }
-        await publish_message("consent_processing_q", json.dumps(message_payload))
+        await publish_consent_processing(message_payload)
         logger.info(f"Published OTP verification event for agreement {agreement_id}.")
 
         await redis_client.delete(pending_key)
@@ -221,7 +232,7 @@ async def dp_verification_ack(
             "event_type": "otp_verification",
             "consent_artifact_id": agreement_id,
         }
-        await publish_message("consent_processing_q", json.dumps(message_payload))
+        await publish_consent_processing(message_payload)
         logger.info(f"Published OTP verification event for agreement {agreement_id}.")
 
         await redis_client.delete(pending_key)
@@ -27,6 +27,10 @@ class Settings(BaseSettings):
     NOTICE_WORKER_BUCKET: str = "notice-worker-dev"
     S3_SECURE: bool = False
 
+    NOTICE_HTML_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    NOTICE_HTML_CACHE_TTL_SECONDS: int = 300
+    CONFIG_CACHE_TTL_SECONDS: int = 60
+
     SMS_SENDER_ID: str = "SAHAJ"
 
     RABBITMQ_HOST: str
@@ -36,6 +40,17 @@ class Settings(BaseSettings):
     RABBITMQ_PASSWORD: str
     RABBITMQ_VHOST_NAME: str
     RABBITMQ_POOL_SIZE: int = 5
+    RABBITMQ_CONNECTION_COUNT: int = 2
+    RABBITMQ_PUBLISHER_CHANNELS: int = 4
+    RABBITMQ_PUBLISH_BATCH_SIZE: int = 200
+    CONSENT_PROCESSING_SHARDS: int = 8
+    CONSENT_PROCESSING_WORKERS: int = 0
+
+    CONSENT_PROCESSING_PREFETCH: int = 10
+    CONSENT_LEDGER_RETENTION_DAYS: int = 7
+    CONSENT_OUTBOX_RETENTION_DAYS: int = 7
+    CONSENT_OUTBOX_RELAY_INTERVAL_SECONDS: int = 60
+    CONSENT_OUTBOX_RELAY_GRACE_SECONDS: int = 30
 
     PUBLIC_KEY_PEM: str
     PRIVATE_KEY_PEM: str
@@ -0,0 +1,279 @@
+import asyncio
+import hashlib
+import itertools
+import weakref
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractExchange, AbstractRobustConnection
+
+from app.core.config import settings
+from app.core.logger import app_logger
+
+
+RABBIT_MQ_RETRY_DELAY = 60
+RABBIT_MQ_RETRY_LIMIT = 10
+
+# Queues that are published through a named exchange instead of the default exchange.
+PUBLISH_ROUTES: Dict[str, Tuple[str, str]] = {
+    "webhook_main": ("webhook_exchange", "webhook_main"),
+    "webhook_retry": ("retry_exchange", "webhook_retry"),
+    "webhook_dlq": ("dlq_exchange", "webhook_dlq"),
+    "consent_events_q": ("consent_events_exchange", "consent_events_q"),
+    "consent_retry_q": ("consent_retry_exchange", "consent_retry_q"),
+    "consent_dlq": ("consent_dlq_exchange", "consent_dlq"),
+    "consent_expiry_queue": ("consent_expiry_exchange", "consent_expiry"),
+    "consent_processing_retry_q": ("consent_processing_retry_exchange", "consent_processing_retry_q"),
+    "consent_processing_dlq": ("consent_processing_dlq_exchange", "consent_processing_dlq"),
+}
+
+OutgoingMessage = Union[str, bytes, aio_pika.Message]
+
+
+def build_message(
+    body: Union[str, bytes],
+    correlation_id: Optional[str] = None,
+    reply_to: Optional[str] = None,
+    expiration: Optional[int] = None,
+) -> aio_pika.Message:
+    return aio_pika.Message(
+        body=body.encode() if isinstance(body, str) else body,
+        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        correlation_id=correlation_id,
+        reply_to=reply_to,
+        expiration=expiration,
+    )
+
+
+CONSENT_PROCESSING_QUEUE = "consent_processing_q"
+CONSENT_PROCESSING_SHARD_RETRY_EXCHANGE = "consent_processing_shard_retry_exchange"
+CONSENT_PROCESSING_SHARD_RETRY_QUEUE = "consent_processing_shard_retry_q"
+
+
+def consent_processing_shard_queues(shard_count: int) -> List[str]:
+    return [f"{CONSENT_PROCESSING_QUEUE}.{shard}" for shard in range(max(1, shard_count))]
+
+
+def owned_consent_processing_shards(worker_index: int, worker_count: int, shard_count: int) -> List[str]:
+    """Shard queues assigned to one worker process; shard i belongs to worker i % worker_count."""
+    return [queue_name for shard, queue_name in enumerate(consent_processing_shard_queues(shard_count)) if shard % worker_count == worker_index]
+
+
+def consent_processing_partition_key(payload: dict) -> str:
+    """
+    Agreement id for submissions, expiries (resolved by the expiry consumers at publish time) and OTP
+    verifications (which carry it as consent_artifact_id). The artifact id is only a fallback.
+    """
+    artifact = (payload.get("consent_artifact") or {}).get("artifact") or {}
+    return str(artifact.get("agreement_id") or payload.get("agreement_id") or payload.get("consent_artifact_id") or "")
+
+
+def _jump_consistent_hash(key: int, buckets: int) -> int:
+    # Lamping & Veach: growing from n to n+1 buckets moves only ~1/(n+1) of the keys.
+    bucket, candidate = -1, 0
+    while candidate < buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return bucket
+
+
+def consent_processing_queue_for(payload: dict, shard_count: int) -> str:
+    """The consent_processing_q shard that owns the payload's partition key."""
+    key = int.from_bytes(hashlib.blake2b(consent_processing_partition_key(payload).encode(), digest_size=8).digest(), "big")
+    return consent_processing_shard_queues(shard_count)[_jump_consistent_hash(key, max(1, shard_count))]
+
+
+async def declare_consent_processing_shards(channel: AbstractChannel, shard_count: int, retry_delay_ms: int):
+    """
+    Declares the shard queues and their shared retry queue. Shard queues dead-letter without
+    overriding the routing key, so a retried message returns to the shard it came from.
+    """
+    retry_exchange = await channel.declare_exchange(CONSENT_PROCESSING_SHARD_RETRY_EXCHANGE, aio_pika.ExchangeType.DIRECT, durable=True)
+    retry_queue = await channel.declare_queue(
+        CONSENT_PROCESSING_SHARD_RETRY_QUEUE,
+        durable=True,
+        arguments={"x-dead-letter-exchange": "", "x-message-ttl": retry_delay_ms},
+    )
+    for queue_name in consent_processing_shard_queues(shard_count):
+        await channel.declare_queue(queue_name, durable=True, arguments={"x-dead-letter-exchange": CONSENT_PROCESSING_SHARD_RETRY_EXCHANGE})
+        await retry_queue.bind(retry_exchange, routing_key=queue_name)
+    app_logger.info(f"Declared {max(1, shard_count)} consent processing shard queues.")
+
+
+class AsyncRabbitMQConnectionPool:
+    """
+    A small number of robust connections multiplexing a pool of channels.
+    Pool items are still (connection, channel) pairs so consumers borrow and release them as before.
+    """
+
+    def __init__(self, pool_size: int, connection_count: int):
+        self.pool_size = pool_size
+        self.connection_count = max(1, min(connection_count, pool_size))
+        self._connections: List[AbstractRobustConnection] = []
+        self._connection_cursor = itertools.count()
+        self._pool: asyncio.Queue = asyncio.Queue()
+        self._initialized = False
+
+    async def _connect(self) -> AbstractRobustConnection:
+        """Opens a robust connection, backing off exponentially without blocking the event loop."""
+        for attempt in range(1, RABBIT_MQ_RETRY_LIMIT + 1):
+            try:
+                return await aio_pika.connect_robust(
+                    host=settings.RABBITMQ_HOST,
+                    port=settings.RABBITMQ_PORT,
+                    login=settings.RABBITMQ_USER,
+                    password=settings.RABBITMQ_PASSWORD,
+                    virtualhost=settings.RABBITMQ_VHOST_NAME,
+                )
+            except aio_pika.exceptions.CONNECTION_EXCEPTIONS as e:
+                delay = min(RABBIT_MQ_RETRY_DELAY, 2**attempt)
+                app_logger.error(f"Failed to connect to RabbitMQ: {e} - Retry {attempt}/{RABBIT_MQ_RETRY_LIMIT} in {delay}s")
+                await asyncio.sleep(delay)
+        raise ConnectionError(f"Could not connect to RabbitMQ after {RABBIT_MQ_RETRY_LIMIT} attempts")
+
+    async def open_channel(self, prefetch_count: int = 20) -> Tuple[AbstractRobustConnection, AbstractChannel]:
+        """Opens a new channel on the next connection, replacing that connection if it was closed."""
+        if not self._connections:
+            self._connections = [await self._connect() for _ in range(self.connection_count)]
+
+        index = next(self._connection_cursor) % len(self._connections)
+        connection = self._connections[index]
+        if connection.is_closed:
+            connection = await self._connect()
+            self._connections[index] = connection
+
+        channel = await connection.channel(publisher_confirms=True)
+        if prefetch_count:
+            await channel.set_qos(prefetch_count=prefetch_count)
+        return connection, channel
+
+    async def init_pool(self):
+        """Opens the shared connections and fills the pool with channels spread across them."""
+        if self._initialized:
+            app_logger.warning("RabbitMQ pool already initialized.")
+            return
+
+        app_logger.info(f"Initializing RabbitMQ pool with {self.pool_size} channels over {self.connection_count} connections...")
+        for _ in range(self.pool_size):
+            await self._pool.put(await self.open_channel())
+        self._initialized = True
+        app_logger.info("RabbitMQ pool initialized successfully!")
+
+    async def get_connection(self) -> Tuple[AbstractRobustConnection, AbstractChannel]:
+        """Retrieves a connection and channel from the pool."""
+        return await self._pool.get()
+
+    async def release_connection(self, connection: AbstractRobustConnection, channel: AbstractChannel):
+        """Releases a channel back to the pool, replacing it if it was closed."""
+        if not channel.is_closed and not connection.is_closed:
+            await self._pool.put((connection, channel))
+            return
+
+        app_logger.warning("Channel was closed, opening a new one to replace it.")
+        try:
+            await self._pool.put(await self.open_channel())
+        except (ConnectionError, *aio_pika.exceptions.CONNECTION_EXCEPTIONS):
+            app_logger.error("Failed to open a new channel to replace the closed one.")
+
+    async def close_pool(self):
+        """Closes every channel in the pool and the shared connections."""
+        app_logger.info("Closing all connections in the pool...")
+        while not self._pool.empty():
+            _, channel = await self._pool.get()
+            if not channel.is_closed:
+                await channel.close()
+        for connection in self._connections:
+            if not connection.is_closed:
+                await connection.close()
+        self._connections = []
+        self._initialized = False
+        app_logger.info("RabbitMQ connections closed!")
+
+
+class RabbitMQPublisher:
+    """
+    Publishes on a few dedicated confirm-mode channels shared by all callers.
+    Exchange handles are cached per channel, and publish_many pipelines a batch
+    of messages and waits for their broker confirms together.
+    """
+
+    def __init__(self, pool: AsyncRabbitMQConnectionPool, queues: Iterable[str], exchanges: Dict[str, str], channel_count: int, batch_size: int):
+        self.pool = pool
+        self.exchanges = exchanges
+        self.destinations = set(queues) | set(exchanges)
+        self.channel_count = max(1, channel_count)
+        self.batch_size = max(1, batch_size)
+        self._channels: List[AbstractChannel] = []
+        self._channel_cursor = itertools.count()
+        self._channel_lock = asyncio.Lock()
+        self._exchange_cache: "weakref.WeakKeyDictionary[AbstractChannel, Dict[str, AbstractExchange]]" = weakref.WeakKeyDictionary()
+
+    def _route(self, queue_name: str) -> Tuple[str, str]:
+        if queue_name not in self.destinations:
+            app_logger.error(f"Invalid queue or exchange name for publishing: {queue_name}")
+            raise ValueError(f"Invalid queue or exchange name: {queue_name}")
+        if queue_name in PUBLISH_ROUTES:
+            return PUBLISH_ROUTES[queue_name]
+        if queue_name in self.exchanges:
+            return queue_name, ""
+        return "", queue_name
+
+    async def _publish_channel(self) -> AbstractChannel:
+        async with self._channel_lock:
+            if not self._channels:
+                self._channels = [(await self.pool.open_channel(prefetch_count=0))[1] for _ in range(self.channel_count)]
+            index = next(self._channel_cursor) % len(self._channels)
+            if self._channels[index].is_closed:
+                self._channels[index] = (await self.pool.open_channel(prefetch_count=0))[1]
+            return self._channels[index]
+
+    async def _exchange(self, channel: AbstractChannel, exchange_name: str) -> AbstractExchange:
+        if not exchange_name:
+            return channel.default_exchange
+        cached = self._exchange_cache.setdefault(channel, {})
+        exchange = cached.get(exchange_name)
+        if exchange is None:
+            exchange = await channel.get_exchange(exchange_name)
+            cached[exchange_name] = exchange
+        return exchange
+
+    async def publish(
+        self,
+        queue_name: str,
+        message: Union[str, bytes],
+        channel: Optional[AbstractChannel] = None,
+        correlation_id: Optional[str] = None,
+        reply_to: Optional[str] = None,
+        expiration: Optional[int] = None,
+    ):
+        """Publishes one message and waits for its broker confirm."""
+        await self.publish_many(queue_name, [build_message(message, correlation_id, reply_to, expiration)], channel=channel)
+
+    async def publish_many(self, queue_name: str, messages: Iterable[OutgoingMessage], channel: Optional[AbstractChannel] = None) -> int:
+        """
+        Publishes messages in batches of `batch_size`; each batch is written without waiting
+        and its confirms are awaited together. Returns the number of confirmed messages.
+        """
+        exchange_name, routing_key = self._route(queue_name)
+        _channel = channel or await self._publish_channel()
+        exchange = await self._exchange(_channel, exchange_name)
+
+        published = 0
+        batch: List[aio_pika.Message] = []
+        try:
+            for message in messages:
+                batch.append(message if isinstance(message, aio_pika.Message) else build_message(message))
+                if len(batch) >= self.batch_size:
+                    await asyncio.gather(*(exchange.publish(item, routing_key=routing_key) for item in batch))
+                    published += len(batch)
+                    batch = []
+            if batch:
+                await asyncio.gather(*(exchange.publish(item, routing_key=routing_key) for item in batch))
+                published += len(batch)
+        except Exception as e:
+            app_logger.error(f"Failed to publish to queue/exchange '{queue_name}' after {published} confirmed messages: {e}")
+            raise
+
+        app_logger.debug(f"Published {published} message(s) to queue/exchange '{queue_name}'.")
+        return published
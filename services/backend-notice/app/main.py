@@ -1,6 +1,5 @@
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
-import json
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -10,8 +9,10 @@ from slowapi.errors import RateLimitExceeded
 
 from app.api.routers import api_router
 from app.core.logger import setup_logging, app_logger
-from app.db.session import get_cp_master_collection, get_df_keys_collection, get_redis, startup_db_clients
+from app.db.session import get_mongo_master_db, get_redis, startup_db_clients
 from app.db.rabbitmq import declare_queues, rabbitmq_pool
+from app.services.notice_service import load_otp_page
+from app.services.config_cache_service import run_config_event_listener, warm_config_cache
 
 limiter = Limiter(key_func=get_ipaddr, default_limits=["100/minute"])
 
@@ -28,34 +29,17 @@ async def lifespan(app: FastAPI):
     setup_logging()
     app_logger.info("Application startup initiated.")
     await startup_db_clients()
+    load_otp_page()
 
     await rabbitmq_pool.init_pool()
     await declare_queues()
 
-    redis_client = get_redis()
-
-    df_keys = get_df_keys_collection()
-    df_data = await df_keys.find({}).to_list(length=None)
-
-    for record in df_data:
-        df_id = record.get("df_id")
-        if df_id:
-            key = f"{df_id}_detail"
-            value = json.dumps(record, default=str)
-            await redis_client.set(key, value)
-            app_logger.info(f"Stored DF key: {key} in Redis")
-
-    cp_master = get_cp_master_collection()
-    cp_data = await cp_master.find({"cp_status": "published"}).to_list(length=None)
-
-    for cp_record in cp_data:
-        cp_id = str(cp_record.get("_id"))
-        key = f"cp:{cp_id}"
-        await redis_client.set(key, json.dumps(cp_record, default=str))
-        app_logger.info(f"Stored CP record under key={key}")
+    await warm_config_cache(get_mongo_master_db(), get_redis())
+    config_listener = asyncio.create_task(run_config_event_listener(get_mongo_master_db()))
 
     app_logger.info("Application startup complete.")
     yield
+    config_listener.cancel()
     await rabbitmq_pool.close_pool()
     app_logger.info("Application shutdown initiated.")
     app_logger.info("Application shutdown complete.")
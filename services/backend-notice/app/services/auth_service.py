@@ -1,16 +1,16 @@
 import uuid
-import json
 import asyncpg
 from jose import jwt
 from datetime import datetime, timedelta
 from fastapi import HTTPException, BackgroundTasks
 from pymongo.database import Database
-from bson import ObjectId
+from bson.errors import InvalidId
 
 from app.core.config import settings
 from app.db.session import get_postgres_pool
 from app.schemas.authentication import AuthRequestSchema
 from app.core.logger import get_logger
+from app.services.config_cache_service import get_collection_point_config
 
 
 logger = get_logger("service.auth_service")
@@ -163,21 +163,15 @@ class AuthenticationService:
 
     async def _get_collection_point(self, cp_id: str) -> dict:
         """Fetches collection point from cache or database."""
-        redis_key = f"cp:{cp_id}"
-        cached_cp = await self.redis.get(redis_key)
-        if cached_cp:
-            return json.loads(cached_cp)
-
         try:
-            db_cp = await self.db.cp_master.find_one({"_id": ObjectId(cp_id)})
-        except Exception:
+            cp = await get_collection_point_config(cp_id, self.db, self.redis)
+        except (InvalidId, TypeError):
             raise HTTPException(status_code=400, detail="Invalid Collection Point ID format.")
 
-        if not db_cp:
+        if not cp:
             raise HTTPException(status_code=404, detail="Unknown Collection Point.")
 
-        await self.redis.set(redis_key, json.dumps(db_cp, default=str))
-        return db_cp
+        return cp
 
     def _create_jwt_token(self, payload: dict) -> str:
         """Encodes a JWT token."""
@@ -0,0 +1,180 @@
+import asyncio
+import copy
+import json
+import time
+from typing import Dict, Optional, Tuple
+
+import aio_pika
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.db.rabbitmq import rabbitmq_pool
+from app.db.session import get_redis
+from app.services.notice_service import invalidate_notice_cache
+
+
+logger = get_logger("service.config_cache_service")
+
+CONFIG_EVENTS_EXCHANGE = "config_events_exchange"
+
+_config_cache: Dict[str, Tuple[float, dict]] = {}
+
+
+def cp_cache_key(cp_id: str) -> str:
+    return f"cp:{cp_id}"
+
+
+def df_cache_key(df_id: str) -> str:
+    return f"{df_id}_detail"
+
+
+def _cache_get(key: str) -> Optional[dict]:
+    entry = _config_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        _config_cache.pop(key, None)
+        return None
+    return copy.deepcopy(value)
+
+
+def _cache_set(key: str, value: dict):
+    _config_cache[key] = (time.monotonic() + settings.CONFIG_CACHE_TTL_SECONDS, value)
+
+
+def _serialize(doc: dict) -> str:
+    return json.dumps(doc, default=str)
+
+
+async def _read_through(key: str, loader, redis_client) -> Optional[dict]:
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    redis_client = redis_client or get_redis()
+    redis_data = await redis_client.get(key)
+    if redis_data:
+        doc = json.loads(redis_data)
+    else:
+        logger.info(f"Config {key} not found in Redis, checking MongoDB", extra={"config_key": key})
+        db_doc = await loader()
+        if not db_doc:
+            return None
+        serialized = _serialize(db_doc)
+        await redis_client.set(key, serialized)
+        doc = json.loads(serialized)
+
+    _cache_set(key, doc)
+    return copy.deepcopy(doc)
+
+
+async def get_collection_point_config(cp_id: str, gdb, redis_client=None) -> Optional[dict]:
+    """Collection point document from the in-process cache, then Redis, then MongoDB."""
+    return await _read_through(cp_cache_key(cp_id), lambda: gdb.cp_master.find_one({"_id": ObjectId(cp_id)}), redis_client)
+
+
+async def get_df_config(df_id: str, gdb, redis_client=None) -> Optional[dict]:
+    """DF keys document from the in-process cache, then Redis, then MongoDB."""
+    return await _read_through(df_cache_key(df_id), lambda: gdb.df_keys.find_one({"df_id": df_id}), redis_client)
+
+
+async def _flush_batch(redis_client, batch: list):
+    if not batch:
+        return
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key, value in batch:
+            pipe.set(key, value)
+        await pipe.execute()
+
+
+async def warm_config_cache(gdb, redis_client, batch_size: int = 500) -> Tuple[int, int]:
+    """Loads every DF key and published collection point into Redis using pipelined batches."""
+    df_count = 0
+    batch = []
+    async for record in gdb.df_keys.find({}):
+        df_id = record.get("df_id")
+        if not df_id:
+            continue
+        batch.append((df_cache_key(df_id), _serialize(record)))
+        df_count += 1
+        if len(batch) >= batch_size:
+            await _flush_batch(redis_client, batch)
+            batch = []
+    await _flush_batch(redis_client, batch)
+
+    cp_count = 0
+    batch = []
+    async for cp_record in gdb.cp_master.find({"cp_status": "published"}):
+        batch.append((cp_cache_key(str(cp_record.get("_id"))), _serialize(cp_record)))
+        cp_count += 1
+        if len(batch) >= batch_size:
+            await _flush_batch(redis_client, batch)
+            batch = []
+    await _flush_batch(redis_client, batch)
+
+    logger.info(f"Warmed config cache with {df_count} DF keys and {cp_count} published collection points.")
+    return df_count, cp_count
+
+
+async def apply_config_event(event: dict, gdb, redis_client):
+    """Refreshes Redis and drops in-process entries for a changed collection point or DF."""
+    entity = event.get("entity")
+    df_id = event.get("df_id")
+    cp_id = event.get("cp_id")
+
+    if entity == "cp" and cp_id:
+        key = cp_cache_key(cp_id)
+        _config_cache.pop(key, None)
+        cp_record = await gdb.cp_master.find_one({"_id": ObjectId(cp_id)})
+        if cp_record and cp_record.get("cp_status") == "published":
+            await redis_client.set(key, _serialize(cp_record))
+        else:
+            await redis_client.delete(key)
+        await redis_client.delete(f"notice:{df_id}:{cp_id}")
+        invalidate_notice_cache(df_id, cp_id)
+    elif entity == "df" and df_id:
+        key = df_cache_key(df_id)
+        _config_cache.pop(key, None)
+        df_record = await gdb.df_keys.find_one({"df_id": df_id})
+        if df_record:
+            await redis_client.set(key, _serialize(df_record))
+        else:
+            await redis_client.delete(key)
+        invalidate_notice_cache(df_id)
+    else:
+        logger.warning(f"Ignoring malformed config event: {event}")
+        return
+
+    logger.info(f"Applied config change for {entity} df_id={df_id} cp_id={cp_id}")
+
+
+async def run_config_event_listener(gdb):
+    """Consumes config change broadcasts on an exclusive queue bound to the fanout exchange."""
+    while True:
+        connection, channel = None, None
+        try:
+            connection, channel = await rabbitmq_pool.get_connection()
+            exchange = await channel.declare_exchange(CONFIG_EVENTS_EXCHANGE, aio_pika.ExchangeType.FANOUT, durable=True)
+            queue = await channel.declare_queue("", exclusive=True, auto_delete=True)
+            await queue.bind(exchange)
+            logger.info("Listening for config change events...")
+
+            async with queue.iterator() as queue_iter:
+                async for message in queue_iter:
+                    async with message.process():
+                        try:
+                            await apply_config_event(json.loads(message.body.decode()), gdb, get_redis())
+                        except Exception as e:
+                            logger.error(f"Failed to apply config event: {e}", exc_info=True)
+
+        except asyncio.CancelledError:
+            logger.info("Config event listener cancelled.")
+            raise
+        except Exception as e:
+            logger.error(f"Config event listener failed (restarting): {e}", exc_info=True)
+            await asyncio.sleep(5)
+        finally:
+            if connection and channel:
+                await rabbitmq_pool.release_connection(connection, channel)
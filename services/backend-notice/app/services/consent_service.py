@@ -1,9 +1,8 @@
 import uuid
-import json
 from datetime import UTC, datetime
 
 from fastapi import Request, HTTPException, BackgroundTasks
-from app.db.rabbitmq import publish_message
+from app.db.rabbitmq import publish_consent_processing
 from app.db.session import get_redis
 from app.utils.request_utils import get_client_ip
 
@@ -15,9 +14,9 @@ from app.services.consent_artifact_service import (
     validate_jwt_token,
     get_dp_email_and_mobile,
 )
-from bson import ObjectId
 
 from app.services.otp_service import send_otp_if_required
+from app.services.config_cache_service import get_collection_point_config
 from app.utils.verification_utils import otp_verified_key
 from app.core.logger import get_logger
 
@@ -56,7 +55,9 @@ async def handle_submit_consent(
 
         request_headers_hash = await hash_headers(request.headers)
 
-        cp_doc = await gdb.cp_master.find_one({"_id": ObjectId(collection_point_id), "df_id": df_id})
+        cp_doc = await get_collection_point_config(collection_point_id, gdb, redis_client)
+        if cp_doc and cp_doc.get("df_id") != df_id:
+            cp_doc = None
         collection_point_name = cp_doc.get("cp_name") if cp_doc else "Unknown"
 
         logger.debug(f"Dp id that is being processed: {dp_id}", extra={"dp_id": dp_id})
@@ -83,7 +84,7 @@ async def handle_submit_consent(
             "timestamp": datetime.now(UTC).isoformat(),
             "consent_artifact": consent_artifact,
         }
-        await publish_message("consent_processing_q", json.dumps(message_payload))
+        await publish_consent_processing(message_payload)
 
         needs_otp = bool(cp_doc.get("is_verification_required") and cp_doc.get("verification_done_by") == "sahaj")
 
@@ -144,13 +145,7 @@ async def handle_submit_consent(
 
 async def get_redirection_and_fallback_url(collection_point_id: str, gdb):
     """Get redirection URL from Redis or MongoDB."""
-    redis_client = get_redis()
-    redis_key = f"cp:{collection_point_id}"
-    redis_data = await redis_client.get(redis_key)
-    matching_cp = json.loads(redis_data) if redis_data else None
-    if not matching_cp:
-        logger.info("Collection Point not found in Redis, checking MongoDB", extra={"collection_point_id": collection_point_id})
-        matching_cp = await gdb.cp_master.find_one({"_id": ObjectId(collection_point_id)})
+    matching_cp = await get_collection_point_config(collection_point_id, gdb)
     if not matching_cp:
         logger.error(f"Collection Point {collection_point_id} not found in database.", extra={"collection_point_id": collection_point_id})
         raise HTTPException(status_code=404, detail="Collection Point not found in database.")
@@ -1,9 +1,11 @@
 import asyncio
 import json
-from datetime import datetime, UTC
+from datetime import datetime, timedelta, UTC
 from typing import Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from bson.objectid import ObjectId
 import aio_pika
 
@@ -18,6 +20,11 @@ from cryptography.hazmat.primitives.asymmetric import ec
 
 logger = get_logger("service.consent_worker_service")
 
+# Version 1 events carried the full flattened purpose objects; version 2 carries compact change records.
+CONSENT_CHANGE_SCHEMA_VERSION = 2
+
+DUPLICATE_KEY_ERROR = 11000
+
 
 def canonical_ts(value=None) -> str:
     """
@@ -43,6 +50,153 @@ def canonical_ts(value=None) -> str:
     return dt.isoformat()
 
 
+def parse_expiry(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=UTC)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=UTC)
+
+
+def build_consent_grants(data_elements: list) -> list:
+    """
+    Flatten the consents of an artifact into one entry per (de_id, purpose_id) with a real
+    datetime expiry, so expiry reports can be indexed and aggregated without parsing strings.
+    """
+    grants = []
+    for element in data_elements:
+        for consent in element.get("consents", []):
+            grants.append(
+                {
+                    "de_id": element.get("de_id"),
+                    "purpose_id": consent.get("purpose_id"),
+                    "purpose_title": consent.get("purpose_title"),
+                    "consent_status": consent.get("consent_status"),
+                    "expires_at": parse_expiry(consent.get("consent_expiry_period")),
+                }
+            )
+    return grants
+
+
+def build_consent_changes(old_data_elements: list, new_data_elements: list) -> list:
+    """
+    Compact change records, one per (de_id, purpose_id) whose status differs from the previous
+    artifact. Built once per submission and shared by the consent event and the audit log.
+    """
+    old_statuses = {
+        (element.get("de_id"), consent.get("purpose_id")): consent.get("consent_status")
+        for element in old_data_elements
+        for consent in element.get("consents", [])
+    }
+
+    changes = []
+    seen = set()
+    for element in new_data_elements:
+        for consent in element.get("consents", []):
+            key = (element.get("de_id"), consent.get("purpose_id"))
+            if key in seen:
+                continue
+            seen.add(key)
+            old_status = old_statuses.get(key)
+            new_status = consent.get("consent_status")
+            if new_status == old_status:
+                continue
+            changes.append(
+                {
+                    "de_id": key[0],
+                    "de_title": element.get("title"),
+                    "purpose_id": key[1],
+                    "purpose_title": consent.get("purpose_title"),
+                    "old_status": old_status,
+                    "new_status": new_status,
+                    "data_processor_ids": [
+                        processor.get("data_processor_id") if isinstance(processor, dict) else processor
+                        for processor in consent.get("data_processors", [])
+                    ],
+                }
+            )
+    return changes
+
+
+def _comparable(value):
+    """Mongo stores naive UTC datetimes with millisecond precision; compare submissions the same way."""
+    if isinstance(value, datetime):
+        if value.tzinfo:
+            value = value.astimezone(UTC).replace(tzinfo=None)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    if isinstance(value, dict):
+        return {key: _comparable(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_comparable(item) for item in value]
+    return value
+
+
+def _same_consent_layout(old_artifact: dict, new_artifact: dict) -> bool:
+    old_scope = old_artifact.get("consent_scope") or {}
+    new_scope = new_artifact.get("consent_scope") or {}
+    old_elements = old_scope.get("data_elements") or []
+    new_elements = new_scope.get("data_elements") or []
+    if set(old_scope) != set(new_scope) or len(old_elements) != len(new_elements):
+        return False
+    for old_element, new_element in zip(old_elements, new_elements):
+        if set(old_element) - set(new_element) or old_element.get("de_id") != new_element.get("de_id"):
+            return False
+        old_purposes = [consent.get("purpose_id") for consent in old_element.get("consents", [])]
+        new_purposes = [consent.get("purpose_id") for consent in new_element.get("consents", [])]
+        if old_purposes != new_purposes:
+            return False
+    return True
+
+
+def _artifact_set_paths(old_artifact: dict, new_artifact: dict) -> dict:
+    if set(old_artifact) - set(new_artifact) or not _same_consent_layout(old_artifact, new_artifact):
+        return {"artifact": new_artifact}
+
+    paths = {}
+    for key, value in new_artifact.items():
+        if key != "consent_scope":
+            if _comparable(old_artifact.get(key)) != _comparable(value):
+                paths[f"artifact.{key}"] = value
+            continue
+        old_elements = old_artifact["consent_scope"].get("data_elements") or []
+        for name, scope_value in value.items():
+            if name != "data_elements" and _comparable(old_artifact["consent_scope"].get(name)) != _comparable(scope_value):
+                paths[f"artifact.consent_scope.{name}"] = scope_value
+        for i, (old_element, new_element) in enumerate(zip(old_elements, value.get("data_elements") or [])):
+            prefix = f"artifact.consent_scope.data_elements.{i}"
+            for name, element_value in new_element.items():
+                if name != "consents" and _comparable(old_element.get(name)) != _comparable(element_value):
+                    paths[f"{prefix}.{name}"] = element_value
+            for j, (old_consent, new_consent) in enumerate(zip(old_element.get("consents", []), new_element.get("consents", []))):
+                if _comparable(old_consent) != _comparable(new_consent):
+                    paths[f"{prefix}.consents.{j}"] = new_consent
+    return paths
+
+
+def build_minimal_set(existing: dict, update_fields: dict) -> dict:
+    """
+    Reduces a full latest-artifact update to `$set` paths for the fields that actually changed.
+    Individual consent entries and consent grants are set by position when the data element and
+    purpose layout is unchanged; otherwise the whole artifact is replaced as before.
+    """
+    paths = {}
+    for key, value in update_fields.items():
+        old_value = existing.get(key)
+        if key == "artifact" and isinstance(old_value, dict) and isinstance(value, dict):
+            paths.update(_artifact_set_paths(old_value, value))
+        elif key == "consent_grants" and isinstance(old_value, list) and len(old_value) == len(value):
+            for i, (old_grant, new_grant) in enumerate(zip(old_value, value)):
+                if _comparable(old_grant) != _comparable(new_grant):
+                    paths[f"consent_grants.{i}"] = new_grant
+        elif _comparable(old_value) != _comparable(value):
+            paths[key] = value
+    return paths
+
+
 class ConsentWorkerService:
     def __init__(self, gdb: AsyncIOMotorDatabase, channel: aio_pika.Channel):
         self.gdb = gdb
@@ -119,105 +273,237 @@ class ConsentWorkerService:
         )
         return base64.b64encode(sig).decode("ascii")
 
-    def _extract_flattened_purposes(self, data_elements_consents: list) -> list:
-        purposes_list = []
-        seen = set()
-        for element in data_elements_consents:
-            de_base = {
-                "de_id": element.get("de_id"),
-                "de_hash_id": element.get("de_hash_id"),
-                "title": element.get("title"),
-                "data_retention_period": element.get("data_retention_period"),
-            }
-            for consent in element.get("consents", []):
-                unique_key = f"{de_base['de_id']}_{consent.get('purpose_id')}"
-                if unique_key in seen:
-                    continue
-                seen.add(unique_key)
-                flattened = {**de_base, **consent}
-                purposes_list.append(flattened)
-        return purposes_list
-
-    async def _publish_initial_consent_events(self, full_consent_artifact: dict, dp_id: str, df_id: str, channel: aio_pika.Channel):
-        data_elements_consents = full_consent_artifact["artifact"]["consent_scope"]["data_elements"]
-        collection_point_name = full_consent_artifact["artifact"]["cp_name"]
-        timestamp = canonical_ts()
+    @staticmethod
+    async def ensure_indexes(gdb: AsyncIOMotorDatabase):
+        """Indexes for the submission ledger, the event outbox, audit de-duplication and the latest pointers."""
+        await gdb.consent_processing_ledger.create_index(
+            "completed_at", expireAfterSeconds=settings.CONSENT_LEDGER_RETENTION_DAYS * 86400, name="ttl_completed_at"
+        )
+        await gdb.consent_event_outbox.create_index([("status", ASCENDING), ("request_key", ASCENDING)], name="idx_status_request_key")
+        await gdb.consent_event_outbox.create_index([("status", ASCENDING), ("created_at", ASCENDING)], name="idx_status_created_at")
+        await gdb.consent_event_outbox.create_index([("status", ASCENDING), ("claimed_at", ASCENDING)], name="idx_status_claimed_at")
+        await gdb.consent_event_outbox.create_index(
+            "published_at", expireAfterSeconds=settings.CONSENT_OUTBOX_RETENTION_DAYS * 86400, name="ttl_published_at"
+        )
+        await gdb.consent_audit_logs.create_index("request_key", sparse=True, name="idx_request_key")
+        # Same spec as the customer portal's index; the pointer upsert relies on it being unique.
+        await gdb.consent_latest_pointers.create_index(
+            [("dp_id", ASCENDING), ("df_id", ASCENDING), ("cp_id", ASCENDING)], name="idx_dp_df_cp_latest", unique=True
+        )
 
-        purposes_list = self._extract_flattened_purposes(data_elements_consents)
+    @staticmethod
+    def _request_key(payload: dict, agreement_id: str) -> str:
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()).hexdigest()
+        return f"{agreement_id}:{digest}"
 
-        approved_purposes = [p for p in purposes_list if p.get("consent_status") == "approved"]
-        denied_purposes = [p for p in purposes_list if p.get("consent_status") == "denied"]
+    async def _claim_submission(self, request_key: str, agreement_id: str) -> dict:
+        now = datetime.now(UTC)
+        return await self.gdb.consent_processing_ledger.find_one_and_update(
+            {"_id": request_key},
+            {
+                "$setOnInsert": {"agreement_id": agreement_id, "status": "received", "created_at": now},
+                "$set": {"updated_at": now},
+                "$inc": {"attempts": 1},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
 
-        if approved_purposes:
-            message_to_publish_granted = {
+    async def _prepare_submission(self, ledger: dict, existing_artifact: Optional[dict], new_data_elements: list) -> dict:
+        """Fixes the version and change records of a submission once, so retries reuse them."""
+        old_data_elements = existing_artifact.get("artifact", {}).get("consent_scope", {}).get("data_elements", []) if existing_artifact else []
+        prepared = {
+            "status": "prepared",
+            "version": existing_artifact.get("version", 0) + 1 if existing_artifact else 1,
+            "operation": "update" if existing_artifact else "insert",
+            "changes": build_consent_changes(old_data_elements, new_data_elements),
+            "updated_at": datetime.now(UTC),
+        }
+        await self.gdb.consent_processing_ledger.update_one({"_id": ledger["_id"]}, {"$set": prepared})
+        return {**ledger, **prepared}
+
+    async def _stage_consent_events(
+        self, request_key: str, changes: list, dp_id: str, df_id: str, cp_id: str, cp_name: str, agreement_id: str, version: int
+    ):
+        """Writes one consent_granted and one consent_withdrawn event to the outbox, keyed so retries do not duplicate them."""
+        timestamp = canonical_ts()
+        entries = []
+        for event_type, status in (("consent_granted", "approved"), ("consent_withdrawn", "denied")):
+            event_changes = [change for change in changes if change["new_status"] == status]
+            if not event_changes:
+                continue
+            event_id = f"{request_key}:{event_type}"
+            message = {
+                "schema_version": CONSENT_CHANGE_SCHEMA_VERSION,
+                "event_id": event_id,
                 "dp_id": dp_id,
                 "df_id": df_id,
-                "cp_name": collection_point_name,
-                "event_type": "consent_granted",
+                "cp_id": cp_id,
+                "cp_name": cp_name,
+                "agreement_id": agreement_id,
+                "version": version,
+                "event_type": event_type,
                 "timestamp": timestamp,
-                "purposes": approved_purposes,
+                "changes": event_changes,
             }
-            await publish_message("consent_events_q", json.dumps(message_to_publish_granted), channel=channel)
+            entries.append(
+                {
+                    "_id": event_id,
+                    "request_key": request_key,
+                    "queue": "consent_events_q",
+                    "body": json.dumps(message),
+                    "status": "pending",
+                    "created_at": datetime.now(UTC),
+                }
+            )
 
-        if denied_purposes:
-            message_to_publish_withdrawn = {
-                "dp_id": dp_id,
-                "df_id": df_id,
-                "cp_name": collection_point_name,
-                "event_type": "consent_withdrawn",
-                "timestamp": timestamp,
-                "purposes": denied_purposes,
+        if not entries:
+            return
+        try:
+            await self.gdb.consent_event_outbox.insert_many(entries, ordered=False)
+        except BulkWriteError as e:
+            if any(error.get("code") != DUPLICATE_KEY_ERROR for error in e.details.get("writeErrors", [])):
+                raise
+
+    async def _claim_outbox_entry(self, query: dict) -> Optional[dict]:
+        return await self.gdb.consent_event_outbox.find_one_and_update(
+            query,
+            {"$set": {"status": "publishing", "claimed_at": datetime.now(UTC)}},
+            sort=[("_id", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def flush_outbox(self, request_key: Optional[str] = None, created_before: Optional[datetime] = None) -> int:
+        """
+        Publishes pending outbox events (optionally for one submission, or staged before a cutoff) and marks each as published.
+        Each entry is claimed (pending -> publishing) before it is published, so a submission's own flush and the relay
+        never publish the same entry concurrently. A failed publish puts the entry back to pending.
+        """
+        query = {"status": "pending"}
+        if request_key:
+            query["request_key"] = request_key
+        if created_before:
+            # Entries left in publishing by a worker that stopped mid-flush are reclaimed after the same grace period.
+            query = {
+                "$or": [
+                    {**query, "created_at": {"$lt": created_before}},
+                    {"status": "publishing", "claimed_at": {"$lt": created_before}},
+                ]
             }
-            await publish_message("consent_events_q", json.dumps(message_to_publish_withdrawn), channel=channel)
 
-    async def _compare_and_publish_consent_changes(self, old_artifact: dict, new_artifact: dict, dp_id: str, df_id: str, channel: aio_pika.Channel):
-        old_flattened_purposes = self._extract_flattened_purposes(old_artifact["artifact"]["consent_scope"]["data_elements"])
-        new_flattened_purposes = self._extract_flattened_purposes(new_artifact["artifact"]["consent_scope"]["data_elements"])
+        published = 0
+        while True:
+            entry = await self._claim_outbox_entry(query)
+            if not entry:
+                break
+            try:
+                await publish_message(entry["queue"], entry["body"], channel=self.channel)
+            except Exception:
+                await self.gdb.consent_event_outbox.update_one({"_id": entry["_id"], "status": "publishing"}, {"$set": {"status": "pending"}})
+                raise
+            await self.gdb.consent_event_outbox.update_one(
+                {"_id": entry["_id"]}, {"$set": {"status": "published", "published_at": datetime.now(UTC)}}
+            )
+            published += 1
+        return published
 
-        old_consents_map = {f"{p['de_id']}_{p['purpose_id']}": p["consent_status"] for p in old_flattened_purposes}
-        new_consents_map = {f"{p['de_id']}_{p['purpose_id']}": p["consent_status"] for p in new_flattened_purposes}
+    async def relay_stale_outbox(self) -> int:
+        """
+        Publishes events left pending (or stuck in publishing) by a worker that stopped before flushing them, and
+        whose submission is never redelivered. Entries younger than the grace period are left to the submission's
+        own flush. An event published again after a crash between publish and mark keeps its event_id, which the
+        cmp-admin consent event consumer de-duplicates on.
+        """
+        cutoff = datetime.now(UTC) - timedelta(seconds=settings.CONSENT_OUTBOX_RELAY_GRACE_SECONDS)
+        published = await self.flush_outbox(created_before=cutoff)
+        if published:
+            logger.warning(f"Outbox relay published {published} stale consent events")
+        return published
 
-        new_purposes_map_full = {f"{p['de_id']}_{p['purpose_id']}": p for p in new_flattened_purposes}
+    async def _update_latest_pointer(self, dp_id: str, df_id: str, cp_id: str, agreement_id: str, artifact_id, full_consent_artifact: dict):
+        """
+        Point (dp_id, df_id, cp_id) at the terminal artifact with the latest agreement_date, the same choice
+        the customer portal makes when it scans artifacts. The pointer moves when the submission supersedes
+        the pointed artifact (same agreement, or linked to its hash) or is not older than it; otherwise the
+        upsert hits the unique pointer index and the newer pointer is kept.
+        """
+        artifact = full_consent_artifact["artifact"]
+        agreement_date = parse_expiry((artifact.get("data_fiduciary") or {}).get("agreement_date")) or datetime.fromtimestamp(0, tz=UTC)
+        replaceable = [
+            {"agreement_id": agreement_id},
+            {"agreement_date": {"$lte": agreement_date}},
+            {"agreement_date": {"$exists": False}},
+        ]
+        if artifact.get("linked_agreement_hash"):
+            replaceable.append({"agreement_hash_id": artifact["linked_agreement_hash"]})
 
-        cp_name = new_artifact["artifact"]["cp_name"]
-        timestamp = canonical_ts()
+        try:
+            await self.gdb.consent_latest_pointers.update_one(
+                {"dp_id": dp_id, "df_id": df_id, "cp_id": cp_id, "$or": replaceable},
+                {
+                    "$set": {
+                        "artifact_id": artifact_id,
+                        "agreement_id": agreement_id,
+                        "agreement_hash_id": full_consent_artifact.get("agreement_hash_id"),
+                        "agreement_date": agreement_date,
+                        "cp_name": artifact.get("cp_name"),
+                        "updated_at": datetime.now(UTC),
+                    }
+                },
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            logger.info(
+                f"Kept the latest pointer for cp_id: {cp_id}; it references a newer agreement than {agreement_id}",
+                extra={"agreement_id": agreement_id},
+            )
 
-        changed_granted_purposes = []
-        changed_withdrawn_purposes = []
-
-        for key, new_status in new_consents_map.items():
-            old_status = old_consents_map.get(key)
-            if new_status != old_status:
-                purpose_obj = new_purposes_map_full.get(key)
-                if purpose_obj:
-                    if new_status == "approved":
-                        changed_granted_purposes.append(purpose_obj)
-                    elif new_status == "denied":
-                        changed_withdrawn_purposes.append(purpose_obj)
-
-        if changed_granted_purposes:
-            message_to_publish_granted = {
-                "dp_id": dp_id,
-                "df_id": df_id,
-                "cp_name": cp_name,
-                "event_type": "consent_granted",
-                "timestamp": timestamp,
-                "purposes": changed_granted_purposes,
+    async def _update_active_consent_state(self, dp_id: str, df_id: str, cp_id: str, artifact_id, artifact: dict):
+        """
+        Maintain the customer portal's (dp_id, de_id) read model: for every data element of the
+        latest artifact of this collection point, record its active (not denied/expired) purposes.
+        Entries created here only hold this collection point, so they start unseeded and the customer
+        portal keeps scanning artifacts for them until it has backfilled the other collection points.
+        """
+        now = datetime.now(UTC)
+        agreement_key = f"agreements.{cp_id}"
+        operations = []
+        for de in artifact.get("consent_scope", {}).get("data_elements", []):
+            purposes = [
+                {
+                    "purpose_id": consent.get("purpose_id"),
+                    "purpose_title": consent.get("purpose_title"),
+                    "consent_status": consent.get("consent_status"),
+                    "consent_timestamp": consent.get("consent_timestamp"),
+                    "consent_expiry_period": consent.get("consent_expiry_period"),
+                }
+                for consent in de.get("consents", [])
+                if (consent.get("consent_status") or "").lower() not in ["denied", "expired"]
+            ]
+            update = {
+                "$set": {"df_id": df_id, "de_hash_id": de.get("de_hash_id"), "title": de.get("title"), "updated_at": now},
+                "$setOnInsert": {"seeded": False},
             }
-            await publish_message("consent_events_q", json.dumps(message_to_publish_granted), channel=channel)
+            if purposes:
+                update["$set"][agreement_key] = {
+                    "agreement_id": artifact.get("agreement_id"),
+                    "cp_name": artifact.get("cp_name", "Unknown"),
+                    "artifact_id": str(artifact_id),
+                    "purposes": purposes,
+                }
+            else:
+                update["$unset"] = {agreement_key: ""}
+            operations.append(UpdateOne({"dp_id": dp_id, "de_id": de.get("de_id")}, update, upsert=True))
 
-        if changed_withdrawn_purposes:
-            message_to_publish_withdrawn = {
-                "dp_id": dp_id,
-                "df_id": df_id,
-                "cp_name": cp_name,
-                "event_type": "consent_withdrawn",
-                "timestamp": timestamp,
-                "purposes": changed_withdrawn_purposes,
-            }
-            await publish_message("consent_events_q", json.dumps(message_to_publish_withdrawn), channel=channel)
+        if operations:
+            await self.gdb.consent_active_state.bulk_write(operations, ordered=False)
 
     async def process_consent_submission(self, payload: dict):
+        """
+        Applies a consent submission at most once per (agreement_id, payload hash). The ledger records
+        the version and change records on the first attempt; each later step is skipped or repeated
+        idempotently on retry, and events go through the outbox instead of being published inline.
+        """
         full_consent_artifact = payload["consent_artifact"]
 
         agreement_id = full_consent_artifact["artifact"]["agreement_id"]
@@ -226,6 +512,14 @@ class ConsentWorkerService:
         cp_id = full_consent_artifact["artifact"]["cp_id"]
         timestamp = canonical_ts(payload.get("timestamp"))
 
+        request_key = self._request_key(payload, agreement_id)
+        ledger = await self._claim_submission(request_key, agreement_id)
+        if ledger["status"] == "completed":
+            logger.info(f"Submission for agreement_id: {agreement_id} already processed; flushing outbox only", extra={"agreement_id": agreement_id})
+            await self.flush_outbox(request_key)
+            return
+
+        new_data_elements = full_consent_artifact["artifact"]["consent_scope"]["data_elements"]
         existing_artifact = await self.gdb.consent_latest_artifacts.find_one(
             {
                 "dp_id": dp_id,
@@ -235,68 +529,75 @@ class ConsentWorkerService:
             }
         )
 
-        if existing_artifact:
+        already_applied = bool(existing_artifact) and existing_artifact.get("last_request_key") == request_key
+        superseded = bool(existing_artifact) and not already_applied and existing_artifact.get("version", 0) >= ledger.get("version", 0)
+        if ledger["status"] == "received" or superseded:
+            ledger = await self._prepare_submission(ledger, existing_artifact, new_data_elements)
 
-            new_version = existing_artifact.get("version", 0) + 1
-            operation = "update"
+        new_version = ledger["version"]
+        operation = ledger["operation"]
+        changes = ledger["changes"]
 
-            artifact_to_spread = full_consent_artifact.copy()
-            artifact_to_spread.pop("_id", None)
-            artifact_to_spread.pop("version", None)
-            artifact_to_spread.pop("operation", None)
+        artifact_to_spread = full_consent_artifact.copy()
+        artifact_to_spread.pop("_id", None)
+        artifact_to_spread.pop("version", None)
+        artifact_to_spread.pop("operation", None)
 
-            update_fields = {
-                "timestamp": timestamp,
-                "dp_id": dp_id,
-                "df_id": df_id,
-                "cp_id": cp_id,
-                **artifact_to_spread,
-                "version": new_version,
-            }
+        latest_fields = {
+            "timestamp": timestamp,
+            "dp_id": dp_id,
+            "df_id": df_id,
+            "cp_id": cp_id,
+            **artifact_to_spread,
+            "consent_grants": build_consent_grants(new_data_elements),
+            "version": new_version,
+            "last_request_key": request_key,
+        }
 
-            await self.gdb.consent_latest_artifacts.update_one(
-                {"dp_id": dp_id, "df_id": df_id, "cp_id": cp_id, "agreement_id": agreement_id},
-                {"$set": update_fields},
+        if already_applied:
+            artifact_id = existing_artifact["_id"]
+        elif existing_artifact:
+            result = await self.gdb.consent_latest_artifacts.update_one(
+                {"_id": existing_artifact["_id"], "version": existing_artifact.get("version")},
+                {"$set": build_minimal_set(existing_artifact, latest_fields)},
             )
-
-            await self._compare_and_publish_consent_changes(existing_artifact, full_consent_artifact, dp_id, df_id, self.channel)
+            if result.matched_count == 0:
+                raise RuntimeError(f"Latest artifact for agreement {agreement_id} changed concurrently; the submission will be retried.")
+            artifact_id = existing_artifact["_id"]
         else:
+            insert_result = await self.gdb.consent_latest_artifacts.insert_one({"agreement_id": agreement_id, **latest_fields})
+            artifact_id = insert_result.inserted_id
 
-            new_version = 1
-            operation = "insert"
+        await self._update_latest_pointer(dp_id, df_id, cp_id, agreement_id, artifact_id, full_consent_artifact)
+        await self._update_active_consent_state(dp_id, df_id, cp_id, artifact_id, full_consent_artifact["artifact"])
 
-            artifact_to_spread = full_consent_artifact.copy()
-            artifact_to_spread.pop("_id", None)
-            artifact_to_spread.pop("version", None)
-            artifact_to_spread.pop("operation", None)
+        cp_name = full_consent_artifact["artifact"]["cp_name"]
+        await self._stage_consent_events(request_key, changes, dp_id, df_id, cp_id, cp_name, agreement_id, new_version)
 
-            latest_artifact_entry = {
+        if not await self.gdb.consent_audit_logs.find_one({"request_key": request_key}, projection={"_id": 1}):
+            audit_log_entry = {
                 "dp_id": dp_id,
                 "df_id": df_id,
                 "cp_id": cp_id,
                 "agreement_id": agreement_id,
                 "timestamp": timestamp,
-                **artifact_to_spread,
+                **full_consent_artifact.copy(),
                 "version": new_version,
+                "operation": operation,
+                "consent_changes": {"schema_version": CONSENT_CHANGE_SCHEMA_VERSION, "changes": changes},
+                "request_key": request_key,
             }
-            await self.gdb.consent_latest_artifacts.insert_one(latest_artifact_entry)
-
-            await self._publish_initial_consent_events(full_consent_artifact, dp_id, df_id, self.channel)
+            audit_log_entry.pop("_id", None)
+            audit_log_entry.pop("consent_grants", None)
 
-        audit_log_entry = {
-            "dp_id": dp_id,
-            "df_id": df_id,
-            "cp_id": cp_id,
-            "agreement_id": agreement_id,
-            "timestamp": timestamp,
-            **full_consent_artifact.copy(),
-            "version": new_version,
-            "operation": operation,
-        }
-        audit_log_entry.pop("_id", None)
+            audit_log_entry = await self._prepare_secure_audit_entry(audit_log_entry)
+            await self.gdb.consent_audit_logs.insert_one(audit_log_entry)
 
-        audit_log_entry = await self._prepare_secure_audit_entry(audit_log_entry)
-        await self.gdb.consent_audit_logs.insert_one(audit_log_entry)
+        await self.gdb.consent_processing_ledger.update_one(
+            {"_id": request_key},
+            {"$set": {"status": "completed", "artifact_id": artifact_id, "completed_at": datetime.now(UTC)}},
+        )
+        await self.flush_outbox(request_key)
 
         logger.info(f"Processed consent for agreement_id: {agreement_id}", extra={"agreement_id": agreement_id})
 
@@ -398,6 +699,7 @@ class ConsentWorkerService:
                 "$set": {
                     "artifact.consent_scope.data_elements.$[de].consents.$[c].consent_status": "expired",
                     "artifact.consent_scope.data_elements.$[de].consents.$[c].consent_expiry_notification_sent": True,
+                    "consent_grants.$[g].consent_status": "expired",
                     "timestamp": canonical_ts(),
                 },
                 "$inc": {"version": 1},
@@ -405,6 +707,7 @@ class ConsentWorkerService:
             array_filters=[
                 {"de.de_id": data_element_id},
                 {"c.purpose_id": purpose_id},
+                {"g.de_id": data_element_id, "g.purpose_id": purpose_id},
             ],
             return_document=True,
         )
@@ -415,6 +718,10 @@ class ConsentWorkerService:
                 extra={"consent_artifact_id": consent_artifact_id, "purpose_id": purpose_id},
             )
 
+            pointer = await self.gdb.consent_latest_pointers.find_one({"dp_id": dp_id, "df_id": df_id, "cp_id": cp_id})
+            if pointer is None or pointer.get("artifact_id") == update_result["_id"]:
+                await self._update_active_consent_state(dp_id, df_id, cp_id, update_result["_id"], update_result["artifact"])
+
             new_version = update_result.get("version", 0)
             audit_ts = canonical_ts()
             audit_log_entry = {
@@ -428,6 +735,7 @@ class ConsentWorkerService:
                 "operation": "consent_expired",
             }
             audit_log_entry.pop("_id", None)
+            audit_log_entry.pop("consent_grants", None)
             audit_log_entry = await self._prepare_secure_audit_entry(audit_log_entry)
             await self.gdb.consent_audit_logs.insert_one(audit_log_entry)
             logger.info(
@@ -599,6 +907,7 @@ class ConsentWorkerService:
                 "operation": "data_erasure_retention_triggered" if not instant_expiry else "data_erasure_manual_triggered",
             }
             audit_log_entry.pop("_id", None)
+            audit_log_entry.pop("consent_grants", None)
 
             audit_log_entry = await self._prepare_secure_audit_entry(audit_log_entry)
             await self.gdb.consent_audit_logs.insert_one(audit_log_entry)
@@ -703,6 +1012,7 @@ class ConsentWorkerService:
                 "operation": "otp_verified",
             }
             audit_log_entry.pop("_id", None)
+            audit_log_entry.pop("consent_grants", None)
 
             audit_log_entry = await self._prepare_secure_audit_entry(audit_log_entry)
             await self.gdb.consent_audit_logs.insert_one(audit_log_entry)
@@ -5,7 +5,7 @@ from bson import ObjectId
 from fastapi import BackgroundTasks, HTTPException, Request
 from fastapi.responses import HTMLResponse
 
-from app.db.rabbitmq import publish_message
+from app.db.rabbitmq import publish_consent_processing
 from app.services.postgres_service import (
     delete_token_information,
     get_token_information,
@@ -114,7 +114,7 @@ async def handle_legacy_consent_submission(
         "timestamp": datetime.now(UTC).isoformat(),
         "consent_artifact": consent_artifact,
     }
-    await publish_message("consent_processing_q", json.dumps(message_payload))
+    await publish_consent_processing(message_payload)
 
     background_tasks.add_task(
         delete_token_information,
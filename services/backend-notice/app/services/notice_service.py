@@ -6,7 +6,9 @@ from app.db.session import get_redis, get_s3_client
 from app.utils.common import run_in_thread
 from minio.error import S3Error
 import os
+from typing import Optional
 from app.core.logger import get_logger
+from app.utils.notice_cache import ByteBoundedLRU, NoticeSegments, NoticeVariant, build_variant
 
 
 logger = get_logger("service.notice_service")
@@ -15,9 +17,62 @@ logger = get_logger("service.notice_service")
 s3_client = get_s3_client()
 SECRET_KEY = settings.SECRET_KEY
 S3_BUCKET = settings.NOTICE_WORKER_BUCKET
+NOTICE_NOT_FOUND = "Notice not found."
 
+notice_html_cache = ByteBoundedLRU(settings.NOTICE_HTML_CACHE_MAX_BYTES, settings.NOTICE_HTML_CACHE_TTL_SECONDS)
+_otp_variant: Optional[NoticeVariant] = None
 
-async def retrieve_notice_html(token: str, request: Request):
+
+def _language_script(language: str) -> str:
+    return f"""
+        <script>
+            document.addEventListener("DOMContentLoaded", function() {{
+                window.prefLanguage = '{language}';
+            }});
+        </script>
+        """
+
+
+def invalidate_notice_cache(df_id: Optional[str] = None, cp_id: Optional[str] = None):
+    """Drop in-process notice entries for a collection point, a DF, or everything."""
+    if df_id is None:
+        notice_html_cache.clear()
+    elif cp_id is None:
+        notice_html_cache.pop_prefix(f"notice:{df_id}:")
+    else:
+        notice_html_cache.pop_prefix(f"notice:{df_id}:{cp_id}:")
+
+
+async def _get_notice_segments(redis_client, df_id: str, cp_id: str) -> Optional[NoticeSegments]:
+    segments_key = f"notice:{df_id}:{cp_id}:segments"
+    segments = notice_html_cache.get(segments_key)
+    if segments is not None:
+        return segments
+
+    cache_key = f"notice:{df_id}:{cp_id}"
+    cached_notice = await redis_client.get(cache_key)
+
+    if cached_notice is not None:
+        rendered_html = cached_notice.decode("utf-8") if isinstance(cached_notice, bytes) else cached_notice
+    else:
+        s3_object_name = f"notices/{cp_id}.html"
+        try:
+            response = await run_in_thread(s3_client.get_object, S3_BUCKET, s3_object_name)
+            rendered_html = response.read().decode("utf-8")
+        except S3Error as e:
+            logger.error(f"S3 error: {str(e)}", exc_info=True)
+            if e.code == "NoSuchKey":
+                return None
+            raise HTTPException(status_code=500, detail=f"S3 error: {str(e)}")
+
+        await redis_client.setex(cache_key, 3600, rendered_html)
+
+    segments = NoticeSegments.from_html(rendered_html)
+    notice_html_cache.set(segments_key, segments, len(rendered_html))
+    return segments
+
+
+async def retrieve_notice_html(token: str, request: Request) -> NoticeVariant:
     redis_client = get_redis()
     try:
 
@@ -47,35 +102,18 @@ async def retrieve_notice_html(token: str, request: Request):
         if not cp_id:
             raise HTTPException(status_code=400, detail="Invalid token payload.")
 
-        cache_key = f"notice:{df_id}:{cp_id}"
-        cached_notice = await redis_client.get(cache_key)
-
-        language_script = f"""
-        <script>
-            document.addEventListener("DOMContentLoaded", function() {{
-                window.prefLanguage = '{language}';
-            }});
-        </script>
-        """
-
-        if cached_notice is not None:
-            cached_notice = cached_notice.decode("utf-8") if isinstance(cached_notice, bytes) else cached_notice
-            return cached_notice.replace("</head>", f"{language_script}</head>")
-
-        new_file_name = f"{cp_id}.html"
-        s3_object_name = f"notices/{new_file_name}"
+        variant_key = f"notice:{df_id}:{cp_id}:{language}"
+        variant = notice_html_cache.get(variant_key)
+        if variant is not None:
+            return variant
 
-        try:
-            response = await run_in_thread(s3_client.get_object, S3_BUCKET, s3_object_name)
-            rendered_html = response.read().decode("utf-8")
-        except S3Error as e:
-            logger.error(f"S3 error: {str(e)}", exc_info=True)
-            if e.code == "NoSuchKey":
-                return "Notice not found."
-            raise HTTPException(status_code=500, detail=f"S3 error: {str(e)}")
+        segments = await _get_notice_segments(redis_client, df_id, cp_id)
+        if segments is None:
+            return build_variant(NOTICE_NOT_FOUND, NOTICE_NOT_FOUND)
 
-        await redis_client.setex(cache_key, 3600, rendered_html)
-        return rendered_html.replace("</head>", f"{language_script}</head>")
+        variant = build_variant(segments.render(_language_script(language)), f"{segments.digest}:{language}")
+        notice_html_cache.set(variant_key, variant, variant.size)
+        return variant
 
     except JWTError as e:
         logger.error(f"JWT decode failed: {str(e)}", exc_info=True)
@@ -86,14 +124,20 @@ async def retrieve_notice_html(token: str, request: Request):
         raise HTTPException(status_code=500, detail="Internal Server Error.")
 
 
-async def retrieve_otp_html(token: str, request: Request):
-    try:
+def load_otp_page() -> NoticeVariant:
+    """Read and precompress the OTP page once; it does not change while the process runs."""
+    global _otp_variant
+    html_file_path = os.path.join("app", "constants", "otp_verification.html")
+    with open(html_file_path, "r", encoding="utf-8", errors="strict") as html_file:
+        rendered_html = html_file.read().replace("{{api_url}}", "http://127.0.0.1:8001")
 
-        html_file_path = os.path.join("app", "constants", "otp_verification.html")
-        with open(html_file_path, "r", encoding="utf-8", errors="strict") as html_file:
-            rendered_html = html_file.read().replace("{{api_url}}", "http://127.0.0.1:8001")
+    _otp_variant = build_variant(rendered_html, rendered_html)
+    return _otp_variant
 
-        return rendered_html
+
+async def retrieve_otp_html(token: str, request: Request) -> NoticeVariant:
+    try:
+        return _otp_variant or load_otp_page()
 
     except Exception as e:
         logger.error("Internal Server Error:", exc_info=True)
@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import brotli
+
+
+HEAD_CLOSE_TAG = "</head>"
+
+
+@dataclass(frozen=True)
+class NoticeVariant:
+    """A fully rendered notice page with its precompressed encodings."""
+
+    html: bytes
+    gzip: bytes
+    br: bytes
+    etag: str
+
+    @property
+    def size(self) -> int:
+        return len(self.html) + len(self.gzip) + len(self.br)
+
+    def encoded(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """Pick the smallest representation the client accepts."""
+        accepted = {token.split(";")[0].strip().lower() for token in (accept_encoding or "").split(",")}
+        if "br" in accepted:
+            return self.br, "br"
+        if "gzip" in accepted:
+            return self.gzip, "gzip"
+        return self.html, None
+
+
+@dataclass(frozen=True)
+class NoticeSegments:
+    """Notice HTML pre-split around </head> so a language can be spliced in without rescanning."""
+
+    head: str
+    tail: str
+    digest: str
+
+    @classmethod
+    def from_html(cls, html: str) -> "NoticeSegments":
+        digest = hashlib.sha256(html.encode("utf-8")).hexdigest()[:32]
+        head, tag, rest = html.partition(HEAD_CLOSE_TAG)
+        if not tag:
+            return cls(head=html, tail="", digest=digest)
+        return cls(head=head, tail=tag + rest, digest=digest)
+
+    def render(self, injection: str) -> str:
+        if not self.tail:
+            return self.head
+        return f"{self.head}{injection}{self.tail}"
+
+
+def build_variant(html: str, etag_seed: str) -> NoticeVariant:
+    body = html.encode("utf-8")
+    return NoticeVariant(
+        html=body,
+        gzip=gzip.compress(body, compresslevel=6),
+        br=brotli.compress(body, mode=brotli.MODE_TEXT, quality=5),
+        etag=f'"{hashlib.sha256(etag_seed.encode("utf-8")).hexdigest()[:32]}"',
+    )
+
+
+class ByteBoundedLRU:
+    """
+    In-process LRU whose capacity is expressed in bytes rather than entries.
+    Entries expire after `ttl_seconds` so republished notices are picked up from L2.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: int):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, int, object]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            self.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value, size: int):
+        if size > self.max_bytes:
+            return
+        self.pop(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def pop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def pop_prefix(self, prefix: str):
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            self.pop(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    @property
+    def current_bytes(self) -> int:
+        return self._bytes
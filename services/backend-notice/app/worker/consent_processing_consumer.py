@@ -1,7 +1,9 @@
 import asyncio
 import json
+
 import aio_pika
 from app.db.session import get_mongo_master_db, startup_db_clients
+from app.db.messaging import owned_consent_processing_shards
 from app.db.rabbitmq import rabbitmq_pool, declare_queues
 from app.services.consent_worker_service import ConsentWorkerService
 from app.core.config import settings
@@ -142,23 +144,51 @@ async def handle_failure(message: aio_pika.IncomingMessage, agreement_id: str, e
             )
 
 
-async def start_worker() -> None:
+async def _consume(queue_name: str, prefetch_count: int, gdb):
+    _, channel = await rabbitmq_pool.open_channel(prefetch_count=prefetch_count)
+    queue = await channel.get_queue(queue_name)
+    await queue.consume(lambda msg: process_consent_processing_event(msg, channel, gdb))
+    logger.info(f"Waiting for messages on '{queue_name}' (prefetch {prefetch_count})...")
+    return channel
+
+
+async def run_outbox_relay(gdb):
+    """Periodically publishes consent_event_outbox entries that stayed pending past the grace period."""
+    consent_worker_service = ConsentWorkerService(gdb, None)
+    while True:
+        try:
+            await consent_worker_service.relay_stale_outbox()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Consent outbox relay failed: {e}", exc_info=True)
+        await asyncio.sleep(settings.CONSENT_OUTBOX_RELAY_INTERVAL_SECONDS)
+
+
+async def start_worker(worker_index: int = 0, worker_count: int = 1) -> None:
+    """
+    Consumes this worker's consent_processing_q shards, each on its own channel with prefetch 1 so
+    messages of a shard (and therefore of an agreement) are processed one at a time and in order.
+    Worker 0 also drains the unsharded consent_processing_q left over from older publishers and
+    runs the outbox relay.
+    """
     setup_logging()
     await startup_db_clients()
     await rabbitmq_pool.init_pool()
     await declare_queues()
 
     gdb = get_mongo_master_db()
+    await ConsentWorkerService.ensure_indexes(gdb)
+    shards = owned_consent_processing_shards(worker_index, worker_count, settings.CONSENT_PROCESSING_SHARDS)
+    relay_task = asyncio.create_task(run_outbox_relay(gdb)) if worker_index == 0 else None
 
     while True:
-        connection, channel = None, None
+        channels = []
         try:
-            connection, channel = await rabbitmq_pool.get_connection()
-            await channel.set_qos(prefetch_count=10)
-            queue = await channel.get_queue("consent_processing_q")
-            logger.info("Waiting for messages on 'consent_processing_q'...")
-
-            await queue.consume(lambda msg: process_consent_processing_event(msg, channel, gdb))
+            for queue_name in shards:
+                channels.append(await _consume(queue_name, 1, gdb))
+            if worker_index == 0:
+                channels.append(await _consume("consent_processing_q", settings.CONSENT_PROCESSING_PREFETCH, gdb))
 
             await asyncio.Future()
 
@@ -170,7 +200,13 @@ async def start_worker() -> None:
             await asyncio.sleep(5)
             continue
         finally:
-            pass
+            for channel in channels:
+                if not channel.is_closed:
+                    await channel.close()
+
+    if relay_task:
+        relay_task.cancel()
+        await asyncio.gather(relay_task, return_exceptions=True)
 
 
 if __name__ == "__main__":
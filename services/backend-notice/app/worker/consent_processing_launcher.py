@@ -0,0 +1,71 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+
+from app.core.config import settings
+from app.core.logger import get_logger, setup_logging
+from app.worker.consent_processing_consumer import start_worker
+
+
+logger = get_logger("worker.consent_processing_launcher")
+
+RESTART_DELAY_SECONDS = 5
+
+
+def _run_worker(worker_index: int, worker_count: int):
+    asyncio.run(start_worker(worker_index, worker_count))
+
+
+def worker_count() -> int:
+    """CONSENT_PROCESSING_WORKERS, or one per core; never more workers than shards."""
+    requested = settings.CONSENT_PROCESSING_WORKERS or os.cpu_count() or 1
+    return max(1, min(requested, settings.CONSENT_PROCESSING_SHARDS))
+
+
+def main():
+    """
+    Starts one consent processing consumer per worker slot and restarts any that exit. Each slot
+    owns a fixed subset of the shard queues, so per-agreement ordering survives restarts.
+    """
+    setup_logging()
+    count = worker_count()
+    context = multiprocessing.get_context("spawn")
+    workers = {}
+    stopping = False
+
+    def spawn(worker_index: int):
+        process = context.Process(target=_run_worker, args=(worker_index, count), name=f"consent-processing-{worker_index}", daemon=False)
+        process.start()
+        workers[worker_index] = process
+        logger.info(f"Started consent processing worker {worker_index}/{count} (pid {process.pid}).")
+
+    def stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        logger.info(f"Received signal {signum}; stopping {len(workers)} consent processing workers...")
+        for process in workers.values():
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for worker_index in range(count):
+        spawn(worker_index)
+
+    while not stopping:
+        time.sleep(RESTART_DELAY_SECONDS)
+        for worker_index, process in list(workers.items()):
+            if not process.is_alive() and not stopping:
+                logger.error(f"Consent processing worker {worker_index} exited with code {process.exitcode}; restarting.")
+                spawn(worker_index)
+
+    for process in workers.values():
+        process.join()
+    logger.info("All consent processing workers stopped.")
+
+
+if __name__ == "__main__":
+    main()
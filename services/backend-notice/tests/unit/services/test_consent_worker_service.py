@@ -0,0 +1,244 @@
+import pytest
+from datetime import datetime, timedelta, UTC
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services import consent_worker_service as module
+from app.services.consent_worker_service import ConsentWorkerService
+
+
+COLLECTIONS = (
+    "consent_processing_ledger",
+    "consent_latest_artifacts",
+    "consent_latest_pointers",
+    "consent_active_state",
+    "consent_audit_logs",
+    "consent_event_outbox",
+)
+
+
+def artifact_payload(status="approved"):
+    return {
+        "timestamp": "2025-01-01T00:00:00+00:00",
+        "consent_artifact": {
+            "artifact": {
+                "agreement_id": "agr-1",
+                "cp_id": "cp1",
+                "cp_name": "Signup",
+                "data_principal": {"dp_id": "dp1"},
+                "data_fiduciary": {"df_id": "df1"},
+                "consent_scope": {"data_elements": [{"de_id": "de1", "title": "Email", "consents": [{"purpose_id": "p1", "consent_status": status}]}]},
+            }
+        },
+    }
+
+
+@pytest.fixture
+def gdb():
+    db = MagicMock()
+    for name in COLLECTIONS:
+        collection = getattr(db, name)
+        collection.find_one_and_update = AsyncMock()
+        collection.find_one = AsyncMock(return_value=None)
+        collection.update_one = AsyncMock(return_value=MagicMock(matched_count=1))
+        collection.insert_one = AsyncMock(return_value=MagicMock(inserted_id="new-artifact"))
+        collection.insert_many = AsyncMock()
+        collection.bulk_write = AsyncMock()
+    return db
+
+
+@pytest.fixture
+def service(gdb):
+    service = ConsentWorkerService(gdb, MagicMock())
+    service.flush_outbox = AsyncMock(return_value=0)
+    service._prepare_secure_audit_entry = AsyncMock(side_effect=lambda entry: entry)
+    return service
+
+
+def request_key(payload):
+    return ConsentWorkerService._request_key(payload, "agr-1")
+
+
+@pytest.mark.asyncio
+async def test_completed_duplicate_only_flushes_outbox(service, gdb):
+    payload = artifact_payload()
+    gdb.consent_processing_ledger.find_one_and_update.return_value = {"_id": request_key(payload), "status": "completed"}
+
+    await service.process_consent_submission(payload)
+
+    service.flush_outbox.assert_awaited_once_with(request_key(payload))
+    gdb.consent_latest_artifacts.find_one.assert_not_awaited()
+    gdb.consent_latest_artifacts.update_one.assert_not_awaited()
+    gdb.consent_audit_logs.insert_one.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_already_applied_retry_skips_artifact_write(service, gdb):
+    payload = artifact_payload()
+    key = request_key(payload)
+    changes = [{"de_id": "de1", "purpose_id": "p1", "old_status": None, "new_status": "approved"}]
+    gdb.consent_processing_ledger.find_one_and_update.return_value = {
+        "_id": key,
+        "status": "prepared",
+        "version": 2,
+        "operation": "update",
+        "changes": changes,
+    }
+    gdb.consent_latest_artifacts.find_one.return_value = {"_id": "artifact-1", "version": 2, "last_request_key": key}
+    # The audit entry was written by the attempt that failed afterwards.
+    gdb.consent_audit_logs.find_one.return_value = {"_id": "audit-1"}
+
+    await service.process_consent_submission(payload)
+
+    gdb.consent_latest_artifacts.update_one.assert_not_awaited()
+    gdb.consent_latest_artifacts.insert_one.assert_not_awaited()
+    gdb.consent_audit_logs.insert_one.assert_not_awaited()
+    # The ledger keeps the change records of the first attempt.
+    staged = gdb.consent_event_outbox.insert_many.await_args.args[0]
+    assert [entry["_id"] for entry in staged] == [f"{key}:consent_granted"]
+    completed = gdb.consent_processing_ledger.update_one.await_args.args[1]["$set"]
+    assert completed["status"] == "completed"
+    assert completed["artifact_id"] == "artifact-1"
+    service.flush_outbox.assert_awaited_once_with(key)
+
+
+@pytest.mark.asyncio
+async def test_superseded_version_is_prepared_again(service, gdb):
+    payload = artifact_payload(status="denied")
+    key = request_key(payload)
+    gdb.consent_processing_ledger.find_one_and_update.return_value = {"_id": key, "status": "prepared", "version": 2, "operation": "update", "changes": []}
+    # Another submission stored version 2 after this one was prepared.
+    existing = {
+        "_id": "artifact-1",
+        "version": 2,
+        "last_request_key": "agr-1:other",
+        "artifact": artifact_payload()["consent_artifact"]["artifact"],
+    }
+    gdb.consent_latest_artifacts.find_one.return_value = existing
+
+    await service.process_consent_submission(payload)
+
+    prepared = gdb.consent_processing_ledger.update_one.await_args_list[0].args[1]["$set"]
+    assert prepared["version"] == 3
+    assert [change["new_status"] for change in prepared["changes"]] == ["denied"]
+    artifact_filter, update = gdb.consent_latest_artifacts.update_one.await_args.args
+    assert artifact_filter == {"_id": "artifact-1", "version": 2}
+    assert update["$set"]["version"] == 3
+    assert update["$set"]["last_request_key"] == key
+    staged = gdb.consent_event_outbox.insert_many.await_args.args[0]
+    assert [entry["_id"] for entry in staged] == [f"{key}:consent_withdrawn"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_artifact_change_raises_for_retry(service, gdb):
+    payload = artifact_payload()
+    key = request_key(payload)
+    gdb.consent_processing_ledger.find_one_and_update.return_value = {"_id": key, "status": "received"}
+    gdb.consent_latest_artifacts.find_one.return_value = {"_id": "artifact-1", "version": 1, "artifact": {}}
+    gdb.consent_latest_artifacts.update_one.return_value = MagicMock(matched_count=0)
+
+    with pytest.raises(RuntimeError):
+        await service.process_consent_submission(payload)
+
+    gdb.consent_event_outbox.insert_many.assert_not_awaited()
+    service.flush_outbox.assert_not_awaited()
+
+
+def claimable(*entries):
+    """find_one_and_update stand-in handing out each entry once, like the pending -> publishing claim."""
+    remaining = list(entries)
+
+    async def claim(query, update, **kwargs):
+        return {**remaining.pop(0), **update["$set"]} if remaining else None
+
+    return AsyncMock(side_effect=claim)
+
+
+@pytest.mark.asyncio
+async def test_flush_claims_each_entry_before_publishing(gdb):
+    service = ConsentWorkerService(gdb, None)
+    entry = {"_id": "agr-1:x:consent_granted", "queue": "consent_events_q", "body": "{}"}
+    gdb.consent_event_outbox.find_one_and_update = claimable(entry)
+    publish = AsyncMock()
+
+    with patch.object(module, "publish_message", publish):
+        published = await service.flush_outbox("agr-1:x")
+
+    query, update = gdb.consent_event_outbox.find_one_and_update.await_args_list[0].args
+    assert query == {"status": "pending", "request_key": "agr-1:x"}
+    assert update["$set"]["status"] == "publishing"
+    assert published == 1
+    publish.assert_awaited_once_with("consent_events_q", "{}", channel=None)
+    marked = gdb.consent_event_outbox.update_one.await_args.args
+    assert marked[0] == {"_id": "agr-1:x:consent_granted"}
+    assert marked[1]["$set"]["status"] == "published"
+
+
+@pytest.mark.asyncio
+async def test_flush_releases_claim_when_publish_fails(gdb):
+    service = ConsentWorkerService(gdb, None)
+    gdb.consent_event_outbox.find_one_and_update = claimable({"_id": "e1", "queue": "consent_events_q", "body": "{}"})
+
+    with patch.object(module, "publish_message", AsyncMock(side_effect=ConnectionError("down"))):
+        with pytest.raises(ConnectionError):
+            await service.flush_outbox("agr-1:x")
+
+    gdb.consent_event_outbox.update_one.assert_awaited_once_with({"_id": "e1", "status": "publishing"}, {"$set": {"status": "pending"}})
+
+
+@pytest.mark.asyncio
+async def test_relay_claims_stale_pending_and_abandoned_publishing_events(gdb):
+    service = ConsentWorkerService(gdb, None)
+    gdb.consent_event_outbox.find_one_and_update = claimable(
+        {"_id": "e1", "queue": "consent_events_q", "body": "{}"}, {"_id": "e2", "queue": "consent_events_q", "body": "{}"}
+    )
+
+    with patch.object(module, "publish_message", AsyncMock()):
+        published = await service.relay_stale_outbox()
+
+    query = gdb.consent_event_outbox.find_one_and_update.await_args_list[0].args[0]
+    pending, publishing = query["$or"]
+    cutoff = datetime.now(UTC) - timedelta(seconds=module.settings.CONSENT_OUTBOX_RELAY_GRACE_SECONDS)
+    assert pending["status"] == "pending"
+    assert "request_key" not in pending
+    assert pending["created_at"]["$lt"] <= cutoff
+    assert publishing["status"] == "publishing"
+    assert publishing["claimed_at"]["$lt"] <= cutoff
+    assert published == 2
+
+
+def pointer_artifact(agreement_date, linked_hash=None):
+    artifact = artifact_payload()["consent_artifact"]
+    artifact["agreement_hash_id"] = "hash-2"
+    artifact["artifact"]["data_fiduciary"]["agreement_date"] = agreement_date
+    if linked_hash:
+        artifact["artifact"]["linked_agreement_hash"] = linked_hash
+    return artifact
+
+
+@pytest.mark.asyncio
+async def test_latest_pointer_only_replaces_older_or_superseded_pointers(service, gdb):
+    await service._update_latest_pointer("dp1", "df1", "cp1", "agr-1", "artifact-1", pointer_artifact("2025-02-01T10:00:00", linked_hash="hash-1"))
+
+    query, update = gdb.consent_latest_pointers.update_one.await_args.args
+    agreement_date = datetime(2025, 2, 1, 10, tzinfo=UTC)
+    assert {key: query[key] for key in ("dp_id", "df_id", "cp_id")} == {"dp_id": "dp1", "df_id": "df1", "cp_id": "cp1"}
+    assert query["$or"] == [
+        {"agreement_id": "agr-1"},
+        {"agreement_date": {"$lte": agreement_date}},
+        {"agreement_date": {"$exists": False}},
+        {"agreement_hash_id": "hash-1"},
+    ]
+    assert update["$set"]["artifact_id"] == "artifact-1"
+    assert update["$set"]["agreement_date"] == agreement_date
+    assert update["$set"]["agreement_hash_id"] == "hash-2"
+    assert gdb.consent_latest_pointers.update_one.await_args.kwargs["upsert"] is True
+
+
+@pytest.mark.asyncio
+async def test_latest_pointer_keeps_newer_pointer_on_duplicate_key(service, gdb):
+    gdb.consent_latest_pointers.update_one.side_effect = module.DuplicateKeyError("E11000")
+
+    await service._update_latest_pointer("dp1", "df1", "cp1", "agr-1", "artifact-1", pointer_artifact("2025-01-01T00:00:00"))
+
+    query = gdb.consent_latest_pointers.update_one.await_args.args[0]
+    assert {"agreement_hash_id": "hash-1"} not in query["$or"]
@@ -0,0 +1,54 @@
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def decode_cmp_admin_token(credentials: HTTPAuthorizationCredentials | None) -> str:
+    """Returns the user id from a CMP admin access token; the token is signed with the SECRET_KEY shared with cmp-admin."""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    if not settings.SECRET_KEY:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Analytics authentication is not configured.")
+    if credentials is None:
+        raise credentials_exception
+    try:
+        payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    user_id = payload.get("sub")
+    if not user_id:
+        raise credentials_exception
+    return user_id
+
+
+async def authorize_website_access(master_db: AsyncIOMotorDatabase, user_id: str, website_id: str) -> dict:
+    """Checks that the user belongs to the data fiduciary owning `website_id` (an asset in cmp-admin's asset_master)."""
+    try:
+        user_oid, website_oid = ObjectId(user_id), ObjectId(website_id)
+    except InvalidId:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to read analytics for this website.")
+
+    user = await master_db["cmp_users"].find_one({"_id": user_oid}, {"df_id": 1})
+    if not user or not user.get("df_id"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials", headers={"WWW-Authenticate": "Bearer"})
+
+    asset = await master_db["asset_master"].find_one(
+        {"_id": website_oid, "df_id": user["df_id"], "asset_status": {"$in": ["draft", "published"]}}, {"_id": 1}
+    )
+    if not asset:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to read analytics for this website.")
+    return {"_id": user_id, "df_id": user["df_id"]}
+
+
+def get_cmp_admin_user_id(credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme)) -> str:
+    return decode_cmp_admin_token(credentials)
@@ -8,7 +8,27 @@ class Settings(BaseSettings):
     SERVICE_NAME: str = "backend-cookie-consent"
     MONGO_URI: str
     DB_NAME_COOKIE_MANAGEMENT: str = "cookie_management_test"
+    DB_NAME_CONCUR_MASTER: str = "concur_master_test"
+    # Shared with cmp-admin: consent analytics only accept access tokens it issued.
+    SECRET_KEY: Optional[str] = None
+    ALGORITHM: str = "HS256"
     RATE_LIMIT_DEFAULT: str = "5/minute, 60/hour"
+    RATE_LIMIT_ENABLED: bool = True
+    CONSENT_INGESTION_MODE: str = "sync"
+    CONSENT_BUFFER_MAX_SIZE: int = 10000
+    CONSENT_BUFFER_BATCH_SIZE: int = 500
+    CONSENT_BUFFER_FLUSH_INTERVAL_SECONDS: float = 0.2
+    CONSENT_BUFFER_MAX_ATTEMPTS: int = 3
+    CONSENT_BUFFER_RETRY_BACKOFF_SECONDS: float = 0.5
+
+    CONSENT_ROLLUP_INTERVAL_SECONDS: int = 300
+    CONSENT_ROLLUP_LATE_ARRIVAL_HOURS: int = 1
+    CONSENT_AUDIT_RETENTION_DAYS: int = 90
+    CONSENT_AUDIT_ARCHIVE_BUCKET: str = "cookie-consent-audit-archive"
+    S3_URL: Optional[str] = None
+    MINIO_ROOT_USER: Optional[str] = None
+    MINIO_ROOT_PASSWORD: Optional[str] = None
+    S3_SECURE: bool = False
     model_config = SettingsConfigDict(env_file=os.getenv("ENV_FILE", ".env"), extra="ignore")
 
 
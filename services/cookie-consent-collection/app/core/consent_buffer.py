@@ -0,0 +1,232 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.core.logger import app_logger
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def _newer_state_filter(current_state_record: dict) -> dict:
+    """
+    Matches the stored state only if it is older than the incoming record. When a newer
+    choice is already stored the upsert falls through to an insert and hits the unique
+    (website_id, unique_key) index, so a retried or delayed write can never roll it back.
+    """
+    return {
+        "website_id": current_state_record["website_id"],
+        "unique_key": current_state_record["unique_key"],
+        "last_updated": {"$lt": current_state_record["last_updated"]},
+    }
+
+
+async def write_consent_direct(database, current_state_record: dict, audit_record: dict) -> str:
+    """Upserts one current-state record and writes its audit record; returns the audit action."""
+    state_update = {k: v for k, v in current_state_record.items() if k != "initial_timestamp"}
+    try:
+        existing_record = await database["user_preferences_current"].find_one_and_update(
+            _newer_state_filter(current_state_record),
+            {"$set": state_update, "$setOnInsert": {"initial_timestamp": current_state_record["initial_timestamp"]}},
+            upsert=True,
+            projection={"_id": 1},
+            return_document=ReturnDocument.BEFORE,
+        )
+        action = "updated" if existing_record else "created"
+    except DuplicateKeyError:
+        # A newer choice is already stored; the click is still audited.
+        action = "updated"
+    await database["consent_audit_records"].insert_one({**audit_record, "action": action})
+    return action
+
+
+class ConsentWriteBuffer:
+    """
+    Write-behind buffer for consent submissions. Records are queued in-process and
+    flushed in batches: one unordered bulk_write of upserts for the current-state collection
+    and one insert_many for the audit trail. The created/updated audit action is
+    derived from the upserted ids of the bulk result instead of a find_one per click.
+
+    Each batch is collapsed to the latest record per (website_id, unique_key) and every
+    upsert only applies over an older stored state, so retries and the direct fallback
+    never overwrite a newer choice with an older one.
+
+    Records whose upsert fails are retried with exponential backoff; after `max_attempts`
+    they are written one by one like the synchronous path, so a bad batch never drops
+    the records that could still be stored.
+    """
+
+    def __init__(
+        self,
+        database,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        max_attempts: int = 3,
+        retry_backoff: float = 0.5,
+    ):
+        self.database = database
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._held: Optional[Tuple[dict, dict]] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            app_logger.info("Consent write buffer started.")
+
+    def submit(self, current_state_record: dict, audit_record: dict) -> bool:
+        """Queues a submission; returns False when the buffer is full so the caller can write directly."""
+        try:
+            self._queue.put_nowait((current_state_record, audit_record))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def stop(self):
+        """Stops the flusher and writes out everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._inflight is not None and not self._inflight.done():
+            await asyncio.gather(self._inflight, return_exceptions=True)
+
+        if self._held is not None:
+            await self._flush(self._drain(self._held))
+            self._held = None
+        while not self._queue.empty():
+            await self._flush(self._drain())
+        app_logger.info("Consent write buffer flushed and stopped.")
+
+    def _drain(self, first: Optional[Tuple[dict, dict]] = None) -> List[Tuple[dict, dict]]:
+        batch = [first] if first is not None else []
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            self._held = await self._queue.get()
+            if self._queue.qsize() < self.batch_size:
+                await asyncio.sleep(self.flush_interval)
+            batch = self._drain(self._held)
+            self._held = None
+            self._inflight = asyncio.ensure_future(self._flush(batch))
+            try:
+                await asyncio.shield(self._inflight)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                app_logger.critical(f"Failed to flush {len(batch)} buffered consent records: {e}", exc_info=True)
+
+    async def _flush(self, batch: List[Tuple[dict, dict]]):
+        if not batch:
+            return
+
+        pending = batch
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                pending = await self._write_batch(pending)
+                if not pending:
+                    return
+                error = f"{len(pending)} write errors"
+            except Exception as e:
+                error = e
+            if attempt < self.max_attempts:
+                app_logger.warning(f"Consent batch write attempt {attempt} failed for {len(pending)} records, retrying: {error}")
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+        app_logger.error(f"Consent batch write failed for {len(pending)} records after {self.max_attempts} attempts; writing them directly.")
+        await self._write_direct(pending)
+
+    async def _write_batch(self, batch: List[Tuple[dict, dict]]) -> List[Tuple[dict, dict]]:
+        """Writes a batch and its audit records; returns the entries whose upsert failed."""
+        latest: Dict[Tuple[str, str], int] = {}
+        for index, (current_state_record, _) in enumerate(batch):
+            key = (current_state_record["website_id"], current_state_record["unique_key"])
+            if key not in latest or current_state_record["last_updated"] >= batch[latest[key]][0]["last_updated"]:
+                latest[key] = index
+
+        keys = list(latest)
+        operations = []
+        for key in keys:
+            state = dict(batch[latest[key]][0])
+            initial_timestamp = state.pop("initial_timestamp")
+            operations.append(
+                UpdateOne(
+                    _newer_state_filter(state),
+                    {"$set": state, "$setOnInsert": {"initial_timestamp": initial_timestamp}},
+                    upsert=True,
+                )
+            )
+
+        failed_ops = set()
+        try:
+            result = await self.database["user_preferences_current"].bulk_write(operations, ordered=False)
+            upserted_ops = set(result.upserted_ids.keys())
+        except BulkWriteError as e:
+            # Unordered: every op not listed in writeErrors was applied and still needs its audit record.
+            # A duplicate key means a newer choice is already stored, which is not a failure.
+            failed_ops = {error["index"] for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY_ERROR}
+            upserted_ops = {item["index"] for item in e.details.get("upserted", [])}
+
+        failed_keys = {keys[op] for op in failed_ops}
+        created_keys = {keys[op] for op in upserted_ops}
+        audit_records = []
+        failed = []
+        for current_state_record, audit_record in batch:
+            key = (current_state_record["website_id"], current_state_record["unique_key"])
+            if key in failed_keys:
+                failed.append((current_state_record, audit_record))
+                continue
+            # Only the first click for a newly created key is audited as "created".
+            audit_records.append({**audit_record, "action": "created" if key in created_keys else "updated"})
+            created_keys.discard(key)
+
+        if audit_records:
+            await self._insert_audit_records(audit_records)
+
+        app_logger.info(
+            f"Flushed {len(audit_records)} buffered consent records "
+            f"({len(operations)} keys, {len(upserted_ops)} created, {len(failed)} failed)."
+        )
+        return failed
+
+    async def _insert_audit_records(self, audit_records: List[dict]):
+        """Audit records are only retried on their own: their upserts are already stored."""
+        pending = audit_records
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self.database["consent_audit_records"].insert_many(pending, ordered=False)
+                return
+            except BulkWriteError as e:
+                failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                pending = [record for index, record in enumerate(pending) if index in failed]
+                error = e
+            except Exception as e:
+                error = e
+            if attempt < self.max_attempts:
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+        app_logger.critical(f"Failed to write {len(pending)} consent audit records after {self.max_attempts} attempts: {error}")
+
+    async def _write_direct(self, batch: List[Tuple[dict, dict]]):
+        for current_state_record, audit_record in batch:
+            try:
+                await write_consent_direct(self.database, current_state_record, audit_record)
+            except Exception as e:
+                app_logger.critical(
+                    f"Failed to record consent for website '{current_state_record['website_id']}' "
+                    f"key '{current_state_record['unique_key']}': {e}",
+                    exc_info=True,
+                )
@@ -0,0 +1,210 @@
+import asyncio
+import gzip
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta, UTC
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, ReplaceOne
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+
+logger = get_logger("core.consent_rollups")
+
+AUDIT_COLLECTION = "consent_audit_records"
+HOURLY_COLLECTION = "consent_rollups_hourly"
+DAILY_COLLECTION = "consent_rollups_daily"
+STATE_COLLECTION = "consent_rollup_state"
+STATE_ID = "consent_rollups"
+
+HOUR_FORMAT = "%Y-%m-%dT%H"
+
+
+def _truncate_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _truncate_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+async def ensure_rollup_indexes(db):
+    await db[HOURLY_COLLECTION].create_index([("website_id", ASCENDING), ("bucket_start", ASCENDING)], unique=True, name="idx_website_bucket")
+    await db[DAILY_COLLECTION].create_index([("website_id", ASCENDING), ("bucket_start", ASCENDING)], unique=True, name="idx_website_bucket")
+
+
+async def _get_watermark(db) -> Optional[datetime]:
+    state = await db[STATE_COLLECTION].find_one({"_id": STATE_ID})
+    if state:
+        return state["watermark"]
+    oldest = await db[AUDIT_COLLECTION].find_one({}, sort=[("timestamp", ASCENDING)], projection={"timestamp": 1})
+    return oldest["timestamp"] if oldest else None
+
+
+async def _aggregate_hourly(db, start: datetime, end: datetime) -> Dict[Tuple[str, datetime], dict]:
+    match = {"$match": {"timestamp": {"$gte": start, "$lt": end}}}
+    hour = {"$dateToString": {"format": HOUR_FORMAT, "date": "$timestamp"}}
+
+    category_pipeline = [
+        match,
+        {"$project": {"website_id": 1, "hour": hour, "choices": {"$objectToArray": "$consent_data.category_choices"}}},
+        {"$unwind": "$choices"},
+        {
+            "$group": {
+                "_id": {"website_id": "$website_id", "hour": "$hour", "category": "$choices.k"},
+                "accepted": {"$sum": {"$cond": ["$choices.v", 1, 0]}},
+                "rejected": {"$sum": {"$cond": ["$choices.v", 0, 1]}},
+            }
+        },
+    ]
+    interaction_pipeline = [
+        match,
+        {"$group": {"_id": {"website_id": "$website_id", "hour": hour}, "interactions": {"$sum": 1}}},
+    ]
+
+    category_rows, interaction_rows = await asyncio.gather(
+        db[AUDIT_COLLECTION].aggregate(category_pipeline).to_list(length=None),
+        db[AUDIT_COLLECTION].aggregate(interaction_pipeline).to_list(length=None),
+    )
+
+    buckets: Dict[Tuple[str, datetime], dict] = {}
+
+    def bucket_for(row_id: dict) -> dict:
+        bucket_start = datetime.strptime(row_id["hour"], HOUR_FORMAT).replace(tzinfo=UTC)
+        key = (row_id["website_id"], bucket_start)
+        return buckets.setdefault(key, {"interactions": 0, "categories": {}})
+
+    for row in interaction_rows:
+        bucket_for(row["_id"])["interactions"] = row["interactions"]
+    for row in category_rows:
+        bucket_for(row["_id"])["categories"][row["_id"]["category"]] = {"accepted": row["accepted"], "rejected": row["rejected"]}
+    return buckets
+
+
+async def _rebuild_daily(db, first_day: datetime, last_day: datetime, now: datetime):
+    daily: Dict[Tuple[str, datetime], dict] = defaultdict(lambda: {"interactions": 0, "categories": defaultdict(lambda: {"accepted": 0, "rejected": 0})})
+    cursor = db[HOURLY_COLLECTION].find({"bucket_start": {"$gte": first_day, "$lt": last_day + timedelta(days=1)}})
+    async for hourly in cursor:
+        bucket = daily[(hourly["website_id"], _truncate_day(hourly["bucket_start"]))]
+        bucket["interactions"] += hourly.get("interactions", 0)
+        for category, counts in hourly.get("categories", {}).items():
+            bucket["categories"][category]["accepted"] += counts.get("accepted", 0)
+            bucket["categories"][category]["rejected"] += counts.get("rejected", 0)
+
+    operations = [
+        ReplaceOne(
+            {"website_id": website_id, "bucket_start": day},
+            {
+                "website_id": website_id,
+                "bucket_start": day,
+                "interactions": bucket["interactions"],
+                "categories": {category: dict(counts) for category, counts in bucket["categories"].items()},
+                "updated_at": now,
+            },
+            upsert=True,
+        )
+        for (website_id, day), bucket in daily.items()
+    ]
+    if operations:
+        await db[DAILY_COLLECTION].bulk_write(operations, ordered=False)
+
+
+async def roll_up_consent_audits(db, now: datetime) -> int:
+    """
+    Recomputes hourly and daily per-website, per-category accept/reject counts for every
+    hour touched since the stored watermark. Buckets are replaced rather than incremented,
+    so overlapping or repeated runs stay correct.
+    """
+    watermark = await _get_watermark(db)
+    if watermark is None:
+        return 0
+
+    start = _truncate_hour(watermark) - timedelta(hours=settings.CONSENT_ROLLUP_LATE_ARRIVAL_HOURS)
+    buckets = await _aggregate_hourly(db, start, now)
+
+    operations = [
+        ReplaceOne(
+            {"website_id": website_id, "bucket_start": bucket_start},
+            {"website_id": website_id, "bucket_start": bucket_start, **bucket, "updated_at": now},
+            upsert=True,
+        )
+        for (website_id, bucket_start), bucket in buckets.items()
+    ]
+    if operations:
+        await db[HOURLY_COLLECTION].bulk_write(operations, ordered=False)
+        await _rebuild_daily(db, _truncate_day(start), _truncate_day(now), now)
+
+    await db[STATE_COLLECTION].update_one({"_id": STATE_ID}, {"$set": {"watermark": now}}, upsert=True)
+    logger.info(f"Rolled up {len(operations)} hourly consent buckets from {start.isoformat()}")
+    return len(operations)
+
+
+def _write_archive(s3_client, object_name: str, payload: bytes):
+    s3_client.put_object(
+        bucket_name=settings.CONSENT_AUDIT_ARCHIVE_BUCKET,
+        object_name=object_name,
+        data=BytesIO(payload),
+        length=len(payload),
+        content_type="application/x-ndjson",
+        metadata={"Content-Encoding": "gzip"},
+    )
+
+
+async def archive_expired_audits(db, s3_client, now: datetime) -> int:
+    """
+    Moves raw audits older than CONSENT_AUDIT_RETENTION_DAYS to MinIO as gzip NDJSON,
+    one object per hour, then deletes them. Only hours already covered by the rollup
+    watermark are archived so reporting never loses data.
+    """
+    watermark = await _get_watermark(db)
+    if watermark is None:
+        return 0
+    cutoff = min(now - timedelta(days=settings.CONSENT_AUDIT_RETENTION_DAYS), _truncate_hour(watermark))
+
+    archived = 0
+    loop = asyncio.get_running_loop()
+    while True:
+        oldest = await db[AUDIT_COLLECTION].find_one({"timestamp": {"$lt": cutoff}}, sort=[("timestamp", ASCENDING)], projection={"timestamp": 1})
+        if not oldest:
+            break
+
+        hour_start = _truncate_hour(oldest["timestamp"])
+        hour_end = min(hour_start + timedelta(hours=1), cutoff)
+        hour_query = {"timestamp": {"$gte": hour_start, "$lt": hour_end}}
+
+        buffer = BytesIO()
+        count = 0
+        with gzip.GzipFile(fileobj=buffer, mode="wb") as archive:
+            async for record in db[AUDIT_COLLECTION].find(hour_query).sort("_id", ASCENDING):
+                record["_id"] = str(record["_id"])
+                archive.write(json.dumps(record, default=str).encode("utf-8") + b"\n")
+                count += 1
+
+        object_name = f"consent-audits/{hour_start:%Y/%m/%d}/{hour_start:%Y%m%dT%H%M%S}-{hour_end:%Y%m%dT%H%M%S}.ndjson.gz"
+        await loop.run_in_executor(None, _write_archive, s3_client, object_name, buffer.getvalue())
+        await db[AUDIT_COLLECTION].delete_many(hour_query)
+
+        archived += count
+        logger.info(f"Archived {count} consent audits to {object_name}")
+
+    return archived
+
+
+async def get_consent_rollups(db, website_id: str, granularity: str, start: datetime, end: datetime) -> List[dict]:
+    """Reads time-bucketed rollups for a website and adds per-category opt-in rates."""
+    collection = HOURLY_COLLECTION if granularity == "hour" else DAILY_COLLECTION
+    cursor = db[collection].find(
+        {"website_id": website_id, "bucket_start": {"$gte": start, "$lt": end}},
+        projection={"_id": 0, "website_id": 0},
+    ).sort("bucket_start", ASCENDING)
+
+    buckets = []
+    async for bucket in cursor:
+        for counts in bucket.get("categories", {}).values():
+            total = counts.get("accepted", 0) + counts.get("rejected", 0)
+            counts["opt_in_rate"] = round(counts.get("accepted", 0) / total, 4) if total else None
+        buckets.append(bucket)
+    return buckets
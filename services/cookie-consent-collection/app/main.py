@@ -1,9 +1,9 @@
 import os
-from typing import Dict
+from typing import Dict, Literal
 from contextlib import asynccontextmanager
-from datetime import datetime, UTC
+from datetime import datetime, timedelta, UTC
 
-from fastapi import FastAPI, Request, status, HTTPException
+from fastapi import Depends, FastAPI, Query, Request, Response, status, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -12,16 +12,20 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
+from app.core.auth import authorize_website_access, get_cmp_admin_user_id
 from app.core.config import settings
+from app.core.consent_buffer import ConsentWriteBuffer, write_consent_direct
+from app.core.consent_rollups import get_consent_rollups
 from app.core.logger import app_logger, setup_logging
 
 
-limiter = Limiter(key_func=get_remote_address, default_limits=[settings.RATE_LIMIT_DEFAULT])
+limiter = Limiter(key_func=get_remote_address, default_limits=[settings.RATE_LIMIT_DEFAULT], enabled=settings.RATE_LIMIT_ENABLED)
 
 
 class MongoDB:
     client: AsyncIOMotorClient = None
     database = None
+    write_buffer: ConsentWriteBuffer = None
 
 
 async def create_indexes():
@@ -46,7 +50,19 @@ async def lifespan(app: FastAPI):
         app_logger.critical(f"Could not connect to MongoDB at {settings.MONGO_URI}. {e}")
     MongoDB.database = MongoDB.client[settings.DB_NAME_COOKIE_MANAGEMENT]
     await create_indexes()
+    if settings.CONSENT_INGESTION_MODE == "buffered":
+        MongoDB.write_buffer = ConsentWriteBuffer(
+            MongoDB.database,
+            max_size=settings.CONSENT_BUFFER_MAX_SIZE,
+            batch_size=settings.CONSENT_BUFFER_BATCH_SIZE,
+            flush_interval=settings.CONSENT_BUFFER_FLUSH_INTERVAL_SECONDS,
+            max_attempts=settings.CONSENT_BUFFER_MAX_ATTEMPTS,
+            retry_backoff=settings.CONSENT_BUFFER_RETRY_BACKOFF_SECONDS,
+        )
+        MongoDB.write_buffer.start()
     yield
+    if MongoDB.write_buffer:
+        await MongoDB.write_buffer.stop()
     if MongoDB.client:
         MongoDB.client.close()
         app_logger.info("MongoDB connection closed gracefully.")
@@ -79,19 +95,13 @@ app.add_middleware(
 
 @app.post("/v1/consent", status_code=status.HTTP_201_CREATED)
 @limiter.limit("5/minute")
-async def submit_consent(payload: ConsentPayload, request: Request):
+async def submit_consent(payload: ConsentPayload, request: Request, response: Response):
     if MongoDB.database is None:
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection is unavailable.")
 
     ip_address = request.headers.get("x-forwarded-for", get_remote_address(request)).split(",")[0].strip()
     unique_key = payload.user_id if payload.user_id else ip_address
 
-    audit_collection = MongoDB.database["consent_audit_records"]
-    current_collection = MongoDB.database["user_preferences_current"]
-
-    filter_query = {"website_id": payload.website_id, "unique_key": unique_key}
-    existing_record = await current_collection.find_one(filter_query)
-    action = "updated" if existing_record else "created"
     current_timestamp = datetime.now(UTC)
     data = payload.model_dump()
 
@@ -101,13 +111,12 @@ async def submit_consent(payload: ConsentPayload, request: Request):
         "category_choices": data["category_choices"],
         "language": payload.language,
         "last_updated": current_timestamp,
-        "initial_timestamp": existing_record.get("initial_timestamp", current_timestamp) if existing_record else current_timestamp,
+        "initial_timestamp": current_timestamp,
     }
 
     audit_record = {
         "website_id": payload.website_id,
         "unique_key": unique_key,
-        "action": action,
         "ip_address": ip_address,
         "timestamp": current_timestamp,
         "consent_data": data,
@@ -115,10 +124,13 @@ async def submit_consent(payload: ConsentPayload, request: Request):
         "country": request.headers.get("x-country", "unknown"),
     }
 
+    if MongoDB.write_buffer is not None and MongoDB.write_buffer.submit(current_state_record, audit_record):
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"message": "Consent accepted and queued for recording."}
+
     try:
-        await current_collection.update_one(filter_query, {"$set": current_state_record}, upsert=True)
-        result = await audit_collection.insert_one(audit_record)
-        app_logger.info(f"Consent {action} for Key '{unique_key}'. Audit ID: {result.inserted_id}")
+        action = await write_consent_direct(MongoDB.database, current_state_record, audit_record)
+        app_logger.info(f"Consent {action} for Key '{unique_key}'.")
     except Exception as e:
         app_logger.critical(f"Error writing to MongoDB: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to record consent securely due to a server error.")
@@ -126,6 +138,27 @@ async def submit_consent(payload: ConsentPayload, request: Request):
     return {"message": f"Consent successfully {action} and recorded."}
 
 
+@app.get("/v1/consent-analytics")
+async def consent_analytics(
+    website_id: str,
+    granularity: Literal["hour", "day"] = "day",
+    start: datetime | None = Query(None, description="Inclusive bucket start (UTC). Defaults to 30 days before `end`."),
+    end: datetime | None = Query(None, description="Exclusive bucket end (UTC). Defaults to now."),
+    user_id: str = Depends(get_cmp_admin_user_id),
+):
+    if MongoDB.database is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database connection is unavailable.")
+    await authorize_website_access(MongoDB.client[settings.DB_NAME_CONCUR_MASTER], user_id, website_id)
+
+    end = end.replace(tzinfo=end.tzinfo or UTC) if end else datetime.now(UTC)
+    start = start.replace(tzinfo=start.tzinfo or UTC) if start else end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end.")
+
+    buckets = await get_consent_rollups(MongoDB.database, website_id, granularity, start, end)
+    return {"website_id": website_id, "granularity": granularity, "buckets": buckets}
+
+
 @app.get("/v1/status")
 async def status_check():
     is_db_connected = False
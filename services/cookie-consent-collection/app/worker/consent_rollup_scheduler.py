@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime, UTC
+
+from minio import Minio
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.core.consent_rollups import archive_expired_audits, ensure_rollup_indexes, roll_up_consent_audits
+from app.core.logger import get_logger, setup_logging
+
+
+logger = get_logger("worker.consent_rollup_scheduler")
+
+
+def build_archive_client():
+    if not settings.S3_URL:
+        logger.warning("S3_URL is not configured; raw consent audits will not be archived.")
+        return None
+    client = Minio(
+        settings.S3_URL,
+        access_key=settings.MINIO_ROOT_USER,
+        secret_key=settings.MINIO_ROOT_PASSWORD,
+        secure=settings.S3_SECURE,
+    )
+    if not client.bucket_exists(settings.CONSENT_AUDIT_ARCHIVE_BUCKET):
+        client.make_bucket(settings.CONSENT_AUDIT_ARCHIVE_BUCKET)
+    return client
+
+
+async def main():
+    setup_logging()
+    client = AsyncIOMotorClient(settings.MONGO_URI, tz_aware=True)
+    db = client[settings.DB_NAME_COOKIE_MANAGEMENT]
+    await ensure_rollup_indexes(db)
+    archive_client = build_archive_client()
+
+    logger.info("Consent rollup scheduler started.")
+    try:
+        while True:
+            now = datetime.now(UTC)
+            try:
+                await roll_up_consent_audits(db, now)
+                if archive_client is not None:
+                    await archive_expired_audits(db, archive_client, now)
+            except Exception as e:
+                logger.error(f"Consent rollup cycle failed: {e}", exc_info=True)
+            await asyncio.sleep(settings.CONSENT_ROLLUP_INTERVAL_SECONDS)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())